@@ -1,8 +1,9 @@
+import json
 import logging
 from functools import lru_cache
 from pathlib import Path
 
-from pydantic import Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,6 +15,41 @@ DEFAULT_STUCKUP_EXPORT_COLUMNS = (
     "status_timestamp,ageing_bucket,hub_dest_station_name,next_destination_name,hub_region,cluster_name,"
     "fms_last_update_time,last_run_time,last_operator,day,Ageing bucket_,operator"
 )
+DEFAULT_STUCKUP_PIPELINE_NAME = "default"
+
+
+class StuckupPipelineConfig(BaseModel):
+    # One entry of STUCKUP_PIPELINES; unset fields inherit the global STUCKUP_*/SUPABASE_* values.
+    model_config = ConfigDict(extra="forbid")
+
+    name: str = Field(min_length=1, pattern=r"^[A-Za-z0-9_-]+$")
+    source_spreadsheet_id: str | None = None
+    source_worksheet_name: str | None = None
+    source_range: str | None = None
+    target_spreadsheet_id: str | None = None
+    target_worksheet_name: str | None = None
+    log_worksheet_name: str | None = None
+    filter_status_values: str | None = None
+    export_columns: str | None = None
+    supabase_table: str | None = None
+    supabase_conflict_column: str | None = None
+    auto_sync_enabled: bool | None = None
+    sync_mode: str | None = None
+    poll_interval_seconds: int | None = None
+    scheduled_sync_interval_seconds: int | None = None
+    sync_schedule: str | None = None
+    probe_schedule: str | None = None
+    summary_schedule: str | None = None
+    reference_row: int | None = None
+    report_group_id: str | None = None
+
+
+_PIPELINE_SUPABASE_FIELDS = {
+    "supabase_table": "supabase_stuckup_table",
+    "supabase_conflict_column": "supabase_stuckup_conflict_column",
+}
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -24,12 +60,61 @@ class Settings(BaseSettings):
     seatalk_system_signing_secrets: str = Field(default="", alias="SEATALK_SYSTEM_SIGNING_SECRETS")
     seatalk_verify_signature: bool = Field(default=True, alias="SEATALK_VERIFY_SIGNATURE")
     seatalk_api_base_url: str = Field(default="https://openapi.seatalk.io", alias="SEATALK_API_BASE_URL")
+    # One pooled connection set to the SeaTalk API per process; HTTP/2 needs the h2 package (httpx[http2]).
+    seatalk_http2: bool = Field(default=False, alias="SEATALK_HTTP2")
+    seatalk_http_max_connections: int = Field(default=20, alias="SEATALK_HTTP_MAX_CONNECTIONS")
+    seatalk_http_max_keepalive_connections: int = Field(default=10, alias="SEATALK_HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    seatalk_http_keepalive_expiry_seconds: float = Field(default=60.0, alias="SEATALK_HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    seatalk_http_connect_timeout_seconds: float = Field(default=5.0, alias="SEATALK_HTTP_CONNECT_TIMEOUT_SECONDS")
+    seatalk_http_timeout_seconds: float = Field(default=15.0, alias="SEATALK_HTTP_TIMEOUT_SECONDS")
+    # The app access token is refreshed in the background this long before it expires.
+    seatalk_token_refresh_ahead_seconds: float = Field(default=600.0, alias="SEATALK_TOKEN_REFRESH_AHEAD_SECONDS")
+    seatalk_token_retry_base_seconds: float = Field(default=2.0, alias="SEATALK_TOKEN_RETRY_BASE_SECONDS")
+    seatalk_token_retry_max_seconds: float = Field(default=60.0, alias="SEATALK_TOKEN_RETRY_MAX_SECONDS")
+    # Share the token between workers on one host: none, file or sqlite (path defaults under data/seatalk/).
+    seatalk_token_cache: str = Field(default="none", alias="SEATALK_TOKEN_CACHE")
+    seatalk_token_cache_path: str = Field(default="", alias="SEATALK_TOKEN_CACHE_PATH")
+    # Callback replies are queued and delivered after the ack; set the rate to the app's SeaTalk quota.
+    seatalk_outbox_workers: int = Field(default=4, alias="SEATALK_OUTBOX_WORKERS")
+    seatalk_outbox_rate_per_minute: float = Field(default=100.0, alias="SEATALK_OUTBOX_RATE_PER_MINUTE")
+    seatalk_outbox_burst: float = Field(default=10.0, alias="SEATALK_OUTBOX_BURST")
+    seatalk_outbox_max_attempts: int = Field(default=5, alias="SEATALK_OUTBOX_MAX_ATTEMPTS")
+    seatalk_outbox_retry_base_seconds: float = Field(default=1.0, alias="SEATALK_OUTBOX_RETRY_BASE_SECONDS")
+    seatalk_outbox_retry_max_seconds: float = Field(default=60.0, alias="SEATALK_OUTBOX_RETRY_MAX_SECONDS")
+    seatalk_outbox_max_pending: int = Field(default=1000, alias="SEATALK_OUTBOX_MAX_PENDING")
+    seatalk_outbox_dead_letter_limit: int = Field(default=100, alias="SEATALK_OUTBOX_DEAD_LETTER_LIMIT")
+    seatalk_outbox_drain_seconds: float = Field(default=10.0, alias="SEATALK_OUTBOX_DRAIN_SECONDS")
+    # Merge replies to one group thread produced within this window into one message (0 = off).
+    seatalk_outbox_coalesce_window_ms: int = Field(default=0, alias="SEATALK_OUTBOX_COALESCE_WINDOW_MS")
+    seatalk_outbox_coalesce_max_chars: int = Field(default=4096, alias="SEATALK_OUTBOX_COALESCE_MAX_CHARS")
+    # Chat workflows: a "working on it" notice goes out after the first delay, the run is cancelled
+    # after the timeout (a WorkflowSpec can set its own).
+    workflow_working_notice_seconds: float = Field(default=3.0, alias="WORKFLOW_WORKING_NOTICE_SECONDS")
+    workflow_timeout_seconds: float = Field(default=25.0, alias="WORKFLOW_TIMEOUT_SECONDS")
+    # On shutdown, runs still in flight after this long are cancelled.
+    workflow_drain_seconds: float = Field(default=10.0, alias="WORKFLOW_DRAIN_SECONDS")
+    # Redelivered callbacks (same event_id) are acked without reprocessing: none, memory, sqlite or supabase.
+    seatalk_callback_dedup: str = Field(default="memory", alias="SEATALK_CALLBACK_DEDUP")
+    seatalk_callback_dedup_ttl_seconds: float = Field(default=3600.0, alias="SEATALK_CALLBACK_DEDUP_TTL_SECONDS")
+    seatalk_callback_dedup_max_entries: int = Field(default=10000, alias="SEATALK_CALLBACK_DEDUP_MAX_ENTRIES")
+    seatalk_callback_dedup_path: Path = Field(
+        default=Path("data/seatalk/callback_events.sqlite3"), alias="SEATALK_CALLBACK_DEDUP_PATH"
+    )
+    # Groups the bot was added to, kept for broadcasts: memory, sqlite or supabase.
+    seatalk_group_registry: str = Field(default="sqlite", alias="SEATALK_GROUP_REGISTRY")
+    seatalk_group_registry_path: Path = Field(default=Path("data/seatalk/groups.sqlite3"), alias="SEATALK_GROUP_REGISTRY_PATH")
+    seatalk_broadcast_concurrency: int = Field(default=8, alias="SEATALK_BROADCAST_CONCURRENCY")
+    # Enables POST /seatalk/broadcast; requests are signed like /stuckup/trigger.
+    seatalk_broadcast_secret: str = Field(default="", alias="SEATALK_BROADCAST_SECRET")
 
     openrouter_api_key: str = Field(default="", alias="OPENROUTER_API_KEY")
     openrouter_model: str = Field(default="", alias="OPENROUTER_MODEL")
     openrouter_base_url: str = Field(default="https://openrouter.ai/api/v1", alias="OPENROUTER_BASE_URL")
 
     google_service_account_file: str = Field(default="", alias="GOOGLE_SERVICE_ACCOUNT_FILE")
+    # Overrides the Sheets API root URL, e.g. a local fake server (benchmarks/fake_servers.py).
+    # Without a service account file, requests are then sent unauthenticated.
+    google_sheets_api_endpoint: str = Field(default="", alias="GOOGLE_SHEETS_API_ENDPOINT")
     stuckup_source_spreadsheet_id: str = Field(default="", alias="STUCKUP_SOURCE_SPREADSHEET_ID")
     stuckup_source_worksheet_name: str = Field(default="Source", alias="STUCKUP_SOURCE_WORKSHEET_NAME")
     stuckup_source_range: str = Field(default="A1:AL", alias="STUCKUP_SOURCE_RANGE")
@@ -48,10 +133,27 @@ class Settings(BaseSettings):
     supabase_stuckup_table: str = Field(default="stuckup_shipments", alias="SUPABASE_STUCKUP_TABLE")
     supabase_stuckup_conflict_column: str = Field(default="shipment_id", alias="SUPABASE_STUCKUP_CONFLICT_COLUMN")
     supabase_stuckup_state_table: str = Field(default="stuckup_sync_state", alias="SUPABASE_STUCKUP_STATE_TABLE")
+    supabase_callback_events_table: str = Field(default="seatalk_callback_events", alias="SUPABASE_CALLBACK_EVENTS_TABLE")
+    supabase_seatalk_groups_table: str = Field(default="seatalk_groups", alias="SUPABASE_SEATALK_GROUPS_TABLE")
     supabase_stuckup_state_key: str = Field(default="reference_row_fingerprint", alias="SUPABASE_STUCKUP_STATE_KEY")
     supabase_stuckup_data_hash_key: str = Field(default="stuckup_data_hash", alias="SUPABASE_STUCKUP_DATA_HASH_KEY")
+    supabase_stuckup_scheduled_sync_key: str = Field(
+        default="stuckup_last_scheduled_sync_ts",
+        alias="SUPABASE_STUCKUP_SCHEDULED_SYNC_KEY",
+    )
+    supabase_stuckup_report_hash_key: str = Field(
+        default="stuckup_last_reported_hash",
+        alias="SUPABASE_STUCKUP_REPORT_HASH_KEY",
+    )
 
-    stuckup_raw_backup_path: Path = Field(default=Path("data/stuckup/raw_full.jsonl"), alias="STUCKUP_RAW_BACKUP_PATH")
+    stuckup_backup_enabled: bool = Field(default=True, alias="STUCKUP_BACKUP_ENABLED")
+    stuckup_backup_dir: Path = Field(default=Path("data/stuckup/backups"), alias="STUCKUP_BACKUP_DIR")
+    stuckup_backup_snapshot_interval_seconds: int = Field(
+        default=86400,
+        alias="STUCKUP_BACKUP_SNAPSHOT_INTERVAL_SECONDS",
+    )
+    stuckup_backup_retention_count: int = Field(default=7, alias="STUCKUP_BACKUP_RETENTION_COUNT")
+    stuckup_backup_retention_days: int = Field(default=14, alias="STUCKUP_BACKUP_RETENTION_DAYS")
     stuckup_auto_sync_enabled: bool = Field(default=True, alias="STUCKUP_AUTO_SYNC_ENABLED")
     stuckup_poll_interval_seconds: int = Field(default=60, alias="STUCKUP_POLL_INTERVAL_SECONDS")
     stuckup_sync_mode: str = Field(default="scheduled", alias="STUCKUP_SYNC_MODE")
@@ -59,8 +161,44 @@ class Settings(BaseSettings):
         default=1800,
         alias="STUCKUP_SCHEDULED_SYNC_INTERVAL_SECONDS",
     )
+    # Cron ("*/30 * * * *") or interval ("every 30m") expressions in APP_TIMEZONE. Empty values
+    # fall back to STUCKUP_SCHEDULED_SYNC_INTERVAL_SECONDS / STUCKUP_POLL_INTERVAL_SECONDS.
+    stuckup_sync_schedule: str = Field(default="", alias="STUCKUP_SYNC_SCHEDULE")
+    stuckup_probe_schedule: str = Field(default="", alias="STUCKUP_PROBE_SCHEDULE")
+    stuckup_summary_schedule: str = Field(default="", alias="STUCKUP_SUMMARY_SCHEDULE")
+    stuckup_schedule_jitter_seconds: float = Field(default=0.0, alias="STUCKUP_SCHEDULE_JITTER_SECONDS")
+    stuckup_missed_run_policy: str = Field(default="once", alias="STUCKUP_MISSED_RUN_POLICY")
+    stuckup_sync_deadline_seconds: float = Field(default=900.0, alias="STUCKUP_SYNC_DEADLINE_SECONDS")
+    stuckup_probe_deadline_seconds: float = Field(default=60.0, alias="STUCKUP_PROBE_DEADLINE_SECONDS")
+    stuckup_summary_deadline_seconds: float = Field(default=300.0, alias="STUCKUP_SUMMARY_DEADLINE_SECONDS")
+    stuckup_summary_source: str = Field(default="local", alias="STUCKUP_SUMMARY_SOURCE")
+    stuckup_summary_status_values: str = Field(default="SOC_Staging", alias="STUCKUP_SUMMARY_STATUS_VALUES")
+    stuckup_report_group_id: str = Field(default="", alias="STUCKUP_REPORT_GROUP_ID")
+    stuckup_report_title: str = Field(default="Outbound Stuck at SOC_Staging", alias="STUCKUP_REPORT_TITLE")
+    stuckup_report_text_template: str = Field(
+        default="Outbound Stuck at SOC_Staging Stuckup Validation Report {date}",
+        alias="STUCKUP_REPORT_TEXT_TEMPLATE",
+    )
+    stuckup_report_image_dir: Path = Field(default=Path("data/stuckup/report_images"), alias="STUCKUP_REPORT_IMAGE_DIR")
     stuckup_reference_row: int = Field(default=2, alias="STUCKUP_REFERENCE_ROW")
+    stuckup_probe_head_rows: int = Field(default=3, alias="STUCKUP_PROBE_HEAD_ROWS")
+    stuckup_probe_tail_rows: int = Field(default=3, alias="STUCKUP_PROBE_TAIL_ROWS")
+    stuckup_probe_sample_rows: int = Field(default=5, alias="STUCKUP_PROBE_SAMPLE_ROWS")
     stuckup_state_path: Path = Field(default=Path("data/stuckup/reference_row_state.txt"), alias="STUCKUP_STATE_PATH")
+    stuckup_pipeline_name: str = Field(default=DEFAULT_STUCKUP_PIPELINE_NAME, alias="STUCKUP_PIPELINE_NAME")
+    # JSON list of StuckupPipelineConfig objects, inline or as a path to a .json file.
+    stuckup_pipelines: str = Field(default="", alias="STUCKUP_PIPELINES")
+    stuckup_max_concurrent_syncs: int = Field(default=2, alias="STUCKUP_MAX_CONCURRENT_SYNCS")
+    stuckup_trigger_secret: str = Field(default="", alias="STUCKUP_TRIGGER_SECRET")
+    stuckup_trigger_debounce_seconds: float = Field(default=10.0, alias="STUCKUP_TRIGGER_DEBOUNCE_SECONDS")
+    stuckup_trigger_max_delay_seconds: float = Field(default=60.0, alias="STUCKUP_TRIGGER_MAX_DELAY_SECONDS")
+    stuckup_trigger_rate_per_minute: float = Field(default=30.0, alias="STUCKUP_TRIGGER_RATE_PER_MINUTE")
+    stuckup_trigger_max_skew_seconds: float = Field(default=300.0, alias="STUCKUP_TRIGGER_MAX_SKEW_SECONDS")
+    stuckup_leader_election: str = Field(default="none", alias="STUCKUP_LEADER_ELECTION")
+    stuckup_leader_lease_key: str = Field(default="stuckup_leader_lease", alias="STUCKUP_LEADER_LEASE_KEY")
+    stuckup_leader_lease_path: Path = Field(default=Path("data/stuckup/leader_lease.sqlite3"), alias="STUCKUP_LEADER_LEASE_PATH")
+    stuckup_leader_lease_ttl_seconds: float = Field(default=30.0, alias="STUCKUP_LEADER_LEASE_TTL_SECONDS")
+    stuckup_leader_renew_interval_seconds: float = Field(default=10.0, alias="STUCKUP_LEADER_RENEW_INTERVAL_SECONDS")
     app_host: str = Field(default="0.0.0.0", alias="APP_HOST")
     app_port: int = Field(default=8000, alias="APP_PORT")
     app_timezone: str = Field(default="Asia/Manila", alias="APP_TIMEZONE")
@@ -83,6 +221,43 @@ class Settings(BaseSettings):
             deduped.append(secret)
         return deduped
 
+    def stuckup_pipeline_configs(self) -> list[StuckupPipelineConfig]:
+        raw = self.stuckup_pipelines.strip()
+        if not raw:
+            return []
+        if not raw.startswith("["):
+            raw = Path(raw).read_text(encoding="utf-8")
+        configs = [StuckupPipelineConfig.model_validate(item) for item in json.loads(raw)]
+        names = [config.name for config in configs]
+        if len(set(names)) != len(names):
+            raise ValueError("STUCKUP_PIPELINES contains duplicate pipeline names")
+        return configs
+
+    def stuckup_pipeline_settings(self) -> list["Settings"]:
+        # Without STUCKUP_PIPELINES the global settings are the single default pipeline.
+        configs = self.stuckup_pipeline_configs()
+        if not configs:
+            return [self]
+        return [self.for_stuckup_pipeline(config) for config in configs]
+
+    def for_stuckup_pipeline(self, config: StuckupPipelineConfig) -> "Settings":
+        update: dict[str, object] = {"stuckup_pipeline_name": config.name}
+        for field_name, value in config.model_dump(exclude={"name"}, exclude_none=True).items():
+            update[_PIPELINE_SUPABASE_FIELDS.get(field_name, f"stuckup_{field_name}")] = value
+
+        if config.name != DEFAULT_STUCKUP_PIPELINE_NAME:
+            # Keep per-pipeline state apart in the shared state table and on disk.
+            suffix = f":{config.name}"
+            update["supabase_stuckup_state_key"] = self.supabase_stuckup_state_key + suffix
+            update["supabase_stuckup_data_hash_key"] = self.supabase_stuckup_data_hash_key + suffix
+            update["supabase_stuckup_scheduled_sync_key"] = self.supabase_stuckup_scheduled_sync_key + suffix
+            update["supabase_stuckup_report_hash_key"] = self.supabase_stuckup_report_hash_key + suffix
+            state_path = Path(self.stuckup_state_path)
+            update["stuckup_state_path"] = state_path.parent / config.name / state_path.name
+            update["stuckup_backup_dir"] = Path(self.stuckup_backup_dir) / config.name
+            update["stuckup_report_image_dir"] = Path(self.stuckup_report_image_dir) / config.name
+        return self.model_copy(update=update)
+
 
 def configure_logging(level: str) -> None:
     logging.basicConfig(
@@ -1,7 +1,9 @@
 import logging
+import threading
 from pathlib import Path
 from typing import Any
 
+from google.auth.credentials import AnonymousCredentials
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
@@ -13,22 +15,43 @@ logger = logging.getLogger(__name__)
 class GoogleSheetsClient:
     def __init__(self, settings: Settings) -> None:
         self._credentials_file = Path(settings.google_service_account_file) if settings.google_service_account_file else None
+        self._api_endpoint = settings.google_sheets_api_endpoint.strip()
+        self._credentials = None
+        self._credentials_lock = threading.Lock()
+        # googleapiclient service objects are not thread-safe, so each worker thread keeps its own.
+        self._local = threading.local()
 
     @staticmethod
     def _scopes() -> list[str]:
         return ["https://www.googleapis.com/auth/spreadsheets"]
 
     def _load_credentials(self):
-        if not self._credentials_file or not self._credentials_file.exists():
-            raise FileNotFoundError("google service account file not found")
-        return service_account.Credentials.from_service_account_file(
-            str(self._credentials_file),
-            scopes=self._scopes(),
-        )
+        with self._credentials_lock:
+            if self._credentials is not None:
+                return self._credentials
+            if self._api_endpoint and not self._credentials_file:
+                self._credentials = AnonymousCredentials()
+                return self._credentials
+            if not self._credentials_file or not self._credentials_file.exists():
+                raise FileNotFoundError("google service account file not found")
+            self._credentials = service_account.Credentials.from_service_account_file(
+                str(self._credentials_file),
+                scopes=self._scopes(),
+            )
+            return self._credentials
 
     def _build_service(self):
-        credentials = self._load_credentials()
-        return build("sheets", "v4", credentials=credentials, cache_discovery=False)
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = build(
+                "sheets",
+                "v4",
+                credentials=self._load_credentials(),
+                cache_discovery=False,
+                client_options={"api_endpoint": self._api_endpoint} if self._api_endpoint else None,
+            )
+            self._local.service = service
+        return service
 
     def read_values(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
         service = self._build_service()
@@ -39,6 +62,34 @@ class GoogleSheetsClient:
         values: list[list[Any]] = response.get("values", [])
         return [[str(cell).strip() for cell in row] for row in values]
 
+    def read_row_blocks(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        cell_ranges: list[str],
+    ) -> tuple[int, list[list[list[str]]]]:
+        # One spreadsheets.get for several ranges of one sheet; the same response carries the
+        # sheet's grid row count, so no separate metadata request is needed.
+        service = self._build_service()
+        response = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            ranges=[self._sheet_range(worksheet_name, cell_range) for cell_range in cell_ranges],
+            includeGridData=True,
+            fields="sheets(properties(gridProperties(rowCount)),data(rowData(values(formattedValue))))",
+        ).execute()
+        sheets = response.get("sheets", [])
+        if not sheets:
+            return 0, [[] for _ in cell_ranges]
+
+        sheet = sheets[0]
+        grid_rows = int(sheet.get("properties", {}).get("gridProperties", {}).get("rowCount", 0))
+        blocks: list[list[list[str]]] = []
+        for data in sheet.get("data", []):
+            rows = data.get("rowData", [])
+            blocks.append([[str(cell.get("formattedValue", "")).strip() for cell in row.get("values", [])] for row in rows])
+        blocks.extend([] for _ in range(len(cell_ranges) - len(blocks)))
+        return grid_rows, blocks
+
     def overwrite_values(self, spreadsheet_id: str, worksheet_name: str, values: list[list[str]]) -> None:
         self.clear_range(spreadsheet_id, worksheet_name, "A:ZZ")
         if values:
@@ -72,6 +123,30 @@ class GoogleSheetsClient:
             .execute()
         )
 
+    def batch_update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        blocks: list[tuple[str, list[list[str]]]],
+    ) -> dict[str, Any]:
+        # Several (start_cell, values) blocks of one sheet in a single values.batchUpdate request.
+        service = self._build_service()
+        return (
+            service.spreadsheets()
+            .values()
+            .batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={
+                    "valueInputOption": "USER_ENTERED",
+                    "data": [
+                        {"range": self._sheet_range(worksheet_name, start_cell), "values": values}
+                        for start_cell, values in blocks
+                    ],
+                },
+            )
+            .execute()
+        )
+
     def ensure_grid_size(
         self,
         spreadsheet_id: str,
@@ -80,21 +155,7 @@ class GoogleSheetsClient:
         min_columns: int,
     ) -> None:
         service = self._build_service()
-        metadata = service.spreadsheets().get(
-            spreadsheetId=spreadsheet_id,
-            includeGridData=False,
-        ).execute()
-
-        target_props: dict[str, Any] | None = None
-        for sheet in metadata.get("sheets", []):
-            props = sheet.get("properties", {})
-            if props.get("title") == worksheet_name:
-                target_props = props
-                break
-
-        if not target_props:
-            raise ValueError(f"worksheet '{worksheet_name}' not found")
-
+        target_props = self._worksheet_properties(spreadsheet_id, worksheet_name)
         grid = target_props.get("gridProperties", {})
         current_rows = int(grid.get("rowCount", 0))
         current_columns = int(grid.get("columnCount", 0))
@@ -125,6 +186,22 @@ class GoogleSheetsClient:
             },
         ).execute()
 
+    def get_grid_size(self, spreadsheet_id: str, worksheet_name: str) -> tuple[int, int]:
+        grid = self._worksheet_properties(spreadsheet_id, worksheet_name).get("gridProperties", {})
+        return int(grid.get("rowCount", 0)), int(grid.get("columnCount", 0))
+
+    def _worksheet_properties(self, spreadsheet_id: str, worksheet_name: str) -> dict[str, Any]:
+        service = self._build_service()
+        metadata = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            includeGridData=False,
+        ).execute()
+        for sheet in metadata.get("sheets", []):
+            props = sheet.get("properties", {})
+            if props.get("title") == worksheet_name:
+                return props
+        raise ValueError(f"worksheet '{worksheet_name}' not found")
+
     @staticmethod
     def _sheet_range(worksheet_name: str, cell_range: str) -> str:
         # Always quote sheet names to support spaces/special chars.
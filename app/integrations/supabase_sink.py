@@ -1,4 +1,7 @@
 import logging
+from collections.abc import Iterable
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
 from supabase import Client, create_client
@@ -9,6 +12,12 @@ from app.integrations.types import SinkResult
 logger = logging.getLogger(__name__)
 
 
+@lru_cache
+def shared_client(url: str, key: str) -> Client:
+    # One client (and HTTP connection pool) per project, shared by every sink and pipeline.
+    return create_client(url, key)
+
+
 class SupabaseSink:
     def __init__(self, settings: Settings) -> None:
         self._enabled = bool(settings.supabase_url and settings.supabase_service_role_key)
@@ -16,29 +25,47 @@ class SupabaseSink:
         self._state_table = settings.supabase_stuckup_state_table
         self._state_key = settings.supabase_stuckup_state_key
         self._data_hash_key = settings.supabase_stuckup_data_hash_key
+        self._callback_events_table = settings.supabase_callback_events_table
+        self._seatalk_groups_table = settings.supabase_seatalk_groups_table
         self._client: Client | None = None
 
         if self._enabled:
-            self._client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+            self._client = shared_client(settings.supabase_url, settings.supabase_service_role_key)
 
     @property
     def enabled(self) -> bool:
         return self._enabled
 
-    def upsert_rows(self, rows: list[dict[str, Any]], conflict_column: str) -> SinkResult:
+    def upsert_rows(
+        self,
+        rows: Iterable[dict[str, Any]],
+        conflict_column: str,
+        *,
+        batch_size: int = 1000,
+    ) -> SinkResult:
         if not self.enabled or not self._client:
             return SinkResult("supabase", "skipped", "not configured")
-        if not rows:
-            return SinkResult("supabase", "ok", "no rows to upsert")
+        if batch_size < 1:
+            return SinkResult("supabase", "error", "batch_size must be >= 1")
 
         try:
-            self._client.table(self._table).upsert(rows, on_conflict=conflict_column).execute()
-            return SinkResult("supabase", "ok", f"upserted {len(rows)} rows")
+            upserted = 0
+            iterator = iter(rows)
+            while batch := list(islice(iterator, batch_size)):
+                self._client.table(self._table).upsert(batch, on_conflict=conflict_column).execute()
+                upserted += len(batch)
+            if not upserted:
+                return SinkResult("supabase", "ok", "no rows to upsert")
+            return SinkResult("supabase", "ok", f"upserted {upserted} rows")
         except Exception as exc:
             logger.exception("failed to upsert rows into supabase")
             return SinkResult("supabase", "error", str(exc))
 
-    def fetch_all_rows(self, order_by: str | None = None) -> tuple[SinkResult, list[dict[str, Any]]]:
+    def fetch_all_rows(
+        self,
+        order_by: str | None = None,
+        columns: list[str] | None = None,
+    ) -> tuple[SinkResult, list[dict[str, Any]]]:
         if not self.enabled or not self._client:
             return SinkResult("supabase", "skipped", "not configured"), []
 
@@ -46,9 +73,10 @@ class SupabaseSink:
             page_size = 1000
             offset = 0
             rows: list[dict[str, Any]] = []
+            select = ",".join(columns) if columns else "*"
 
             while True:
-                query = self._client.table(self._table).select("*").range(offset, offset + page_size - 1)
+                query = self._client.table(self._table).select(select).range(offset, offset + page_size - 1)
                 if order_by:
                     query = query.order(order_by)
 
@@ -126,6 +154,129 @@ class SupabaseSink:
             logger.exception("failed to save stuckup state to supabase")
             return SinkResult("supabase_state", "error", str(exc))
 
+    def insert_state_if_absent(self, key: str, value: str) -> SinkResult:
+        # Plain insert: the primary key on "key" makes a concurrent writer fail with a conflict.
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_state", "skipped", "not configured")
+        try:
+            self._client.table(self._state_table).insert([{"key": key, "value": value}]).execute()
+            return SinkResult("supabase_state", "ok", "state inserted")
+        except Exception as exc:
+            if "23505" in str(exc) or "duplicate key" in str(exc):
+                return SinkResult("supabase_state", "conflict", "state already exists")
+            logger.exception("failed to insert stuckup state into supabase")
+            return SinkResult("supabase_state", "error", str(exc))
+
+    def replace_state_if_equal(self, key: str, expected: str, value: str) -> SinkResult:
+        # Compare-and-set: the update only matches while the row still holds the expected value.
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_state", "skipped", "not configured")
+        try:
+            data = (
+                self._client.table(self._state_table)
+                .update({"value": value})
+                .eq("key", key)
+                .eq("value", expected)
+                .execute()
+                .data
+                or []
+            )
+            if not data:
+                return SinkResult("supabase_state", "conflict", "state changed concurrently")
+            return SinkResult("supabase_state", "ok", "state replaced")
+        except Exception as exc:
+            logger.exception("failed to replace stuckup state in supabase")
+            return SinkResult("supabase_state", "error", str(exc))
+
+    def claim_callback_event(self, event_id: str, expires_at: float, now: float) -> SinkResult:
+        # Insert on the event_id primary key; an existing row is only taken over once it has expired.
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_callback_events", "skipped", "not configured")
+        table = self._callback_events_table
+        try:
+            self._client.table(table).insert([{"event_id": event_id, "expires_at": expires_at}]).execute()
+            return SinkResult("supabase_callback_events", "ok", "event claimed")
+        except Exception as exc:
+            if "23505" not in str(exc) and "duplicate key" not in str(exc):
+                logger.exception("failed to claim callback event in supabase")
+                return SinkResult("supabase_callback_events", "error", str(exc))
+        try:
+            data = (
+                self._client.table(table)
+                .update({"expires_at": expires_at})
+                .eq("event_id", event_id)
+                .lt("expires_at", now)
+                .execute()
+                .data
+                or []
+            )
+            if not data:
+                return SinkResult("supabase_callback_events", "conflict", "event already claimed")
+            return SinkResult("supabase_callback_events", "ok", "expired event reclaimed")
+        except Exception as exc:
+            logger.exception("failed to reclaim callback event in supabase")
+            return SinkResult("supabase_callback_events", "error", str(exc))
+
+    def release_callback_event(self, event_id: str) -> SinkResult:
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_callback_events", "skipped", "not configured")
+        try:
+            self._client.table(self._callback_events_table).delete().eq("event_id", event_id).execute()
+            return SinkResult("supabase_callback_events", "ok", "event released")
+        except Exception as exc:
+            logger.exception("failed to release callback event in supabase")
+            return SinkResult("supabase_callback_events", "error", str(exc))
+
+    def purge_callback_events(self, before: float) -> SinkResult:
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_callback_events", "skipped", "not configured")
+        try:
+            self._client.table(self._callback_events_table).delete().lt("expires_at", before).execute()
+            return SinkResult("supabase_callback_events", "ok", "expired events purged")
+        except Exception as exc:
+            logger.exception("failed to purge callback events in supabase")
+            return SinkResult("supabase_callback_events", "error", str(exc))
+
+    def list_seatalk_groups(self) -> tuple[SinkResult, list[dict]]:
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_seatalk_groups", "skipped", "not configured"), []
+        try:
+            data = (
+                self._client.table(self._seatalk_groups_table)
+                .select("group_id,group_name,added_at")
+                .order("group_id")
+                .execute()
+                .data
+                or []
+            )
+            return SinkResult("supabase_seatalk_groups", "ok", f"{len(data)} groups loaded"), data
+        except Exception as exc:
+            logger.exception("failed to load seatalk groups from supabase")
+            return SinkResult("supabase_seatalk_groups", "error", str(exc)), []
+
+    def upsert_seatalk_group(self, group_id: str, group_name: str | None, added_at: float) -> SinkResult:
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_seatalk_groups", "skipped", "not configured")
+        try:
+            self._client.table(self._seatalk_groups_table).upsert(
+                [{"group_id": group_id, "group_name": group_name, "added_at": added_at}],
+                on_conflict="group_id",
+            ).execute()
+            return SinkResult("supabase_seatalk_groups", "ok", "group saved")
+        except Exception as exc:
+            logger.exception("failed to save seatalk group to supabase")
+            return SinkResult("supabase_seatalk_groups", "error", str(exc))
+
+    def delete_seatalk_group(self, group_id: str) -> SinkResult:
+        if not self.enabled or not self._client:
+            return SinkResult("supabase_seatalk_groups", "skipped", "not configured")
+        try:
+            self._client.table(self._seatalk_groups_table).delete().eq("group_id", group_id).execute()
+            return SinkResult("supabase_seatalk_groups", "ok", "group removed")
+        except Exception as exc:
+            logger.exception("failed to remove seatalk group from supabase")
+            return SinkResult("supabase_seatalk_groups", "error", str(exc))
+
     def get_reference_fingerprint(self) -> tuple[SinkResult, str | None]:
         return self.get_state(self._state_key)
 
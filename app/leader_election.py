@@ -0,0 +1,328 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+from app.config import Settings
+from app.integrations.supabase_sink import SupabaseSink
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Lease:
+    holder: str
+    # Fencing token: grows every time the lease changes hands, never on a plain renewal.
+    token: int
+    expires_at: float
+
+
+class LeaseBackend(Protocol):
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float, now: float) -> Lease | None: ...
+
+    def read(self, name: str) -> Lease | None: ...
+
+    def release(self, name: str, holder: str) -> None: ...
+
+
+class LeaseLostError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class LeaseFence:
+    # Leadership as of one fencing token. Work started by the leader calls check() before each
+    # side effect; it re-reads the lease and raises once the lease has moved on (new holder or
+    # token) or expired, so a demoted leader's in-flight work stops instead of writing.
+    backend: LeaseBackend
+    name: str
+    holder: str
+    token: int
+
+    def check(self) -> None:
+        try:
+            lease = self.backend.read(self.name)
+        except Exception as exc:
+            raise LeaseLostError(f"lease {self.name} could not be checked: {exc}") from exc
+        if lease is None or lease.holder != self.holder or lease.token != self.token or lease.expires_at <= time.time():
+            raise LeaseLostError(f"lease {self.name} is no longer held with fencing token {self.token}")
+
+
+def _next_lease(current: Lease | None, holder: str, ttl_seconds: float, now: float) -> Lease | None:
+    if current is None:
+        return Lease(holder=holder, token=1, expires_at=now + ttl_seconds)
+    if current.holder == holder and current.expires_at > now:
+        return Lease(holder=holder, token=current.token, expires_at=now + ttl_seconds)
+    if current.expires_at <= now:
+        return Lease(holder=holder, token=current.token + 1, expires_at=now + ttl_seconds)
+    return None
+
+
+class MemoryLeaseBackend:
+    # Process-local backend; useful for tests and single-process deployments.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._leases: dict[str, Lease] = {}
+
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float, now: float) -> Lease | None:
+        with self._lock:
+            lease = _next_lease(self._leases.get(name), holder, ttl_seconds, now)
+            if lease:
+                self._leases[name] = lease
+            return lease
+
+    def read(self, name: str) -> Lease | None:
+        with self._lock:
+            return self._leases.get(name)
+
+    def release(self, name: str, holder: str) -> None:
+        with self._lock:
+            current = self._leases.get(name)
+            if current and current.holder == holder:
+                self._leases[name] = Lease(holder=holder, token=current.token, expires_at=0.0)
+
+
+class SqliteLeaseBackend:
+    # Shared by every process on one host (e.g. uvicorn workers) through a SQLite file.
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "create table if not exists leases "
+                "(name text primary key, holder text not null, token integer not null, expires_at real not null)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float, now: float) -> Lease | None:
+        conn = self._connect()
+        try:
+            conn.execute("begin immediate")
+            row = conn.execute("select holder, token, expires_at from leases where name = ?", (name,)).fetchone()
+            current = Lease(holder=row[0], token=row[1], expires_at=row[2]) if row else None
+            lease = _next_lease(current, holder, ttl_seconds, now)
+            if lease:
+                conn.execute(
+                    "insert into leases (name, holder, token, expires_at) values (?, ?, ?, ?) "
+                    "on conflict(name) do update set holder = excluded.holder, token = excluded.token, "
+                    "expires_at = excluded.expires_at",
+                    (name, lease.holder, lease.token, lease.expires_at),
+                )
+            conn.execute("commit")
+            return lease
+        except Exception:
+            conn.execute("rollback")
+            raise
+        finally:
+            conn.close()
+
+    def read(self, name: str) -> Lease | None:
+        with self._connect() as conn:
+            row = conn.execute("select holder, token, expires_at from leases where name = ?", (name,)).fetchone()
+        return Lease(holder=row[0], token=row[1], expires_at=row[2]) if row else None
+
+    def release(self, name: str, holder: str) -> None:
+        with self._connect() as conn:
+            conn.execute("update leases set expires_at = 0 where name = ? and holder = ?", (name, holder))
+
+
+class SupabaseLeaseBackend:
+    # Stores the lease as JSON in the stuckup state table and changes it with compare-and-set,
+    # so replicas on different hosts agree on a single leader.
+
+    def __init__(self, supabase: SupabaseSink) -> None:
+        self._supabase = supabase
+
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float, now: float) -> Lease | None:
+        result, raw = self._supabase.get_state(name)
+        if result.status != "ok":
+            raise RuntimeError(f"lease read failed: {result.message}")
+        current = Lease(**json.loads(raw)) if raw else None
+        lease = _next_lease(current, holder, ttl_seconds, now)
+        if lease is None:
+            return None
+        new_raw = json.dumps(asdict(lease), sort_keys=True)
+        if raw is None:
+            result = self._supabase.insert_state_if_absent(name, new_raw)
+        else:
+            result = self._supabase.replace_state_if_equal(name, raw, new_raw)
+        if result.status == "ok":
+            return lease
+        if result.status == "error":
+            raise RuntimeError(f"lease write failed: {result.message}")
+        return None
+
+    def read(self, name: str) -> Lease | None:
+        result, raw = self._supabase.get_state(name)
+        if result.status != "ok":
+            raise RuntimeError(f"lease read failed: {result.message}")
+        return Lease(**json.loads(raw)) if raw else None
+
+    def release(self, name: str, holder: str) -> None:
+        result, raw = self._supabase.get_state(name)
+        if result.status != "ok" or not raw:
+            return
+        current = Lease(**json.loads(raw))
+        if current.holder != holder:
+            return
+        released = Lease(holder=holder, token=current.token, expires_at=0.0)
+        self._supabase.replace_state_if_equal(name, raw, json.dumps(asdict(released), sort_keys=True))
+
+
+class LeaderElector:
+    # Keeps renewing a lease in the background and calls on_elected / on_demoted when
+    # leadership changes. is_leader only trusts the lease until shortly before it expires,
+    # so a process that cannot renew stops acting before another one can take over.
+
+    def __init__(
+        self,
+        backend: LeaseBackend,
+        *,
+        name: str,
+        ttl_seconds: float,
+        renew_interval_seconds: float,
+        holder: str | None = None,
+    ) -> None:
+        self._backend = backend
+        self._name = name
+        self._ttl = max(1.0, ttl_seconds)
+        self._renew_interval = min(max(0.05, renew_interval_seconds), self._ttl / 2)
+        self._holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease: Lease | None = None
+        self._leader = False
+        self._task: asyncio.Task | None = None
+        self._stop_event = asyncio.Event()
+        self._on_elected: Callable[[], None] | None = None
+        self._on_demoted: Callable[[], Awaitable[None]] | None = None
+        self._last_error: str | None = None
+
+    @property
+    def holder(self) -> str:
+        return self._holder
+
+    @property
+    def token(self) -> int | None:
+        return self._lease.token if self._lease else None
+
+    def fence(self) -> LeaseFence | None:
+        # Fence for work started now, or None when this process is not the leader.
+        lease = self._lease
+        if not self.is_leader() or lease is None:
+            return None
+        return LeaseFence(self._backend, self._name, self._holder, lease.token)
+
+    def is_leader(self) -> bool:
+        # Leave one renew interval of margin before the lease actually expires.
+        lease = self._lease
+        return bool(self._leader and lease and time.time() < lease.expires_at - self._renew_interval)
+
+    def start(
+        self,
+        *,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], Awaitable[None]],
+    ) -> None:
+        if self._task and not self._task.done():
+            return
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._task:
+            await self._task
+        if self._leader:
+            await self._demote("shutting down")
+        try:
+            await asyncio.to_thread(self._backend.release, self._name, self._holder)
+        except Exception:
+            logger.exception("leader lease release failed")
+
+    def get_status(self) -> dict[str, object]:
+        lease = self._lease
+        return {
+            "lease": self._name,
+            "holder": self._holder,
+            "is_leader": self.is_leader(),
+            "fencing_token": lease.token if lease else None,
+            "lease_expires_at": lease.expires_at if lease else None,
+            "last_error": self._last_error,
+        }
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            await self._tick()
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self._renew_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _tick(self) -> None:
+        try:
+            lease = await asyncio.to_thread(self._backend.try_acquire, self._name, self._holder, self._ttl, time.time())
+            self._last_error = None
+        except Exception as exc:
+            # Keep the current lease until it runs out; is_leader() stops trusting it in time.
+            self._last_error = str(exc)
+            logger.warning("leader lease renewal failed: %s", exc)
+            if self._leader and not self.is_leader():
+                await self._demote("lease could not be renewed")
+            return
+
+        if lease is None:
+            self._lease = None
+            if self._leader:
+                await self._demote("lease taken by another holder")
+            return
+
+        self._lease = lease
+        if not self._leader:
+            self._leader = True
+            logger.info("elected leader for %s: holder=%s token=%s", self._name, self._holder, lease.token)
+            if self._on_elected:
+                self._on_elected()
+
+    async def _demote(self, reason: str) -> None:
+        self._leader = False
+        logger.warning("lost leadership for %s: %s", self._name, reason)
+        if self._on_demoted:
+            await self._on_demoted()
+
+
+def build_leader_elector(settings: Settings) -> LeaderElector | None:
+    backend_name = settings.stuckup_leader_election.strip().lower()
+    if backend_name in {"", "none", "off", "false"}:
+        return None
+    backend: LeaseBackend
+    if backend_name == "sqlite":
+        backend = SqliteLeaseBackend(settings.stuckup_leader_lease_path)
+    elif backend_name == "supabase":
+        sink = SupabaseSink(settings)
+        if not sink.enabled:
+            raise ValueError("STUCKUP_LEADER_ELECTION=supabase requires SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+        backend = SupabaseLeaseBackend(sink)
+    elif backend_name == "memory":
+        backend = MemoryLeaseBackend()
+    else:
+        raise ValueError(f"unknown STUCKUP_LEADER_ELECTION backend: {settings.stuckup_leader_election}")
+    return LeaderElector(
+        backend,
+        name=settings.stuckup_leader_lease_key,
+        ttl_seconds=settings.stuckup_leader_lease_ttl_seconds,
+        renew_interval_seconds=settings.stuckup_leader_renew_interval_seconds,
+    )
@@ -1,12 +1,15 @@
 import logging
 from contextlib import asynccontextmanager
+from functools import partial
 
-from fastapi import FastAPI, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 
 from app.config import get_settings
+from app.leader_election import build_leader_elector
 from app.models.events import (
     BOT_ADDED_TO_GROUP_CHAT,
+    BOT_REMOVED_FROM_GROUP_CHAT,
     EVENT_VERIFICATION,
     INTERACTIVE_MESSAGE_CLICK,
     MESSAGE_FROM_BOT_SUBSCRIBER,
@@ -16,25 +19,69 @@ from app.models.events import (
     CallbackEnvelope,
     CallbackEvent,
 )
+from app.seatalk.callbacks import CallbackRegistry
 from app.seatalk.client import SeaTalkClient
+from app.seatalk.dedup import build_callback_dedup
+from app.seatalk.groups import build_group_registry
+from app.seatalk.outbox import BroadcastRequest, BroadcastTarget, SeaTalkOutbox
 from app.seatalk.signature import is_valid_signature
 from app.workflows.base import WorkflowContext
 from app.workflows.router import WorkflowRouter
+from app.workflows.stuckup.index import ShipmentIndex
 from app.workflows.stuckup.monitor import StuckupMonitor
+from app.workflows.stuckup.pipelines import StuckupPipelineManager
+from app.workflows.stuckup.trigger import StuckupTriggerRequest, is_valid_trigger_signature
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 seatalk_client = SeaTalkClient(settings)
+seatalk_outbox = SeaTalkOutbox(
+    seatalk_client,
+    workers=settings.seatalk_outbox_workers,
+    rate_per_minute=settings.seatalk_outbox_rate_per_minute,
+    burst=settings.seatalk_outbox_burst,
+    max_attempts=settings.seatalk_outbox_max_attempts,
+    retry_base_seconds=settings.seatalk_outbox_retry_base_seconds,
+    retry_max_seconds=settings.seatalk_outbox_retry_max_seconds,
+    max_pending=settings.seatalk_outbox_max_pending,
+    dead_letter_limit=settings.seatalk_outbox_dead_letter_limit,
+    broadcast_concurrency=settings.seatalk_broadcast_concurrency,
+    coalesce_window_seconds=settings.seatalk_outbox_coalesce_window_ms / 1000,
+    coalesce_max_chars=settings.seatalk_outbox_coalesce_max_chars,
+)
 workflow_router = WorkflowRouter(settings)
-stuckup_monitor = StuckupMonitor(settings)
+callback_dedup = build_callback_dedup(settings)
+callback_handlers = CallbackRegistry()
+group_registry = build_group_registry(settings)
+leader_elector = build_leader_elector(settings)
+stuckup_pipelines = StuckupPipelineManager(
+    settings,
+    run_guard=leader_elector.is_leader if leader_elector else None,
+    fence=leader_elector.fence if leader_elector else None,
+    outbox=seatalk_outbox,
+)
+stuckup_monitor = stuckup_pipelines.default
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    stuckup_monitor.start()
+    await seatalk_client.start()
+    seatalk_outbox.start()
+    # With leader election enabled only the replica holding the lease runs the monitors.
+    if leader_elector:
+        leader_elector.start(on_elected=stuckup_pipelines.start, on_demoted=stuckup_pipelines.stop)
+    else:
+        stuckup_pipelines.start()
     try:
         yield
     finally:
-        await stuckup_monitor.stop()
+        if leader_elector:
+            await leader_elector.stop()
+        else:
+            await stuckup_pipelines.stop()
+        # Workflow replies are queued before the outbox drains.
+        await workflow_router.drain(settings.workflow_drain_seconds)
+        await seatalk_outbox.stop(settings.seatalk_outbox_drain_seconds)
+        await seatalk_client.aclose()
 
 
 app = FastAPI(
@@ -59,9 +106,190 @@ async def uptime_ping() -> dict[str, str]:
     return {"status": "alive"}
 
 
+@app.get("/seatalk/token")
+async def seatalk_token_status() -> dict:
+    return seatalk_client.token_status()
+
+
+@app.get("/seatalk/outbox")
+async def seatalk_outbox_status() -> dict:
+    return seatalk_outbox.get_status()
+
+
+@app.get("/workflows/status")
+async def workflows_status() -> dict:
+    return workflow_router.get_status()
+
+
+@app.get("/seatalk/callbacks")
+async def seatalk_callbacks_status() -> dict:
+    return callback_handlers.get_status()
+
+
+@app.get("/seatalk/groups")
+async def seatalk_groups_status() -> dict:
+    return await group_registry.get_status()
+
+
+@app.post("/seatalk/broadcast")
+async def seatalk_broadcast(
+    request: Request,
+    x_broadcast_timestamp: str | None = Header(default=None),
+    x_broadcast_signature: str | None = Header(default=None),
+):
+    if not settings.seatalk_broadcast_secret:
+        raise HTTPException(status_code=404, detail="seatalk broadcast is not configured")
+
+    body = await request.body()
+    if not is_valid_trigger_signature(
+        settings.seatalk_broadcast_secret,
+        x_broadcast_timestamp,
+        body,
+        x_broadcast_signature,
+        max_skew_seconds=settings.stuckup_trigger_max_skew_seconds,
+    ):
+        raise HTTPException(status_code=401, detail="invalid broadcast signature")
+
+    try:
+        payload = BroadcastRequest.model_validate_json(body)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid payload") from exc
+
+    group_ids = list(payload.group_ids)
+    if payload.all_groups:
+        group_ids += [group.group_id for group in await group_registry.list_groups()]
+    targets = [BroadcastTarget("group", group_id) for group_id in group_ids if group_id]
+    targets += [BroadcastTarget("single", code) for code in payload.employee_codes if code]
+    if not payload.content.strip() or not targets:
+        raise HTTPException(status_code=400, detail="content and at least one target are required")
+
+    report = await seatalk_outbox.broadcast(targets, payload.content)
+    return report.to_dict()
+
+
+@app.get("/seatalk/dedup")
+async def seatalk_dedup_status() -> dict:
+    return callback_dedup.get_status() if callback_dedup else {"enabled": False}
+
+
 @app.get("/stuckup/status")
-async def stuckup_status() -> dict:
-    return stuckup_monitor.get_status()
+async def stuckup_status(pipeline: str | None = None) -> dict:
+    return _stuckup_pipeline(pipeline).get_status()
+
+
+@app.get("/stuckup/pipelines")
+async def stuckup_pipelines_status() -> dict:
+    return {
+        **stuckup_pipelines.get_status(),
+        "leader": leader_elector.get_status() if leader_elector else None,
+    }
+
+
+@app.get("/stuckup/diff")
+async def stuckup_diff(pipeline: str | None = None, limit: int = Query(default=100, ge=0, le=5000)) -> dict:
+    return _stuckup_pipeline(pipeline).get_diff(limit)
+
+
+@app.get("/stuckup/shipments")
+async def stuckup_shipments(
+    pipeline: str | None = None,
+    hub_dest_station_name: str | None = None,
+    cluster_name: str | None = None,
+    hub_region: str | None = None,
+    status_desc: str | None = None,
+    ageing_bucket: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+) -> JSONResponse:
+    # Served from the in-process index of the last sync; JSONResponse skips response-model encoding.
+    monitor, index = _stuckup_shipment_index(pipeline)
+    filters = {
+        "hub_dest_station_name": hub_dest_station_name,
+        "cluster_name": cluster_name,
+        "hub_region": hub_region,
+        "status_desc": status_desc,
+        "ageing_bucket": ageing_bucket,
+    }
+    page = index.query({name: value for name, value in filters.items() if value}, limit=limit, offset=offset)
+    return JSONResponse({"pipeline": monitor.name, **page})
+
+
+@app.get("/stuckup/shipments/{shipment_id}")
+async def stuckup_shipment(shipment_id: str, pipeline: str | None = None) -> JSONResponse:
+    monitor, index = _stuckup_shipment_index(pipeline)
+    shipment = index.get(shipment_id)
+    if shipment is None:
+        raise HTTPException(status_code=404, detail=f"unknown shipment: {shipment_id}")
+    return JSONResponse({"pipeline": monitor.name, "shipment": shipment})
+
+
+@app.get("/stuckup/plan")
+async def stuckup_plan(pipeline: str | None = None) -> dict:
+    # Dry run of the next sync: performs the reads, reports the writes it would issue.
+    return await _stuckup_pipeline(pipeline).plan_sync()
+
+
+@app.get("/stuckup/report.png")
+async def stuckup_report_image(pipeline: str | None = None) -> Response:
+    rendered = await _stuckup_pipeline(pipeline).report_image()
+    if rendered is None:
+        raise HTTPException(status_code=404, detail="no exported data yet")
+    png, content_hash = rendered
+    return Response(content=png, media_type="image/png", headers={"ETag": f'"{content_hash}"'})
+
+
+@app.post("/stuckup/trigger", status_code=202)
+async def stuckup_trigger(
+    request: Request,
+    x_stuckup_timestamp: str | None = Header(default=None),
+    x_stuckup_signature: str | None = Header(default=None),
+):
+    if not settings.stuckup_trigger_secret:
+        raise HTTPException(status_code=404, detail="stuckup trigger is not configured")
+
+    body = await request.body()
+    if not is_valid_trigger_signature(
+        settings.stuckup_trigger_secret,
+        x_stuckup_timestamp,
+        body,
+        x_stuckup_signature,
+        max_skew_seconds=settings.stuckup_trigger_max_skew_seconds,
+    ):
+        raise HTTPException(status_code=401, detail="invalid trigger signature")
+
+    try:
+        payload = StuckupTriggerRequest.model_validate_json(body or b"{}")
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid payload") from exc
+
+    monitor = _stuckup_pipeline(payload.pipeline)
+    if not monitor.running:
+        # Disabled, misconfigured, or not the elected leader: the scheduled jobs own syncing.
+        return JSONResponse({"status": "not_running", "pipeline": monitor.name}, status_code=409)
+
+    decision = monitor.request_sync(payload.source)
+    if decision.status == "rate_limited":
+        return JSONResponse(
+            {"status": decision.status, "pipeline": monitor.name, "retry_after_seconds": decision.retry_after_seconds},
+            status_code=429,
+            headers={"Retry-After": str(max(1, round(decision.retry_after_seconds)))},
+        )
+    return {"status": decision.status, "pipeline": monitor.name}
+
+
+def _stuckup_shipment_index(name: str | None) -> tuple[StuckupMonitor, ShipmentIndex]:
+    monitor = _stuckup_pipeline(name)
+    index = monitor.shipments
+    if index is None or not index.ready:
+        raise HTTPException(status_code=503, detail=f"no synced stuckup data yet for pipeline: {monitor.name}")
+    return monitor, index
+
+
+def _stuckup_pipeline(name: str | None) -> StuckupMonitor:
+    monitor = stuckup_pipelines.get(name)
+    if monitor is None:
+        raise HTTPException(status_code=404, detail=f"unknown stuckup pipeline: {name}")
+    return monitor
 
 
 @app.post("/callbacks/seatalk")
@@ -83,40 +311,37 @@ async def seatalk_callback(request: Request, signature: str | None = Header(defa
         raise HTTPException(status_code=400, detail="invalid payload") from exc
 
     if payload.event_type == EVENT_VERIFICATION:
-        event = _normalize_event(payload.event)
-        challenge = event.seatalk_challenge or ""
-        return JSONResponse({"seatalk_challenge": challenge})
+        challenge = (payload.event or {}).get("seatalk_challenge") or ""
+        return JSONResponse({"seatalk_challenge": str(challenge)})
 
-    if payload.event_type == MESSAGE_FROM_BOT_SUBSCRIBER:
-        await _handle_message_from_bot_subscriber(payload)
-        return JSONResponse({"code": 0})
+    if not callback_handlers.handles(payload.event_type):
+        # Ack unsupported events (never parsed past the envelope) to avoid retries.
+        callback_handlers.record_ignored(payload.event_type)
+        return JSONResponse({"code": 0, "message": f"ignored event_type={payload.event_type}"})
 
-    if payload.event_type == USER_ENTER_CHATROOM_WITH_BOT:
-        await _handle_user_enter_chatroom_with_bot(payload)
-        return JSONResponse({"code": 0})
-
-    if payload.event_type == INTERACTIVE_MESSAGE_CLICK:
-        _handle_interactive_message_click(payload)
-        return JSONResponse({"code": 0})
-
-    if payload.event_type == BOT_ADDED_TO_GROUP_CHAT:
-        await _handle_bot_added_to_group_chat(payload)
-        return JSONResponse({"code": 0})
-
-    if payload.event_type == NEW_MENTIONED_MESSAGE_RECEIVED_FROM_GROUP_CHAT:
-        await _handle_new_mentioned_message_received_from_group_chat(payload)
-        return JSONResponse({"code": 0})
+    try:
+        event = callback_handlers.parse(payload)
+    except Exception as exc:
+        logger.exception("invalid callback event: event_type=%s", payload.event_type)
+        raise HTTPException(status_code=400, detail="invalid payload") from exc
 
-    if payload.event_type == NEW_MESSAGE_RECEIVED_FROM_THREAD:
-        await _handle_new_message_received_from_thread(payload)
+    if callback_dedup is None:
+        await callback_handlers.dispatch(payload, event)
         return JSONResponse({"code": 0})
-
-    # Ack unsupported events to avoid retries.
-    return JSONResponse({"code": 0, "message": f"ignored event_type={payload.event_type}"})
+    if not await callback_dedup.claim(payload.event_id):
+        logger.info("duplicate callback acked: event_id=%s event_type=%s", payload.event_id, payload.event_type)
+        return JSONResponse({"code": 0, "message": "duplicate event"})
+    try:
+        await callback_handlers.dispatch(payload, event)
+    except Exception:
+        # Let SeaTalk's redelivery of a failed event be processed again.
+        await callback_dedup.release(payload.event_id)
+        raise
+    return JSONResponse({"code": 0})
 
 
-async def _handle_message_from_bot_subscriber(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(MESSAGE_FROM_BOT_SUBSCRIBER)
+async def _handle_message_from_bot_subscriber(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     if not event.employee_code:
         logger.warning("employee_code missing in callback event_id=%s", payload.event_id)
         return
@@ -133,23 +358,18 @@ async def _handle_message_from_bot_subscriber(payload: CallbackEnvelope) -> None
         thread_id=message.thread_id,
         text=text_content,
     )
-    result = workflow_router.route(context)
-
-    if result.response_text:
-        await seatalk_client.send_text_message(
-            employee_code=event.employee_code,
-            content=result.response_text,
-            thread_id=message.thread_id,
-        )
+    # Runs after the callback is acked; the reply goes to the same chat.
+    send = partial(seatalk_outbox.send_text, event.employee_code, thread_id=message.thread_id)
+    workflow_router.dispatch(context, reply=send, notify=send)
 
 
-async def _handle_user_enter_chatroom_with_bot(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(USER_ENTER_CHATROOM_WITH_BOT)
+async def _handle_user_enter_chatroom_with_bot(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     if not event.employee_code:
         logger.warning("employee_code missing for user_enter_chatroom_with_bot event_id=%s", payload.event_id)
         return
 
-    await seatalk_client.send_text_message(
+    await seatalk_outbox.send_text(
         employee_code=event.employee_code,
         content=(
             "Hello! 👋 How can I assist you today?"
@@ -157,8 +377,8 @@ async def _handle_user_enter_chatroom_with_bot(payload: CallbackEnvelope) -> Non
     )
 
 
-def _handle_interactive_message_click(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(INTERACTIVE_MESSAGE_CLICK)
+def _handle_interactive_message_click(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     logger.info(
         "interactive_message_click: event_id=%s employee_code=%s message_id=%s value=%s group_id=%s thread_id=%s",
         payload.event_id,
@@ -170,15 +390,16 @@ def _handle_interactive_message_click(payload: CallbackEnvelope) -> None:
     )
 
 
-async def _handle_bot_added_to_group_chat(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(BOT_ADDED_TO_GROUP_CHAT)
+async def _handle_bot_added_to_group_chat(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     group_id = _group_id_from_event(event)
     logger.info("bot_added_to_group_chat: event_id=%s payload=%s", payload.event_id, event.model_dump())
     if not group_id:
         logger.warning("group_id missing for bot_added_to_group_chat event_id=%s", payload.event_id)
         return
 
-    await seatalk_client.send_group_text_message(
+    await group_registry.add(group_id, event.group.group_name if event.group else None)
+    await seatalk_outbox.send_group_text(
         group_id=group_id,
         content=(
             "Hi everyone, thanks for adding me. "
@@ -188,8 +409,16 @@ async def _handle_bot_added_to_group_chat(payload: CallbackEnvelope) -> None:
     )
 
 
-async def _handle_new_mentioned_message_received_from_group_chat(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(BOT_REMOVED_FROM_GROUP_CHAT)
+async def _handle_bot_removed_from_group_chat(payload: CallbackEnvelope, event: CallbackEvent) -> None:
+    group_id = _group_id_from_event(event)
+    logger.info("bot_removed_from_group_chat: event_id=%s group_id=%s", payload.event_id, group_id)
+    if group_id:
+        await group_registry.remove(group_id)
+
+
+@callback_handlers.register(NEW_MENTIONED_MESSAGE_RECEIVED_FROM_GROUP_CHAT)
+async def _handle_new_mentioned_message_received_from_group_chat(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     message = event.message
     text_content = _extract_text_content(message)
     logger.info(
@@ -211,17 +440,12 @@ async def _handle_new_mentioned_message_received_from_group_chat(payload: Callba
         thread_id=message.thread_id,
         text=text_content,
     )
-    result = workflow_router.route(context)
-    if result.response_text:
-        await seatalk_client.send_group_text_message(
-            group_id=event.group_id,
-            content=result.response_text,
-            thread_id=message.thread_id,
-        )
+    send = partial(seatalk_outbox.send_group_text, event.group_id, thread_id=message.thread_id)
+    workflow_router.dispatch(context, reply=send, notify=send)
 
 
-async def _handle_new_message_received_from_thread(payload: CallbackEnvelope) -> None:
-    event = _normalize_event(payload.event)
+@callback_handlers.register(NEW_MESSAGE_RECEIVED_FROM_THREAD)
+async def _handle_new_message_received_from_thread(payload: CallbackEnvelope, event: CallbackEvent) -> None:
     message = event.message
     text_content = _extract_text_content(message)
     logger.info(
@@ -243,21 +467,9 @@ async def _handle_new_message_received_from_thread(payload: CallbackEnvelope) ->
         thread_id=message.thread_id,
         text=text_content,
     )
-    result = workflow_router.route(context)
-    if result.response_text:
-        await seatalk_client.send_group_text_message(
-            group_id=event.group_id,
-            content=result.response_text,
-            thread_id=message.thread_id,
-        )
-
-
-def _normalize_event(event: CallbackEvent | dict | None) -> CallbackEvent:
-    if isinstance(event, CallbackEvent):
-        return event
-    if isinstance(event, dict):
-        return CallbackEvent.model_validate(event)
-    return CallbackEvent()
+    # Replies in a busy thread may be coalesced; the working notice is always sent on its own.
+    send = partial(seatalk_outbox.send_group_text, event.group_id, thread_id=message.thread_id)
+    workflow_router.dispatch(context, reply=partial(send, coalesce=True), notify=send)
 
 
 def _extract_text_content(message) -> str:
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MISSED_RUN_POLICIES = ("skip", "once", "all")
+_MAX_CATCHUP_RUNS = 10
+_INTERVAL_RE = re.compile(r"^(?:every\s+)?(\d+)\s*(s|sec|secs|m|min|mins|h|hr|hrs)?$")
+_UNIT_SECONDS = {"s": 1, "sec": 1, "secs": 1, "m": 60, "min": 60, "mins": 60, "h": 3600, "hr": 3600, "hrs": 3600}
+
+
+class IntervalSchedule:
+    # Fires every N seconds on wall-clock boundaries counted from local midnight,
+    # e.g. "every 30m" fires at HH:00 and HH:30 regardless of when the process started.
+
+    def __init__(self, seconds: int, tz: ZoneInfo) -> None:
+        if seconds < 1:
+            raise ValueError("schedule interval must be >= 1 second")
+        self.seconds = seconds
+        self._tz = tz
+
+    def next_after(self, ts: float) -> float:
+        local = datetime.fromtimestamp(ts, self._tz)
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (local - midnight).total_seconds()
+        candidate = midnight + timedelta(seconds=(int(elapsed // self.seconds) + 1) * self.seconds)
+        next_midnight = midnight + timedelta(days=1)
+        return min(candidate, next_midnight).timestamp()
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds}s"
+
+
+class CronSchedule:
+    # Standard 5-field cron (minute hour day-of-month month day-of-week) in local time.
+    # Supports "*", lists, ranges and steps; day-of-week 0 and 7 are Sunday.
+
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str, tz: ZoneInfo) -> None:
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self._tz = tz
+        parsed = [self._parse_field(part, low, high) for part, (low, high) in zip(parts, self._FIELDS)]
+        self._minutes, self._hours, self._days, self._months, weekdays = parsed
+        self._weekdays = {0 if day == 7 else day for day in weekdays}
+        # As in cron, a field starting with "*" (including "*/N") does not restrict the day, so
+        # day-of-month and day-of-week are OR'd only when both are explicit.
+        self._days_restricted = not parts[2].startswith("*")
+        self._weekdays_restricted = not parts[4].startswith("*")
+
+    @staticmethod
+    def _parse_field(text: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for item in text.split(","):
+            base, _, step_text = item.partition("/")
+            step = int(step_text) if step_text else 1
+            if step < 1:
+                raise ValueError(f"invalid cron step: {item!r}")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start_text, end_text = base.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(base)
+                end = high if step_text else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron value out of range: {item!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self._days
+        weekday_ok = (dt.isoweekday() % 7) in self._weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, ts: float) -> float:
+        dt = datetime.fromtimestamp(ts, self._tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 4)
+        while dt <= limit:
+            if dt.month not in self._months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self._hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self._minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return self.expression
+
+
+Schedule = IntervalSchedule | CronSchedule
+
+
+def parse_schedule(expression: str, timezone: str) -> Schedule:
+    tz = ZoneInfo(timezone)
+    text = expression.strip().lower()
+    match = _INTERVAL_RE.match(text)
+    if match:
+        return IntervalSchedule(int(match.group(1)) * _UNIT_SECONDS[match.group(2) or "s"], tz)
+    return CronSchedule(text, tz)
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    schedule: Schedule
+    func: Callable[[], Awaitable[object]]
+    jitter_seconds: float = 0.0
+    deadline_seconds: float | None = None
+    missed_run_policy: str = "once"
+    # Start time of the last run before this process started, for startup catch-up.
+    last_run_at: float | None = None
+
+
+@dataclass
+class _JobState:
+    job: ScheduledJob
+    task: asyncio.Task | None = None
+    next_run_at: float | None = None
+    last_run_at: float | None = None
+    last_duration_seconds: float | None = None
+    last_error: str | None = None
+    runs: int = 0
+    skipped_overlap: int = 0
+    skipped_guard: int = 0
+    missed_runs: int = 0
+    deadline_exceeded: int = 0
+
+
+class JobScheduler:
+    # Runs each job on its own cadence. A run that is still going when the next fire is
+    # due is never overlapped; that fire is skipped. A run past its deadline is reported
+    # and no longer awaited, but keeps its slot until it actually finishes, because work
+    # running in a worker thread cannot be interrupted.
+
+    def __init__(
+        self,
+        timezone: str,
+        *,
+        name: str = "scheduler",
+        run_guard: Callable[[], bool] | None = None,
+    ) -> None:
+        self._tz = ZoneInfo(timezone)
+        self._name = name
+        # Checked before every fire; a False result skips the run (e.g. not the leader).
+        self._run_guard = run_guard
+        self._jobs: dict[str, _JobState] = {}
+        self._loops: list[asyncio.Task] = []
+        self._stop_event = asyncio.Event()
+
+    def add_job(self, job: ScheduledJob) -> None:
+        if job.missed_run_policy not in MISSED_RUN_POLICIES:
+            raise ValueError(f"unknown missed-run policy: {job.missed_run_policy!r}")
+        if job.name in self._jobs:
+            raise ValueError(f"duplicate job name: {job.name!r}")
+        self._jobs[job.name] = _JobState(job=job, last_run_at=job.last_run_at)
+
+    @property
+    def running(self) -> bool:
+        return any(not loop.done() for loop in self._loops)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._loops = [asyncio.create_task(self._job_loop(state)) for state in self._jobs.values()]
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._loops:
+            await asyncio.gather(*self._loops, return_exceptions=True)
+        running = [state.task for state in self._jobs.values() if state.task and not state.task.done()]
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        self._loops = []
+
+    def get_status(self) -> dict[str, dict[str, object]]:
+        return {
+            name: {
+                "schedule": repr(state.job.schedule),
+                "missed_run_policy": state.job.missed_run_policy,
+                "running": bool(state.task and not state.task.done()),
+                "next_run_at": self._format_ts(state.next_run_at),
+                "last_run_at": self._format_ts(state.last_run_at),
+                "last_duration_seconds": state.last_duration_seconds,
+                "last_error": state.last_error,
+                "runs": state.runs,
+                "skipped_overlap": state.skipped_overlap,
+                "skipped_guard": state.skipped_guard,
+                "missed_runs": state.missed_runs,
+                "deadline_exceeded": state.deadline_exceeded,
+            }
+            for name, state in self._jobs.items()
+        }
+
+    def _format_ts(self, ts: float | None) -> str | None:
+        if ts is None:
+            return None
+        return datetime.fromtimestamp(ts, self._tz).isoformat(timespec="seconds")
+
+    async def _job_loop(self, state: _JobState) -> None:
+        job = state.job
+        # Without a recorded last run, history starts now: nothing counts as missed, so a deploy
+        # does not fire every job at once.
+        last_run_at = job.last_run_at if job.last_run_at is not None else time.time()
+        pending = self._catchup_runs(job, self._count_fires(job.schedule, last_run_at, time.time()))
+
+        while not self._stop_event.is_set():
+            if pending:
+                pending -= 1
+                fire_at = time.time()
+                state.next_run_at = fire_at
+            else:
+                fire_at = job.schedule.next_after(time.time())
+                state.next_run_at = fire_at
+                delay = fire_at - time.time() + (random.uniform(0, job.jitter_seconds) if job.jitter_seconds else 0.0)
+                if await self._sleep(delay):
+                    break
+
+            await self._run(state)
+
+            missed = self._count_fires(job.schedule, fire_at, time.time())
+            if missed:
+                state.missed_runs += missed
+                logger.warning("%s job %s missed %s scheduled run(s)", self._name, job.name, missed)
+                pending = max(pending, self._catchup_runs(job, missed))
+
+    @staticmethod
+    def _catchup_runs(job: ScheduledJob, missed: int) -> int:
+        if missed <= 0 or job.missed_run_policy == "skip":
+            return 0
+        if job.missed_run_policy == "once":
+            return 1
+        return min(missed, _MAX_CATCHUP_RUNS)
+
+    @staticmethod
+    def _count_fires(schedule: Schedule, after: float, until: float) -> int:
+        count = 0
+        fire = schedule.next_after(after)
+        while fire <= until and count <= _MAX_CATCHUP_RUNS:
+            count += 1
+            fire = schedule.next_after(fire)
+        return count
+
+    async def _sleep(self, delay: float) -> bool:
+        # Returns True when stop was requested during the wait.
+        if delay <= 0:
+            return self._stop_event.is_set()
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _run(self, state: _JobState) -> None:
+        job = state.job
+        if state.task and not state.task.done():
+            state.skipped_overlap += 1
+            logger.warning("%s job %s still running; skipping this run", self._name, job.name)
+            return
+        if self._run_guard and not self._run_guard():
+            state.skipped_guard += 1
+            logger.info("%s job %s skipped by run guard", self._name, job.name)
+            return
+
+        state.last_run_at = time.time()
+        state.runs += 1
+        state.task = asyncio.create_task(self._invoke(state, state.last_run_at))
+        try:
+            await asyncio.wait_for(asyncio.shield(state.task), timeout=job.deadline_seconds)
+        except asyncio.TimeoutError:
+            state.deadline_exceeded += 1
+            logger.warning(
+                "%s job %s exceeded its %ss deadline; later runs wait for it to finish",
+                self._name,
+                job.name,
+                job.deadline_seconds,
+            )
+
+    async def _invoke(self, state: _JobState, started_at: float) -> None:
+        try:
+            await state.job.func()
+            state.last_error = None
+        except Exception as exc:
+            state.last_error = str(exc)
+            logger.exception("%s job %s failed", self._name, state.job.name)
+        finally:
+            state.last_duration_seconds = round(time.time() - started_at, 3)
@@ -0,0 +1,56 @@
+import inspect
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Union
+
+from app.models.events import CallbackEnvelope, CallbackEvent
+
+logger = logging.getLogger(__name__)
+
+CallbackHandler = Callable[[CallbackEnvelope, CallbackEvent], Union[Awaitable[None], None]]
+
+
+class CallbackRegistry:
+    # Maps event_type to its handler, replacing a chain of event_type comparisons. The envelope
+    # keeps the event as a raw dict; it is validated into a CallbackEvent only for event types
+    # that have a handler.
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, CallbackHandler] = {}
+        self._counts: dict[str, int] = {}
+        self._ignored: dict[str, int] = {}
+
+    def register(self, event_type: str) -> Callable[[CallbackHandler], CallbackHandler]:
+        def decorator(handler: CallbackHandler) -> CallbackHandler:
+            if event_type in self._handlers:
+                raise ValueError(f"callback handler already registered for {event_type}")
+            self._handlers[event_type] = handler
+            return handler
+
+        return decorator
+
+    def handles(self, event_type: str) -> bool:
+        return event_type in self._handlers
+
+    def record_ignored(self, event_type: str) -> None:
+        self._ignored[event_type] = self._ignored.get(event_type, 0) + 1
+
+    @staticmethod
+    def parse(envelope: CallbackEnvelope) -> CallbackEvent:
+        # Raises pydantic.ValidationError when the event does not match CallbackEvent.
+        return CallbackEvent.model_validate(envelope.event) if envelope.event else CallbackEvent()
+
+    async def dispatch(self, envelope: CallbackEnvelope, event: CallbackEvent | None = None) -> bool:
+        # Returns False when no handler is registered for the event type.
+        handler = self._handlers.get(envelope.event_type)
+        if handler is None:
+            self.record_ignored(envelope.event_type)
+            return False
+        self._counts[envelope.event_type] = self._counts.get(envelope.event_type, 0) + 1
+        result = handler(envelope, event if event is not None else self.parse(envelope))
+        if inspect.isawaitable(result):
+            await result
+        return True
+
+    def get_status(self) -> dict[str, object]:
+        return {"handled": dict(self._counts), "ignored": dict(self._ignored), "event_types": sorted(self._handlers)}
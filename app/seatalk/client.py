@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import time
 from typing import Any
@@ -6,6 +5,7 @@ from typing import Any
 import httpx
 
 from app.config import Settings
+from app.seatalk.token import AccessToken, TokenManager, build_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -13,38 +13,82 @@ logger = logging.getLogger(__name__)
 class SeaTalkClient:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._token: str | None = None
-        self._token_expire_ts = 0.0
-        self._lock = asyncio.Lock()
-
-    async def _refresh_token(self) -> None:
+        self._http: httpx.AsyncClient | None = None
+        self._tokens = TokenManager(
+            self._fetch_token,
+            app_id=settings.seatalk_app_id,
+            refresh_ahead_seconds=settings.seatalk_token_refresh_ahead_seconds,
+            retry_base_seconds=settings.seatalk_token_retry_base_seconds,
+            retry_max_seconds=settings.seatalk_token_retry_max_seconds,
+            cache=build_token_cache(settings),
+        )
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        settings = self._settings
+        http2 = settings.seatalk_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("SEATALK_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+                http2 = False
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.seatalk_http_max_connections,
+                max_keepalive_connections=settings.seatalk_http_max_keepalive_connections,
+                keepalive_expiry=settings.seatalk_http_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                settings.seatalk_http_timeout_seconds,
+                connect=settings.seatalk_http_connect_timeout_seconds,
+            ),
+        )
+
+    async def start(self) -> None:
+        if self._http is None:
+            self._http = self._build_http_client()
+        self._tokens.start()
+
+    async def aclose(self) -> None:
+        await self._tokens.stop()
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+
+    def _client(self) -> httpx.AsyncClient:
+        # Outside the app lifespan (scripts, tests) the pool is opened on first use.
+        if self._http is None:
+            self._http = self._build_http_client()
+        return self._http
+
+    async def _post(self, url: str, payload: dict[str, Any], headers: dict[str, str] | None = None) -> dict[str, Any]:
+        response = await self._client().post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_token(self) -> AccessToken:
         url = f"{self._settings.seatalk_api_base_url}/auth/app_access_token"
         payload = {
             "app_id": self._settings.seatalk_app_id,
             "app_secret": self._settings.seatalk_app_secret,
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        data = await self._post(url, payload)
 
         code = data.get("code")
         if code != 0:
             raise RuntimeError(f"failed to obtain app access token, code={code}, payload={data}")
 
-        self._token = data["app_access_token"]
-        # API returns unix timestamp in seconds.
-        expire_ts = float(data["expire"])
-        self._token_expire_ts = max(expire_ts - 60.0, time.time() + 30.0)
+        # API returns unix timestamp in seconds; keep at least 30 usable seconds in case of clock skew.
+        expires_at = max(float(data["expire"]), time.time() + 90.0)
+        return AccessToken(value=data["app_access_token"], expires_at=expires_at)
 
     async def get_token(self) -> str:
-        async with self._lock:
-            now = time.time()
-            if self._token and now < self._token_expire_ts:
-                return self._token
-            await self._refresh_token()
-            return self._token or ""
+        return await self._tokens.get_token()
+
+    def token_status(self) -> dict[str, object]:
+        return self._tokens.get_status()
 
     async def send_text_message(
         self,
@@ -76,10 +120,7 @@ class SeaTalkClient:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        data = await self._post(url, payload, headers)
 
         if data.get("code") != 0:
             logger.error("send_message failed with response: %s", data)
@@ -141,10 +182,7 @@ class SeaTalkClient:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        data = await self._post(url, payload, headers)
 
         if data.get("code") != 0:
             logger.error("send_group_message failed with response: %s", data)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+from app.config import Settings
+from app.integrations.supabase_sink import SupabaseSink
+
+logger = logging.getLogger(__name__)
+
+# Expired rows in a shared backend are deleted every this many claims.
+_PURGE_EVERY_CLAIMS = 500
+
+
+class DedupBackend(Protocol):
+    def claim(self, event_id: str, ttl_seconds: float, now: float) -> bool: ...
+
+    def release(self, event_id: str) -> None: ...
+
+    def purge(self, now: float) -> None: ...
+
+
+class SqliteDedupBackend:
+    # Shared by every process on one host (e.g. uvicorn workers) through a SQLite file.
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("create table if not exists callback_events (event_id text primary key, expires_at real not null)")
+            conn.execute("create index if not exists callback_events_expires_at on callback_events (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def claim(self, event_id: str, ttl_seconds: float, now: float) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "insert into callback_events (event_id, expires_at) values (?, ?) "
+                "on conflict(event_id) do update set expires_at = excluded.expires_at "
+                "where callback_events.expires_at <= ?",
+                (event_id, now + ttl_seconds, now),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def release(self, event_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("delete from callback_events where event_id = ?", (event_id,))
+
+    def purge(self, now: float) -> None:
+        with self._connect() as conn:
+            conn.execute("delete from callback_events where expires_at <= ?", (now,))
+
+
+class SupabaseDedupBackend:
+    # Claims event_ids in the seatalk_callback_events table, so replicas on different hosts agree.
+
+    def __init__(self, supabase: SupabaseSink) -> None:
+        self._supabase = supabase
+
+    def claim(self, event_id: str, ttl_seconds: float, now: float) -> bool:
+        result = self._supabase.claim_callback_event(event_id, now + ttl_seconds, now)
+        if result.status == "error":
+            raise RuntimeError(f"callback event claim failed: {result.message}")
+        return result.status == "ok"
+
+    def release(self, event_id: str) -> None:
+        self._supabase.release_callback_event(event_id)
+
+    def purge(self, now: float) -> None:
+        self._supabase.purge_callback_events(now)
+
+
+class CallbackDedup:
+    # Remembers SeaTalk callback event_ids so redeliveries are acknowledged without being
+    # processed again. A bounded in-process TTL/LRU answers repeats seen by this process; with
+    # a shared backend, first sightings are also claimed there so only one worker processes
+    # an event. If the backend fails the event is processed (fail open) and counted as an error.
+
+    def __init__(self, backend: DedupBackend | None, *, ttl_seconds: float, max_entries: int) -> None:
+        self._backend = backend
+        self._ttl = max(1.0, ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._claims = 0
+        self._counters = {
+            "checked": 0,
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "backend_errors": 0,
+            "evicted": 0,
+            "released": 0,
+            "without_event_id": 0,
+        }
+
+    async def claim(self, event_id: str | None) -> bool:
+        # True when the caller should process the event, False for a duplicate.
+        if not event_id:
+            self._counters["without_event_id"] += 1
+            return True
+        self._counters["checked"] += 1
+        now = time.time()
+        expires_at = self._seen.get(event_id)
+        if expires_at is not None:
+            if expires_at > now:
+                self._seen.move_to_end(event_id)
+                self._counters["local_hits"] += 1
+                return False
+            del self._seen[event_id]
+        # Remember it before any await, so a concurrent delivery in this process is a local hit.
+        self._remember(event_id, now)
+        if self._backend is not None:
+            try:
+                claimed = await asyncio.to_thread(self._backend.claim, event_id, self._ttl, now)
+            except Exception as exc:
+                self._counters["backend_errors"] += 1
+                logger.warning("callback dedup backend failed for event_id=%s: %s", event_id, exc)
+                claimed = True
+            if not claimed:
+                # Another worker owns it; if that worker releases it, a redelivery here must get through.
+                self._seen.pop(event_id, None)
+                self._counters["shared_hits"] += 1
+                return False
+            self._claims += 1
+            if self._claims % _PURGE_EVERY_CLAIMS == 0:
+                try:
+                    await asyncio.to_thread(self._backend.purge, now)
+                except Exception as exc:
+                    logger.warning("callback dedup purge failed: %s", exc)
+        self._counters["misses"] += 1
+        return True
+
+    async def release(self, event_id: str | None) -> None:
+        # Forget an event whose processing failed, so a redelivery is processed again.
+        if not event_id:
+            return
+        self._seen.pop(event_id, None)
+        self._counters["released"] += 1
+        if self._backend is not None:
+            try:
+                await asyncio.to_thread(self._backend.release, event_id)
+            except Exception as exc:
+                logger.warning("callback dedup release failed for event_id=%s: %s", event_id, exc)
+
+    def get_status(self) -> dict[str, object]:
+        checked = self._counters["checked"]
+        hits = self._counters["local_hits"] + self._counters["shared_hits"]
+        return {
+            **self._counters,
+            "backend": type(self._backend).__name__ if self._backend else "memory",
+            "entries": len(self._seen),
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            "hit_rate": round(hits / checked, 4) if checked else 0.0,
+        }
+
+    def _remember(self, event_id: str, now: float) -> None:
+        self._seen[event_id] = now + self._ttl
+        while len(self._seen) > self._max_entries:
+            self._seen.popitem(last=False)
+            self._counters["evicted"] += 1
+
+
+def build_callback_dedup(settings: Settings) -> CallbackDedup | None:
+    backend_name = settings.seatalk_callback_dedup.strip().lower()
+    if backend_name in {"", "none", "off", "false"}:
+        return None
+    backend: DedupBackend | None
+    if backend_name == "memory":
+        backend = None
+    elif backend_name == "sqlite":
+        backend = SqliteDedupBackend(settings.seatalk_callback_dedup_path)
+    elif backend_name == "supabase":
+        sink = SupabaseSink(settings)
+        if not sink.enabled:
+            raise ValueError("SEATALK_CALLBACK_DEDUP=supabase requires SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+        backend = SupabaseDedupBackend(sink)
+    else:
+        raise ValueError(f"unknown SEATALK_CALLBACK_DEDUP backend: {settings.seatalk_callback_dedup}")
+    return CallbackDedup(
+        backend,
+        ttl_seconds=settings.seatalk_callback_dedup_ttl_seconds,
+        max_entries=settings.seatalk_callback_dedup_max_entries,
+    )
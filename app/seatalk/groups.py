@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+from app.config import Settings
+from app.integrations.supabase_sink import SupabaseSink
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SeaTalkGroup:
+    group_id: str
+    group_name: str | None
+    # Unix seconds of the (latest) bot_added_to_group_chat event.
+    added_at: float
+
+
+class GroupStore(Protocol):
+    def load(self) -> list[SeaTalkGroup]: ...
+
+    def save(self, group: SeaTalkGroup) -> None: ...
+
+    def delete(self, group_id: str) -> None: ...
+
+
+class SqliteGroupStore:
+    # Survives restarts and is shared by every process on one host.
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("create table if not exists seatalk_groups (group_id text primary key, group_name text, added_at real not null)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def load(self) -> list[SeaTalkGroup]:
+        with self._connect() as conn:
+            rows = conn.execute("select group_id, group_name, added_at from seatalk_groups order by group_id").fetchall()
+        return [SeaTalkGroup(*row) for row in rows]
+
+    def save(self, group: SeaTalkGroup) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "insert into seatalk_groups (group_id, group_name, added_at) values (?, ?, ?) "
+                "on conflict(group_id) do update set group_name = coalesce(excluded.group_name, seatalk_groups.group_name), "
+                "added_at = excluded.added_at",
+                (group.group_id, group.group_name, group.added_at),
+            )
+
+    def delete(self, group_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("delete from seatalk_groups where group_id = ?", (group_id,))
+
+
+class SupabaseGroupStore:
+    # Keeps groups in the seatalk_groups table, so replicas on different hosts broadcast to the same set.
+
+    def __init__(self, supabase: SupabaseSink) -> None:
+        self._supabase = supabase
+
+    def load(self) -> list[SeaTalkGroup]:
+        result, rows = self._supabase.list_seatalk_groups()
+        if result.status == "error":
+            raise RuntimeError(f"seatalk group load failed: {result.message}")
+        return [SeaTalkGroup(str(row["group_id"]), row.get("group_name"), float(row.get("added_at") or 0.0)) for row in rows]
+
+    def save(self, group: SeaTalkGroup) -> None:
+        result = self._supabase.upsert_seatalk_group(group.group_id, group.group_name, group.added_at)
+        if result.status == "error":
+            raise RuntimeError(f"seatalk group save failed: {result.message}")
+
+    def delete(self, group_id: str) -> None:
+        result = self._supabase.delete_seatalk_group(group_id)
+        if result.status == "error":
+            raise RuntimeError(f"seatalk group delete failed: {result.message}")
+
+
+class GroupRegistry:
+    # Groups the bot is a member of, captured from bot_added_to_group_chat (and dropped on
+    # bot_removed_from_group_chat). Listing reads the store, so groups another worker saw are
+    # included; if the store fails, the groups this process knows about are used instead.
+
+    def __init__(self, store: GroupStore | None) -> None:
+        self._store = store
+        self._groups: dict[str, SeaTalkGroup] = {}
+        self._counters = {"added": 0, "removed": 0, "store_errors": 0}
+
+    async def add(self, group_id: str, group_name: str | None = None) -> SeaTalkGroup:
+        known = self._groups.get(group_id)
+        group = SeaTalkGroup(group_id, group_name or (known.group_name if known else None), time.time())
+        self._groups[group_id] = group
+        self._counters["added"] += 1
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(self._store.save, group)
+            except Exception as exc:
+                self._counters["store_errors"] += 1
+                logger.warning("seatalk group save failed for group_id=%s: %s", group_id, exc)
+        return group
+
+    async def remove(self, group_id: str) -> None:
+        self._groups.pop(group_id, None)
+        self._counters["removed"] += 1
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(self._store.delete, group_id)
+            except Exception as exc:
+                self._counters["store_errors"] += 1
+                logger.warning("seatalk group delete failed for group_id=%s: %s", group_id, exc)
+
+    async def list_groups(self) -> list[SeaTalkGroup]:
+        if self._store is not None:
+            try:
+                groups = await asyncio.to_thread(self._store.load)
+            except Exception as exc:
+                self._counters["store_errors"] += 1
+                logger.warning("seatalk group load failed, using the groups known to this process: %s", exc)
+            else:
+                self._groups = {group.group_id: group for group in groups}
+        return sorted(self._groups.values(), key=lambda group: group.group_id)
+
+    async def get_status(self) -> dict[str, object]:
+        groups = await self.list_groups()
+        return {
+            **self._counters,
+            "store": type(self._store).__name__ if self._store else "memory",
+            "groups": [asdict(group) for group in groups],
+        }
+
+
+def build_group_registry(settings: Settings) -> GroupRegistry:
+    backend_name = settings.seatalk_group_registry.strip().lower()
+    store: GroupStore | None
+    if backend_name in {"", "memory", "none"}:
+        store = None
+    elif backend_name == "sqlite":
+        store = SqliteGroupStore(settings.seatalk_group_registry_path)
+    elif backend_name == "supabase":
+        sink = SupabaseSink(settings)
+        if not sink.enabled:
+            raise ValueError("SEATALK_GROUP_REGISTRY=supabase requires SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+        store = SupabaseGroupStore(sink)
+    else:
+        raise ValueError(f"unknown SEATALK_GROUP_REGISTRY backend: {settings.seatalk_group_registry}")
+    return GroupRegistry(store)
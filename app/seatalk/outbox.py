@@ -0,0 +1,395 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+import httpx
+from pydantic import BaseModel
+
+from app.seatalk.client import SeaTalkClient
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; SeaTalk API error codes (HTTP 200, code != 0) are not.
+_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+_PREVIEW_CHARS = 200
+# Coalesced replies are joined with a blank line.
+_COALESCE_SEPARATOR = "\n\n"
+
+
+@dataclass
+class OutboundMessage:
+    id: int
+    kind: str  # "single" (employee_code) or "group" (group_id)
+    recipient: str
+    content: str
+    thread_id: str | None = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    last_error: str | None = None
+    # May be merged with other coalescible replies to the same group thread.
+    coalesce: bool = False
+    # SeaTalk message tag: "text", or "image" with base64 PNG/JPG content (group messages only).
+    tag: str = "text"
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.recipient}"
+
+
+class BroadcastRequest(BaseModel):
+    content: str
+    group_ids: list[str] = []
+    # Every group in the group registry, in addition to group_ids.
+    all_groups: bool = False
+    employee_codes: list[str] = []
+
+
+@dataclass(frozen=True)
+class BroadcastTarget:
+    kind: str  # "single" (employee_code) or "group" (group_id)
+    recipient: str
+
+
+@dataclass
+class BroadcastResult:
+    kind: str
+    recipient: str
+    status: str  # "sent" or "failed"
+    attempts: int
+    error: str | None = None
+
+
+@dataclass
+class BroadcastReport:
+    results: list[BroadcastResult]
+    elapsed_seconds: float
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for result in self.results if result.status == "sent")
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.sent
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "targets": len(self.results),
+            "sent": self.sent,
+            "failed": self.failed,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+class SeaTalkOutbox:
+    # Delivers bot replies after the callback has been acknowledged. Messages are queued per
+    # recipient and a recipient is served by at most one worker at a time, so its messages
+    # arrive in order even across retries; other recipients keep flowing meanwhile. All sends
+    # share one token bucket. Failed sends back off exponentially; messages that run out of
+    # attempts (or fail permanently) go to a bounded dead-letter list.
+    # With a coalescing window, thread replies sent with coalesce=True to the same group thread
+    # within the window are merged into one message (up to coalesce_max_chars), saving API calls
+    # in busy threads. Other messages (mention replies, "working on it" notices) are never merged.
+    # Until start() is called (no app lifespan, e.g. scripts and tests) sends happen inline.
+
+    def __init__(
+        self,
+        client: SeaTalkClient,
+        *,
+        workers: int,
+        rate_per_minute: float,
+        burst: float,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        max_pending: int,
+        dead_letter_limit: int,
+        broadcast_concurrency: int = 8,
+        coalesce_window_seconds: float = 0.0,
+        coalesce_max_chars: int = 4096,
+    ) -> None:
+        self._client = client
+        self._worker_count = max(1, workers)
+        self._rate_per_second = max(0.0, rate_per_minute) / 60.0
+        self._burst = max(1.0, burst)
+        self._tokens = self._burst
+        self._bucket_updated = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base = max(0.0, retry_base_seconds)
+        self._retry_max = max(self._retry_base, retry_max_seconds)
+        self._max_pending = max(1, max_pending)
+        self._broadcast_concurrency = max(1, broadcast_concurrency)
+        self._coalesce_window = max(0.0, coalesce_window_seconds)
+        self._coalesce_max_chars = max(1, coalesce_max_chars)
+        # Open coalescing batches per (group_id, thread_id), each with the timer that flushes it.
+        self._batches: dict[tuple[str, str], tuple[OutboundMessage, asyncio.TimerHandle]] = {}
+        self._ids = itertools.count(1)
+        self._queues: dict[str, deque[OutboundMessage]] = {}
+        self._ready: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retry_timers: dict[str, asyncio.TimerHandle] = {}
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._dead_letters: deque[dict[str, object]] = deque(maxlen=max(1, dead_letter_limit))
+        self._counters = {"enqueued": 0, "sent": 0, "retried": 0, "dead_lettered": 0, "rate_limited_waits": 0, "broadcasts": 0, "broadcast_sent": 0, "broadcast_failed": 0, "coalesced": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._bucket_lock = asyncio.Lock()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = [asyncio.create_task(self._work(), name=f"seatalk-outbox-{i}") for i in range(self._worker_count)]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        if not self._workers:
+            return
+        for batch_key in list(self._batches):
+            self._flush_batch(batch_key)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=max(0.0, drain_timeout))
+        except asyncio.TimeoutError:
+            logger.warning("seatalk outbox stopped with %s undelivered message(s)", self._pending)
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for queue in self._queues.values():
+            for message in queue:
+                message.last_error = message.last_error or "outbox stopped"
+                self._dead_letter(message)
+        self._workers = []
+        self._retry_timers.clear()
+        self._queues.clear()
+        self._pending = 0
+        self._ready = None
+
+    async def send_text(self, employee_code: str, content: str, *, thread_id: str | None = None) -> None:
+        await self._submit(OutboundMessage(next(self._ids), "single", employee_code, content, thread_id))
+
+    async def send_group_text(
+        self, group_id: str, content: str, *, thread_id: str | None = None, coalesce: bool = False
+    ) -> None:
+        await self._submit(OutboundMessage(next(self._ids), "group", group_id, content, thread_id, coalesce=coalesce))
+
+    async def send_group_image(self, group_id: str, image_base64: str, *, thread_id: str | None = None) -> None:
+        await self._submit(OutboundMessage(next(self._ids), "group", group_id, image_base64, thread_id, tag="image"))
+
+    async def broadcast(
+        self, targets: list[BroadcastTarget], content: str, *, concurrency: int | None = None
+    ) -> BroadcastReport:
+        # Sends one message to every target and waits for the outcome. At most `concurrency`
+        # sends are in flight; they draw from the same token bucket as queued replies and are
+        # retried the same way. A failing target never stops the others.
+        started = time.monotonic()
+        limit = asyncio.Semaphore(max(1, concurrency or self._broadcast_concurrency))
+        unique = list(dict.fromkeys(targets))
+
+        async def send(target: BroadcastTarget) -> BroadcastResult:
+            async with limit:
+                return await self._broadcast_one(target, content)
+
+        self._counters["broadcasts"] += 1
+        results = list(await asyncio.gather(*(send(target) for target in unique)))
+        report = BroadcastReport(results, time.monotonic() - started)
+        self._counters["broadcast_sent"] += report.sent
+        self._counters["broadcast_failed"] += report.failed
+        logger.info("seatalk broadcast: targets=%s sent=%s failed=%s", len(results), report.sent, report.failed)
+        return report
+
+    def get_status(self) -> dict[str, object]:
+        return {
+            **self._counters,
+            "running": self.running,
+            "workers": self._worker_count,
+            "pending": self._pending,
+            "recipients": len(self._queues),
+            "retry_scheduled": len(self._retry_timers),
+            "rate_per_minute": round(self._rate_per_second * 60, 3),
+            "broadcast_concurrency": self._broadcast_concurrency,
+            "coalesce_window_ms": round(self._coalesce_window * 1000),
+            "coalescing": len(self._batches),
+            "dead_letters": list(self._dead_letters),
+        }
+
+    async def _submit(self, message: OutboundMessage) -> None:
+        if self._ready is None:
+            await self._send(message)
+            return
+        self._counters["enqueued"] += 1
+        batch_key = (message.recipient, message.thread_id) if message.kind == "group" and message.thread_id else None
+        if batch_key is not None and not message.coalesce:
+            # Keeps the thread in order: a held batch goes out before this message.
+            if batch_key in self._batches:
+                self._flush_batch(batch_key)
+            batch_key = None
+        if batch_key is not None and self._coalesce_window:
+            batch = self._batches.get(batch_key)
+            if batch is not None:
+                merged = len(batch[0].content) + len(_COALESCE_SEPARATOR) + len(message.content)
+                if merged <= self._coalesce_max_chars:
+                    batch[0].content += _COALESCE_SEPARATOR + message.content
+                    self._counters["coalesced"] += 1
+                    return
+                self._flush_batch(batch_key)
+        if self._pending >= self._max_pending:
+            message.last_error = f"outbox full ({self._max_pending} pending)"
+            self._dead_letter(message)
+            return
+        self._pending += 1
+        self._idle.clear()
+        if batch_key is not None and self._coalesce_window:
+            # Held back (but already pending) until the window closes or the batch is full.
+            timer = asyncio.get_running_loop().call_later(self._coalesce_window, self._flush_batch, batch_key)
+            self._batches[batch_key] = (message, timer)
+            return
+        self._enqueue(message)
+
+    def _flush_batch(self, batch_key: tuple[str, str]) -> None:
+        message, timer = self._batches.pop(batch_key)
+        timer.cancel()
+        self._enqueue(message)
+
+    def _enqueue(self, message: OutboundMessage) -> None:
+        assert self._ready is not None
+        queue = self._queues.get(message.key)
+        if queue is None:
+            self._queues[message.key] = deque([message])
+            self._ready.put_nowait(message.key)
+        else:
+            # The recipient is already scheduled; its worker picks this up after the earlier ones.
+            queue.append(message)
+
+    async def _send(self, message: OutboundMessage) -> None:
+        if message.tag == "image":
+            await self._client.send_group_image_message(message.recipient, message.content, thread_id=message.thread_id)
+        elif message.kind == "group":
+            await self._client.send_group_text_message(message.recipient, message.content, thread_id=message.thread_id)
+        else:
+            await self._client.send_text_message(message.recipient, message.content, thread_id=message.thread_id)
+
+    async def _work(self) -> None:
+        assert self._ready is not None
+        while True:
+            key = await self._ready.get()
+            self._retry_timers.pop(key, None)
+            queue = self._queues[key]
+            retry_in = await self._deliver(queue[0])
+            if retry_in is not None:
+                # Keep the recipient's queue intact (and blocked) until the retry is due.
+                loop = asyncio.get_running_loop()
+                self._retry_timers[key] = loop.call_later(retry_in, self._ready.put_nowait, key)
+                continue
+            queue.popleft()
+            self._pending -= 1
+            if queue:
+                self._ready.put_nowait(key)
+            else:
+                del self._queues[key]
+            if not self._pending:
+                self._idle.set()
+
+    async def _deliver(self, message: OutboundMessage) -> float | None:
+        # Returns the delay before the next attempt, or None when the message is done with.
+        await self._take_token()
+        message.attempts += 1
+        try:
+            await self._send(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            message.last_error = f"{type(exc).__name__}: {exc}"
+            retry_after = _retry_after(exc)
+            if retry_after is None or message.attempts >= self._max_attempts:
+                logger.error("seatalk send to %s failed after %s attempt(s): %s", message.key, message.attempts, exc)
+                self._dead_letter(message)
+                return None
+            self._counters["retried"] += 1
+            delay = self._retry_delay(message.attempts, retry_after)
+            logger.warning("seatalk send to %s failed (attempt %s), retrying in %.1fs: %s", message.key, message.attempts, delay, exc)
+            return delay
+        self._counters["sent"] += 1
+        return None
+
+    async def _broadcast_one(self, target: BroadcastTarget, content: str) -> BroadcastResult:
+        message = OutboundMessage(next(self._ids), target.kind, target.recipient, content)
+        while True:
+            await self._take_token()
+            message.attempts += 1
+            try:
+                await self._send(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                message.last_error = f"{type(exc).__name__}: {exc}"
+                retry_after = _retry_after(exc)
+                if retry_after is None or message.attempts >= self._max_attempts:
+                    logger.warning("seatalk broadcast to %s failed after %s attempt(s): %s", message.key, message.attempts, exc)
+                    return BroadcastResult(target.kind, target.recipient, "failed", message.attempts, message.last_error)
+                self._counters["retried"] += 1
+                await asyncio.sleep(self._retry_delay(message.attempts, retry_after))
+                continue
+            return BroadcastResult(target.kind, target.recipient, "sent", message.attempts)
+
+    def _retry_delay(self, attempts: int, retry_after: float) -> float:
+        backoff = min(self._retry_max, self._retry_base * 2 ** (attempts - 1))
+        return max(retry_after, backoff * random.uniform(0.8, 1.2))
+
+    async def _take_token(self) -> None:
+        if not self._rate_per_second:
+            return
+        async with self._bucket_lock:
+            waited = False
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._bucket_updated) * self._rate_per_second)
+                self._bucket_updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                if not waited:
+                    self._counters["rate_limited_waits"] += 1
+                    waited = True
+                await asyncio.sleep((1.0 - self._tokens) / self._rate_per_second)
+
+    def _dead_letter(self, message: OutboundMessage) -> None:
+        self._counters["dead_lettered"] += 1
+        self._dead_letters.append(
+            {
+                "id": message.id,
+                "kind": message.kind,
+                "recipient": message.recipient,
+                "thread_id": message.thread_id,
+                "tag": message.tag,
+                "content": message.content[:_PREVIEW_CHARS],
+                "attempts": message.attempts,
+                "error": message.last_error,
+                "enqueued_at": message.enqueued_at,
+                "failed_at": time.time(),
+            }
+        )
+
+
+def _retry_after(exc: Exception) -> float | None:
+    # Seconds to wait at least before retrying, or None when the error is permanent.
+    if isinstance(exc, httpx.TransportError):
+        return 0.0
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in _RETRYABLE_STATUS:
+        try:
+            return max(0.0, float(exc.response.headers.get("retry-after", 0)))
+        except ValueError:
+            return 0.0
+    return None
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# A token is not handed out during its last minute, so a request never races its expiry.
+_EXPIRY_MARGIN_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class AccessToken:
+    value: str
+    # Unix seconds, as returned by SeaTalk in "expire".
+    expires_at: float
+
+    def usable(self, now: float) -> bool:
+        return now < self.expires_at - _EXPIRY_MARGIN_SECONDS
+
+
+class TokenCache(Protocol):
+    def load(self, app_id: str) -> AccessToken | None: ...
+
+    def store(self, app_id: str, token: AccessToken) -> None: ...
+
+
+class FileTokenCache:
+    # JSON file keyed by app id, replaced atomically and readable only by the owner.
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+
+    def load(self, app_id: str) -> AccessToken | None:
+        try:
+            entry = json.loads(self._path.read_text(encoding="utf-8")).get(app_id)
+        except (OSError, ValueError):
+            return None
+        return AccessToken(**entry) if entry else None
+
+    def store(self, app_id: str, token: AccessToken) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            entries = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entries = {}
+        entries[app_id] = asdict(token)
+        tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(entries, handle)
+        os.replace(tmp, self._path)
+
+
+class SqliteTokenCache:
+    # Shared by every process on one host through a SQLite file.
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("create table if not exists access_tokens (app_id text primary key, value text not null, expires_at real not null)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def load(self, app_id: str) -> AccessToken | None:
+        with self._connect() as conn:
+            row = conn.execute("select value, expires_at from access_tokens where app_id = ?", (app_id,)).fetchone()
+        return AccessToken(value=row[0], expires_at=row[1]) if row else None
+
+    def store(self, app_id: str, token: AccessToken) -> None:
+        with self._connect() as conn:
+            # Never replace a token with one that expires sooner (a slower worker finishing late).
+            conn.execute(
+                "insert into access_tokens (app_id, value, expires_at) values (?, ?, ?) "
+                "on conflict(app_id) do update set value = excluded.value, expires_at = excluded.expires_at "
+                "where excluded.expires_at > access_tokens.expires_at",
+                (app_id, token.value, token.expires_at),
+            )
+
+
+class TokenManager:
+    # Serves the current token without locking and refreshes it in the background once it is
+    # within refresh_ahead_seconds of expiry. Refreshes are single-flight: concurrent callers
+    # that find no usable token wait on the same fetch. A failed background refresh is retried
+    # with exponential backoff while the old token keeps being served. With a cache, a token
+    # another process stored is adopted instead of fetching a new one.
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[AccessToken]],
+        *,
+        app_id: str,
+        refresh_ahead_seconds: float,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        cache: TokenCache | None = None,
+    ) -> None:
+        self._fetch = fetch
+        self._app_id = app_id
+        self._refresh_ahead = max(_EXPIRY_MARGIN_SECONDS, refresh_ahead_seconds)
+        self._retry_base = max(0.01, retry_base_seconds)
+        self._retry_max = max(self._retry_base, retry_max_seconds)
+        self._cache = cache
+        self._token: AccessToken | None = None
+        self._inflight: asyncio.Future[AccessToken] | None = None
+        self._task: asyncio.Task | None = None
+        self._failures = 0
+        self._counters = {"fetched": 0, "cache_loads": 0, "inline_refreshes": 0, "background_refreshes": 0, "failures": 0}
+        self._last_error: str | None = None
+        self._last_refresh_at: float | None = None
+
+    async def get_token(self) -> str:
+        token = self._token
+        if token is not None and token.usable(time.time()):
+            return token.value
+        self._counters["inline_refreshes"] += 1
+        return (await self._refresh()).value
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="seatalk-token-refresh")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def get_status(self) -> dict[str, object]:
+        token = self._token
+        return {
+            **self._counters,
+            "cache": type(self._cache).__name__ if self._cache else None,
+            "expires_at": token.expires_at if token else None,
+            "refresh_ahead_seconds": self._refresh_ahead,
+            "consecutive_failures": self._failures,
+            "last_refresh_at": self._last_refresh_at,
+            "last_error": self._last_error,
+        }
+
+    async def _refresh(self) -> AccessToken:
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._load_or_fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        # Shielded so a cancelled caller does not cancel the fetch others are waiting on.
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future: asyncio.Future) -> None:
+        if self._inflight is future:
+            self._inflight = None
+
+    async def _load_or_fetch(self) -> AccessToken:
+        now = time.time()
+        if self._cache is not None:
+            try:
+                cached = await asyncio.to_thread(self._cache.load, self._app_id)
+            except Exception as exc:
+                cached = None
+                logger.warning("seatalk token cache read failed: %s", exc)
+            if cached is not None and cached.expires_at - self._refresh_ahead > now:
+                self._counters["cache_loads"] += 1
+                self._adopt(cached)
+                return cached
+        try:
+            token = await self._fetch()
+        except Exception as exc:
+            self._counters["failures"] += 1
+            self._failures += 1
+            self._last_error = str(exc)
+            raise
+        self._counters["fetched"] += 1
+        self._adopt(token)
+        if self._cache is not None:
+            try:
+                await asyncio.to_thread(self._cache.store, self._app_id, token)
+            except Exception as exc:
+                logger.warning("seatalk token cache write failed: %s", exc)
+        return token
+
+    def _adopt(self, token: AccessToken) -> None:
+        self._token = token
+        self._failures = 0
+        self._last_error = None
+        self._last_refresh_at = time.time()
+
+    def _next_refresh_delay(self) -> float:
+        token = self._token
+        if token is None:
+            return 0.0
+        # Spread workers sharing a cache over the first part of the refresh window.
+        jitter = random.uniform(0, min(30.0, self._refresh_ahead / 4))
+        # The floor keeps a token issued with less than refresh_ahead left from spinning the loop.
+        return max(1.0, token.expires_at - self._refresh_ahead - time.time() - jitter)
+
+    async def _run(self) -> None:
+        delay = self._next_refresh_delay()
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._refresh()
+                self._counters["background_refreshes"] += 1
+                delay = self._next_refresh_delay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                delay = min(self._retry_max, self._retry_base * 2 ** (self._failures - 1))
+                token = self._token
+                still_valid = token is not None and token.usable(time.time())
+                logger.warning(
+                    "seatalk token refresh failed (attempt %s, current token %s), retrying in %.1fs: %s",
+                    self._failures,
+                    "still valid" if still_valid else "expired",
+                    delay,
+                    exc,
+                )
+
+
+def build_token_cache(settings: Settings) -> TokenCache | None:
+    backend_name = settings.seatalk_token_cache.strip().lower()
+    if backend_name in {"", "none", "off", "false"}:
+        return None
+    path = settings.seatalk_token_cache_path
+    if backend_name == "file":
+        return FileTokenCache(Path(path or "data/seatalk/app_access_token.json"))
+    if backend_name == "sqlite":
+        return SqliteTokenCache(Path(path or "data/seatalk/app_access_token.sqlite3"))
+    raise ValueError(f"unknown SEATALK_TOKEN_CACHE backend: {settings.seatalk_token_cache}")
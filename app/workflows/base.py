@@ -1,4 +1,7 @@
+import asyncio
+import inspect
 from dataclasses import dataclass
+from typing import Protocol
 
 
 @dataclass
@@ -12,4 +15,33 @@ class WorkflowContext:
 @dataclass
 class WorkflowResult:
     handled: bool
-    response_text: str | None = None
\ No newline at end of file
+    response_text: str | None = None
+
+
+class Workflow(Protocol):
+    async def handle(self, context: WorkflowContext) -> WorkflowResult: ...
+
+
+class SyncWorkflow(Protocol):
+    def handle(self, context: WorkflowContext) -> WorkflowResult: ...
+
+
+class SyncWorkflowAdapter:
+    # Gives a synchronous workflow the async interface. handle() runs in a worker thread so
+    # Sheets/Supabase calls do not block the event loop; inline=True is for handlers that only
+    # build text. A timed-out thread cannot be interrupted, its result is just discarded.
+
+    def __init__(self, workflow: SyncWorkflow, *, inline: bool = False) -> None:
+        self.workflow = workflow
+        self._inline = inline
+
+    async def handle(self, context: WorkflowContext) -> WorkflowResult:
+        if self._inline:
+            return self.workflow.handle(context)
+        return await asyncio.to_thread(self.workflow.handle, context)
+
+
+def as_async_workflow(workflow: Workflow | SyncWorkflow, *, inline: bool = False) -> Workflow:
+    if inspect.iscoroutinefunction(workflow.handle):
+        return workflow  # type: ignore[return-value]
+    return SyncWorkflowAdapter(workflow, inline=inline)  # type: ignore[arg-type]
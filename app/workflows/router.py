@@ -1,27 +1,109 @@
+import asyncio
+import importlib
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
 from app.config import Settings
-from app.workflows.backlogs.handler import BacklogsWorkflow
-from app.workflows.base import WorkflowContext, WorkflowResult
-from app.workflows.lh_request.handler import LHRequestWorkflow
-from app.workflows.smalltalk.handler import SmallTalkWorkflow
-from app.workflows.shortlanded.handler import ShortlandedWorkflow
-from app.workflows.stuckup.handler import StuckupWorkflow
+from app.workflows.base import Workflow, WorkflowContext, WorkflowResult, as_async_workflow
+
+logger = logging.getLogger(__name__)
+
+# Leading/trailing punctuation ignored when matching a command token ("stuckup?", "/backlogs,").
+_TOKEN_PUNCTUATION = ",.!?:;"
+
+WORKING_ON_IT_TEXT = "Working on it. I'll reply here when it's done."
+TIMED_OUT_TEXT = "Sorry, that took too long and I stopped it. Please try again in a moment."
+
+Notify = Callable[[str], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class WorkflowSpec:
+    # "package.module:ClassName"; the module is imported and the class built on first use.
+    target: str
+    # Command prefixes, matched token by token against the start of the message.
+    commands: tuple[str, ...] = ()
+    needs_settings: bool = False
+    # Sync handlers run in a worker thread unless inline (they only build text).
+    inline: bool = False
+    # Overrides WORKFLOW_TIMEOUT_SECONDS.
+    timeout_seconds: float | None = None
+
+
+COMMAND_WORKFLOWS = (
+    WorkflowSpec("app.workflows.stuckup.handler:StuckupWorkflow", ("/stuckup", "stuckup"), needs_settings=True, inline=True),
+    WorkflowSpec("app.workflows.backlogs.handler:BacklogsWorkflow", ("/backlogs", "backlogs")),
+    WorkflowSpec("app.workflows.shortlanded.handler:ShortlandedWorkflow", ("/shortlanded", "shortlanded")),
+    WorkflowSpec("app.workflows.lh_request.handler:LHRequestWorkflow", ("/lh_request", "lh_request", "/lh", "lh request")),
+)
+# Tried in order for messages that do not start with a command.
+FREE_TEXT_WORKFLOWS = (WorkflowSpec("app.workflows.smalltalk.handler:SmallTalkWorkflow", inline=True),)
 
 
 class WorkflowRouter:
-    def __init__(self, settings: Settings) -> None:
-        self._workflows = [
-            StuckupWorkflow(settings),
-            BacklogsWorkflow(),
-            ShortlandedWorkflow(),
-            LHRequestWorkflow(),
-            SmallTalkWorkflow(),
-        ]
-
-    def route(self, context: WorkflowContext) -> WorkflowResult:
-        for workflow in self._workflows:
-            result = workflow.handle(context)
+    # Commands are looked up in a trie keyed by lowercased tokens, so only the workflow that owns
+    # the command runs; free text goes through the fallback chain. Workflows are imported and
+    # constructed lazily, the first time a message is routed to them.
+    # Each run is awaited with the workflow's timeout. If it is still running after
+    # WORKFLOW_WORKING_NOTICE_SECONDS, notify() sends a "working on it" message; at the timeout
+    # the run is cancelled and a timeout reply is returned instead.
+    # Callbacks use dispatch(), which runs route() and the reply in a tracked background task so
+    # SeaTalk is acked at once; drain() waits for those tasks on shutdown.
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        commands: tuple[WorkflowSpec, ...] = COMMAND_WORKFLOWS,
+        free_text: tuple[WorkflowSpec, ...] = FREE_TEXT_WORKFLOWS,
+    ) -> None:
+        self._settings = settings
+        self._trie: dict[str, Any] = {}
+        for spec in commands:
+            for command in spec.commands:
+                node = self._trie
+                for token in command.lower().split():
+                    node = node.setdefault(token, {})
+                if None in node:
+                    raise ValueError(f"command {command!r} is registered twice")
+                node[None] = spec
+        self._free_text = free_text
+        self._instances: dict[WorkflowSpec, Workflow] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._counters = {"routed": 0, "working_notices": 0, "timeouts": 0, "failed": 0}
+
+    def dispatch(self, context: WorkflowContext, *, reply: Notify, notify: Notify | None = None) -> asyncio.Task:
+        task = asyncio.create_task(self._route_and_reply(context, reply, notify))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self, timeout: float) -> None:
+        # Lets in-flight runs send their replies, then cancels whatever is left.
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=max(0.0, timeout))
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("cancelled %d workflow run(s) still in flight at shutdown", len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def route(self, context: WorkflowContext, *, notify: Notify | None = None) -> WorkflowResult:
+        self._counters["routed"] += 1
+        tokens = context.text.lower().split()
+        spec = self._match(tokens)
+        if spec is not None:
+            result = await self._run(spec, context, notify)
             if result.handled:
                 return result
+        elif tokens and not tokens[0].startswith("/"):
+            for fallback in self._free_text:
+                result = await self._run(fallback, context, notify)
+                if result.handled:
+                    return result
 
         return WorkflowResult(
             handled=False,
@@ -30,3 +112,63 @@ class WorkflowRouter:
                 "You can chat with me using `/stuckup`, `/backlogs`, `/shortlanded`, or `/lh_request`."
             ),
         )
+
+    def loaded(self) -> list[str]:
+        return [spec.target for spec in self._instances]
+
+    def get_status(self) -> dict[str, object]:
+        return {**self._counters, "in_flight": len(self._tasks), "loaded": self.loaded()}
+
+    async def _route_and_reply(self, context: WorkflowContext, reply: Notify, notify: Notify | None) -> None:
+        try:
+            result = await self.route(context, notify=notify)
+            if result.response_text:
+                await reply(result.response_text)
+        except Exception:
+            self._counters["failed"] += 1
+            logger.exception("workflow run failed: employee_code=%s thread_id=%s", context.employee_code, context.thread_id)
+
+    def _match(self, tokens: list[str]) -> WorkflowSpec | None:
+        # Longest command wins, e.g. "lh request" over a shorter "lh".
+        node = self._trie
+        found = None
+        for token in tokens:
+            node = node.get(token) or node.get(token.strip(_TOKEN_PUNCTUATION))
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    async def _run(self, spec: WorkflowSpec, context: WorkflowContext, notify: Notify | None) -> WorkflowResult:
+        loop = asyncio.get_running_loop()
+        timeout = spec.timeout_seconds if spec.timeout_seconds is not None else self._settings.workflow_timeout_seconds
+        deadline = loop.time() + max(0.0, timeout)
+        notice_after = self._settings.workflow_working_notice_seconds
+        task = asyncio.ensure_future(self._workflow(spec).handle(context))
+        try:
+            if notify is not None and 0 < notice_after < timeout:
+                done, _ = await asyncio.wait({task}, timeout=notice_after)
+                if not done:
+                    self._counters["working_notices"] += 1
+                    try:
+                        await notify(WORKING_ON_IT_TEXT)
+                    except Exception as exc:
+                        logger.warning("workflow working notice failed: workflow=%s error=%s", spec.target, exc)
+            return await asyncio.wait_for(task, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            logger.warning("workflow timed out: workflow=%s timeout=%.1fs", spec.target, timeout)
+            return WorkflowResult(handled=True, response_text=TIMED_OUT_TEXT)
+        finally:
+            # Also cancels the run when the caller itself is cancelled (e.g. shutdown).
+            task.cancel()
+
+    def _workflow(self, spec: WorkflowSpec) -> Workflow:
+        workflow = self._instances.get(spec)
+        if workflow is None:
+            module_name, class_name = spec.target.split(":")
+            workflow_class = getattr(importlib.import_module(module_name), class_name)
+            instance = workflow_class(self._settings) if spec.needs_settings else workflow_class()
+            workflow = as_async_workflow(instance, inline=spec.inline)
+            self._instances[spec] = workflow
+        return workflow
@@ -4,11 +4,16 @@ from app.workflows.base import WorkflowContext, WorkflowResult
 
 
 class SmallTalkWorkflow:
-    _GREETING_RE = re.compile(r"\b(hi|hello|hey|good morning|good afternoon|good evening)\b")
-    _HOW_ARE_YOU_RE = re.compile(r"\b(how are you|how r u|how're you)\b")
-    _THANKS_RE = re.compile(r"\b(thanks|thank you|ty)\b")
-    _BYE_RE = re.compile(r"\b(bye|goodbye|see you|cya)\b")
-    _HELP_RE = re.compile(r"\b(help|what can you do|commands?)\b")
+    # One pass over the text; when several kinds match, the earlier kind in this list wins.
+    _INTENTS = (
+        ("how_are_you", r"how are you|how r u|how're you"),
+        ("greeting", r"hi|hello|hey|good morning|good afternoon|good evening"),
+        ("thanks", r"thanks|thank you|ty"),
+        ("bye", r"bye|goodbye|see you|cya"),
+        ("help", r"help|what can you do|commands?"),
+    )
+    _INTENT_RE = re.compile("|".join(rf"\b(?P<{name}>{pattern})\b" for name, pattern in _INTENTS))
+    _PRIORITY = {name: index for index, (name, _) in enumerate(_INTENTS)}
 
     def handle(self, context: WorkflowContext) -> WorkflowResult:
         text = context.text.strip()
@@ -21,7 +26,8 @@ class SmallTalkWorkflow:
         if lowered.startswith("/"):
             return WorkflowResult(handled=False)
 
-        if self._HOW_ARE_YOU_RE.search(lowered):
+        intent = min((match.lastgroup for match in self._INTENT_RE.finditer(lowered)), key=self._PRIORITY.get, default=None)
+        if intent == "how_are_you":
             return WorkflowResult(
                 handled=True,
                 response_text=(
@@ -29,7 +35,7 @@ class SmallTalkWorkflow:
                     "I can help with /stuckup, /backlogs, /shortlanded, and /lh_request."
                 ),
             )
-        if self._GREETING_RE.search(lowered):
+        if intent == "greeting":
             return WorkflowResult(
                 handled=True,
                 response_text=(
@@ -37,17 +43,17 @@ class SmallTalkWorkflow:
                     "What do you want to work on today?"
                 ),
             )
-        if self._THANKS_RE.search(lowered):
+        if intent == "thanks":
             return WorkflowResult(
                 handled=True,
                 response_text="You're welcome. If you need a command, start with /stuckup help.",
             )
-        if self._BYE_RE.search(lowered):
+        if intent == "bye":
             return WorkflowResult(
                 handled=True,
                 response_text="See you. Message me anytime if you need help.",
             )
-        if self._HELP_RE.search(lowered):
+        if intent == "help":
             return WorkflowResult(
                 handled=True,
                 response_text=(
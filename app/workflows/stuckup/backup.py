@@ -0,0 +1,294 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import Settings
+from app.workflows.stuckup.table import StuckupTable
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_RE = re.compile(r"^snapshot-(\d{6})-(\d{8}T\d{6}Z)\.jsonl\.gz$")
+
+
+def _row_json(row: dict[str, str]) -> str:
+    return json.dumps(row, ensure_ascii=True, sort_keys=True)
+
+
+def _row_key(row: dict[str, str], key_column: str, row_json: str) -> str:
+    key = str(row.get(key_column, "")).strip()
+    if key:
+        return key
+    # Rows without a key are tracked by content so they still round-trip through restore.
+    return "#" + hashlib.blake2b(row_json.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _row_digest(row_json: str) -> bytes:
+    return hashlib.blake2b(row_json.encode("utf-8"), digest_size=16).digest()
+
+
+def _keyed_rows(rows: Iterable[dict[str, str]], key_column: str) -> Iterator[tuple[str, str, dict[str, str]]]:
+    # Yields (key, row_json, row). Later rows repeating a key get an occurrence suffix, so
+    # duplicate rows survive deltas and restore instead of collapsing into one.
+    seen: dict[str, int] = {}
+    for row in rows:
+        row_json = _row_json(row)
+        key = _row_key(row, key_column, row_json)
+        count = seen.get(key, 0) + 1
+        seen[key] = count
+        yield (key if count == 1 else f"{key}#{count}"), row_json, row
+
+
+class StuckupBackupWriter:
+    # Writes gzip-compressed full snapshots periodically and appends per-sync deltas to the
+    # current snapshot's delta file in between. Writes happen on a background thread; only
+    # the newest submitted table is kept when the writer falls behind, since each delta is
+    # computed against whatever was written last.
+
+    def __init__(self, settings: Settings) -> None:
+        self._enabled = settings.stuckup_backup_enabled
+        self._dir = Path(settings.stuckup_backup_dir)
+        self._key_column = settings.supabase_stuckup_conflict_column
+        self._snapshot_interval = max(0, settings.stuckup_backup_snapshot_interval_seconds)
+        self._retention_count = max(1, settings.stuckup_backup_retention_count)
+        self._retention_days = max(0, settings.stuckup_backup_retention_days)
+
+        self._cond = threading.Condition()
+        self._pending: StuckupTable | None = None
+        self._busy = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        # State of the last written backup, used to compute the next delta.
+        self._snapshot_path: Path | None = None
+        self._snapshot_ts = 0.0
+        self._digests: dict[str, bytes] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def submit(self, table: StuckupTable) -> None:
+        if not self._enabled:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = table
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stuckup-backup", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending is not None or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._thread is None or not self._thread.is_alive():
+            # Reopen so a monitor that is stopped and started again (e.g. after a leader
+            # hand-over) keeps writing backups.
+            with self._cond:
+                self._thread = None
+                self._closed = False
+
+    def write_now(self, table: StuckupTable) -> None:
+        now = time.time()
+        if self._snapshot_path is None or (now - self._snapshot_ts) >= self._snapshot_interval:
+            self._write_snapshot(table, now)
+            self._apply_retention(now)
+        else:
+            self._append_delta(table, now)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                table = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                self.write_now(table)
+            except Exception:
+                logger.exception("stuckup backup write failed")
+                # Force a full snapshot next time so a partial delta cannot break the chain.
+                self._snapshot_path = None
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write_snapshot(self, table: StuckupTable, now: float) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        seq = self._next_sequence()
+        stamp = datetime.fromtimestamp(now, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = self._dir / f"snapshot-{seq:06d}-{stamp}.jsonl.gz"
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        digests: dict[str, bytes] = {}
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for key, row_json, _ in _keyed_rows(table.iter_records(), self._key_column):
+                digests[key] = _row_digest(row_json)
+                f.write(row_json + "\n")
+        tmp_path.replace(path)
+
+        self._snapshot_path = path
+        self._snapshot_ts = now
+        self._digests = digests
+        logger.info("stuckup backup snapshot written: %s rows=%s", path.name, len(table))
+
+    def _append_delta(self, table: StuckupTable, now: float) -> None:
+        if self._snapshot_path is None:
+            return
+        digests: dict[str, bytes] = {}
+        lines: list[str] = []
+        for key, row_json, row in _keyed_rows(table.iter_records(), self._key_column):
+            digest = _row_digest(row_json)
+            digests[key] = digest
+            if self._digests.get(key) != digest:
+                lines.append(json.dumps({"op": "upsert", "key": key, "row": row}, ensure_ascii=True, sort_keys=True))
+        for key in self._digests.keys() - digests.keys():
+            lines.append(json.dumps({"op": "delete", "key": key}, ensure_ascii=True, sort_keys=True))
+
+        self._digests = digests
+        if not lines:
+            return
+        header = json.dumps({"op": "run", "ts": round(now, 3), "rows": len(table)}, ensure_ascii=True)
+        # Each run is one gzip member, compressed up front and appended with a single write. A
+        # crash mid-write can only truncate this last member, which restore then skips.
+        member = gzip.compress((header + "\n" + "\n".join(lines) + "\n").encode("utf-8"))
+        with _delta_path(self._snapshot_path).open("ab") as f:
+            f.write(member)
+        logger.info("stuckup backup delta appended: %s changes=%s", self._snapshot_path.name, len(lines))
+
+    def _next_sequence(self) -> int:
+        snapshots = list_snapshots(self._dir)
+        return (snapshots[-1][0] + 1) if snapshots else 1
+
+    def _apply_retention(self, now: float) -> None:
+        snapshots = list_snapshots(self._dir)
+        expired = snapshots[: max(0, len(snapshots) - self._retention_count)]
+        if self._retention_days:
+            cutoff = now - self._retention_days * 86400
+            # Never drop the newest snapshot, whatever its age.
+            expired += [item for item in snapshots[len(expired) : -1] if item[1] < cutoff]
+        for _, _, path in expired:
+            for candidate in (path, _delta_path(path)):
+                try:
+                    candidate.unlink(missing_ok=True)
+                except OSError:
+                    logger.warning("failed to remove expired stuckup backup %s", candidate)
+
+
+def _delta_path(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.name.replace(".jsonl.gz", ".delta.jsonl.gz"))
+
+
+def list_snapshots(backup_dir: Path) -> list[tuple[int, float, Path]]:
+    if not backup_dir.exists():
+        return []
+    snapshots: list[tuple[int, float, Path]] = []
+    for path in backup_dir.iterdir():
+        match = _SNAPSHOT_RE.match(path.name)
+        if not match:
+            continue
+        taken_at = datetime.strptime(match.group(2), "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).timestamp()
+        snapshots.append((int(match.group(1)), taken_at, path))
+    snapshots.sort()
+    return snapshots
+
+
+def restore_rows(backup_dir: Path, key_column: str, sequence: int | None = None) -> list[dict[str, str]]:
+    snapshots = list_snapshots(backup_dir)
+    if sequence is not None:
+        snapshots = [item for item in snapshots if item[0] == sequence]
+    if not snapshots:
+        raise FileNotFoundError(f"no stuckup backup snapshot found in {backup_dir}")
+    snapshot_path = snapshots[-1][2]
+
+    snapshot_rows = (json.loads(line) for line in _read_lines(snapshot_path))
+    rows = {key: row for key, _, row in _keyed_rows(snapshot_rows, key_column)}
+
+    delta_path = _delta_path(snapshot_path)
+    if delta_path.exists():
+        for run in _read_delta_runs(delta_path):
+            for entry in run:
+                if entry["op"] == "upsert":
+                    rows[entry["key"]] = entry["row"]
+                elif entry["op"] == "delete":
+                    rows.pop(entry["key"], None)
+    return list(rows.values())
+
+
+def _read_delta_runs(path: Path) -> Iterator[list[dict]]:
+    # One gzip member per run. A member cut short by a crash ends the replay at the last
+    # complete run instead of failing the restore.
+    data = path.read_bytes()
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            text = decompressor.decompress(data)
+            if not decompressor.eof:
+                raise EOFError("gzip member ends before its end-of-stream marker")
+            entries = [json.loads(line) for line in text.decode("utf-8").splitlines() if line.strip()]
+        except (EOFError, zlib.error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            logger.warning("stuckup backup delta %s ends with an incomplete run, skipped: %s", path.name, exc)
+            return
+        yield entries
+        data = decompressor.unused_data
+
+
+def _read_lines(path: Path) -> Iterator[str]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Restore stuckup rows from a snapshot plus its deltas.")
+    parser.add_argument("--dir", type=Path, default=Path("data/stuckup/backups"), help="backup directory")
+    parser.add_argument("--key-column", default="shipment_id", help="row key column used by the deltas")
+    parser.add_argument("--snapshot", type=int, default=None, help="snapshot sequence (default: latest)")
+    parser.add_argument("--output", type=Path, default=None, help="JSONL output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    rows = restore_rows(args.dir, args.key_column, args.snapshot)
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=True) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    print(f"restored {len(rows)} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
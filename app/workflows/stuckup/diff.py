@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+
+from app.workflows.stuckup.table import StuckupTable
+
+
+@dataclass
+class StuckupDiff:
+    # Keys only; row values stay in the table, so a diff costs O(churn), not O(rows).
+    computed_at: str
+    key_column: str
+    previous_rows: int
+    current_rows: int
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    schema_changed: bool = False
+    # False when there was no previous snapshot to compare against.
+    has_base: bool = True
+    # Keys on more than one row of either table; rows can't be matched by key, so the sync is not incremental.
+    duplicate_keys: list[str] = field(default_factory=list)
+
+    @property
+    def is_incremental(self) -> bool:
+        # True when applying only upsert_keys and removed turns the previous table into the current one.
+        return self.has_base and not self.schema_changed and not self.duplicate_keys
+
+    @property
+    def is_empty(self) -> bool:
+        return self.has_base and not self.schema_changed and not (self.added or self.removed or self.changed)
+
+    @property
+    def upsert_keys(self) -> set[str]:
+        return {*self.added, *self.changed}
+
+    def touches_columns(self, columns: list[str]) -> bool:
+        if not self.is_incremental or self.added or self.removed:
+            return True
+        wanted = set(columns)
+        return any(wanted.intersection(names) for names in self.changed.values())
+
+    def summary(self) -> dict[str, object]:
+        column_counts: dict[str, int] = {}
+        for names in self.changed.values():
+            for name in names:
+                column_counts[name] = column_counts.get(name, 0) + 1
+        return {
+            "computed_at": self.computed_at,
+            "key_column": self.key_column,
+            "has_base": self.has_base,
+            "schema_changed": self.schema_changed,
+            "previous_rows": self.previous_rows,
+            "current_rows": self.current_rows,
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "duplicates": len(self.duplicate_keys),
+            "changed_columns": dict(sorted(column_counts.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+    def to_dict(self, limit: int = 100) -> dict[str, object]:
+        limit = max(0, limit)
+        changed_keys = sorted(self.changed)[:limit]
+        return {
+            **self.summary(),
+            "added_keys": self.added[:limit],
+            "removed_keys": self.removed[:limit],
+            "changed_keys": {key: list(self.changed[key]) for key in changed_keys},
+            "duplicate_keys": self.duplicate_keys[:limit],
+        }
+
+
+def diff_tables(
+    previous: StuckupTable | None,
+    current: StuckupTable,
+    key_column: str,
+    *,
+    computed_at: str = "",
+) -> StuckupDiff:
+    current_keys = [value.strip() for value in current.column(key_column)]
+    duplicates: set[str] = set()
+    current_seen: set[str] = set()
+    for key in current_keys:
+        if key in current_seen:
+            duplicates.add(key)
+        elif key:
+            current_seen.add(key)
+    if previous is None:
+        return StuckupDiff(
+            computed_at=computed_at,
+            key_column=key_column,
+            previous_rows=0,
+            current_rows=len(current),
+            added=sorted(current_seen),
+            has_base=False,
+            duplicate_keys=sorted(duplicates),
+        )
+
+    columns = current.column_names
+    diff = StuckupDiff(
+        computed_at=computed_at,
+        key_column=key_column,
+        previous_rows=len(previous),
+        current_rows=len(current),
+        schema_changed=columns != previous.column_names,
+    )
+
+    # Hash join on the key column: build on the previous snapshot, probe with the current one.
+    previous_index: dict[str, int] = {}
+    for idx, value in enumerate(previous.column(key_column)):
+        key = value.strip()
+        if key in previous_index:
+            duplicates.add(key)
+        elif key:
+            previous_index[key] = idx
+
+    current_columns = [current.column(name) for name in columns]
+    previous_columns = [previous.column(name) for name in columns]
+    compared = list(zip(columns, current_columns, previous_columns))
+    matched: set[str] = set()
+    for idx, key in enumerate(current_keys):
+        if not key or key in matched:
+            continue
+        matched.add(key)
+        previous_idx = previous_index.pop(key, None)
+        if previous_idx is None:
+            diff.added.append(key)
+            continue
+        changed = tuple(name for name, cur, prev in compared if cur[idx] != prev[previous_idx])
+        if changed:
+            diff.changed[key] = changed
+
+    diff.added.sort()
+    diff.removed = sorted(previous_index)
+    diff.duplicate_keys = sorted(duplicates)
+    return diff
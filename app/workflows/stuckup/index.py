@@ -0,0 +1,181 @@
+import bisect
+import threading
+from collections.abc import Iterable, Mapping
+
+from app.workflows.stuckup.diff import StuckupDiff
+from app.workflows.stuckup.table import StuckupTable
+
+# Columns with a secondary index; filters on them match whole values, ignoring case and padding.
+INDEXED_COLUMNS = ("hub_dest_station_name", "cluster_name", "hub_region", "status_desc", "ageing_bucket")
+
+
+def _normalize(value: str) -> str:
+    return value.strip().casefold()
+
+
+class _Snapshot:
+    __slots__ = ("columns", "positions", "rows", "keys", "postings")
+
+    def __init__(self, columns: list[str], indexed: tuple[str, ...]) -> None:
+        self.columns = columns
+        # Indexed column -> position in a row tuple (columns missing from the table are left out).
+        self.positions = {name: columns.index(name) for name in indexed if name in columns}
+        # Primary index: shipment_id -> row tuple (cells shared with the synced StuckupTable).
+        self.rows: dict[str, tuple[str, ...]] = {}
+        # Every shipment_id, sorted, for unfiltered pages.
+        self.keys: list[str] = []
+        # Secondary indexes: column -> normalized value -> sorted shipment_ids, so a page is a slice.
+        self.postings: dict[str, dict[str, list[str]]] = {name: {} for name in self.positions}
+
+
+class ShipmentIndex:
+    # In-process copy of the last synced stuckup table for HTTP lookups. After a sync only the
+    # diff's keys are applied (index work is O(churn)); the first sync and schema changes build
+    # a new snapshot off to the side and swap it in. A lock keeps readers on the event loop from
+    # seeing a half-applied sync running in a worker thread.
+
+    def __init__(self, key_column: str, indexed_columns: Iterable[str] = INDEXED_COLUMNS) -> None:
+        self._key_column = key_column
+        self._indexed = tuple(indexed_columns)
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot([], self._indexed)
+        self._counters = {"rebuilds": 0, "incremental_updates": 0, "rows_applied": 0}
+
+    @property
+    def indexed_columns(self) -> tuple[str, ...]:
+        return self._indexed
+
+    @property
+    def ready(self) -> bool:
+        # False until the first successful sync of this process.
+        return self._counters["rebuilds"] > 0
+
+    def apply(self, table: StuckupTable, diff: StuckupDiff) -> None:
+        columns = table.column_names
+        snapshot = self._snapshot
+        if not snapshot.columns or columns != snapshot.columns or not diff.is_incremental:
+            self._rebuild(table)
+            return
+        if diff.is_empty:
+            return
+        rows = self._rows(table, diff.upsert_keys)
+        with self._lock:
+            for key in diff.removed:
+                self._remove(snapshot, key)
+            for key, row in rows.items():
+                self._put(snapshot, key, row)
+            self._counters["incremental_updates"] += 1
+            self._counters["rows_applied"] += len(diff.removed) + len(rows)
+
+    def get(self, shipment_id: str) -> dict[str, str] | None:
+        with self._lock:
+            snapshot = self._snapshot
+            row = snapshot.rows.get(shipment_id.strip())
+            return dict(zip(snapshot.columns, row)) if row is not None else None
+
+    def query(self, filters: Mapping[str, str], *, limit: int, offset: int = 0) -> dict[str, object]:
+        # Rows matching every filter, ordered by shipment_id.
+        wanted = {name: _normalize(value) for name, value in filters.items() if value and value.strip()}
+        unknown = set(wanted) - set(self._indexed)
+        if unknown:
+            raise ValueError(f"not an indexed column: {', '.join(sorted(unknown))}")
+        with self._lock:
+            snapshot = self._snapshot
+            if not wanted:
+                matches = snapshot.keys
+            elif set(wanted) - set(snapshot.positions):
+                matches = []
+            else:
+                # Walk the shortest posting list and binary-search each key in the others.
+                postings = sorted((snapshot.postings[name].get(value, []) for name, value in wanted.items()), key=len)
+                matches = postings[0]
+                for other in postings[1:]:
+                    matches = [key for key in matches if _contains(other, key)]
+            page = matches[offset : offset + limit]
+            items = [dict(zip(snapshot.columns, snapshot.rows[key])) for key in page]
+            return {"total": len(matches), "offset": offset, "limit": limit, "items": items}
+
+    def get_status(self) -> dict[str, object]:
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                **self._counters,
+                "ready": self.ready,
+                "rows": len(snapshot.rows),
+                "indexed_columns": {name: len(snapshot.postings[name]) for name in snapshot.positions},
+            }
+
+    def _rows(self, table: StuckupTable, keys: set[str]) -> dict[str, tuple[str, ...]]:
+        # One pass over the key column; only the rows being applied are materialized.
+        columns = [table.column(name) for name in table.column_names]
+        rows: dict[str, tuple[str, ...]] = {}
+        for idx, value in enumerate(table.column(self._key_column)):
+            key = value.strip()
+            if key in keys:
+                rows[key] = tuple(column[idx] for column in columns)
+        return rows
+
+    def _rebuild(self, table: StuckupTable) -> None:
+        columns = table.column_names
+        snapshot = _Snapshot(columns, self._indexed)
+        if self._key_column in columns and len(table):
+            key_position = columns.index(self._key_column)
+            rows: dict[str, tuple[str, ...]] = {}
+            for row in zip(*(table.column(name) for name in columns)):
+                key = row[key_position].strip()
+                if key:
+                    rows[key] = row
+            snapshot.keys = sorted(rows)
+            snapshot.rows = {key: rows[key] for key in snapshot.keys}
+            for name, position in snapshot.positions.items():
+                postings = snapshot.postings[name]
+                # Keys are visited in order, so every posting list comes out sorted.
+                for key in snapshot.keys:
+                    postings.setdefault(_normalize(rows[key][position]), []).append(key)
+        with self._lock:
+            self._snapshot = snapshot
+            self._counters["rebuilds"] += 1
+
+    @staticmethod
+    def _put(snapshot: _Snapshot, key: str, row: tuple[str, ...]) -> None:
+        previous = snapshot.rows.get(key)
+        snapshot.rows[key] = row
+        if previous is None:
+            bisect.insort(snapshot.keys, key)
+        for name, position in snapshot.positions.items():
+            value = _normalize(row[position])
+            if previous is not None:
+                old_value = _normalize(previous[position])
+                if old_value == value:
+                    continue
+                _discard(snapshot.postings[name], old_value, key)
+            bisect.insort(snapshot.postings[name].setdefault(value, []), key)
+
+    @staticmethod
+    def _remove(snapshot: _Snapshot, key: str) -> None:
+        previous = snapshot.rows.pop(key, None)
+        if previous is None:
+            return
+        _discard_key(snapshot.keys, key)
+        for name, position in snapshot.positions.items():
+            _discard(snapshot.postings[name], _normalize(previous[position]), key)
+
+
+def _discard(postings: dict[str, list[str]], value: str, key: str) -> None:
+    keys = postings.get(value)
+    if keys is None:
+        return
+    _discard_key(keys, key)
+    if not keys:
+        del postings[value]
+
+
+def _contains(keys: list[str], key: str) -> bool:
+    position = bisect.bisect_left(keys, key)
+    return position < len(keys) and keys[position] == key
+
+
+def _discard_key(keys: list[str], key: str) -> None:
+    position = bisect.bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        del keys[position]
@@ -7,5 +7,6 @@ class StuckupSyncResult:
     message: str
     source_rows: int
     upserted_rows: int
-    exported_rows: int
+    # None when the target sheet was left as is and not read back.
+    exported_rows: int | None
     exported_columns: int
@@ -1,42 +1,79 @@
 import asyncio
-import hashlib
-import json
+import base64
 import logging
-import re
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 from app.config import Settings
 from app.integrations.google_sheets import GoogleSheetsClient
 from app.integrations.supabase_sink import SupabaseSink
-from app.time_utils import format_local_timestamp
+from app.leader_election import LeaseFence
+from app.scheduler import JobScheduler, ScheduledJob, parse_schedule
+from app.seatalk.outbox import SeaTalkOutbox
+from app.time_utils import format_local_timestamp, now_local
+from app.workflows.stuckup.index import ShipmentIndex
+from app.workflows.stuckup.probe import SourceChangeProbe
 from app.workflows.stuckup.service import StuckupService
+from app.workflows.stuckup.trigger import StuckupTriggerQueue, TriggerDecision
 
 logger = logging.getLogger(__name__)
 
 
 class StuckupMonitor:
-    _SCHEDULED_SYNC_TS_STATE_KEY = "stuckup_last_scheduled_sync_ts"
-
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        sheets: GoogleSheetsClient | None = None,
+        sync_limiter: asyncio.Semaphore | None = None,
+        run_guard: Callable[[], bool] | None = None,
+        fence: Callable[[], LeaseFence | None] | None = None,
+        outbox: SeaTalkOutbox | None = None,
+    ) -> None:
         self._settings = settings
-        self._sheets = GoogleSheetsClient(settings)
+        self._outbox = outbox
+        self._sheets = sheets or GoogleSheetsClient(settings)
         self._supabase = SupabaseSink(settings)
-        self._service = StuckupService(settings)
-        self._task: asyncio.Task | None = None
-        self._stop_event = asyncio.Event()
+        self._service = StuckupService(settings, sheets=self._sheets, fence=fence)
+        self._probe = SourceChangeProbe(settings, self._sheets)
+        self._probe_restored = False
+        # Shared across pipelines so only a bounded number of syncs hit Google/Supabase at once.
+        self._sync_limiter = sync_limiter or asyncio.Semaphore(1)
+        self._run_guard = run_guard
+        # Serialises work on this pipeline's service across the probe, scheduled, triggered and summary jobs.
+        self._sync_lock = asyncio.Lock()
+        self._scheduler: JobScheduler | None = None
+        self._trigger = StuckupTriggerQueue(
+            self._run_triggered_sync,
+            debounce_seconds=settings.stuckup_trigger_debounce_seconds,
+            max_delay_seconds=settings.stuckup_trigger_max_delay_seconds,
+            rate_per_minute=settings.stuckup_trigger_rate_per_minute,
+            name=f"stuckup[{settings.stuckup_pipeline_name}]",
+        )
         self._state_path = Path(settings.stuckup_state_path)
         self._state_path.parent.mkdir(parents=True, exist_ok=True)
         self._scheduled_state_path = self._state_path.with_name("scheduled_sync_state.txt")
+        self._scheduled_sync_state_key = settings.supabase_stuckup_scheduled_sync_key
         self._last_scheduled_sync_ts: float | None = None
+        # Exported data hash of the last report pushed to SeaTalk, so each export is reported once.
+        # Kept in the state table (local file as fallback) so restarts and new leaders don't resend.
+        self._report_state_path = self._state_path.with_name("report_state.txt")
+        self._report_state_key = settings.supabase_stuckup_report_hash_key
+        self._last_reported_hash: str | None = None
+        self._report_state_restored = False
         self._last_status: dict[str, str | int | None] = {
             "monitor": "idle",
             "last_check_at": None,
             "last_change_detected_at": None,
             "last_scheduled_sync_at": None,
+            "last_triggered_sync_at": None,
             "last_summary_refresh_at": None,
             "last_summary_refresh_status": None,
             "last_summary_refresh_message": None,
+            "last_report_at": None,
+            "last_report_status": None,
+            "last_report_message": None,
             "last_sync_status": None,
             "last_sync_message": None,
             "last_source_rows": 0,
@@ -47,63 +84,90 @@ class StuckupMonitor:
 
     def start(self) -> None:
         if not self._settings.stuckup_auto_sync_enabled:
-            logger.info("stuckup auto-sync is disabled")
+            logger.info("stuckup auto-sync is disabled: pipeline=%s", self.name)
             self._last_status["monitor"] = "disabled"
             return
         if not self._settings.stuckup_source_spreadsheet_id or not self._settings.stuckup_target_spreadsheet_id:
-            logger.warning("stuckup monitor not started: source/target spreadsheet ID is missing")
+            logger.warning("stuckup monitor not started: pipeline=%s source/target spreadsheet ID is missing", self.name)
             self._last_status["monitor"] = "not_started_missing_sheet_config"
             return
-        if not self._settings.google_service_account_file:
-            logger.warning("stuckup monitor not started: GOOGLE_SERVICE_ACCOUNT_FILE is missing")
+        if not self._settings.google_service_account_file and not self._settings.google_sheets_api_endpoint:
+            logger.warning("stuckup monitor not started: pipeline=%s GOOGLE_SERVICE_ACCOUNT_FILE is missing", self.name)
             self._last_status["monitor"] = "not_started_missing_google_credentials"
             return
-        if self._task and not self._task.done():
+        if self._scheduler and self._scheduler.running:
             return
         self._last_scheduled_sync_ts = self._load_last_scheduled_sync_ts()
-        self._stop_event.clear()
-        self._task = asyncio.create_task(self._run_loop())
-        logger.info("stuckup monitor started")
+        self._scheduler = self._build_scheduler()
+        self._scheduler.start()
+        logger.info("stuckup monitor started: pipeline=%s", self.name)
         self._last_status["monitor"] = "running"
 
+    @property
+    def running(self) -> bool:
+        return bool(self._scheduler and self._scheduler.running)
+
+    def request_sync(self, source: str) -> TriggerDecision:
+        return self._trigger.request(source)
+
     async def stop(self) -> None:
-        self._stop_event.set()
-        if self._task:
-            await self._task
-            logger.info("stuckup monitor stopped")
+        await self._trigger.close()
+        if self._scheduler:
+            await self._scheduler.stop()
+            logger.info("stuckup monitor stopped: pipeline=%s", self.name)
+        await asyncio.to_thread(self._service.close)
         self._last_status["monitor"] = "stopped"
 
-    async def _run_loop(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                mode = self._settings.stuckup_sync_mode.strip().lower()
-                if mode in {"row_change", "both"}:
-                    await self._check_reference_row_and_sync()
-                if mode in {"scheduled", "both"}:
-                    await self._check_scheduled_sync()
-                await self._refresh_dashboard_summary_only()
-            except Exception:
-                logger.exception("stuckup monitor iteration failed")
+    def _build_scheduler(self) -> JobScheduler:
+        settings = self._settings
+        scheduler = JobScheduler(settings.app_timezone, name=f"stuckup[{self.name}]", run_guard=self._run_guard)
+        mode = settings.stuckup_sync_mode.strip().lower()
+        poll_interval = max(5, settings.stuckup_poll_interval_seconds)
+        common = {
+            "jitter_seconds": max(0.0, settings.stuckup_schedule_jitter_seconds),
+            "missed_run_policy": settings.stuckup_missed_run_policy.strip().lower(),
+        }
 
-            try:
-                await asyncio.wait_for(
-                    self._stop_event.wait(),
-                    timeout=max(5, self._settings.stuckup_poll_interval_seconds),
+        if mode in {"row_change", "both"}:
+            scheduler.add_job(
+                ScheduledJob(
+                    name="source_probe",
+                    schedule=parse_schedule(settings.stuckup_probe_schedule or f"every {poll_interval}s", settings.app_timezone),
+                    func=self._probe_source_and_sync,
+                    deadline_seconds=settings.stuckup_probe_deadline_seconds,
+                    **common,
+                )
+            )
+        if mode in {"scheduled", "both"}:
+            interval = max(30, settings.stuckup_scheduled_sync_interval_seconds)
+            scheduler.add_job(
+                ScheduledJob(
+                    name="sync",
+                    schedule=parse_schedule(settings.stuckup_sync_schedule or f"every {interval}s", settings.app_timezone),
+                    func=self._run_scheduled_sync,
+                    deadline_seconds=settings.stuckup_sync_deadline_seconds,
+                    last_run_at=self._last_scheduled_sync_ts,
+                    **common,
                 )
-            except asyncio.TimeoutError:
-                pass
+            )
+        scheduler.add_job(
+            ScheduledJob(
+                name="summary_refresh",
+                schedule=parse_schedule(settings.stuckup_summary_schedule or f"every {poll_interval}s", settings.app_timezone),
+                func=self._refresh_dashboard_summary_only,
+                deadline_seconds=settings.stuckup_summary_deadline_seconds,
+                **common,
+            )
+        )
+        return scheduler
 
-    async def _check_scheduled_sync(self) -> None:
-        interval = max(30, self._settings.stuckup_scheduled_sync_interval_seconds)
+    async def _run_scheduled_sync(self) -> None:
         now_ts = time.time()
-        if self._last_scheduled_sync_ts is not None and (now_ts - self._last_scheduled_sync_ts) < interval:
-            return
-
         self._last_scheduled_sync_ts = now_ts
         self._save_last_scheduled_sync_ts(now_ts)
         self._last_status["last_scheduled_sync_at"] = format_local_timestamp(self._settings)
-        logger.info("stuckup scheduled sync triggered")
-        result = self._service.sync_source_sheet_to_supabase()
+        logger.info("stuckup scheduled sync triggered: pipeline=%s", self.name)
+        result = await self._run_sync()
         self._record_sync_result(result.status, result.message, result.source_rows, result.upserted_rows, result.exported_rows, result.exported_columns)
         logger.info(
             "stuckup scheduled sync result: status=%s message=%s source_rows=%s upserted_rows=%s exported_rows=%s",
@@ -114,42 +178,61 @@ class StuckupMonitor:
             result.exported_rows,
         )
 
-    async def _check_reference_row_and_sync(self) -> None:
-        self._last_status["last_check_at"] = format_local_timestamp(self._settings)
-        row = self._settings.stuckup_reference_row
-        reference_range = self._build_reference_row_range(row)
-        values = self._sheets.read_values(
-            spreadsheet_id=self._settings.stuckup_source_spreadsheet_id,
-            worksheet_name=self._settings.stuckup_source_worksheet_name,
-            cell_range=reference_range,
+    async def _run_triggered_sync(self) -> None:
+        if self._run_guard and not self._run_guard():
+            logger.info("stuckup triggered sync skipped by run guard: pipeline=%s", self.name)
+            return
+        self._last_status["last_triggered_sync_at"] = format_local_timestamp(self._settings)
+        result = await self._run_sync()
+        self._record_sync_result(result.status, result.message, result.source_rows, result.upserted_rows, result.exported_rows, result.exported_columns)
+        logger.info(
+            "stuckup triggered sync result: status=%s message=%s source_rows=%s upserted_rows=%s exported_rows=%s",
+            result.status,
+            result.message,
+            result.source_rows,
+            result.upserted_rows,
+            result.exported_rows,
         )
 
-        row_values = values[0] if values else []
-        fingerprint = hashlib.sha256(json.dumps(row_values, ensure_ascii=True).encode("utf-8")).hexdigest()
+    async def _probe_source_and_sync(self) -> None:
+        self._last_status["last_check_at"] = format_local_timestamp(self._settings)
+        if not self._probe_restored:
+            # Read the persisted fingerprint once; later probes compare in memory.
+            self._probe.restore(await asyncio.to_thread(self._load_last_fingerprint))
+            self._probe_restored = True
 
-        previous = self._load_last_fingerprint()
-        if previous == fingerprint:
-            logger.debug("stuckup reference row unchanged")
-            return
+        result = await asyncio.to_thread(self._probe.probe)
+        if result.fingerprint_changed:
+            await asyncio.to_thread(self._save_last_fingerprint, self._probe.dump())
 
-        self._save_last_fingerprint(fingerprint)
-        if previous is None:
-            logger.info("stuckup monitor baseline set from reference row %s", row)
-            self._last_status["last_sync_status"] = "baseline_set"
-            self._last_status["last_sync_message"] = f"baseline set from row {row}"
+        if result.baseline:
+            if not self._last_status["last_sync_status"]:
+                logger.info("stuckup monitor baseline set from source probe: pipeline=%s", self.name)
+                self._last_status["last_sync_status"] = "baseline_set"
+                self._last_status["last_sync_message"] = "baseline set from source probe"
+            return
+        if not result.changes:
+            logger.debug("stuckup source probe unchanged")
             return
 
-        logger.info("stuckup reference row changed, triggering sync")
+        logger.info("stuckup source changed (%s), triggering sync: pipeline=%s", ", ".join(result.changes), self.name)
         self._last_status["last_change_detected_at"] = format_local_timestamp(self._settings)
-        result = self._service.sync_source_sheet_to_supabase()
-        self._record_sync_result(result.status, result.message, result.source_rows, result.upserted_rows, result.exported_rows, result.exported_columns)
+        sync_result = await self._run_sync()
+        self._record_sync_result(
+            sync_result.status,
+            sync_result.message,
+            sync_result.source_rows,
+            sync_result.upserted_rows,
+            sync_result.exported_rows,
+            sync_result.exported_columns,
+        )
         logger.info(
             "stuckup auto-sync result: status=%s message=%s source_rows=%s upserted_rows=%s exported_rows=%s",
-            result.status,
-            result.message,
-            result.source_rows,
-            result.upserted_rows,
-            result.exported_rows,
+            sync_result.status,
+            sync_result.message,
+            sync_result.source_rows,
+            sync_result.upserted_rows,
+            sync_result.exported_rows,
         )
 
     def _load_last_fingerprint(self) -> str | None:
@@ -172,19 +255,8 @@ class StuckupMonitor:
             logger.warning("fallback to local stuckup state file due to supabase write error: %s", result.message)
         self._state_path.write_text(value, encoding="utf-8")
 
-    def _build_reference_row_range(self, row: int) -> str:
-        # Build row-check range using configured source range columns.
-        # Example: source A1:AL -> reference A2:AL2
-        raw = self._settings.stuckup_source_range.upper()
-        cols = re.findall(r"[A-Z]+", raw)
-        if not cols:
-            return f"A{row}:ZZ{row}"
-        start_col = cols[0]
-        end_col = cols[1] if len(cols) > 1 else cols[0]
-        return f"{start_col}{row}:{end_col}{row}"
-
     def _load_last_scheduled_sync_ts(self) -> float | None:
-        result, value = self._supabase.get_state(self._SCHEDULED_SYNC_TS_STATE_KEY)
+        result, value = self._supabase.get_state(self._scheduled_sync_state_key)
         if result.status == "ok" and value:
             try:
                 return float(value)
@@ -204,24 +276,68 @@ class StuckupMonitor:
 
     def _save_last_scheduled_sync_ts(self, value: float) -> None:
         text = str(value)
-        result = self._supabase.set_state(self._SCHEDULED_SYNC_TS_STATE_KEY, text)
+        result = self._supabase.set_state(self._scheduled_sync_state_key, text)
         if result.status == "ok":
             return
         if result.status == "error":
             logger.warning("fallback to local scheduled sync state file due to supabase write error: %s", result.message)
         self._scheduled_state_path.write_text(text, encoding="utf-8")
 
+    def _load_last_reported_hash(self) -> str | None:
+        result, value = self._supabase.get_state(self._report_state_key)
+        if result.status == "ok":
+            return value
+        if result.status == "error":
+            logger.warning("fallback to local report state file due to supabase read error: %s", result.message)
+
+        if not self._report_state_path.exists():
+            return None
+        value = self._report_state_path.read_text(encoding="utf-8").strip()
+        return value or None
+
+    def _save_last_reported_hash(self, value: str) -> None:
+        result = self._supabase.set_state(self._report_state_key, value)
+        if result.status == "ok":
+            return
+        if result.status == "error":
+            logger.warning("fallback to local report state file due to supabase write error: %s", result.message)
+        self._report_state_path.write_text(value, encoding="utf-8")
+
+    @property
+    def name(self) -> str:
+        return self._settings.stuckup_pipeline_name
+
     def get_status(self) -> dict[str, str | int | bool | None]:
         return {
+            "pipeline": self.name,
             "auto_sync_enabled": self._settings.stuckup_auto_sync_enabled,
             "poll_interval_seconds": self._settings.stuckup_poll_interval_seconds,
             "sync_mode": self._settings.stuckup_sync_mode,
             "scheduled_sync_interval_seconds": self._settings.stuckup_scheduled_sync_interval_seconds,
             "reference_row": self._settings.stuckup_reference_row,
+            "source_spreadsheet_id": self._settings.stuckup_source_spreadsheet_id,
             "source_worksheet": self._settings.stuckup_source_worksheet_name,
             "source_range": self._settings.stuckup_source_range,
+            "target_spreadsheet_id": self._settings.stuckup_target_spreadsheet_id,
             "target_worksheet": self._settings.stuckup_target_worksheet_name,
+            "supabase_table": self._settings.supabase_stuckup_table,
             **self._last_status,
+            "jobs": self._scheduler.get_status() if self._scheduler else {},
+            "trigger": self._trigger.get_status(),
+            "summary_refreshes": self._service.summary_refresh_counts(),
+            "summary_validation": self._service.summary_validation,
+            "report_images": self._service.report_image_counts(),
+        }
+
+    @property
+    def shipments(self) -> ShipmentIndex | None:
+        return self._service.shipments
+
+    def get_diff(self, limit: int = 100) -> dict:
+        last_diff = self._service.last_diff
+        return {
+            "diff": last_diff.to_dict(limit) if last_diff else None,
+            "history": [diff.summary() for diff in reversed(self._service.diff_history())],
         }
 
     def _record_sync_result(
@@ -230,7 +346,7 @@ class StuckupMonitor:
         message: str,
         source_rows: int,
         upserted_rows: int,
-        exported_rows: int,
+        exported_rows: int | None,
         exported_columns: int,
     ) -> None:
         self._last_status["last_sync_status"] = status
@@ -240,12 +356,71 @@ class StuckupMonitor:
         self._last_status["last_exported_rows"] = exported_rows
         self._last_status["last_exported_columns"] = exported_columns
 
+    async def _run_sync(self):
+        async with self._sync_lock, self._sync_limiter:
+            result = await asyncio.to_thread(self._service.sync_source_sheet_to_supabase)
+        # Anchor the probe's tail rows on the end of data the sync just read.
+        if self._service.source_row_count is not None:
+            self._probe.set_data_rows(self._service.source_row_count)
+        # Fast paths (exported_rows is None) leave the target as an earlier run exported it; that
+        # run sent the report, so only a run that wrote the export reports it.
+        if result.status == "ok" and result.exported_rows is not None:
+            await self._send_report_if_updated()
+        return result
+
+    async def plan_sync(self) -> dict:
+        async with self._sync_lock, self._sync_limiter:
+            plan = await asyncio.to_thread(self._service.plan_sync)
+        return plan.to_dict()
+
+    async def report_image(self) -> tuple[bytes, str] | None:
+        return await asyncio.to_thread(self._service.render_report_image)
+
+    async def _send_report_if_updated(self) -> None:
+        # Replaces the Apps Script PDF -> Drive thumbnail -> webhook flow: the report goes out
+        # once per newly exported table, rendered in-process from the exported rows.
+        group_id = self._settings.stuckup_report_group_id
+        if not self._outbox or not group_id:
+            return
+        if not self._report_state_restored:
+            self._last_reported_hash = await asyncio.to_thread(self._load_last_reported_hash)
+            self._report_state_restored = True
+        exported_hash = self._service.exported_data_hash
+        if not exported_hash or exported_hash == self._last_reported_hash:
+            return
+        try:
+            rendered = await self.report_image()
+            if rendered is None:
+                return
+            png, content_hash = rendered
+            text = self._settings.stuckup_report_text_template.replace("{date}", now_local(self._settings).strftime("%Y-%m-%d"))
+            # Queued to the group in order; the outbox rate-limits, retries and dead-letters them.
+            await self._outbox.send_group_text(group_id, text)
+            await self._outbox.send_group_image(group_id, base64.b64encode(png).decode("ascii"))
+        except Exception as exc:
+            logger.exception("stuckup report push failed: pipeline=%s", self.name)
+            self._last_status["last_report_at"] = format_local_timestamp(self._settings)
+            self._last_status["last_report_status"] = "error"
+            self._last_status["last_report_message"] = str(exc)
+            return
+        self._last_reported_hash = exported_hash
+        await asyncio.to_thread(self._save_last_reported_hash, exported_hash)
+        self._last_status["last_report_at"] = format_local_timestamp(self._settings)
+        self._last_status["last_report_status"] = "ok"
+        self._last_status["last_report_message"] = f"report queued ({len(png)} bytes, image {content_hash[:12]})"
+        logger.info("stuckup report queued: pipeline=%s bytes=%s", self.name, len(png))
+
     async def _refresh_dashboard_summary_only(self) -> None:
         try:
-            self._service.refresh_dashboard_summary_only()
+            async with self._sync_lock, self._sync_limiter:
+                refreshed = await asyncio.to_thread(self._service.refresh_dashboard_summary_only)
             self._last_status["last_summary_refresh_at"] = format_local_timestamp(self._settings)
-            self._last_status["last_summary_refresh_status"] = "ok"
-            self._last_status["last_summary_refresh_message"] = "dashboard summary refreshed"
+            if refreshed:
+                self._last_status["last_summary_refresh_status"] = "ok"
+                self._last_status["last_summary_refresh_message"] = "dashboard summary refreshed"
+            else:
+                self._last_status["last_summary_refresh_status"] = "skipped"
+                self._last_status["last_summary_refresh_message"] = "exported data and dashboard block unchanged"
         except Exception as exc:
             logger.exception("dashboard summary refresh failed")
             self._last_status["last_summary_refresh_at"] = format_local_timestamp(self._settings)
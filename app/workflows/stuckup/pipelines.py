@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+from app.config import Settings
+from app.integrations.google_sheets import GoogleSheetsClient
+from app.leader_election import LeaseFence
+from app.seatalk.outbox import SeaTalkOutbox
+from app.workflows.stuckup.monitor import StuckupMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class StuckupPipelineManager:
+    # Runs one StuckupMonitor per configured pipeline. All pipelines share one Google Sheets
+    # client (credentials + per-thread services), the pooled Supabase client, and a global
+    # limit on concurrently running syncs.
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        run_guard: Callable[[], bool] | None = None,
+        fence: Callable[[], LeaseFence | None] | None = None,
+        outbox: SeaTalkOutbox | None = None,
+    ) -> None:
+        self._settings = settings
+        self._sheets = GoogleSheetsClient(settings)
+        self._sync_limiter = asyncio.Semaphore(max(1, settings.stuckup_max_concurrent_syncs))
+        self._monitors: dict[str, StuckupMonitor] = {}
+        for pipeline_settings in settings.stuckup_pipeline_settings():
+            self._monitors[pipeline_settings.stuckup_pipeline_name] = StuckupMonitor(
+                pipeline_settings,
+                sheets=self._sheets,
+                sync_limiter=self._sync_limiter,
+                run_guard=run_guard,
+                fence=fence,
+                outbox=outbox,
+            )
+
+    @property
+    def default(self) -> StuckupMonitor:
+        return next(iter(self._monitors.values()))
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._monitors)
+
+    def get(self, name: str | None = None) -> StuckupMonitor | None:
+        if not name:
+            return self.default
+        return self._monitors.get(name)
+
+    def start(self) -> None:
+        logger.info("starting %s stuckup pipeline(s): %s", len(self._monitors), ", ".join(self._monitors))
+        for monitor in self._monitors.values():
+            monitor.start()
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(monitor.stop() for monitor in self._monitors.values()))
+
+    def get_status(self) -> dict:
+        return {
+            "max_concurrent_syncs": max(1, self._settings.stuckup_max_concurrent_syncs),
+            "pipelines": [monitor.get_status() for monitor in self._monitors.values()],
+        }
@@ -0,0 +1,368 @@
+import argparse
+import json
+import math
+import re
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.integrations.google_sheets import GoogleSheetsClient
+from app.integrations.supabase_sink import SupabaseSink
+from app.integrations.types import SinkResult
+from app.workflows.stuckup.models import StuckupSyncResult
+from app.workflows.stuckup.table import StuckupTable
+
+# Google's guidance for a single Sheets request body, and the per-spreadsheet cell limit.
+_SHEETS_RECOMMENDED_PAYLOAD_BYTES = 2 * 1024 * 1024
+_SHEETS_MAX_CELLS = 10_000_000
+_A1_RE = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+@dataclass
+class PlannedOperation:
+    service: str  # "sheets" or "supabase"
+    action: str  # read, write, clear, resize, upsert, delete, state_write
+    resource: str
+    requests: int = 1
+    rows: int = 0
+    cells: int = 0
+    bytes: int = 0
+    detail: str = ""
+
+
+@dataclass
+class SyncPlan:
+    operations: list[PlannedOperation] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    result: StuckupSyncResult | None = None
+
+    def add(self, operation: PlannedOperation) -> None:
+        self.operations.append(operation)
+
+    def totals(self) -> dict[str, int]:
+        # Sheets quotas count requests per minute, split into read and write buckets.
+        totals = {
+            "sheets_read_requests": 0,
+            "sheets_write_requests": 0,
+            "supabase_read_requests": 0,
+            "supabase_write_requests": 0,
+            "cells_written": 0,
+            "cells_cleared": 0,
+            "rows_upserted": 0,
+            "rows_deleted": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+        }
+        for op in self.operations:
+            is_read = op.action == "read"
+            totals[f"{op.service}_{'read' if is_read else 'write'}_requests"] += op.requests
+            totals["bytes_received" if is_read else "bytes_sent"] += op.bytes
+            if op.action == "write":
+                totals["cells_written"] += op.cells
+            elif op.action == "clear":
+                totals["cells_cleared"] += op.cells
+            elif op.action == "upsert":
+                totals["rows_upserted"] += op.rows
+            elif op.action == "delete":
+                totals["rows_deleted"] += op.rows
+        return totals
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "result": asdict(self.result) if self.result else None,
+            "totals": self.totals(),
+            "warnings": list(self.warnings),
+            "operations": [asdict(op) for op in self.operations],
+        }
+
+
+class PlanningSheetsClient:
+    # Passes reads through to the real client and records writes instead of sending them.
+
+    def __init__(self, sheets: GoogleSheetsClient, plan: SyncPlan) -> None:
+        self._sheets = sheets
+        self._plan = plan
+        self._grid_sizes: dict[tuple[str, str], tuple[int, int]] = {}
+
+    def read_values(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
+        values = self._sheets.read_values(spreadsheet_id, worksheet_name, cell_range)
+        self._plan.add(
+            PlannedOperation(
+                "sheets",
+                "read",
+                f"{worksheet_name}!{cell_range}",
+                rows=len(values),
+                cells=sum(len(row) for row in values),
+                bytes=_values_bytes(values),
+            )
+        )
+        return values
+
+    def read_row_blocks(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        cell_ranges: list[str],
+    ) -> tuple[int, list[list[list[str]]]]:
+        grid_rows, blocks = self._sheets.read_row_blocks(spreadsheet_id, worksheet_name, cell_ranges)
+        self._plan.add(
+            PlannedOperation(
+                "sheets",
+                "read",
+                f"{worksheet_name}!{','.join(cell_ranges)}",
+                rows=sum(len(block) for block in blocks),
+                bytes=sum(_values_bytes(block) for block in blocks),
+            )
+        )
+        return grid_rows, blocks
+
+    def clear_range(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> None:
+        rows, columns = self._range_extent(spreadsheet_id, worksheet_name, cell_range)
+        self._plan.add(
+            PlannedOperation("sheets", "clear", f"{worksheet_name}!{cell_range}", rows=rows, cells=rows * columns, bytes=2)
+        )
+
+    def update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        start_cell: str,
+        values: list[list[str]],
+    ) -> dict[str, Any]:
+        cells = sum(len(row) for row in values)
+        size = _values_bytes(values)
+        self._plan.add(
+            PlannedOperation("sheets", "write", f"{worksheet_name}!{start_cell}", rows=len(values), cells=cells, bytes=size)
+        )
+        if size > _SHEETS_RECOMMENDED_PAYLOAD_BYTES:
+            self._plan.warnings.append(
+                f"{worksheet_name}!{start_cell} write is {size} bytes in one request "
+                f"(Sheets recommends at most {_SHEETS_RECOMMENDED_PAYLOAD_BYTES})"
+            )
+        columns = max((len(row) for row in values), default=0)
+        return {"updatedRows": len(values), "updatedColumns": columns, "updatedCells": cells}
+
+    def batch_update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        blocks: list[tuple[str, list[list[str]]]],
+    ) -> dict[str, Any]:
+        rows = sum(len(values) for _, values in blocks)
+        cells = sum(len(row) for _, values in blocks for row in values)
+        size = sum(_values_bytes(values) for _, values in blocks)
+        self._plan.add(
+            PlannedOperation(
+                "sheets",
+                "write",
+                f"{worksheet_name} (batch)",
+                rows=rows,
+                cells=cells,
+                bytes=size,
+                detail=f"{len(blocks)} range(s)",
+            )
+        )
+        if size > _SHEETS_RECOMMENDED_PAYLOAD_BYTES:
+            self._plan.warnings.append(
+                f"{worksheet_name} batch write is {size} bytes in one request "
+                f"(Sheets recommends at most {_SHEETS_RECOMMENDED_PAYLOAD_BYTES})"
+            )
+        return {"totalUpdatedRows": rows, "totalUpdatedCells": cells}
+
+    def ensure_grid_size(self, spreadsheet_id: str, worksheet_name: str, min_rows: int, min_columns: int) -> None:
+        rows, columns = self._grid_size(spreadsheet_id, worksheet_name)
+        self._plan.add(PlannedOperation("sheets", "read", f"{worksheet_name} (grid properties)", bytes=400))
+        if rows >= min_rows and columns >= min_columns:
+            return
+        new_rows, new_columns = max(rows, min_rows), max(columns, min_columns)
+        self._grid_sizes[(spreadsheet_id, worksheet_name)] = (new_rows, new_columns)
+        self._plan.add(
+            PlannedOperation(
+                "sheets",
+                "resize",
+                worksheet_name,
+                rows=new_rows,
+                cells=new_rows * new_columns,
+                bytes=200,
+                detail=f"{rows}x{columns} -> {new_rows}x{new_columns}",
+            )
+        )
+        if new_rows * new_columns > _SHEETS_MAX_CELLS:
+            self._plan.warnings.append(
+                f"{worksheet_name} would grow to {new_rows * new_columns} cells, above the {_SHEETS_MAX_CELLS} cell spreadsheet limit"
+            )
+
+    def _grid_size(self, spreadsheet_id: str, worksheet_name: str) -> tuple[int, int]:
+        key = (spreadsheet_id, worksheet_name)
+        if key not in self._grid_sizes:
+            self._grid_sizes[key] = self._sheets.get_grid_size(spreadsheet_id, worksheet_name)
+        return self._grid_sizes[key]
+
+    def _range_extent(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> tuple[int, int]:
+        # Open-ended ranges ("A:ZZ") are bounded by the worksheet grid.
+        match = _A1_RE.match(cell_range.upper())
+        if not match:
+            return 0, 0
+        start_col, start_row, end_col, end_row = match.groups()
+        grid_rows, grid_columns = (0, 0)
+        if not (start_row and end_row) or not end_col:
+            grid_rows, grid_columns = self._grid_size(spreadsheet_id, worksheet_name)
+        first_row = int(start_row) if start_row else 1
+        last_row = int(end_row) if end_row else grid_rows
+        first_col = _column_number(start_col) if start_col else 1
+        last_col = min(_column_number(end_col), grid_columns or _column_number(end_col)) if end_col else first_col
+        return max(0, last_row - first_row + 1), max(0, last_col - first_col + 1)
+
+
+class PlanningSupabaseSink:
+    # Passes reads through to the real sink and records writes instead of sending them.
+    # Planned upserts and deletes are overlaid on later fetches, so the export a real sync
+    # would produce (and the stale rows it would find) is planned from the same data.
+
+    def __init__(self, sink: SupabaseSink, plan: SyncPlan, *, table: str) -> None:
+        self._sink = sink
+        self._plan = plan
+        self._table = table
+        self._upserted: dict[str, dict[str, Any]] = {}
+        self._deleted: set[str] = set()
+        self._conflict_column: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._sink.enabled
+
+    def upsert_rows(self, rows: Iterable[dict[str, Any]], conflict_column: str, *, batch_size: int = 1000) -> SinkResult:
+        if not self._sink.enabled:
+            return SinkResult("supabase", "skipped", "not configured")
+        records = list(rows)
+        self._conflict_column = conflict_column
+        for record in records:
+            key = str(record.get(conflict_column, ""))
+            self._upserted[key] = record
+            self._deleted.discard(key)
+        self._plan.add(
+            PlannedOperation(
+                "supabase",
+                "upsert",
+                self._table,
+                requests=math.ceil(len(records) / max(1, batch_size)),
+                rows=len(records),
+                bytes=_records_bytes(records),
+                detail=f"batch_size={batch_size}",
+            )
+        )
+        return SinkResult("supabase", "ok", f"planned upsert of {len(records)} rows")
+
+    def fetch_all_rows(
+        self,
+        order_by: str | None = None,
+        columns: list[str] | None = None,
+    ) -> tuple[SinkResult, list[dict[str, Any]]]:
+        result, rows = self._sink.fetch_all_rows(order_by=order_by, columns=columns)
+        if result.status != "ok":
+            return result, rows
+        self._plan.add(
+            PlannedOperation(
+                "supabase",
+                "read",
+                self._table,
+                requests=len(rows) // 1000 + 1,
+                rows=len(rows),
+                bytes=_records_bytes(rows),
+            )
+        )
+        key_column = self._conflict_column or order_by
+        if not key_column or not (self._upserted or self._deleted):
+            return result, rows
+        merged = {str(row.get(key_column, "")): row for row in rows}
+        for key, record in self._upserted.items():
+            merged[key] = {**merged.get(key, {}), **record}
+        for key in self._deleted:
+            merged.pop(key, None)
+        planned = list(merged.values())
+        if columns:
+            planned = [{column: row.get(column) for column in columns} for row in planned]
+        if order_by:
+            planned.sort(key=lambda row: str(row.get(order_by) or ""))
+        return result, planned
+
+    def delete_rows_by_values(self, column: str, values: list[str], *, batch_size: int = 500) -> SinkResult:
+        if not self._sink.enabled:
+            return SinkResult("supabase", "skipped", "not configured")
+        unique_values = sorted({str(value).strip() for value in values if str(value).strip()})
+        self._deleted.update(unique_values)
+        self._plan.add(
+            PlannedOperation(
+                "supabase",
+                "delete",
+                self._table,
+                requests=math.ceil(len(unique_values) / max(1, batch_size)),
+                rows=len(unique_values),
+                bytes=sum(len(value) + 3 for value in unique_values),
+                detail=f"{column} in (...)",
+            )
+        )
+        return SinkResult("supabase", "ok", f"planned delete of {len(unique_values)} rows")
+
+    def get_data_hash(self) -> tuple[SinkResult, str | None]:
+        result, value = self._sink.get_data_hash()
+        if self._sink.enabled:
+            self._plan.add(PlannedOperation("supabase", "read", "state:data_hash", bytes=len(value or "") + 40))
+        return result, value
+
+    def set_data_hash(self, data_hash: str) -> SinkResult:
+        if not self._sink.enabled:
+            return SinkResult("supabase_state", "skipped", "not configured")
+        self._plan.add(PlannedOperation("supabase", "state_write", "state:data_hash", rows=1, bytes=len(data_hash) + 40))
+        return SinkResult("supabase_state", "ok", "planned state write")
+
+
+class PlanningBackupWriter:
+    # Dry runs never write backups.
+
+    def submit(self, table: StuckupTable) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def _column_number(letters: str) -> int:
+    number = 0
+    for char in letters:
+        number = number * 26 + ord(char) - 64
+    return number
+
+
+def _values_bytes(values: list[list[str]]) -> int:
+    # Approximate JSON size: quotes and a comma per cell, brackets per row.
+    return sum(sum(len(str(cell)) + 3 for cell in row) + 3 for row in values) + 2
+
+
+def _records_bytes(records: list[dict[str, Any]]) -> int:
+    return sum(3 + sum(len(key) + len(str(value)) + 6 for key, value in record.items()) for record in records) + 2
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Dry-run the next stuckup sync and print the planned writes as JSON.")
+    parser.add_argument("--pipeline", default=None, help="pipeline name (default: first configured pipeline)")
+    args = parser.parse_args(argv)
+
+    from app.config import get_settings
+    from app.workflows.stuckup.service import StuckupService
+
+    pipelines = {settings.stuckup_pipeline_name: settings for settings in get_settings().stuckup_pipeline_settings()}
+    settings = pipelines.get(args.pipeline) if args.pipeline else next(iter(pipelines.values()))
+    if settings is None:
+        parser.error(f"unknown pipeline '{args.pipeline}', expected one of: {', '.join(pipelines)}")
+    service = StuckupService(settings)
+    try:
+        plan = service.plan_sync()
+    finally:
+        service.close()
+    print(json.dumps(plan.to_dict(), indent=2))
+    return 0 if plan.result and plan.result.status == "ok" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import random
+import re
+from dataclasses import dataclass, field
+
+from app.config import Settings
+from app.integrations.google_sheets import GoogleSheetsClient
+
+logger = logging.getLogger(__name__)
+
+# Rows read past the last known data row, so appended rows show up in the tail.
+_APPEND_ROWS = 2
+
+
+@dataclass
+class ProbeResult:
+    # True when there was no fingerprint to compare against (first probe, or the tail moved
+    # after a sync); nothing is reported as changed in that case.
+    baseline: bool
+    fingerprint_changed: bool
+    changes: list[str] = field(default_factory=list)
+
+
+class SourceChangeProbe:
+    # Cheap change detection for the source sheet. Each probe is a single spreadsheets.get
+    # that reads the head rows, the tail rows around the last known end of data, and a few
+    # rotating sample rows, and returns the grid row count in the same response.
+    # The head/tail/grid fingerprint is kept in memory; callers persist it only when
+    # fingerprint_changed is set. Sample rows are compared with their previous read.
+
+    def __init__(self, settings: Settings, sheets: GoogleSheetsClient) -> None:
+        self._settings = settings
+        self._sheets = sheets
+        self._first_row = max(2, settings.stuckup_reference_row)
+        self._head_rows = max(1, settings.stuckup_probe_head_rows)
+        self._tail_rows = max(0, settings.stuckup_probe_tail_rows)
+        self._sample_size = max(0, settings.stuckup_probe_sample_rows)
+        self._start_col, self._end_col = self._range_columns(settings.stuckup_source_range)
+        self._rng = random.Random()
+
+        # Number of data rows (below the header) seen by the last sync, if known.
+        self._data_rows: int | None = None
+        self._grid_rows: int | None = None
+        self._fingerprint: str | None = None
+        self._fingerprint_anchor: int | None = None
+        self._samples: dict[int, str] = {}
+        self._sample_slot = 0
+
+    @property
+    def fingerprint(self) -> str | None:
+        return self._fingerprint
+
+    def set_data_rows(self, rows: int) -> None:
+        self._data_rows = max(0, rows)
+
+    def dump(self) -> str:
+        return json.dumps(
+            {"fingerprint": self._fingerprint, "data_rows": self._data_rows, "anchor": self._fingerprint_anchor},
+            sort_keys=True,
+        )
+
+    def restore(self, raw: str | None) -> None:
+        # Older deployments stored a bare reference-row hash; treat that as no baseline.
+        if not raw:
+            return
+        try:
+            state = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(state, dict):
+            return
+        self._fingerprint = state.get("fingerprint")
+        self._fingerprint_anchor = state.get("anchor")
+        if self._data_rows is None and isinstance(state.get("data_rows"), int):
+            self._data_rows = state["data_rows"]
+
+    def probe(self) -> ProbeResult:
+        head_end = self._first_row + self._head_rows - 1
+        anchor = self._last_data_row()
+        ranges = [self._rows_range(self._first_row, head_end)]
+        tail_start = 0
+        if anchor and self._tail_rows:
+            tail_start = max(head_end + 1, anchor - self._tail_rows + 1)
+            ranges.append(self._rows_range(tail_start, anchor + _APPEND_ROWS))
+        sample_rows = self._next_sample_rows(head_end + 1, (tail_start or (anchor or 0) + 1) - 1)
+        ranges.extend(self._rows_range(row, row) for row in sample_rows)
+
+        grid_rows, blocks = self._sheets.read_row_blocks(
+            spreadsheet_id=self._settings.stuckup_source_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_source_worksheet_name,
+            cell_ranges=ranges,
+        )
+        self._grid_rows = grid_rows
+        head = blocks[0]
+        tail = blocks[1] if tail_start else []
+        sample_blocks = blocks[2 if tail_start else 1 :]
+        fingerprint = self._hash([grid_rows, anchor, head, tail])
+
+        changes: list[str] = []
+        baseline = self._fingerprint is None or self._fingerprint_anchor != anchor
+        if not baseline and fingerprint != self._fingerprint:
+            changes.append("head/tail rows or row count")
+
+        samples: dict[int, str] = {}
+        for row, block in zip(sample_rows, sample_blocks):
+            samples[row] = self._hash(block)
+            previous = self._samples.get(row)
+            if previous is not None and previous != samples[row]:
+                changes.append(f"sample row {row}")
+        self._samples = samples
+
+        fingerprint_changed = fingerprint != self._fingerprint or anchor != self._fingerprint_anchor
+        self._fingerprint = fingerprint
+        self._fingerprint_anchor = anchor
+        return ProbeResult(baseline=baseline, fingerprint_changed=fingerprint_changed, changes=changes)
+
+    def _last_data_row(self) -> int | None:
+        if self._data_rows is not None:
+            return self._data_rows + 1
+        return self._grid_rows
+
+    def _next_sample_rows(self, start: int, end: int) -> list[int]:
+        # Keep the current sample and swap one slot per probe, so every sampled row is read
+        # several times in a row (and can be compared) while the sample drifts over the sheet.
+        current = sorted(row for row in self._samples if start <= row <= end)
+        if not self._sample_size or end < start:
+            return []
+        span = end - start + 1
+        wanted = min(self._sample_size, span)
+        while len(current) < wanted:
+            candidate = self._rng.randint(start, end)
+            if candidate not in current:
+                current.append(candidate)
+        if span > wanted:
+            self._sample_slot = (self._sample_slot + 1) % wanted
+            replacement = self._rng.randint(start, end)
+            if replacement not in current:
+                current[self._sample_slot] = replacement
+        return sorted(current)
+
+    def _rows_range(self, first: int, last: int) -> str:
+        return f"{self._start_col}{first}:{self._end_col}{last}"
+
+    @staticmethod
+    def _range_columns(source_range: str) -> tuple[str, str]:
+        # Example: source A1:AL -> rows are read as A<n>:AL<n>
+        cols = re.findall(r"[A-Z]+", source_range.upper())
+        if not cols:
+            return "A", "ZZ"
+        return cols[0], cols[1] if len(cols) > 1 else cols[0]
+
+    @staticmethod
+    def _hash(value: object) -> str:
+        return hashlib.sha256(json.dumps(value, ensure_ascii=True).encode("utf-8")).hexdigest()
@@ -0,0 +1,189 @@
+import hashlib
+import io
+import json
+import logging
+from dataclasses import asdict
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.workflows.stuckup.summary import DashboardSummary
+
+logger = logging.getLogger(__name__)
+
+# SeaTalk rejects images above 5 MB.
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+# Bump when the layout changes so cached images are not reused.
+_RENDER_VERSION = 1
+
+_WIDTH = 1200
+_MARGIN = 32
+_ROW_HEIGHT = 30
+_BACKGROUND = (255, 255, 255)
+_HEADER_FILL = (238, 77, 45)
+_HEADER_TEXT = (255, 255, 255)
+_GRID = (221, 221, 221)
+_TEXT = (33, 33, 33)
+_MUTED = (117, 117, 117)
+_BAR = (238, 77, 45)
+_STRIPE = (250, 245, 243)
+
+
+class DashboardImageRenderer:
+    # Draws the stuckup dashboard (KPIs, region table, top clusters/hubs, L7D chart) from a
+    # DashboardSummary into a PNG. Images are cached on disk by a hash of everything drawn,
+    # so an unchanged summary is never re-rendered.
+
+    def __init__(self, cache_dir: Path, *, max_bytes: int = MAX_IMAGE_BYTES, keep_files: int = 20) -> None:
+        self._cache_dir = Path(cache_dir)
+        self._max_bytes = max_bytes
+        self._keep_files = max(1, keep_files)
+        self.renders = 0
+        self.cache_hits = 0
+
+    def render(self, summary: DashboardSummary, *, title: str, as_of: str) -> tuple[bytes, str]:
+        # Returns (png_bytes, content_hash).
+        content_hash = self.content_hash(summary, title=title, as_of=as_of)
+        path = self._cache_dir / f"{content_hash}.png"
+        if path.exists():
+            self.cache_hits += 1
+            return path.read_bytes(), content_hash
+
+        png = self._encode(self._draw(summary, title=title, as_of=as_of))
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(png)
+        tmp_path.replace(path)
+        self.renders += 1
+        self._prune()
+        return png, content_hash
+
+    @staticmethod
+    def content_hash(summary: DashboardSummary, *, title: str, as_of: str) -> str:
+        payload = {"version": _RENDER_VERSION, "title": title, "as_of": as_of, "summary": asdict(summary)}
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=True, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _encode(self, image: Image.Image) -> bytes:
+        png = _png_bytes(image)
+        if len(png) <= self._max_bytes:
+            return png
+        # Flat dashboard colours survive palette reduction well; shrink only as a last resort.
+        png = _png_bytes(image.quantize(colors=64))
+        while len(png) > self._max_bytes and image.width > 300:
+            image = image.resize((image.width * 3 // 4, image.height * 3 // 4))
+            png = _png_bytes(image.quantize(colors=64))
+        if len(png) > self._max_bytes:
+            raise ValueError(f"dashboard image is {len(png)} bytes, above the {self._max_bytes} byte limit")
+        return png
+
+    def _prune(self) -> None:
+        files = sorted(self._cache_dir.glob("*.png"), key=lambda item: item.stat().st_mtime)
+        for path in files[: max(0, len(files) - self._keep_files)]:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.warning("failed to remove cached dashboard image %s", path)
+
+    def _draw(self, summary: DashboardSummary, *, title: str, as_of: str) -> Image.Image:
+        fonts = {size: ImageFont.load_default(size=size) for size in (14, 16, 30)}
+        regions = summary.region_totals[:10]
+        tops = max(min(len(summary.clusters), 5), min(len(summary.hubs), 5), 1)
+        table_rows = max(len(regions) + 1, tops)
+        chart_height = 260 if summary.daily_counts else 0
+        height = 90 + 110 + 60 + (table_rows + 1) * _ROW_HEIGHT + 40 + chart_height + _MARGIN
+        image = Image.new("RGB", (_WIDTH, height), _BACKGROUND)
+        draw = ImageDraw.Draw(image)
+
+        # Title bar
+        draw.rectangle((0, 0, _WIDTH, 70), fill=_HEADER_FILL)
+        draw.text((_MARGIN, 18), title, font=fonts[30], fill=_HEADER_TEXT)
+        draw.text((_MARGIN, 78), f"As of {as_of}", font=fonts[14], fill=_MUTED)
+
+        # KPI cards
+        kpis = [
+            (summary.latest_label, summary.latest_count),
+            (summary.prev_label, summary.prev_count),
+            ("Total L7D", summary.total_l7d),
+            ("Ave L7D", summary.ave_l7d),
+        ]
+        card_width = (_WIDTH - 2 * _MARGIN - 3 * 16) // 4
+        top = 104
+        for idx, (label, value) in enumerate(kpis):
+            left = _MARGIN + idx * (card_width + 16)
+            draw.rectangle((left, top, left + card_width, top + 90), outline=_GRID, width=2)
+            draw.text((left + 14, top + 10), label, font=fonts[16], fill=_MUTED)
+            draw.text((left + 14, top + 40), "n/a" if value is None else f"{value:,}", font=fonts[30], fill=_TEXT)
+
+        # Tables: regions on the left, clusters and hubs on the right
+        top = 230
+        column_width = (_WIDTH - 2 * _MARGIN - 2 * 24) // 3
+        total = summary.total_l7d or 0
+        region_rows = [(name, f"{count:,}", f"{count * 100.0 / total:.1f}%" if total else "") for name, count in regions]
+        if regions:
+            region_rows.append(("Total", f"{total:,}", "100.0%" if total else ""))
+        self._table(draw, fonts, _MARGIN, top, column_width, "Region (L7D)", region_rows)
+        self._table(
+            draw,
+            fonts,
+            _MARGIN + column_width + 24,
+            top,
+            column_width,
+            "Top clusters",
+            [(name, "", f"{pct:.2f}%") for name, pct in summary.clusters[:5]],
+        )
+        self._table(
+            draw,
+            fonts,
+            _MARGIN + 2 * (column_width + 24),
+            top,
+            column_width,
+            "Top DC/Hubs",
+            [(name, "", f"{pct:.2f}%") for name, pct in summary.hubs[:5]],
+        )
+
+        if summary.daily_counts:
+            self._bar_chart(draw, fonts, top + (table_rows + 2) * _ROW_HEIGHT + 20, chart_height - 20, summary.daily_counts)
+        return image
+
+    @staticmethod
+    def _table(draw, fonts, left: int, top: int, width: int, title: str, rows: list[tuple[str, str, str]]) -> None:
+        draw.rectangle((left, top, left + width, top + _ROW_HEIGHT), fill=_HEADER_FILL)
+        draw.text((left + 8, top + 6), title, font=fonts[16], fill=_HEADER_TEXT)
+        if not rows:
+            draw.text((left + 8, top + _ROW_HEIGHT + 6), "n/a", font=fonts[14], fill=_MUTED)
+            return
+        for idx, (name, count, share) in enumerate(rows):
+            y = top + (idx + 1) * _ROW_HEIGHT
+            if idx % 2:
+                draw.rectangle((left, y, left + width, y + _ROW_HEIGHT), fill=_STRIPE)
+            draw.line((left, y + _ROW_HEIGHT, left + width, y + _ROW_HEIGHT), fill=_GRID)
+            draw.text((left + 8, y + 7), _fit(name, 26), font=fonts[14], fill=_TEXT)
+            if count:
+                draw.text((left + width - 130, y + 7), count, font=fonts[14], fill=_TEXT)
+            draw.text((left + width - 66, y + 7), share, font=fonts[14], fill=_TEXT)
+
+    @staticmethod
+    def _bar_chart(draw, fonts, top: int, height: int, points: list[tuple[str, int]]) -> None:
+        draw.text((_MARGIN, top), "Daily stuck orders (L7D)", font=fonts[16], fill=_TEXT)
+        base = top + height - 24
+        plot_top = top + 40
+        peak = max((count for _, count in points), default=0) or 1
+        slot = (_WIDTH - 2 * _MARGIN) // max(1, len(points))
+        draw.line((_MARGIN, base, _WIDTH - _MARGIN, base), fill=_GRID, width=2)
+        for idx, (label, count) in enumerate(points):
+            left = _MARGIN + idx * slot + slot // 4
+            bar_top = base - int((base - plot_top) * count / peak)
+            if count:
+                draw.rectangle((left, bar_top, left + slot // 2, base), fill=_BAR)
+            draw.text((left, bar_top - 20), f"{count:,}", font=fonts[14], fill=_TEXT)
+            draw.text((left, base + 4), label, font=fonts[14], fill=_MUTED)
+
+
+def _png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _fit(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
@@ -1,16 +1,33 @@
+import copy
 import json
 import re
 import hashlib
 import logging
 import time
-from pathlib import Path
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from typing import Any
 
 from app.config import Settings
 from app.integrations.google_sheets import GoogleSheetsClient
 from app.integrations.supabase_sink import SupabaseSink
-from app.time_utils import format_local_timestamp
+from app.leader_election import LeaseFence, LeaseLostError
+from app.time_utils import format_local_timestamp, now_local
+from app.workflows.stuckup.backup import StuckupBackupWriter
+from app.workflows.stuckup.diff import StuckupDiff, diff_tables
+from app.workflows.stuckup.index import ShipmentIndex
 from app.workflows.stuckup.models import StuckupSyncResult
+from app.workflows.stuckup.plan import PlanningBackupWriter, PlanningSheetsClient, PlanningSupabaseSink, SyncPlan
+from app.workflows.stuckup.report_image import DashboardImageRenderer
+from app.workflows.stuckup.summary import (
+    DashboardSummary,
+    compare_summaries,
+    summarize_table,
+    summary_from_block,
+    summary_lines,
+)
+from app.workflows.stuckup.table import StuckupTable
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +36,56 @@ class StuckupService:
     _CLAIMS_RAW_MAX_EXPORT_COLUMNS = 17  # Keep column R+ formula columns intact.
     _DASHBOARD_SUMMARY_CLEAR_RANGE = "C4:AA9"
     _DASHBOARD_SUMMARY_START_CELL = "C4"
+    _DASHBOARD_BLOCK_RANGE = "B10:AB43"
+    _DIFF_HISTORY_SIZE = 24
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        sheets: GoogleSheetsClient | None = None,
+        fence: Callable[[], LeaseFence | None] | None = None,
+    ) -> None:
         self._settings = settings
-        self._google_sheets = GoogleSheetsClient(settings)
+        self._google_sheets = sheets or GoogleSheetsClient(settings)
         self._supabase = SupabaseSink(settings)
-
-        self._backup_path = Path(settings.stuckup_raw_backup_path)
-        self._backup_path.parent.mkdir(parents=True, exist_ok=True)
+        self._backup = StuckupBackupWriter(settings)
+        self._report_renderer = DashboardImageRenderer(settings.stuckup_report_image_dir)
+
+        # Last successfully synced source table and its hash, used as the diff base.
+        self._last_table: StuckupTable | None = None
+        self._last_data_hash: str | None = None
+        # Data rows (below the header) in the last source read, before status filtering.
+        self._source_row_count: int | None = None
+        # Inputs of the last dashboard summary refresh: exported data hash and dashboard block
+        # fingerprint. The summary is only rebuilt when one of them moves.
+        self._exported_data_hash: str | None = None
+        self._exported_at: str | None = None
+        self._summary_inputs: tuple[str | None, str] | None = None
+        self._summary_refreshes = {"executed": 0, "skipped": 0, "validation_mismatches": 0}
+        # Rows of the last export, aggregated in-process for the local summary.
+        self._summary_table: StuckupTable | None = None
+        # Layout of the target sheet as this process last wrote it: exported columns and the key
+        # on each data row. Lets an incremental sync patch rows in place instead of rewriting.
+        self._exported_columns: list[str] | None = None
+        self._exported_keys: list[str] | None = None
+        self._summary_validation: dict[str, object] | None = None
+        self._diff_history: deque[StuckupDiff] = deque(maxlen=self._DIFF_HISTORY_SIZE)
+        # Last synced table, indexed for /stuckup/shipments lookups.
+        self._shipments: ShipmentIndex | None = ShipmentIndex(settings.supabase_stuckup_conflict_column)
+        # With leader election, returns the fence (lease + fencing token) a run is started under.
+        self._fence_provider = fence
+        self._fence: LeaseFence | None = None
 
     def sync_source_sheet_to_supabase(self) -> StuckupSyncResult:
+        try:
+            with self._fenced():
+                return self._sync_source_sheet_to_supabase()
+        except LeaseLostError as exc:
+            logger.warning("stuckup sync aborted before writing: %s", exc)
+            return self._error(f"sync aborted, leadership lost: {exc}")
+
+    def _sync_source_sheet_to_supabase(self) -> StuckupSyncResult:
         if not self._settings.stuckup_source_spreadsheet_id:
             return self._error("STUCKUP_SOURCE_SPREADSHEET_ID is not configured")
         if not self._settings.stuckup_target_spreadsheet_id:
@@ -44,43 +101,53 @@ class StuckupService:
             return self._error(f"google source read failed: {exc}")
         if not values:
             return self._error("source sheet is empty")
+        self._source_row_count = len(values) - 1
 
         source_headers = [str(v).strip() for v in values[0]]
         normalized_headers = self._normalize_headers(source_headers)
         allowed_statuses = {v.strip() for v in self._settings.stuckup_filter_status_values.split(",") if v.strip()}
 
-        source_records: list[dict[str, str]] = []
-        for row in values[1:]:
-            record: dict[str, str] = {}
-            for idx, normalized in enumerate(normalized_headers):
-                record[normalized] = row[idx] if idx < len(row) else ""
-            if record.get("status_desc", "") in allowed_statuses:
-                source_records.append(record)
-
-        self._write_backup(source_records)
-        data_hash = hashlib.sha256(
-            json.dumps(source_records, ensure_ascii=True, sort_keys=True).encode("utf-8")
-        ).hexdigest()
+        source_table = StuckupTable.from_rows(normalized_headers, values[1:]).filter_in(
+            "status_desc",
+            allowed_statuses,
+        )
+        del values
+        source_rows = len(source_table)
+
+        self._backup.submit(source_table)
+        data_hash = source_table.content_hash()
         _, previous_hash = self._supabase.get_data_hash()
         is_updated = previous_hash != data_hash
         sync_status = "Updated" if is_updated else "no update"
         conflict_column = self._settings.supabase_stuckup_conflict_column
 
+        computed_at = format_local_timestamp(self._settings)
         if is_updated:
+            diff = diff_tables(self._last_table, source_table, conflict_column, computed_at=computed_at)
+        else:
+            diff = StuckupDiff(computed_at, conflict_column, source_rows, source_rows, has_base=self._last_table is not None)
+        # Supabase holds exactly the previous table only if its stored hash is the one we synced last.
+        incremental = diff.is_incremental and previous_hash == self._last_data_hash
+
+        upserted_rows = 0
+        if is_updated:
+            upsert_table = source_table.filter_keys(conflict_column, diff.upsert_keys) if incremental else source_table
+            self._check_fence()
             upsert_result = self._supabase.upsert_rows(
-                rows=source_records,
+                rows=upsert_table.iter_records(),
                 conflict_column=conflict_column,
             )
             if upsert_result.status != "ok":
                 return self._error(
                     f"supabase upsert failed: {upsert_result.message}",
-                    source_rows=len(source_records),
+                    source_rows=source_rows,
                 )
+            upserted_rows = len(upsert_table)
 
         source_to_normalized = {source_headers[i]: normalized_headers[i] for i in range(len(source_headers))}
         requested_export_headers = [v.strip() for v in self._settings.stuckup_export_columns.split(",") if v.strip()]
         if not requested_export_headers:
-            return self._error("STUCKUP_EXPORT_COLUMNS is empty", source_rows=len(source_records))
+            return self._error("STUCKUP_EXPORT_COLUMNS is empty", source_rows=source_rows)
 
         selected_source_headers: list[str] = []
         selected_normalized_headers: list[str] = []
@@ -101,124 +168,436 @@ class StuckupService:
             selected_source_headers = selected_source_headers[: self._CLAIMS_RAW_MAX_EXPORT_COLUMNS]
             selected_normalized_headers = selected_normalized_headers[: self._CLAIMS_RAW_MAX_EXPORT_COLUMNS]
 
-        fetch_result, supabase_rows = self._supabase.fetch_all_rows(order_by=conflict_column)
-        if fetch_result.status != "ok":
-            return self._error(
-                f"supabase fetch failed: {fetch_result.message}",
-                source_rows=len(source_records),
-                upserted_rows=len(source_records) if is_updated else 0,
+        if not is_updated:
+            # Source data matches the stored hash, which is only saved by a sync that upserted this
+            # table, deleted every stale row and exported it to the target sheet. This service is
+            # the only writer of the table (one leader), so there are no stale rows to look for and
+            # the dashboard summary, derived from the same export, is still current (the summary
+            # job keeps refreshing it). Only the run log needs a new entry; the target is not read,
+            # so the exported row count is unknown.
+            self._check_fence()
+            try:
+                self._write_sync_log(sync_status)
+            except Exception as exc:
+                return self._error(f"google log write failed: {exc}", source_rows=source_rows)
+            self._adopt_exported_table(source_table, data_hash, computed_at)
+            self._record_synced_table(source_table, data_hash, diff)
+            return StuckupSyncResult(
+                status="ok",
+                message=f"source sheet unchanged, target sheet left as is ({sync_status})",
+                source_rows=source_rows,
+                upserted_rows=0,
+                exported_rows=None,
+                exported_columns=len(selected_source_headers),
             )
 
-        source_conflict_values = {
-            str(record.get(conflict_column, "")).strip()
-            for record in source_records
-            if str(record.get(conflict_column, "")).strip()
-        }
-        stale_conflict_values = sorted(
-            {
-                str(row.get(conflict_column, "")).strip()
-                for row in supabase_rows
-                if str(row.get(conflict_column, "")).strip()
-                and str(row.get(conflict_column, "")).strip() not in source_conflict_values
-            }
-        )
-        if stale_conflict_values:
-            delete_result = self._supabase.delete_rows_by_values(conflict_column, stale_conflict_values)
+        if incremental and not diff.touches_columns(selected_normalized_headers):
+            # Only columns outside the export changed: Supabase got the changed rows and the
+            # target sheet already shows the same exported table. The local summary reads
+            # columns that need not be exported (day, status_timestamp), so it moves to the new
+            # rows like after a full export.
+            self._check_fence()
+            try:
+                self._write_sync_log(sync_status)
+                self._exported_data_hash = data_hash
+                self._exported_at = computed_at
+                self._summary_table = source_table
+                self.refresh_dashboard_summary_only()
+            except LeaseLostError:
+                raise
+            except Exception as exc:
+                return self._error(
+                    f"google log or summary write failed: {exc}",
+                    source_rows=source_rows,
+                    upserted_rows=upserted_rows,
+                )
+            self._check_fence()
+            self._supabase.set_data_hash(data_hash)
+            self._record_synced_table(source_table, data_hash, diff)
+            return StuckupSyncResult(
+                status="ok",
+                message=f"source sheet synced to supabase, exported columns unchanged ({sync_status})",
+                source_rows=source_rows,
+                upserted_rows=upserted_rows,
+                exported_rows=None,
+                exported_columns=len(selected_source_headers),
+            )
+
+        if incremental and diff.removed:
+            # Supabase holds exactly the previous table, so the removed keys are its stale rows.
+            self._check_fence()
+            delete_result = self._supabase.delete_rows_by_values(conflict_column, diff.removed)
             if delete_result.status != "ok":
                 return self._error(
                     f"supabase cleanup failed: {delete_result.message}",
-                    source_rows=len(source_records),
-                    upserted_rows=len(source_records) if is_updated else 0,
+                    source_rows=source_rows,
+                    upserted_rows=upserted_rows,
                 )
-            # Stale rows were removed, so this run produced an effective update.
-            sync_status = "Updated"
-            fetch_result, supabase_rows = self._supabase.fetch_all_rows(order_by=conflict_column)
+
+        fetch_columns = list(dict.fromkeys([conflict_column, *selected_normalized_headers]))
+        # Narrow the select only when every column is known to exist (it came from the source sheet).
+        select_columns = fetch_columns if set(fetch_columns) <= set(normalized_headers) else None
+        # The target rows can be patched from the source table only if every exported column
+        # comes from it (otherwise Supabase may fill some) and the sheet layout is known.
+        patch = None
+        if incremental and select_columns is not None and self._exported_columns == selected_normalized_headers:
+            patch = self._plan_target_patch(diff, selected_normalized_headers)
+
+        if patch is not None:
+            exported_keys, dirty_slots = patch
+            export_values: list[list[str]] = []
+        else:
+            fetch_result, supabase_rows = self._supabase.fetch_all_rows(order_by=conflict_column, columns=select_columns)
             if fetch_result.status != "ok":
                 return self._error(
-                    f"supabase fetch failed after cleanup: {fetch_result.message}",
-                    source_rows=len(source_records),
-                    upserted_rows=len(source_records) if is_updated else 0,
+                    f"supabase fetch failed: {fetch_result.message}",
+                    source_rows=source_rows,
+                    upserted_rows=upserted_rows,
                 )
 
-        export_values: list[list[str]] = [selected_source_headers]
-        for row in supabase_rows:
-            export_values.append([str(row.get(column, "")) for column in selected_normalized_headers])
-
+            target_table = StuckupTable.from_records(supabase_rows, fetch_columns)
+            del supabase_rows
+            # An incremental run already deleted diff.removed; otherwise look for stale rows.
+            stale_conflict_values = [] if incremental else target_table.keys_not_in(conflict_column, source_table.key_set(conflict_column))
+            if stale_conflict_values:
+                self._check_fence()
+                delete_result = self._supabase.delete_rows_by_values(conflict_column, stale_conflict_values)
+                if delete_result.status != "ok":
+                    return self._error(
+                        f"supabase cleanup failed: {delete_result.message}",
+                        source_rows=source_rows,
+                        upserted_rows=upserted_rows,
+                    )
+                # Stale rows were removed, so this run produced an effective update.
+                sync_status = "Updated"
+                fetch_result, supabase_rows = self._supabase.fetch_all_rows(
+                    order_by=conflict_column,
+                    columns=select_columns,
+                )
+                if fetch_result.status != "ok":
+                    return self._error(
+                        f"supabase fetch failed after cleanup: {fetch_result.message}",
+                        source_rows=source_rows,
+                        upserted_rows=upserted_rows,
+                    )
+                target_table = StuckupTable.from_records(supabase_rows, fetch_columns)
+                del supabase_rows
+
+            export_values = [selected_source_headers, *target_table.project(selected_normalized_headers)]
+            exported_keys = [key.strip() for key in target_table.column(conflict_column)]
+
+        self._check_fence()
         try:
             # 1) Write sync log in columns A:B, latest at row 2
-            existing_log_rows = self._google_sheets.read_values(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_log_worksheet_name,
-                cell_range="A2:B1000",
-            )
-            timestamp = format_local_timestamp(self._settings)
-            new_log_rows = [[timestamp, sync_status]] + existing_log_rows
-
-            self._google_sheets.clear_range(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_log_worksheet_name,
-                cell_range="A:B",
-            )
-            self._google_sheets.update_values(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_log_worksheet_name,
-                start_cell="A1",
-                values=[["run_time", "status"]] + new_log_rows,
-            )
+            self._write_sync_log(sync_status)
+
+            # 2) Write data table in columns A onward: patch the changed rows, or rewrite it all.
+            # The layout is unknown until the write has gone through.
+            previous_rows = len(self._exported_keys or [])
+            self._exported_keys = None
+            if patch is not None:
+                self._patch_target(
+                    source_table,
+                    exported_keys,
+                    dirty_slots,
+                    selected_normalized_headers,
+                    previous_rows=previous_rows,
+                    target_is_claims_raw=target_is_claims_raw,
+                )
+            else:
+                self._rewrite_target(export_values, target_is_claims_raw)
+            self._exported_keys = exported_keys
+            self._exported_columns = selected_normalized_headers
 
-            # 2) Write data table in columns A onward
-            self._google_sheets.clear_range(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_target_worksheet_name,
-                cell_range="A:Q" if target_is_claims_raw else "A:ZZ",
-            )
-            required_rows = max(len(export_values), 1)
-            required_columns = max(len(export_values[0]) if export_values else 1, 1)
-            self._google_sheets.ensure_grid_size(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_target_worksheet_name,
-                min_rows=required_rows,
-                min_columns=required_columns,
-            )
-            write_response = self._google_sheets.update_values(
-                spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
-                worksheet_name=self._settings.stuckup_target_worksheet_name,
-                start_cell="A1",
-                values=export_values,
-            )
-            logger.info(
-                "stuckup google write response: updatedRows=%s updatedColumns=%s updatedCells=%s requestedRows=%s requestedColumns=%s",
-                write_response.get("updatedRows"),
-                write_response.get("updatedColumns"),
-                write_response.get("updatedCells"),
-                required_rows,
-                required_columns,
-            )
+            self._exported_data_hash = data_hash
+            self._exported_at = computed_at
+            self._summary_table = source_table
 
             # 3) Refresh dashboard summary paragraph.
             self.refresh_dashboard_summary_only()
+        except LeaseLostError:
+            raise
         except Exception as exc:
             return self._error(
                 f"google target write failed: {exc}",
-                source_rows=len(source_records),
-                upserted_rows=len(source_records) if is_updated else 0,
+                source_rows=source_rows,
+                upserted_rows=upserted_rows,
             )
 
+        self._check_fence()
         self._supabase.set_data_hash(data_hash)
+        self._record_synced_table(source_table, data_hash, diff)
 
+        if patch is not None:
+            message = f"source sheet synced to supabase, {len(dirty_slots)} target row(s) patched in place ({sync_status})"
+        else:
+            message = f"source sheet synced to supabase and exported to target sheet ({sync_status})"
         return StuckupSyncResult(
             status="ok",
-            message=f"source sheet synced to supabase and exported to target sheet ({sync_status})",
-            source_rows=len(source_records),
-            upserted_rows=len(source_records) if is_updated else 0,
-            exported_rows=max(len(export_values) - 1, 0),
+            message=message,
+            source_rows=source_rows,
+            upserted_rows=upserted_rows,
+            exported_rows=len(exported_keys),
             exported_columns=len(selected_source_headers),
         )
 
-    def refresh_dashboard_summary_only(self) -> None:
-        dashboard_values = self._read_dashboard_block_stable()
-        summary_lines = self._build_dashboard_summary_from_block(dashboard_values)
-        summary_paragraph = self._format_summary_paragraph(summary_lines)
+    def plan_sync(self) -> SyncPlan:
+        # Dry run: the same code path as sync_source_sheet_to_supabase on a shallow copy whose
+        # clients perform the reads and record every write, clear, resize, upsert and delete.
+        # This service's state (diff base, hashes, summary inputs) is left untouched.
+        plan = SyncPlan()
+        planner = copy.copy(self)
+        planner._google_sheets = PlanningSheetsClient(self._google_sheets, plan)
+        planner._supabase = PlanningSupabaseSink(self._supabase, plan, table=self._settings.supabase_stuckup_table)
+        planner._backup = PlanningBackupWriter()
+        planner._diff_history = deque(self._diff_history, maxlen=self._DIFF_HISTORY_SIZE)
+        planner._summary_refreshes = dict(self._summary_refreshes)
+        planner._shipments = None
+        planner._fence_provider = None
+        plan.result = planner.sync_source_sheet_to_supabase()
+        return plan
+
+    @property
+    def source_row_count(self) -> int | None:
+        return self._source_row_count
+
+    @property
+    def exported_data_hash(self) -> str | None:
+        return self._exported_data_hash
+
+    @property
+    def last_diff(self) -> StuckupDiff | None:
+        return self._diff_history[-1] if self._diff_history else None
+
+    def diff_history(self) -> list[StuckupDiff]:
+        return list(self._diff_history)
+
+    @property
+    def shipments(self) -> ShipmentIndex | None:
+        return self._shipments
+
+    def close(self) -> None:
+        self._backup.close()
+
+    @contextmanager
+    def _fenced(self) -> Iterator[None]:
+        # Takes the fence for a run; nested calls (the summary refresh inside a sync) reuse it.
+        if self._fence_provider is None or self._fence is not None:
+            yield
+            return
+        fence = self._fence_provider()
+        if fence is None:
+            raise LeaseLostError("not the elected leader")
+        self._fence = fence
+        try:
+            yield
+        finally:
+            self._fence = None
+
+    def _check_fence(self) -> None:
+        # Called right before every write to Supabase or the target spreadsheet.
+        if self._fence is not None:
+            self._fence.check()
+
+    def _adopt_exported_table(self, table: StuckupTable, data_hash: str, exported_at: str) -> None:
+        # Fast paths leave the target sheet as is. The first one after a restart still has to
+        # record what it shows, or the local summary and the report image stay unavailable.
+        if self._exported_data_hash is None:
+            self._exported_data_hash = data_hash
+            self._exported_at = exported_at
+            self._summary_table = table
+
+    def _record_synced_table(self, table: StuckupTable, data_hash: str, diff: StuckupDiff) -> None:
+        self._last_table = table
+        self._last_data_hash = data_hash
+        self._diff_history.append(diff)
+        if self._shipments is not None:
+            self._shipments.apply(table, diff)
+
+    def _plan_target_patch(self, diff: StuckupDiff, columns: list[str]) -> tuple[list[str], list[int]] | None:
+        # New target layout (key per data row) and the rows to rewrite. Added rows fill the
+        # slots of removed ones, then go at the end; leftover slots are filled by moving rows up
+        # from the end, so the sheet stays compact without shifting every row below a removal.
+        # None when the last export's layout doesn't match the diff (rewrite it all instead).
+        previous = self._exported_keys
+        if previous is None:
+            return None
+        positions = {key: slot for slot, key in enumerate(previous)}
+        if len(positions) != len(previous):
+            return None
+        keys: list[str | None] = list(previous)
+        holes: list[int] = []
+        for key in diff.removed:
+            slot = positions.get(key)
+            if slot is None:
+                return None
+            keys[slot] = None
+            holes.append(slot)
+        holes.sort(reverse=True)
+        dirty: set[int] = set()
+        for key in diff.added:
+            if key in positions:
+                return None
+            slot = holes.pop() if holes else len(keys)
+            if slot == len(keys):
+                keys.append(key)
+            else:
+                keys[slot] = key
+            dirty.add(slot)
+        while holes:
+            while keys and keys[-1] is None:
+                keys.pop()
+            slot = holes.pop()
+            if slot >= len(keys):
+                break
+            keys[slot] = keys.pop()
+            dirty.add(slot)
+        while keys and keys[-1] is None:
+            keys.pop()
+        wanted = set(columns)
+        for key, names in diff.changed.items():
+            slot = positions.get(key)
+            if slot is None:
+                return None
+            if wanted.intersection(names):
+                dirty.add(slot)
+        dirty = {slot for slot in dirty if slot < len(keys)}
+        return [key for key in keys if key is not None], sorted(dirty)
+
+    def _patch_target(
+        self,
+        table: StuckupTable,
+        keys: list[str],
+        dirty_slots: list[int],
+        columns: list[str],
+        *,
+        previous_rows: int,
+        target_is_claims_raw: bool,
+    ) -> None:
+        spreadsheet_id = self._settings.stuckup_target_spreadsheet_id
+        worksheet_name = self._settings.stuckup_target_worksheet_name
+        conflict_column = self._settings.supabase_stuckup_conflict_column
+        changed = table.filter_keys(conflict_column, {keys[slot] for slot in dirty_slots})
+        rows = dict(zip((key.strip() for key in changed.column(conflict_column)), changed.project(columns)))
+
+        # Consecutive rows go out as one range; all ranges in one batch request.
+        blocks: list[tuple[str, list[list[str]]]] = []
+        run_start = None
+        run: list[list[str]] = []
+        for slot in dirty_slots:
+            if run_start is not None and slot != run_start + len(run):
+                blocks.append((f"A{run_start + 2}", run))
+                run_start, run = None, []
+            if run_start is None:
+                run_start = slot
+            run.append(rows[keys[slot]])
+        if run_start is not None:
+            blocks.append((f"A{run_start + 2}", run))
+
+        if len(keys) > previous_rows:
+            self._google_sheets.ensure_grid_size(
+                spreadsheet_id=spreadsheet_id,
+                worksheet_name=worksheet_name,
+                min_rows=len(keys) + 1,
+                min_columns=max(len(columns), 1),
+            )
+        if blocks:
+            self._google_sheets.batch_update_values(
+                spreadsheet_id=spreadsheet_id,
+                worksheet_name=worksheet_name,
+                blocks=blocks,
+            )
+        if len(keys) < previous_rows:
+            last_column = "Q" if target_is_claims_raw else "ZZ"
+            self._google_sheets.clear_range(
+                spreadsheet_id=spreadsheet_id,
+                worksheet_name=worksheet_name,
+                cell_range=f"A{len(keys) + 2}:{last_column}{previous_rows + 1}",
+            )
+        logger.info(
+            "stuckup target patched: rows=%s ranges=%s previousRows=%s currentRows=%s",
+            len(dirty_slots),
+            len(blocks),
+            previous_rows,
+            len(keys),
+        )
+
+    def _rewrite_target(self, export_values: list[list[str]], target_is_claims_raw: bool) -> None:
+        self._google_sheets.clear_range(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_target_worksheet_name,
+            cell_range="A:Q" if target_is_claims_raw else "A:ZZ",
+        )
+        required_rows = max(len(export_values), 1)
+        required_columns = max(len(export_values[0]) if export_values else 1, 1)
+        self._google_sheets.ensure_grid_size(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_target_worksheet_name,
+            min_rows=required_rows,
+            min_columns=required_columns,
+        )
+        write_response = self._google_sheets.update_values(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_target_worksheet_name,
+            start_cell="A1",
+            values=export_values,
+        )
+        logger.info(
+            "stuckup google write response: updatedRows=%s updatedColumns=%s updatedCells=%s requestedRows=%s requestedColumns=%s",
+            write_response.get("updatedRows"),
+            write_response.get("updatedColumns"),
+            write_response.get("updatedCells"),
+            required_rows,
+            required_columns,
+        )
+
+    def _write_sync_log(self, sync_status: str) -> None:
+        existing_log_rows = self._google_sheets.read_values(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_log_worksheet_name,
+            cell_range="A2:B1000",
+        )
+        timestamp = format_local_timestamp(self._settings)
+        new_log_rows = [[timestamp, sync_status]] + existing_log_rows
+
+        # The rewritten log is always one row longer than what was read, so it fully
+        # covers the previous entries and no separate clear is needed.
+        self._google_sheets.update_values(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name=self._settings.stuckup_log_worksheet_name,
+            start_cell="A1",
+            values=[["run_time", "status"]] + new_log_rows,
+        )
+
+    def refresh_dashboard_summary_only(self) -> bool:
+        # Returns False when neither the exported data nor (for the sheet-based path) the
+        # dashboard block changed since the last refresh.
+        with self._fenced():
+            return self._refresh_dashboard_summary()
+
+    def _refresh_dashboard_summary(self) -> bool:
+        source = self._settings.stuckup_summary_source.strip().lower()
+        table = self._summary_table
+        if source == "local" and table is not None:
+            inputs = (self._exported_data_hash, "local")
+            if self._summary_inputs == inputs:
+                self._summary_refreshes["skipped"] += 1
+                return False
+            lines = summary_lines(self._summarize_exported_table(table), format_local_timestamp(self._settings))
+        else:
+            # Sheet-based path: "sheet" mode, "validate" mode, or no exported rows in memory yet.
+            first_read = self._read_dashboard_block()
+            if self._summary_inputs == (self._exported_data_hash, self._fingerprint_block(first_read)):
+                self._summary_refreshes["skipped"] += 1
+                return False
+            dashboard_values = self._read_dashboard_block_stable(first_read)
+            inputs = (self._exported_data_hash, self._fingerprint_block(dashboard_values))
+            lines = self._build_dashboard_summary_from_block(dashboard_values)
+            if source == "validate" and table is not None and dashboard_values:
+                self._validate_summary(table, dashboard_values)
+
+        summary_paragraph = self._format_summary_paragraph(lines)
+        self._check_fence()
         self._google_sheets.ensure_grid_size(
             spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
             worksheet_name="dashboard_summary",
@@ -236,6 +615,38 @@ class StuckupService:
             start_cell=self._DASHBOARD_SUMMARY_START_CELL,
             values=[[summary_paragraph]],
         )
+        self._summary_inputs = inputs
+        self._summary_refreshes["executed"] += 1
+        return True
+
+    def render_report_image(self) -> tuple[bytes, str] | None:
+        # PNG of the dashboard for the last exported rows, or None before the first export.
+        # "As of" is the export time, so re-rendering the same export is a cache hit.
+        table = self._summary_table
+        if table is None or self._exported_at is None:
+            return None
+        return self._report_renderer.render(
+            self._summarize_exported_table(table),
+            title=self._settings.stuckup_report_title,
+            as_of=self._exported_at,
+        )
+
+    def report_image_counts(self) -> dict[str, int]:
+        return {"renders": self._report_renderer.renders, "cache_hits": self._report_renderer.cache_hits}
+
+    def summary_refresh_counts(self) -> dict[str, int]:
+        return dict(self._summary_refreshes)
+
+    @property
+    def summary_validation(self) -> dict[str, object] | None:
+        return self._summary_validation
+
+    def _validate_summary(self, table: StuckupTable, dashboard_values: list[list[str]]) -> None:
+        mismatches = compare_summaries(self._summarize_exported_table(table), summary_from_block(dashboard_values))
+        self._summary_validation = {"checked_at": format_local_timestamp(self._settings), "mismatches": mismatches}
+        if mismatches:
+            self._summary_refreshes["validation_mismatches"] += 1
+            logger.warning("local dashboard summary differs from sheet: %s", "; ".join(mismatches))
 
     @staticmethod
     def _normalize_headers(headers: list[str]) -> list[str]:
@@ -265,97 +676,11 @@ class StuckupService:
                 f"As of {timestamp}, the dashboard block at B10:AB43 is empty, so no trend can be computed.",
                 "Action Taken: Performed a data refresh check and queued the next sync to repopulate dashboard metrics.",
             ]
+        return summary_lines(summary_from_block(values), timestamp)
 
-        region_header_idx = -1
-        region_col_idx = -1
-        for idx, row in enumerate(values):
-            for col_idx, cell in enumerate(row):
-                if str(cell).strip().lower() == "region":
-                    region_header_idx = idx
-                    region_col_idx = col_idx
-                    break
-            if region_header_idx >= 0:
-                break
-
-        if region_col_idx < 0:
-            region_col_idx = 1
-
-        ave_col_idx = region_col_idx + 1
-        total_col_idx = region_col_idx + 2
-        latest_col_idx = region_col_idx + 3
-        prev_col_idx = region_col_idx + 4
-        cluster_marker_col_idx = region_col_idx + 13
-        cluster_name_col_idx = region_col_idx + 14
-        hub_name_col_idx = region_col_idx + 15
-        pct_col_idx = region_col_idx + 18
-
-        region_totals: list[tuple[str, int]] = []
-        total_row: list[str] | None = None
-        header_row: list[str] = values[region_header_idx] if region_header_idx >= 0 else []
-
-        if region_header_idx >= 0:
-            for row in values[region_header_idx + 1 :]:
-                name = self._cell(row, region_col_idx)
-                if not name:
-                    continue
-                if name.lower() == "total":
-                    total_row = row
-                    break
-                total_l7d = self._to_int(self._cell(row, total_col_idx))
-                if total_l7d is not None:
-                    region_totals.append((name, total_l7d))
-
-        ave_l7d = self._to_int(self._cell(total_row or [], ave_col_idx))
-        total_l7d = self._to_int(self._cell(total_row or [], total_col_idx))
-        latest_label = self._cell(header_row, latest_col_idx) or "latest day"
-        latest_count = self._to_int(self._cell(total_row or [], latest_col_idx))
-        prev_label = self._cell(header_row, prev_col_idx) or "previous day"
-        prev_count = self._to_int(self._cell(total_row or [], prev_col_idx))
-
-        top_regions = sorted(region_totals, key=lambda item: item[1], reverse=True)[:3]
-        top_regions_text = ", ".join(f"{name} ({count})" for name, count in top_regions) if top_regions else "n/a"
-
-        clusters: list[tuple[str, float]] = []
-        hubs: list[tuple[str, float]] = []
-        seen_hubs: set[str] = set()
-        for row in values:
-            if self._cell(row, cluster_marker_col_idx) == "*":
-                cluster_name = self._cell(row, cluster_name_col_idx)
-                cluster_pct = self._to_percent(self._cell(row, pct_col_idx))
-                if cluster_name and cluster_pct is not None:
-                    clusters.append((cluster_name, cluster_pct))
-
-            hub_name = self._cell(row, hub_name_col_idx)
-            hub_pct = self._to_percent(self._cell(row, pct_col_idx))
-            if hub_name and hub_pct is not None and hub_name.lower() != "top dc/hubs affected:":
-                if hub_name not in seen_hubs:
-                    hubs.append((hub_name, hub_pct))
-                    seen_hubs.add(hub_name)
-
-        clusters.sort(key=lambda item: item[1], reverse=True)
-        hubs.sort(key=lambda item: item[1], reverse=True)
-        top_clusters_text = ", ".join(f"{name} ({pct:.2f}%)" for name, pct in clusters[:3]) if clusters else "n/a"
-        top_hubs_text = ", ".join(f"{name} ({pct:.2f}%)" for name, pct in hubs[:3]) if hubs else "n/a"
-
-        lead_cluster = clusters[0][0] if clusters else "the highest-impact cluster"
-        lead_hubs = [name for name, _ in hubs[:2]]
-        lead_hub_text = " and ".join(lead_hubs) if lead_hubs else "priority destination hubs"
-
-        sentence_1 = (
-            f"As of {timestamp}, SOC_Staging recorded {latest_count if latest_count is not None else 'n/a'} stuck orders on "
-            f"{latest_label}, compared with {prev_count if prev_count is not None else 'n/a'} on {prev_label}, with "
-            f"a 7-day total of {total_l7d if total_l7d is not None else 'n/a'} and an average of "
-            f"{ave_l7d if ave_l7d is not None else 'n/a'}."
-        )
-        sentence_2 = f"Top Contributing Regions by Total L7D are {top_regions_text}."
-        sentence_3 = (
-            f"The most affected clusters and hubs are {top_clusters_text}; TOP hubs include {top_hubs_text}."
-        )
-        sentence_4 = (
-            f"Action Taken: Prioritized the dispatch for {lead_cluster} since these hubs is 1-day dispatch only "
-            f"({lead_hub_text}) to reduce ageing backlog before the next validation run."
-        )
-        return [sentence_1, sentence_2, sentence_3, sentence_4]
+    def _summarize_exported_table(self, table: StuckupTable) -> DashboardSummary:
+        status_values = {v.strip() for v in self._settings.stuckup_summary_status_values.split(",") if v.strip()}
+        return summarize_table(table, today=now_local(self._settings).date(), status_values=status_values or None)
 
     @staticmethod
     def _format_summary_paragraph(lines: list[str]) -> str:
@@ -379,36 +704,20 @@ class StuckupService:
             return f"{body}\n\n  {action_line}"
         return f"  {action_line}"
 
-    @staticmethod
-    def _cell(row: list[str], idx: int) -> str:
-        return row[idx].strip() if idx < len(row) and row[idx] is not None else ""
-
-    @staticmethod
-    def _to_int(value: str) -> int | None:
-        cleaned = value.replace(",", "").strip()
-        if not cleaned:
-            return None
-        try:
-            return int(float(cleaned))
-        except ValueError:
-            return None
-
-    @staticmethod
-    def _to_percent(value: str) -> float | None:
-        cleaned = value.replace("%", "").strip()
-        if not cleaned:
-            return None
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
+    def _read_dashboard_block(self) -> list[list[str]]:
+        return self._google_sheets.read_values(
+            spreadsheet_id=self._settings.stuckup_target_spreadsheet_id,
+            worksheet_name="dashboard_summary",
+            cell_range=self._DASHBOARD_BLOCK_RANGE,
+        )
 
-    def _read_dashboard_block_stable(self) -> list[list[str]]:
+    def _read_dashboard_block_stable(self, first_read: list[list[str]] | None = None) -> list[list[str]]:
         return self._read_sheet_block_stable(
             worksheet_name="dashboard_summary",
-            cell_range="B10:AB43",
+            cell_range=self._DASHBOARD_BLOCK_RANGE,
             retries=4,
             wait_seconds=2.0,
+            first_read=first_read,
         )
 
     def _read_sheet_block_stable(
@@ -418,13 +727,17 @@ class StuckupService:
         cell_range: str,
         retries: int,
         wait_seconds: float,
+        first_read: list[list[str]] | None = None,
     ) -> list[list[str]]:
         spreadsheet_id = self._settings.stuckup_target_spreadsheet_id
-        current = self._google_sheets.read_values(
-            spreadsheet_id=spreadsheet_id,
-            worksheet_name=worksheet_name,
-            cell_range=cell_range,
-        )
+        if first_read is not None:
+            current = first_read
+        else:
+            current = self._google_sheets.read_values(
+                spreadsheet_id=spreadsheet_id,
+                worksheet_name=worksheet_name,
+                cell_range=cell_range,
+            )
         current_fingerprint = self._fingerprint_block(current)
 
         # Formula-driven dashboards can lag a few seconds after raw table updates.
@@ -448,11 +761,6 @@ class StuckupService:
     def _fingerprint_block(values: list[list[str]]) -> str:
         return hashlib.sha256(json.dumps(values, ensure_ascii=True, sort_keys=False).encode("utf-8")).hexdigest()
 
-    def _write_backup(self, rows: list[dict[str, str]]) -> None:
-        with self._backup_path.open("w", encoding="utf-8") as f:
-            for row in rows:
-                f.write(json.dumps(row, ensure_ascii=True) + "\n")
-
     @staticmethod
     def _error(
         message: str,
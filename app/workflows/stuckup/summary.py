@@ -0,0 +1,267 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from app.workflows.stuckup.table import StuckupTable
+
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%d-%b-%Y",
+    "%d %b %Y",
+)
+_YEARLESS_FORMATS = ("%d-%b", "%d %b", "%b %d")
+
+
+@dataclass
+class DashboardSummary:
+    latest_label: str = "latest day"
+    latest_count: int | None = None
+    prev_label: str = "previous day"
+    prev_count: int | None = None
+    total_l7d: int | None = None
+    ave_l7d: int | None = None
+    # Sorted by value, highest first.
+    region_totals: list[tuple[str, int]] = field(default_factory=list)
+    clusters: list[tuple[str, float]] = field(default_factory=list)
+    hubs: list[tuple[str, float]] = field(default_factory=list)
+    # (day label, count) per day of the L7D window, oldest first; only known for local summaries.
+    daily_counts: list[tuple[str, int]] = field(default_factory=list)
+
+
+def parse_day(value: str, today: date) -> date | None:
+    text = value.strip()
+    if not text:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    for fmt in _YEARLESS_FORMATS:
+        try:
+            parsed = datetime.strptime(f"{text} {today.year}", f"{fmt} %Y").date()
+        except ValueError:
+            continue
+        # "31-Dec" seen on 2 Jan belongs to the previous year.
+        return parsed if parsed <= today else parsed.replace(year=today.year - 1)
+    return None
+
+
+def day_label(day: date) -> str:
+    return f"{day.day}-{day:%b}"
+
+
+def summarize_table(
+    table: StuckupTable,
+    *,
+    today: date,
+    status_values: set[str] | None = None,
+    days: int = 7,
+) -> DashboardSummary:
+    # Mirrors the dashboard_summary formulas from the exported rows: one row is one stuck
+    # shipment, dated by "day" (falling back to status_timestamp).
+    window_start = today - timedelta(days=days - 1)
+    statuses = table.column("status_desc")
+    day_values = table.column("day")
+    timestamps = table.column("status_timestamp")
+    regions = table.column("hub_region")
+    clusters = table.column("cluster_name")
+    hubs = table.column("hub_dest_station_name")
+
+    per_day: Counter[date] = Counter()
+    per_region: Counter[str] = Counter()
+    per_cluster: Counter[str] = Counter()
+    per_hub: Counter[str] = Counter()
+    parsed: dict[str, date | None] = {}
+
+    def _day(value: str) -> date | None:
+        # Pooled column values repeat a lot, so each distinct string is parsed once.
+        if value not in parsed:
+            parsed[value] = parse_day(value, today)
+        return parsed[value]
+
+    for idx in range(len(table)):
+        if status_values and statuses[idx].strip() not in status_values:
+            continue
+        day = _day(day_values[idx]) or _day(timestamps[idx])
+        if day is None or not window_start <= day <= today:
+            continue
+        per_day[day] += 1
+        per_region[regions[idx].strip() or "No Region"] += 1
+        per_cluster[clusters[idx].strip() or "No Cluster"] += 1
+        per_hub[hubs[idx].strip() or "No Hub"] += 1
+
+    total = sum(per_day.values())
+    active_days = len(per_day)
+    previous_day = today - timedelta(days=1)
+    return DashboardSummary(
+        latest_label=day_label(today),
+        latest_count=per_day.get(today, 0),
+        prev_label=day_label(previous_day),
+        prev_count=per_day.get(previous_day, 0),
+        total_l7d=total,
+        # Average over the days that have rows, like AVERAGE over the non-empty day cells.
+        ave_l7d=int(total / active_days + 0.5) if active_days else 0,
+        region_totals=_ranked(per_region),
+        clusters=_shares(per_cluster, total),
+        hubs=_shares(per_hub, total),
+        daily_counts=[(day_label(day), per_day.get(day, 0)) for day in (window_start + timedelta(days=n) for n in range(days))],
+    )
+
+
+def summary_from_block(values: list[list[str]]) -> DashboardSummary:
+    # Parses the formula-driven dashboard_summary!B10:AB43 block. Columns are located
+    # relative to the "Region" header cell because the block shifts between sheet versions.
+    region_header_idx = -1
+    region_col_idx = -1
+    for idx, row in enumerate(values):
+        for col_idx, cell in enumerate(row):
+            if str(cell).strip().lower() == "region":
+                region_header_idx = idx
+                region_col_idx = col_idx
+                break
+        if region_header_idx >= 0:
+            break
+
+    if region_col_idx < 0:
+        region_col_idx = 1
+
+    ave_col_idx = region_col_idx + 1
+    total_col_idx = region_col_idx + 2
+    latest_col_idx = region_col_idx + 3
+    prev_col_idx = region_col_idx + 4
+    cluster_marker_col_idx = region_col_idx + 13
+    cluster_name_col_idx = region_col_idx + 14
+    hub_name_col_idx = region_col_idx + 15
+    pct_col_idx = region_col_idx + 18
+
+    region_totals: list[tuple[str, int]] = []
+    total_row: list[str] | None = None
+    header_row: list[str] = values[region_header_idx] if region_header_idx >= 0 else []
+
+    if region_header_idx >= 0:
+        for row in values[region_header_idx + 1 :]:
+            name = _cell(row, region_col_idx)
+            if not name:
+                continue
+            if name.lower() == "total":
+                total_row = row
+                break
+            total_l7d = _to_int(_cell(row, total_col_idx))
+            if total_l7d is not None:
+                region_totals.append((name, total_l7d))
+
+    clusters: list[tuple[str, float]] = []
+    hubs: list[tuple[str, float]] = []
+    seen_hubs: set[str] = set()
+    for row in values:
+        if _cell(row, cluster_marker_col_idx) == "*":
+            cluster_name = _cell(row, cluster_name_col_idx)
+            cluster_pct = _to_percent(_cell(row, pct_col_idx))
+            if cluster_name and cluster_pct is not None:
+                clusters.append((cluster_name, cluster_pct))
+
+        hub_name = _cell(row, hub_name_col_idx)
+        hub_pct = _to_percent(_cell(row, pct_col_idx))
+        if hub_name and hub_pct is not None and hub_name.lower() != "top dc/hubs affected:":
+            if hub_name not in seen_hubs:
+                hubs.append((hub_name, hub_pct))
+                seen_hubs.add(hub_name)
+
+    return DashboardSummary(
+        latest_label=_cell(header_row, latest_col_idx) or "latest day",
+        latest_count=_to_int(_cell(total_row or [], latest_col_idx)),
+        prev_label=_cell(header_row, prev_col_idx) or "previous day",
+        prev_count=_to_int(_cell(total_row or [], prev_col_idx)),
+        total_l7d=_to_int(_cell(total_row or [], total_col_idx)),
+        ave_l7d=_to_int(_cell(total_row or [], ave_col_idx)),
+        region_totals=sorted(region_totals, key=lambda item: item[1], reverse=True),
+        clusters=sorted(clusters, key=lambda item: item[1], reverse=True),
+        hubs=sorted(hubs, key=lambda item: item[1], reverse=True),
+    )
+
+
+def summary_lines(summary: DashboardSummary, timestamp: str) -> list[str]:
+    top_regions = summary.region_totals[:3]
+    top_regions_text = ", ".join(f"{name} ({count})" for name, count in top_regions) if top_regions else "n/a"
+    clusters = summary.clusters
+    hubs = summary.hubs
+    top_clusters_text = ", ".join(f"{name} ({pct:.2f}%)" for name, pct in clusters[:3]) if clusters else "n/a"
+    top_hubs_text = ", ".join(f"{name} ({pct:.2f}%)" for name, pct in hubs[:3]) if hubs else "n/a"
+
+    lead_cluster = clusters[0][0] if clusters else "the highest-impact cluster"
+    lead_hubs = [name for name, _ in hubs[:2]]
+    lead_hub_text = " and ".join(lead_hubs) if lead_hubs else "priority destination hubs"
+
+    sentence_1 = (
+        f"As of {timestamp}, SOC_Staging recorded {_or_na(summary.latest_count)} stuck orders on "
+        f"{summary.latest_label}, compared with {_or_na(summary.prev_count)} on {summary.prev_label}, with "
+        f"a 7-day total of {_or_na(summary.total_l7d)} and an average of {_or_na(summary.ave_l7d)}."
+    )
+    sentence_2 = f"Top Contributing Regions by Total L7D are {top_regions_text}."
+    sentence_3 = f"The most affected clusters and hubs are {top_clusters_text}; TOP hubs include {top_hubs_text}."
+    sentence_4 = (
+        f"Action Taken: Prioritized the dispatch for {lead_cluster} since these hubs is 1-day dispatch only "
+        f"({lead_hub_text}) to reduce ageing backlog before the next validation run."
+    )
+    return [sentence_1, sentence_2, sentence_3, sentence_4]
+
+
+def compare_summaries(local: DashboardSummary, sheet: DashboardSummary, *, top_n: int = 3) -> list[str]:
+    # Differences worth reporting when validating the local engine against the sheet.
+    mismatches: list[str] = []
+    for name in ("latest_count", "prev_count", "total_l7d", "ave_l7d"):
+        local_value, sheet_value = getattr(local, name), getattr(sheet, name)
+        if local_value != sheet_value:
+            mismatches.append(f"{name}: local={local_value} sheet={sheet_value}")
+    if dict(local.region_totals) != dict(sheet.region_totals):
+        mismatches.append(f"region_totals: local={dict(local.region_totals)} sheet={dict(sheet.region_totals)}")
+    for name in ("clusters", "hubs"):
+        local_top = [item for item, _ in getattr(local, name)[:top_n]]
+        sheet_top = [item for item, _ in getattr(sheet, name)[:top_n]]
+        if local_top != sheet_top:
+            mismatches.append(f"top {name}: local={local_top} sheet={sheet_top}")
+    return mismatches
+
+
+def _ranked(counts: Counter[str]) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _shares(counts: Counter[str], total: int) -> list[tuple[str, float]]:
+    if not total:
+        return []
+    return [(name, round(count * 100.0 / total, 2)) for name, count in _ranked(counts)]
+
+
+def _or_na(value: int | None) -> str | int:
+    return value if value is not None else "n/a"
+
+
+def _cell(row: list[str], idx: int) -> str:
+    return row[idx].strip() if idx < len(row) and row[idx] is not None else ""
+
+
+def _to_int(value: str) -> int | None:
+    cleaned = value.replace(",", "").strip()
+    if not cleaned:
+        return None
+    try:
+        return int(float(cleaned))
+    except ValueError:
+        return None
+
+
+def _to_percent(value: str) -> float | None:
+    cleaned = value.replace("%", "").strip()
+    if not cleaned:
+        return None
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
@@ -0,0 +1,96 @@
+import hashlib
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+
+class StuckupTable:
+    # Column-oriented row store: one list per column instead of one dict per row.
+    # Repeated cell values (statuses, regions, hubs, operators) share a single string
+    # object through a per-table pool, which is released together with the table.
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns: dict[str, list[str]], length: int) -> None:
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_rows(cls, headers: list[str], rows: Iterable[list[Any]]) -> "StuckupTable":
+        pool: dict[str, str] = {}
+        columns: list[list[str]] = [[] for _ in headers]
+        width = len(headers)
+        length = 0
+        for row in rows:
+            row_width = len(row)
+            for idx in range(width):
+                value = str(row[idx]) if idx < row_width else ""
+                columns[idx].append(pool.setdefault(value, value))
+            length += 1
+        return cls(dict(zip(headers, columns)), length)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]], columns: list[str]) -> "StuckupTable":
+        pool: dict[str, str] = {}
+        data: dict[str, list[str]] = {name: [] for name in columns}
+        length = 0
+        for record in records:
+            for name, values in data.items():
+                raw = record.get(name)
+                value = "" if raw is None else str(raw)
+                values.append(pool.setdefault(value, value))
+            length += 1
+        return cls(data, length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> list[str]:
+        values = self._columns.get(name)
+        if values is None:
+            return [""] * self._length
+        return values
+
+    def filter_in(self, column: str, allowed: set[str]) -> "StuckupTable":
+        return self.take([idx for idx, value in enumerate(self.column(column)) if value in allowed])
+
+    def filter_keys(self, column: str, keys: set[str]) -> "StuckupTable":
+        return self.take([idx for idx, value in enumerate(self.column(column)) if value.strip() in keys])
+
+    def take(self, indices: list[int]) -> "StuckupTable":
+        if len(indices) == self._length:
+            return self
+        return StuckupTable(
+            {name: [values[idx] for idx in indices] for name, values in self._columns.items()},
+            len(indices),
+        )
+
+    def project(self, columns: list[str]) -> list[list[str]]:
+        if not self._length:
+            return []
+        return [list(row) for row in zip(*(self.column(name) for name in columns))]
+
+    def key_set(self, column: str) -> set[str]:
+        return {key for key in (value.strip() for value in self.column(column)) if key}
+
+    def keys_not_in(self, column: str, other_keys: set[str]) -> list[str]:
+        return sorted(self.key_set(column) - other_keys)
+
+    def iter_records(self) -> Iterator[dict[str, str]]:
+        names = list(self._columns)
+        for values in zip(*self._columns.values()):
+            yield dict(zip(names, values))
+
+    def content_hash(self) -> str:
+        # Same digest as hashing json.dumps(list_of_records, sort_keys=True), streamed per row.
+        digest = hashlib.sha256(b"[")
+        for idx, record in enumerate(self.iter_records()):
+            if idx:
+                digest.update(b", ")
+            digest.update(json.dumps(record, ensure_ascii=True, sort_keys=True).encode("utf-8"))
+        digest.update(b"]")
+        return digest.hexdigest()
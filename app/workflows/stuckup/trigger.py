@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from pydantic import BaseModel, ConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class StuckupTriggerRequest(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    source: str = "unknown"
+    pipeline: str | None = None
+    sheet: str | None = None
+    range: str | None = None
+
+
+@dataclass
+class TriggerDecision:
+    # "queued" (starts a new debounce window), "coalesced" (joins the pending run)
+    # or "rate_limited" (dropped; retry after retry_after_seconds).
+    status: str
+    retry_after_seconds: float = 0.0
+
+
+def compute_trigger_signature(secret: str, timestamp: str, body: bytes) -> str:
+    message = timestamp.encode("utf-8") + b"." + body
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def is_valid_trigger_signature(
+    secret: str,
+    timestamp: str | None,
+    body: bytes,
+    signature: str | None,
+    *,
+    max_skew_seconds: float,
+    now: float | None = None,
+) -> bool:
+    if not secret or not timestamp or not signature:
+        return False
+    try:
+        sent_at = float(timestamp)
+    except ValueError:
+        return False
+    # Bounding the timestamp keeps a captured request from being replayed later.
+    if abs((time.time() if now is None else now) - sent_at) > max_skew_seconds:
+        return False
+    expected = compute_trigger_signature(secret, timestamp, body)
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+class StuckupTriggerQueue:
+    # Turns bursts of edit notifications into single sync runs. The first request opens a
+    # debounce window; each later request pushes the run back by another debounce period,
+    # but never past max_delay from the first one. Requests that arrive while a run is in
+    # progress schedule exactly one follow-up run. Each source has its own token bucket.
+
+    def __init__(
+        self,
+        run: Callable[[], Awaitable[object]],
+        *,
+        debounce_seconds: float,
+        max_delay_seconds: float,
+        rate_per_minute: float,
+        name: str = "stuckup",
+    ) -> None:
+        self._run = run
+        self._debounce = max(0.0, debounce_seconds)
+        self._max_delay = max(self._debounce, max_delay_seconds)
+        self._rate_per_second = max(0.0, rate_per_minute) / 60.0
+        self._burst = max(1.0, rate_per_minute)
+        self._name = name
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._task: asyncio.Task | None = None
+        self._pending = 0
+        self._first_pending_at = 0.0
+        self._last_request_at = 0.0
+        self._running = False
+        self._counters = {"requests": 0, "coalesced": 0, "rate_limited": 0, "runs": 0}
+        self._last_run_at: float | None = None
+        self._last_error: str | None = None
+
+    def request(self, source: str) -> TriggerDecision:
+        now = time.monotonic()
+        self._counters["requests"] += 1
+        retry_after = self._take_token(source, now)
+        if retry_after:
+            self._counters["rate_limited"] += 1
+            return TriggerDecision("rate_limited", retry_after_seconds=retry_after)
+
+        self._last_request_at = now
+        self._pending += 1
+        if self._pending > 1:
+            self._counters["coalesced"] += 1
+            return TriggerDecision("coalesced")
+        self._first_pending_at = now
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        return TriggerDecision("queued")
+
+    async def close(self) -> None:
+        task = self._task
+        if task is None or task.done():
+            return
+        if self._running:
+            # The sync itself runs in a worker thread; let it finish instead of orphaning it.
+            self._pending = 0
+            await asyncio.gather(task, return_exceptions=True)
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self._pending = 0
+
+    def get_status(self) -> dict[str, object]:
+        return {
+            **self._counters,
+            "pending": self._pending,
+            "running": self._running,
+            "last_run_at": self._last_run_at,
+            "last_error": self._last_error,
+        }
+
+    def _take_token(self, source: str, now: float) -> float:
+        # Returns 0 when a token was taken, otherwise the seconds until one is available.
+        if not self._rate_per_second:
+            return 0.0
+        tokens, updated = self._buckets.get(source, (self._burst, now))
+        tokens = min(self._burst, tokens + (now - updated) * self._rate_per_second)
+        if tokens < 1.0:
+            self._buckets[source] = (tokens, now)
+            return round((1.0 - tokens) / self._rate_per_second, 3)
+        self._buckets[source] = (tokens - 1.0, now)
+        return 0.0
+
+    async def _drain(self) -> None:
+        while self._pending:
+            while True:
+                due = min(self._last_request_at + self._debounce, self._first_pending_at + self._max_delay)
+                delay = due - time.monotonic()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            coalesced = self._pending
+            self._pending = 0
+            self._running = True
+            self._counters["runs"] += 1
+            self._last_run_at = time.time()
+            logger.info("%s triggered sync starting: coalesced_requests=%s", self._name, coalesced)
+            try:
+                await self._run()
+                self._last_error = None
+            except Exception as exc:
+                self._last_error = str(exc)
+                logger.exception("%s triggered sync failed", self._name)
+            finally:
+                self._running = False
@@ -0,0 +1,198 @@
+"""SeaTalk callback throughput (callbacks per second on one core).
+
+Two measurements per event type, each compared with the previous pipeline:
+
+- ``pipeline``: body -> envelope -> handler lookup -> CallbackEvent, with no-op handlers.
+  ``legacy`` is the old path (envelope with the event as a ``CallbackEvent | dict`` union,
+  re-normalized in every handler); ``registry`` is ``CallbackRegistry`` over the raw event.
+- ``app``: full POST /callbacks/seatalk through the ASGI app in-process (signature check,
+  dedup with unique event ids, routing and a queued reply with SeaTalk sends stubbed out).
+
+Usage:
+    python -m benchmarks.callback_throughput [--iterations 20000] [--repeats 3] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.models.events import CallbackEnvelope, CallbackEvent
+from app.seatalk.callbacks import CallbackRegistry
+
+_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_SIGNING_SECRET = "bench_signing_secret"
+
+
+class _LegacyEnvelope(CallbackEnvelope):
+    event: CallbackEvent | dict[str, Any] | None = None
+
+
+def _payloads() -> dict[str, dict[str, Any]]:
+    sender = {"seatalk_id": "9001", "employee_code": "E1001", "email": "ops@example.com", "sender_type": 1}
+    text = {"content": "/stuckup help", "plain_text": "/stuckup help"}
+    return {
+        "message_from_bot_subscriber": {
+            "event_type": "message_from_bot_subscriber",
+            "event": {
+                "seatalk_id": "9001",
+                "employee_code": "E1001",
+                "email": "ops@example.com",
+                "message": {"message_id": "m1", "tag": "text", "text": text, "sender": sender},
+            },
+        },
+        "new_mentioned_message_received_from_group_chat": {
+            "event_type": "new_mentioned_message_received_from_group_chat",
+            "event": {
+                "group_id": "g1",
+                "message": {"message_id": "m2", "thread_id": "t1", "tag": "text", "text": text, "sender": sender},
+            },
+        },
+        "unknown": {
+            "event_type": "user_left_group_chat",
+            "event": {"group_id": "g1", "members": [{"seatalk_id": str(i), "employee_code": f"E{i}"} for i in range(20)]},
+        },
+    }
+
+
+def _body(payload: dict[str, Any], index: int) -> bytes:
+    envelope = {"event_id": f"evt-{index}", "timestamp": 1_760_000_000, "app_id": "bench", **payload}
+    return json.dumps(envelope, separators=(",", ":")).encode("utf-8")
+
+
+async def _legacy_dispatch(body: bytes, handled: set[str]) -> None:
+    payload = _LegacyEnvelope.model_validate_json(body)
+    if payload.event_type in handled:
+        event = payload.event
+        if not isinstance(event, CallbackEvent):
+            event = CallbackEvent.model_validate(event) if isinstance(event, dict) else CallbackEvent()
+
+
+async def _registry_dispatch(body: bytes, registry: CallbackRegistry) -> None:
+    await registry.dispatch(CallbackEnvelope.model_validate_json(body))
+
+
+def _best_rate(dispatch: Any, bodies: list[bytes], context: Any, repeats: int) -> float:
+    async def run() -> float:
+        started = time.perf_counter()
+        for body in bodies:
+            await dispatch(body, context)
+        return time.perf_counter() - started
+
+    best = min(asyncio.run(run()) for _ in range(repeats))
+    return round(len(bodies) / best, 1) if best else 0.0
+
+
+def run_pipeline(iterations: int, repeats: int) -> list[dict[str, Any]]:
+    registry = CallbackRegistry()
+    handled = set(_payloads()) - {"unknown"}
+    for event_type in handled:
+        registry.register(event_type)(lambda envelope, event: None)
+    results = []
+    for name, payload in _payloads().items():
+        bodies = [_body(payload, index) for index in range(iterations)]
+        legacy = _best_rate(_legacy_dispatch, bodies, handled, repeats)
+        current = _best_rate(_registry_dispatch, bodies, registry, repeats)
+        results.append(
+            {
+                "event": name,
+                "legacy_per_second": legacy,
+                "registry_per_second": current,
+                "speedup": round(current / legacy, 2) if legacy else None,
+            }
+        )
+    return results
+
+
+def run_app(iterations: int) -> list[dict[str, Any]]:
+    os.environ.update(
+        {
+            "SEATALK_APP_ID": "bench",
+            "SEATALK_APP_SECRET": "bench",
+            "SEATALK_SIGNING_SECRET": _SIGNING_SECRET,
+            "STUCKUP_AUTO_SYNC_ENABLED": "false",
+            "SEATALK_OUTBOX_RATE_PER_MINUTE": "0",
+            "SEATALK_GROUP_REGISTRY": "memory",
+        }
+    )
+    import httpx
+
+    from app.config import get_settings
+
+    get_settings.cache_clear()
+    import app.main as main
+
+    async def no_send(*args: Any, **kwargs: Any) -> dict:
+        return {"code": 0}
+
+    main.seatalk_client.send_text_message = no_send  # type: ignore[method-assign]
+    main.seatalk_client.send_group_text_message = no_send  # type: ignore[method-assign]
+
+    async def post_all(bodies: list[bytes]) -> float:
+        transport = httpx.ASGITransport(app=main.app)
+        main.seatalk_outbox.start()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            for body in bodies:
+                signature = hashlib.sha256(body + _SIGNING_SECRET.encode()).hexdigest()
+                response = await client.post(
+                    "/callbacks/seatalk",
+                    content=body,
+                    headers={"content-type": "application/json", "signature": signature},
+                )
+                response.raise_for_status()
+            elapsed = time.perf_counter() - started
+        await main.seatalk_outbox.stop()
+        return elapsed
+
+    results = []
+    offset = 0
+    for name, payload in _payloads().items():
+        bodies = [_body(payload, offset + index) for index in range(iterations)]
+        offset += iterations
+        elapsed = asyncio.run(post_all(bodies))
+        results.append({"event": name, "app_per_second": round(iterations / elapsed, 1) if elapsed else 0.0})
+    return results
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.callback_throughput")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--app-iterations", type=int, default=3_000)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    report = {
+        "benchmark": "callback_throughput",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pipeline": run_pipeline(args.iterations, max(1, args.repeats)),
+        "app": run_app(args.app_iterations),
+    }
+    output = args.output or _RESULTS_DIR / f"callback_throughput-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"{'event':<48} {'legacy/s':>10} {'registry/s':>11} {'speedup':>8} {'app/s':>8}")
+    app_rates = {item["event"]: item["app_per_second"] for item in report["app"]}
+    for item in report["pipeline"]:
+        print(
+            f"{item['event']:<48} {item['legacy_per_second']:>10.0f} {item['registry_per_second']:>11.0f} "
+            f"{item['speedup'] or 0:>7.2f}x {app_rates.get(item['event'], 0):>8.0f}"
+        )
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
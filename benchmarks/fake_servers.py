@@ -0,0 +1,753 @@
+"""Local HTTP stand-ins for Google Sheets v4, Supabase PostgREST and the SeaTalk Open API, for load testing.
+
+- Sheets: values.get / values:batchGet / values.update / values:batchUpdate / values:clear, spreadsheets.get
+  (with includeGridData) and spreadsheets:batchUpdate, over ``benchmarks.fakes.FakeSheets``.
+  Writes past the grid size fail like the real API, so ensure_grid_size is exercised.
+- PostgREST: /rest/v1/<table> select/insert/upsert/update/delete with eq/neq/in/is filters,
+  order, offset/limit and Prefer handling, for the tables in docs/supabase_stuckup_schema.sql.
+
+The apps take a FaultConfig (latency + jitter, 5xx error rate, 429 rate, per-minute quota)
+that can be changed at runtime with ``PUT /_fake/faults``; ``GET /_fake/stats`` returns
+request, fault and per-API counters.
+
+Point the app at them with:
+    GOOGLE_SHEETS_API_ENDPOINT=http://127.0.0.1:8081/
+    SUPABASE_URL=http://127.0.0.1:8082
+    SUPABASE_SERVICE_ROLE_KEY=fake.service.key
+    SEATALK_API_BASE_URL=http://127.0.0.1:8083
+
+Usage:
+    python -m benchmarks.fake_servers [--latency-ms 80] [--throttle-rate 0.05] [--source-rows 100000]
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from benchmarks.fakes import CallRecorder, FakeSheets, column_index, parse_a1
+from benchmarks.stuckup_table_memory import _HEADERS, synthetic_rows
+
+_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "docs" / "supabase_stuckup_schema.sql"
+_DEFAULT_GRID_COLUMNS = 26
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Share of requests answered with a 500/503.
+    error_rate: float = 0.0
+    # Share of requests answered with a 429.
+    throttle_rate: float = 0.0
+    # Requests allowed per rolling minute before answering 429; 0 disables the quota.
+    requests_per_minute: int = 0
+    retry_after_seconds: int = 1
+
+
+@dataclass
+class FaultStats:
+    requests: int = 0
+    errors: int = 0
+    throttled: int = 0
+    quota_exceeded: int = 0
+
+
+class FaultInjector:
+    def __init__(self, config: FaultConfig | None = None, *, seed: int | None = None) -> None:
+        self.config = config or FaultConfig()
+        self.stats = FaultStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: deque[float] = deque()
+
+    def update(self, values: dict[str, Any]) -> None:
+        allowed = set(asdict(self.config))
+        self.config = FaultConfig(**{**asdict(self.config), **{k: v for k, v in values.items() if k in allowed}})
+
+    async def apply(self) -> int | None:
+        # Sleeps for the configured latency, then returns the status code to fail with, if any.
+        config = self.config
+        delay = config.latency_ms + (self._rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        with self._lock:
+            self.stats.requests += 1
+            now = time.monotonic()
+            if config.requests_per_minute > 0:
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+                if len(self._window) >= config.requests_per_minute:
+                    self.stats.quota_exceeded += 1
+                    return 429
+                self._window.append(now)
+            roll = self._rng.random()
+            if roll < config.throttle_rate:
+                self.stats.throttled += 1
+                return 429
+            if roll < config.throttle_rate + config.error_rate:
+                self.stats.errors += 1
+                return self._rng.choice([500, 503])
+        return None
+
+
+def _install_fault_middleware(app: FastAPI, faults: FaultInjector, error_body) -> None:
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/_fake"):
+            return await call_next(request)
+        status = await faults.apply()
+        if status is None:
+            return await call_next(request)
+        headers = {"Retry-After": str(faults.config.retry_after_seconds)} if status == 429 else {}
+        return JSONResponse(error_body(status), status_code=status, headers=headers)
+
+    @app.put("/_fake/faults")
+    async def update_faults(request: Request) -> dict:
+        faults.update(await request.json())
+        return asdict(faults.config)
+
+
+# ---------------------------------------------------------------------------
+# Google Sheets v4
+# ---------------------------------------------------------------------------
+
+
+def _google_error(status: int, message: str | None = None) -> dict:
+    names = {400: "INVALID_ARGUMENT", 404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+    defaults = {
+        429: "Quota exceeded for quota metric 'Read requests' and limit 'Read requests per minute per user'",
+        500: "Internal error encountered.",
+        503: "The service is currently unavailable.",
+    }
+    return {"error": {"code": status, "message": message or defaults.get(status, "error"), "status": names.get(status, "UNKNOWN")}}
+
+
+class _SheetsApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def create_sheets_app(store: FakeSheets | None = None, faults: FaultInjector | None = None, *, auto_create: bool = True) -> FastAPI:
+    store = store or FakeSheets()
+    faults = faults or FaultInjector()
+    app = FastAPI(title="Fake Google Sheets v4")
+    app.state.store = store
+    app.state.faults = faults
+    _install_fault_middleware(app, faults, _google_error)
+
+    @app.exception_handler(_SheetsApiError)
+    async def sheets_error(_: Request, exc: _SheetsApiError) -> JSONResponse:
+        return JSONResponse(_google_error(exc.status, str(exc)), status_code=exc.status)
+
+    def worksheet(spreadsheet_id: str, name: str | None) -> str:
+        titles = [title for sid, title in store.grids if sid == spreadsheet_id]
+        if name is None:
+            if titles:
+                return titles[0]
+            name = "Sheet1"
+        if name not in titles:
+            if not auto_create:
+                raise _SheetsApiError(400, f"Unable to parse range: {name}")
+            store.add_worksheet(spreadsheet_id, name)
+        return name
+
+    def split_range(spreadsheet_id: str, a1: str) -> tuple[str, str]:
+        # "'My sheet'!A1:B2" -> ("My sheet", "A1:B2"); a bare sheet name means the whole sheet.
+        if "!" in a1:
+            name, cells = a1.rsplit("!", 1)
+        elif re.fullmatch(r"[A-Za-z]*\d*(:[A-Za-z]*\d*)?", a1):
+            name, cells = None, a1
+        else:
+            name, cells = a1, "A:ZZZ"
+        if name is not None and name.startswith("'") and name.endswith("'"):
+            name = name[1:-1].replace("''", "'")
+        return worksheet(spreadsheet_id, name), cells
+
+    def sheet_properties(spreadsheet_id: str) -> list[dict]:
+        props = []
+        for index, (sid, title) in enumerate(key for key in store.grids if key[0] == spreadsheet_id):
+            rows, columns = store.grid_sizes[(sid, title)]
+            props.append(
+                {
+                    "sheetId": index,
+                    "title": title,
+                    "index": index,
+                    "sheetType": "GRID",
+                    "gridProperties": {"rowCount": rows, "columnCount": columns},
+                }
+            )
+        return props
+
+    def value_range(spreadsheet_id: str, a1: str) -> dict:
+        name, cells = split_range(spreadsheet_id, a1)
+        values = store.read_values(spreadsheet_id, name, cells)
+        body: dict[str, Any] = {"range": f"'{name}'!{cells}", "majorDimension": "ROWS"}
+        if values:
+            body["values"] = values
+        return body
+
+    @app.get("/v4/spreadsheets/{spreadsheet_id}/values:batchGet")
+    async def values_batch_get(spreadsheet_id: str, request: Request) -> dict:
+        ranges = request.query_params.getlist("ranges")
+        return {"spreadsheetId": spreadsheet_id, "valueRanges": [value_range(spreadsheet_id, a1) for a1 in ranges]}
+
+    @app.get("/v4/spreadsheets/{spreadsheet_id}/values/{a1:path}")
+    async def values_get(spreadsheet_id: str, a1: str) -> dict:
+        return value_range(spreadsheet_id, a1)
+
+    @app.put("/v4/spreadsheets/{spreadsheet_id}/values/{a1:path}")
+    async def values_update(spreadsheet_id: str, a1: str, request: Request) -> dict:
+        name, cells = split_range(spreadsheet_id, a1)
+        values = (await request.json()).get("values", [])
+        first_row, first_col, _, _ = parse_a1(cells.split(":")[0])
+        rows, columns = store.grid_sizes[(spreadsheet_id, name)]
+        width = max((len(row) for row in values), default=0)
+        if first_row + len(values) > rows or first_col + width > columns:
+            raise _SheetsApiError(
+                400,
+                f"Range ('{name}'!{cells}) exceeds grid limits. Max rows: {rows}, max columns: {columns}",
+            )
+        result = store.update_values(spreadsheet_id, name, cells.split(":")[0], values)
+        return {"spreadsheetId": spreadsheet_id, "updatedRange": f"'{name}'!{cells}", **result}
+
+    @app.post("/v4/spreadsheets/{spreadsheet_id}/values:batchUpdate")
+    async def values_batch_update(spreadsheet_id: str, request: Request) -> dict:
+        blocks: dict[str, list[tuple[str, list[list[str]]]]] = {}
+        for item in (await request.json()).get("data", []):
+            name, cells = split_range(spreadsheet_id, item["range"])
+            values = item.get("values", [])
+            first_row, first_col, _, _ = parse_a1(cells.split(":")[0])
+            rows, columns = store.grid_sizes[(spreadsheet_id, name)]
+            width = max((len(row) for row in values), default=0)
+            if first_row + len(values) > rows or first_col + width > columns:
+                raise _SheetsApiError(
+                    400,
+                    f"Range ('{name}'!{cells}) exceeds grid limits. Max rows: {rows}, max columns: {columns}",
+                )
+            blocks.setdefault(name, []).append((cells.split(":")[0], values))
+        totals = {"totalUpdatedRows": 0, "totalUpdatedCells": 0}
+        for name, sheet_blocks in blocks.items():
+            result = store.batch_update_values(spreadsheet_id, name, sheet_blocks)
+            for key in totals:
+                totals[key] += result[key]
+        return {"spreadsheetId": spreadsheet_id, **totals}
+
+    @app.post("/v4/spreadsheets/{spreadsheet_id}/values/{a1:path}")
+    async def values_clear(spreadsheet_id: str, a1: str) -> dict:
+        if not a1.endswith(":clear"):
+            raise _SheetsApiError(404, f"unsupported values method: {a1}")
+        name, cells = split_range(spreadsheet_id, a1[: -len(":clear")])
+        store.clear_range(spreadsheet_id, name, cells)
+        return {"spreadsheetId": spreadsheet_id, "clearedRange": f"'{name}'!{cells}"}
+
+    @app.get("/v4/spreadsheets/{spreadsheet_id}")
+    async def spreadsheets_get(spreadsheet_id: str, request: Request) -> dict:
+        params = request.query_params
+        include_grid = params.get("includeGridData", "false").lower() == "true"
+        ranges = params.getlist("ranges")
+        sheets = {props["title"]: {"properties": props} for props in sheet_properties(spreadsheet_id)}
+        if ranges:
+            requested: dict[str, list[str]] = {}
+            for a1 in ranges:
+                name, cells = split_range(spreadsheet_id, a1)
+                requested.setdefault(name, []).append(cells)
+            sheets = {props["title"]: {"properties": props} for props in sheet_properties(spreadsheet_id) if props["title"] in requested}
+            if include_grid:
+                for name, cell_ranges in requested.items():
+                    _, blocks = store.read_row_blocks(spreadsheet_id, name, cell_ranges)
+                    sheets[name]["data"] = [
+                        {
+                            "startRow": parse_a1(cells)[0],
+                            "startColumn": parse_a1(cells)[1],
+                            "rowData": [{"values": [{"formattedValue": cell} for cell in row]} for row in block],
+                        }
+                        for cells, block in zip(cell_ranges, blocks)
+                    ]
+        if not (ranges and include_grid):
+            # Grid reads are recorded by the store per worksheet.
+            store.recorder.record(f"sheets.get:{spreadsheet_id}", time.perf_counter(), time.perf_counter(), 0, 0, 0.0)
+        return {"spreadsheetId": spreadsheet_id, "properties": {"title": spreadsheet_id}, "sheets": list(sheets.values())}
+
+    @app.post("/v4/spreadsheets/{spreadsheet_id}:batchUpdate")
+    async def spreadsheets_batch_update(spreadsheet_id: str, request: Request) -> dict:
+        replies: list[dict] = []
+        titles = {props["sheetId"]: props["title"] for props in sheet_properties(spreadsheet_id)}
+        for item in (await request.json()).get("requests", []):
+            if "updateSheetProperties" in item:
+                props = item["updateSheetProperties"]["properties"]
+                title = titles.get(props.get("sheetId"))
+                if title is None:
+                    raise _SheetsApiError(400, f"No grid with id: {props.get('sheetId')}")
+                grid = props.get("gridProperties", {})
+                rows, columns = store.grid_sizes[(spreadsheet_id, title)]
+                store.grid_sizes[(spreadsheet_id, title)] = (
+                    int(grid.get("rowCount", rows)),
+                    int(grid.get("columnCount", columns)),
+                )
+                replies.append({})
+            elif "addSheet" in item:
+                title = item["addSheet"].get("properties", {}).get("title", f"Sheet{len(titles) + 1}")
+                store.add_worksheet(spreadsheet_id, title)
+                replies.append({"addSheet": {"properties": sheet_properties(spreadsheet_id)[-1]}})
+            else:
+                raise _SheetsApiError(400, f"unsupported request: {', '.join(item)}")
+        store.recorder.record(f"sheets.batchUpdate:{spreadsheet_id}", time.perf_counter(), time.perf_counter(), 0, 0, 0.0)
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+    @app.get("/_fake/stats")
+    async def stats() -> dict:
+        return {"faults": asdict(faults.stats), "config": asdict(faults.config), "apis": store.recorder.snapshot()}
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Supabase PostgREST
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class TableSpec:
+    name: str
+    columns: list[str]
+    # Column rows are keyed by: the first unique non-identity column, else the primary key.
+    key_column: str
+    identity_column: str | None = None
+    required: set[str] = field(default_factory=set)
+    defaults_now: set[str] = field(default_factory=set)
+
+
+def parse_schema(sql: str) -> dict[str, TableSpec]:
+    tables: dict[str, TableSpec] = {}
+    for match in re.finditer(r"create table if not exists (\w+)\s*\((.*?)\n\);", sql, re.S | re.I):
+        name, body = match.group(1), match.group(2)
+        columns: list[str] = []
+        identity = None
+        primary = None
+        unique = None
+        required: set[str] = set()
+        defaults_now: set[str] = set()
+        for line in body.splitlines():
+            line = line.strip().rstrip(",")
+            if not line or line.startswith("--"):
+                continue
+            column = line.split()[0]
+            lowered = line.lower()
+            columns.append(column)
+            if "generated" in lowered and "identity" in lowered:
+                identity = column
+            if "primary key" in lowered:
+                primary = column
+            if " unique" in lowered and unique is None:
+                unique = column
+            if "default now()" in lowered:
+                defaults_now.add(column)
+            elif "not null" in lowered or ("primary key" in lowered and column != identity):
+                required.add(column)
+        key = unique or primary or columns[0]
+        tables[name] = TableSpec(name, columns, key, identity, required, defaults_now)
+    return tables
+
+
+class _PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str, details: str | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.details = details
+
+
+class FakePostgrestStore:
+    def __init__(self, tables: dict[str, TableSpec], recorder: CallRecorder | None = None) -> None:
+        self.specs = tables
+        self.recorder = recorder or CallRecorder()
+        self.rows: dict[str, dict[str, dict[str, Any]]] = {name: {} for name in tables}
+        self._next_id: dict[str, int] = {name: 1 for name in tables}
+        self._sorted_keys: dict[str, list[str]] = {}
+
+    def spec(self, table: str) -> TableSpec:
+        if table not in self.specs:
+            raise _PostgrestError(404, "42P01", f'relation "public.{table}" does not exist')
+        return self.specs[table]
+
+    def write(self, table: str, records: list[dict[str, Any]], *, on_conflict: str | None, resolution: str | None) -> list[dict]:
+        spec = self.spec(table)
+        key_column = on_conflict or spec.key_column
+        rows = self.rows[table]
+        now = datetime.now(timezone.utc).isoformat()
+        written: list[dict] = []
+        for record in records:
+            unknown = set(record) - set(spec.columns)
+            if unknown:
+                raise _PostgrestError(
+                    400,
+                    "PGRST204",
+                    f"Could not find the '{sorted(unknown)[0]}' column of '{table}' in the schema cache",
+                )
+            key = record.get(key_column)
+            if key is None and key_column == spec.identity_column:
+                key = self._next_id[table]
+            key = str(key)
+            existing = rows.get(key)
+            if existing is not None:
+                if resolution is None:
+                    raise _PostgrestError(
+                        409,
+                        "23505",
+                        f'duplicate key value violates unique constraint "{table}_{key_column}_key"',
+                        f"Key ({key_column})=({key}) already exists.",
+                    )
+                if resolution == "ignore-duplicates":
+                    continue
+                row = {**existing, **record}
+            else:
+                missing = [column for column in spec.required if record.get(column) is None]
+                if missing:
+                    raise _PostgrestError(400, "23502", f'null value in column "{missing[0]}" of relation "{table}" violates not-null constraint')
+                row = {column: None for column in spec.columns}
+                row.update(record)
+                if spec.identity_column and row.get(spec.identity_column) is None:
+                    row[spec.identity_column] = self._next_id[table]
+                    self._next_id[table] += 1
+            for column in spec.defaults_now:
+                row[column] = now
+            rows[key] = row
+            written.append(row)
+        self._sorted_keys.pop(table, None)
+        return written
+
+    def select(self, table: str, filters: list[tuple[str, str, str]], order: list[tuple[str, bool]]) -> list[dict]:
+        spec = self.spec(table)
+        rows = self.rows[table]
+        if not filters and order and order[0] == (spec.key_column, False) and len(order) == 1:
+            keys = self._sorted_keys.get(table)
+            if keys is None:
+                keys = self._sorted_keys[table] = sorted(rows)
+            return [rows[key] for key in keys]
+        matched = [row for row in rows.values() if _matches(row, filters)]
+        for column, descending in reversed(order):
+            matched.sort(key=lambda row: (row.get(column) is None, str(row.get(column) or "")), reverse=descending)
+        return matched
+
+    def delete(self, table: str, filters: list[tuple[str, str, str]]) -> list[dict]:
+        spec = self.spec(table)
+        rows = self.rows[table]
+        in_keys = [f for f in filters if f[0] == spec.key_column and f[1] in {"eq", "in"}]
+        if len(filters) == 1 and in_keys:
+            # Fast path for the sink's batched "delete where key in (...)".
+            _, op, value = in_keys[0]
+            keys = _parse_in(value) if op == "in" else [value]
+            removed = [rows.pop(key) for key in keys if key in rows]
+        else:
+            doomed = [key for key, row in rows.items() if _matches(row, filters)]
+            removed = [rows.pop(key) for key in doomed]
+        self._sorted_keys.pop(table, None)
+        return removed
+
+    def update(self, table: str, filters: list[tuple[str, str, str]], values: dict[str, Any]) -> list[dict]:
+        spec = self.spec(table)
+        now = datetime.now(timezone.utc).isoformat()
+        updated = []
+        for row in self.rows[table].values():
+            if _matches(row, filters):
+                row.update(values)
+                for column in spec.defaults_now:
+                    row[column] = now
+                updated.append(row)
+        return updated
+
+
+def _parse_in(value: str) -> list[str]:
+    # in.(a,"b,c",d) -> ["a", "b,c", "d"]
+    inner = value[1:-1] if value.startswith("(") and value.endswith(")") else value
+    return [item[1:-1] if item.startswith('"') and item.endswith('"') else item for item in re.findall(r'"[^"]*"|[^,]+', inner)]
+
+
+def _matches(row: dict[str, Any], filters: list[tuple[str, str, str]]) -> bool:
+    for column, op, value in filters:
+        current = row.get(column)
+        text = None if current is None else str(current)
+        if op == "eq" and text != value:
+            return False
+        if op == "neq" and text == value:
+            return False
+        if op == "in" and text not in set(_parse_in(value)):
+            return False
+        if op == "is" and (value.lower() == "null") != (current is None):
+            return False
+        if op == "lt" and (current is None or float(current) >= float(value)):
+            return False
+    return True
+
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+_SUPPORTED_OPS = {"eq", "neq", "in", "is", "lt"}
+
+
+def _postgrest_error(status: int) -> dict:
+    if status == 429:
+        return {"message": "Too Many Requests"}
+    return {"code": "PGRST000", "message": "upstream error", "details": None, "hint": None}
+
+
+def create_postgrest_app(store: FakePostgrestStore | None = None, faults: FaultInjector | None = None) -> FastAPI:
+    store = store or FakePostgrestStore(parse_schema(_SCHEMA_PATH.read_text(encoding="utf-8")))
+    faults = faults or FaultInjector()
+    app = FastAPI(title="Fake Supabase PostgREST")
+    app.state.store = store
+    app.state.faults = faults
+    _install_fault_middleware(app, faults, _postgrest_error)
+
+    @app.exception_handler(_PostgrestError)
+    async def postgrest_error(_: Request, exc: _PostgrestError) -> JSONResponse:
+        body = {"code": exc.code, "details": exc.details, "hint": None, "message": str(exc)}
+        return JSONResponse(body, status_code=exc.status)
+
+    def parse_query(request: Request) -> tuple[list[tuple[str, str, str]], list[tuple[str, bool]]]:
+        filters = []
+        for key, raw in request.query_params.multi_items():
+            if key in _RESERVED_PARAMS:
+                continue
+            op, _, value = raw.partition(".")
+            if op not in _SUPPORTED_OPS:
+                raise _PostgrestError(400, "PGRST100", f'"failed to parse filter ({raw})" (line 1, column 1)')
+            filters.append((key, op, value))
+        order = []
+        for item in filter(None, request.query_params.get("order", "").split(",")):
+            parts = item.split(".")
+            order.append((parts[0], len(parts) > 1 and parts[1] == "desc"))
+        return filters, order
+
+    def prefer(request: Request) -> dict[str, str]:
+        values: dict[str, str] = {}
+        for item in request.headers.get("prefer", "").split(","):
+            key, _, value = item.strip().partition("=")
+            if key:
+                values[key] = value
+        return values
+
+    def project(rows: list[dict], select: str) -> list[dict]:
+        if not select or select.strip() == "*":
+            return [dict(row) for row in rows]
+        columns = [column.strip() for column in select.split(",")]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def reply(request: Request, table: str, op: str, rows: list[dict], started: float, request_bytes: int) -> Response:
+        if prefer(request).get("return") == "minimal":
+            rows = []
+        body = project(rows, request.query_params.get("select", "*"))
+        response = JSONResponse(body, status_code=201 if request.method == "POST" else 200)
+        store.recorder.record(f"postgrest.{op}:{table}", started, time.perf_counter(), request_bytes, len(response.body), 0.0)
+        return response
+
+    @app.get("/rest/v1/{table}")
+    async def select_rows(table: str, request: Request) -> Response:
+        started = time.perf_counter()
+        filters, order = parse_query(request)
+        rows = store.select(table, filters, order)
+        total = len(rows)
+        offset = int(request.query_params.get("offset", 0))
+        limit = request.query_params.get("limit")
+        range_header = request.headers.get("range")
+        if range_header and "-" in range_header:
+            first, _, last = range_header.partition("-")
+            offset, limit = int(first), str(int(last) - int(first) + 1)
+        page = rows[offset : offset + int(limit)] if limit is not None else rows[offset:]
+        body = project(page, request.query_params.get("select", "*"))
+        end = offset + len(page) - 1
+        count = str(total) if prefer(request).get("count") == "exact" else "*"
+        response = JSONResponse(body, headers={"Content-Range": f"{offset}-{end}/{count}" if page else f"*/{count}"})
+        store.recorder.record(f"postgrest.select:{table}", started, time.perf_counter(), 0, len(response.body), 0.0)
+        return response
+
+    @app.post("/rest/v1/{table}")
+    async def insert_rows(table: str, request: Request) -> Response:
+        started = time.perf_counter()
+        raw = await request.body()
+        payload = await request.json()
+        records = payload if isinstance(payload, list) else [payload]
+        resolution = prefer(request).get("resolution")
+        rows = store.write(
+            table,
+            records,
+            on_conflict=request.query_params.get("on_conflict") or None,
+            resolution=resolution,
+        )
+        return reply(request, table, "upsert" if resolution else "insert", rows, started, len(raw))
+
+    @app.patch("/rest/v1/{table}")
+    async def update_rows(table: str, request: Request) -> Response:
+        started = time.perf_counter()
+        raw = await request.body()
+        filters, _ = parse_query(request)
+        rows = store.update(table, filters, await request.json())
+        return reply(request, table, "update", rows, started, len(raw))
+
+    @app.delete("/rest/v1/{table}")
+    async def delete_rows(table: str, request: Request) -> Response:
+        started = time.perf_counter()
+        filters, _ = parse_query(request)
+        rows = store.delete(table, filters)
+        return reply(request, table, "delete", rows, started, len(str(request.url.query)))
+
+    @app.get("/_fake/stats")
+    async def stats() -> dict:
+        return {
+            "faults": asdict(faults.stats),
+            "config": asdict(faults.config),
+            "apis": store.recorder.snapshot(),
+            "tables": {name: len(rows) for name, rows in store.rows.items()},
+        }
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# SeaTalk Open API
+# ---------------------------------------------------------------------------
+
+
+def _seatalk_error(status: int) -> dict:
+    return {"code": 101 if status == 429 else 100, "message": f"fake error {status}"}
+
+
+def create_seatalk_app(faults: FaultInjector | None = None, *, token_ttl_seconds: int = 7200) -> FastAPI:
+    faults = faults or FaultInjector()
+    app = FastAPI(title="Fake SeaTalk Open API")
+    app.state.faults = faults
+    app.state.messages = []
+    app.state.token_requests = 0
+    # (host, port) of every client socket seen; one entry per TCP connection.
+    app.state.connections = set()
+    _install_fault_middleware(app, faults, _seatalk_error)
+
+    @app.middleware("http")
+    async def track_connections(request: Request, call_next):
+        if request.client is not None:
+            app.state.connections.add((request.client.host, request.client.port))
+        return await call_next(request)
+
+    def authorized(request: Request) -> bool:
+        return request.headers.get("authorization", "").startswith("Bearer fake-token-")
+
+    @app.post("/auth/app_access_token")
+    async def app_access_token(request: Request) -> dict:
+        payload = await request.json()
+        if not payload.get("app_id") or not payload.get("app_secret"):
+            return {"code": 100}
+        app.state.token_requests += 1
+        return {
+            "code": 0,
+            "app_access_token": f"fake-token-{app.state.token_requests}",
+            "expire": int(time.time()) + token_ttl_seconds,
+        }
+
+    @app.post("/messaging/v2/single_chat")
+    @app.post("/messaging/v2/group_chat")
+    async def send_message(request: Request) -> dict:
+        if not authorized(request):
+            return {"code": 2}
+        payload = await request.json()
+        app.state.messages.append({"path": request.url.path, **payload})
+        return {"code": 0, "message_id": f"fake-message-{len(app.state.messages)}"}
+
+    @app.get("/_fake/stats")
+    async def stats() -> dict:
+        return {
+            "faults": asdict(faults.stats),
+            "config": asdict(faults.config),
+            "token_requests": app.state.token_requests,
+            "messages": len(app.state.messages),
+            "connections": len(app.state.connections),
+        }
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, host: str = "127.0.0.1", **config: Any) -> tuple[uvicorn.Server, str]:
+    # Runs the app on a free port in a daemon thread; set server.should_exit to stop it.
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=0, log_level="warning", **config))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if not server.started:
+        raise RuntimeError("fake server did not start")
+    port = server.servers[0].sockets[0].getsockname()[1]
+    scheme = "https" if config.get("ssl_certfile") else "http"
+    return server, f"{scheme}://{host}:{port}"
+
+
+def seed_source_sheet(store: FakeSheets, spreadsheet_id: str, worksheet_name: str, rows: int) -> None:
+    store.add_worksheet(spreadsheet_id, worksheet_name, [list(_HEADERS), *synthetic_rows(rows)])
+    grid_rows, _ = store.grid_sizes[(spreadsheet_id, worksheet_name)]
+    store.grid_sizes[(spreadsheet_id, worksheet_name)] = (grid_rows, max(_DEFAULT_GRID_COLUMNS, column_index("AL") + 1))
+
+
+def add_target_spreadsheet(store: FakeSheets, spreadsheet_id: str, worksheets: list[str]) -> None:
+    # spreadsheets.get only lists existing worksheets, so the target tabs are created up front.
+    for name in worksheets:
+        if (spreadsheet_id, name) not in store.grids:
+            store.add_worksheet(spreadsheet_id, name)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    config = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        requests_per_minute=args.requests_per_minute,
+    )
+    sheets = FakeSheets()
+    if args.source_rows:
+        seed_source_sheet(sheets, args.source_spreadsheet_id, args.source_worksheet, args.source_rows)
+    add_target_spreadsheet(sheets, args.target_spreadsheet_id, args.target_worksheets.split(","))
+    apps = [
+        (create_sheets_app(sheets, FaultInjector(FaultConfig(**asdict(config)), seed=args.seed)), args.sheets_port),
+        (create_postgrest_app(faults=FaultInjector(FaultConfig(**asdict(config)), seed=args.seed)), args.postgrest_port),
+        (create_seatalk_app(FaultInjector(FaultConfig(**asdict(config)), seed=args.seed)), args.seatalk_port),
+    ]
+    servers = [uvicorn.Server(uvicorn.Config(app, host=args.host, port=port, log_level="warning")) for app, port in apps]
+    print(f"fake Sheets:    GOOGLE_SHEETS_API_ENDPOINT=http://{args.host}:{args.sheets_port}/")
+    print(f"fake PostgREST: SUPABASE_URL=http://{args.host}:{args.postgrest_port}  SUPABASE_SERVICE_ROLE_KEY=fake.service.key")
+    print(f"fake SeaTalk:   SEATALK_API_BASE_URL=http://{args.host}:{args.seatalk_port}")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fake_servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--sheets-port", type=int, default=8081)
+    parser.add_argument("--postgrest-port", type=int, default=8082)
+    parser.add_argument("--seatalk-port", type=int, default=8083)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--requests-per-minute", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--source-rows", type=int, default=0, help="seed the source worksheet with synthetic rows")
+    parser.add_argument("--source-spreadsheet-id", default="fake-source")
+    parser.add_argument("--source-worksheet", default="Source")
+    parser.add_argument("--target-spreadsheet-id", default="fake-target")
+    parser.add_argument("--target-worksheets", default="Stuckup,config,dashboard_summary")
+    asyncio.run(serve(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,397 @@
+"""In-memory stand-ins for the Google Sheets client and the supabase-py client.
+
+Both keep their data in plain Python structures and record every API call through a
+shared ``CallRecorder``: call count, approximate JSON request/response bytes, time spent
+inside the call, and the local compute time since the previous call ("lead" time).
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+_A1_RE = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+def column_index(letters: str) -> int:
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def parse_a1(cell_range: str) -> tuple[int, int, int | None, int | None]:
+    # Returns zero-based (first_row, first_col, last_row, last_col); None means unbounded.
+    match = _A1_RE.match(cell_range.upper())
+    if not match:
+        raise ValueError(f"unsupported range: {cell_range}")
+    start_col, start_row, end_col, end_row = match.groups()
+    first_row = int(start_row) - 1 if start_row else 0
+    first_col = column_index(start_col) if start_col else 0
+    if end_col is None and end_row is None:
+        # Single cell ("C4") or whole column ("A").
+        last_row = first_row if start_row else None
+        last_col = first_col
+        return first_row, first_col, last_row, last_col
+    last_row = int(end_row) - 1 if end_row else None
+    last_col = column_index(end_col) if end_col else None
+    return first_row, first_col, last_row, last_col
+
+
+def values_size(values: list[list[str]]) -> int:
+    # Approximate JSON size of a values array: quotes and commas per cell, brackets per row.
+    return sum(sum(len(cell) + 3 for cell in row) + 3 for row in values) + 2
+
+
+def records_size(records: Iterable[dict[str, Any]]) -> int:
+    total = 2
+    for record in records:
+        total += 3 + sum(len(key) + len(str(value)) + 6 for key, value in record.items())
+    return total
+
+
+class CallRecorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: dict[str, dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "request_bytes": 0, "response_bytes": 0, "seconds": 0.0, "lead_seconds": 0.0}
+        )
+        # Time spent measuring payload sizes, excluded from the reported wall time.
+        self.overhead_seconds = 0.0
+        self._last_call_end = time.perf_counter()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self.overhead_seconds = 0.0
+            self._last_call_end = time.perf_counter()
+
+    def record(self, stage: str, started: float, finished: float, request_bytes: int, response_bytes: int, overhead: float) -> None:
+        with self._lock:
+            entry = self.stages[stage]
+            entry["calls"] += 1
+            entry["request_bytes"] += request_bytes
+            entry["response_bytes"] += response_bytes
+            entry["seconds"] += finished - started - overhead
+            entry["lead_seconds"] += max(0.0, started - self._last_call_end)
+            self.overhead_seconds += overhead
+            self._last_call_end = time.perf_counter()
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {stage: dict(entry) for stage, entry in sorted(self.stages.items())}
+
+
+class FakeSheets:
+    # Duck-types GoogleSheetsClient over in-memory grids keyed by (spreadsheet_id, worksheet).
+
+    def __init__(self, recorder: CallRecorder | None = None) -> None:
+        self.recorder = recorder or CallRecorder()
+        self.grids: dict[tuple[str, str], list[list[str]]] = {}
+        self.grid_sizes: dict[tuple[str, str], tuple[int, int]] = {}
+
+    def add_worksheet(self, spreadsheet_id: str, worksheet_name: str, values: list[list[str]] | None = None) -> None:
+        self.grids[(spreadsheet_id, worksheet_name)] = values if values is not None else []
+        self.grid_sizes[(spreadsheet_id, worksheet_name)] = (max(1000, len(values or [])), 26)
+
+    def grid(self, spreadsheet_id: str, worksheet_name: str) -> list[list[str]]:
+        key = (spreadsheet_id, worksheet_name)
+        if key not in self.grids:
+            raise ValueError(f"worksheet '{worksheet_name}' not found")
+        return self.grids[key]
+
+    def read_values(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
+        started = time.perf_counter()
+        values = self._read(self.grid(spreadsheet_id, worksheet_name), cell_range)
+        measured = time.perf_counter()
+        size = values_size(values)
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.values.get:{worksheet_name}", started, finished, 0, size, finished - measured)
+        return values
+
+    def read_row_blocks(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        cell_ranges: list[str],
+    ) -> tuple[int, list[list[list[str]]]]:
+        started = time.perf_counter()
+        grid = self.grid(spreadsheet_id, worksheet_name)
+        blocks = [self._read(grid, cell_range) for cell_range in cell_ranges]
+        measured = time.perf_counter()
+        size = sum(values_size(block) for block in blocks)
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.get:{worksheet_name}", started, finished, 0, size, finished - measured)
+        return max(len(grid), self.grid_sizes[(spreadsheet_id, worksheet_name)][0]), blocks
+
+    def clear_range(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> None:
+        started = time.perf_counter()
+        grid = self.grid(spreadsheet_id, worksheet_name)
+        first_row, first_col, last_row, last_col = parse_a1(cell_range)
+        end = len(grid) if last_row is None else min(len(grid), last_row + 1)
+        for row in grid[first_row:end]:
+            if last_col is None or last_col + 1 >= len(row):
+                del row[first_col:]
+            else:
+                row[first_col : last_col + 1] = [""] * (last_col + 1 - first_col)
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.values.clear:{worksheet_name}", started, finished, 2, 0, 0.0)
+
+    def update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        start_cell: str,
+        values: list[list[str]],
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        grid = self.grid(spreadsheet_id, worksheet_name)
+        first_row, first_col, _, _ = parse_a1(start_cell)
+        while len(grid) < first_row + len(values):
+            grid.append([])
+        for offset, values_row in enumerate(values):
+            row = grid[first_row + offset]
+            if len(row) < first_col:
+                row.extend([""] * (first_col - len(row)))
+            row[first_col : first_col + len(values_row)] = [str(cell) for cell in values_row]
+        measured = time.perf_counter()
+        size = values_size(values)
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.values.update:{worksheet_name}", started, finished, size, 120, finished - measured)
+        columns = max((len(row) for row in values), default=0)
+        return {
+            "updatedRows": len(values),
+            "updatedColumns": columns,
+            "updatedCells": sum(len(row) for row in values),
+        }
+
+    def batch_update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        blocks: list[tuple[str, list[list[str]]]],
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        grid = self.grid(spreadsheet_id, worksheet_name)
+        for start_cell, values in blocks:
+            first_row, first_col, _, _ = parse_a1(start_cell)
+            while len(grid) < first_row + len(values):
+                grid.append([])
+            for offset, values_row in enumerate(values):
+                row = grid[first_row + offset]
+                if len(row) < first_col:
+                    row.extend([""] * (first_col - len(row)))
+                row[first_col : first_col + len(values_row)] = [str(cell) for cell in values_row]
+        measured = time.perf_counter()
+        size = sum(values_size(values) for _, values in blocks)
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.values.batchUpdate:{worksheet_name}", started, finished, size, 120, finished - measured)
+        return {
+            "totalUpdatedRows": sum(len(values) for _, values in blocks),
+            "totalUpdatedCells": sum(len(row) for _, values in blocks for row in values),
+        }
+
+    def ensure_grid_size(self, spreadsheet_id: str, worksheet_name: str, min_rows: int, min_columns: int) -> None:
+        started = time.perf_counter()
+        key = (spreadsheet_id, worksheet_name)
+        self.grid(spreadsheet_id, worksheet_name)
+        rows, columns = self.grid_sizes[key]
+        finished = time.perf_counter()
+        self.recorder.record(f"sheets.get:{worksheet_name}", started, finished, 0, 400, 0.0)
+        if rows < min_rows or columns < min_columns:
+            self.grid_sizes[key] = (max(rows, min_rows), max(columns, min_columns))
+            self.recorder.record(f"sheets.batchUpdate:{worksheet_name}", finished, time.perf_counter(), 200, 100, 0.0)
+
+    def get_grid_size(self, spreadsheet_id: str, worksheet_name: str) -> tuple[int, int]:
+        started = time.perf_counter()
+        self.grid(spreadsheet_id, worksheet_name)
+        size = self.grid_sizes[(spreadsheet_id, worksheet_name)]
+        self.recorder.record(f"sheets.get:{worksheet_name}", started, time.perf_counter(), 0, 400, 0.0)
+        return size
+
+    @staticmethod
+    def _read(grid: list[list[str]], cell_range: str) -> list[list[str]]:
+        # Like the API: trailing empty cells and rows are omitted.
+        first_row, first_col, last_row, last_col = parse_a1(cell_range)
+        end = len(grid) if last_row is None else min(len(grid), last_row + 1)
+        col_end = None if last_col is None else last_col + 1
+        values: list[list[str]] = []
+        for row in grid[first_row:end]:
+            cells = row[first_col:col_end]
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+class FakeSupabaseError(Exception):
+    pass
+
+
+class _Response:
+    def __init__(self, data: list[dict[str, Any]]) -> None:
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client: "FakeSupabaseClient", table: str) -> None:
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._payload: Any = None
+        self._columns = "*"
+        self._on_conflict: str | None = None
+        self._eq: list[tuple[str, str]] = []
+        self._lt: list[tuple[str, float]] = []
+        self._in: tuple[str, list[str]] | None = None
+        self._range: tuple[int, int] | None = None
+        self._order: str | None = None
+        self._limit: int | None = None
+
+    def select(self, columns: str = "*") -> "_Query":
+        self._op, self._columns = "select", columns
+        return self
+
+    def upsert(self, rows: list[dict[str, Any]], on_conflict: str = "") -> "_Query":
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def insert(self, rows: list[dict[str, Any]]) -> "_Query":
+        self._op, self._payload = "insert", rows
+        return self
+
+    def update(self, values: dict[str, Any]) -> "_Query":
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self) -> "_Query":
+        self._op = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        self._eq.append((column, str(value)))
+        return self
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        self._lt.append((column, float(value)))
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> "_Query":
+        self._in = (column, [str(value) for value in values])
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self._range = (start, end)
+        return self
+
+    def order(self, column: str) -> "_Query":
+        self._order = column
+        return self
+
+    def limit(self, count: int) -> "_Query":
+        self._limit = count
+        return self
+
+    def execute(self) -> _Response:
+        return self._client._execute(self)
+
+
+def _filters_match(row: dict[str, Any], query: _Query) -> bool:
+    if not all(str(row.get(column, "")) == value for column, value in query._eq):
+        return False
+    return all(row.get(column) is not None and float(row[column]) < value for column, value in query._lt)
+
+
+class FakeSupabaseClient:
+    # Duck-types the subset of supabase-py used by SupabaseSink. Each table is a dict keyed by
+    # its conflict column ("key" for the state table), like a primary key.
+
+    def __init__(self, recorder: CallRecorder | None = None, *, key_columns: dict[str, str] | None = None) -> None:
+        self.recorder = recorder or CallRecorder()
+        self.tables: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self._key_columns = dict(key_columns or {})
+        self._sorted_keys: dict[str, list[str]] = {}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def _key_column(self, table: str, fallback: str | None = None) -> str:
+        if table not in self._key_columns:
+            self._key_columns[table] = fallback or "key"
+        return self._key_columns[table]
+
+    def _execute(self, query: _Query) -> _Response:
+        started = time.perf_counter()
+        rows = self.tables[query._table]
+        key_column = self._key_column(query._table, query._on_conflict)
+        data: list[dict[str, Any]] = []
+
+        if query._op in {"upsert", "insert"}:
+            for record in query._payload:
+                key = str(record.get(key_column, ""))
+                if query._op == "insert" and key in rows:
+                    raise FakeSupabaseError('duplicate key value violates unique constraint (23505)')
+                rows[key] = {**rows.get(key, {}), **record}
+            self._sorted_keys.pop(query._table, None)
+        elif query._op == "delete" and (query._eq or query._lt):
+            for key in [key for key, row in rows.items() if _filters_match(row, query)]:
+                data.append(rows.pop(key))
+            self._sorted_keys.pop(query._table, None)
+        elif query._op == "delete":
+            column, values = query._in or (key_column, [])
+            if column == key_column:
+                for value in values:
+                    rows.pop(value, None)
+            else:
+                wanted = set(values)
+                for key in [key for key, row in rows.items() if str(row.get(column, "")) in wanted]:
+                    del rows[key]
+            self._sorted_keys.pop(query._table, None)
+        elif query._op == "update":
+            for key, row in rows.items():
+                if _filters_match(row, query):
+                    row.update(query._payload)
+                    data.append(dict(row))
+        else:
+            data = self._select(query, rows, key_column)
+
+        measured = time.perf_counter()
+        request_bytes = records_size(query._payload) if query._op in {"upsert", "insert"} else 200
+        response_bytes = records_size(data)
+        finished = time.perf_counter()
+        self.recorder.record(
+            f"supabase.{query._op}:{query._table}",
+            started,
+            finished,
+            request_bytes,
+            response_bytes,
+            finished - measured,
+        )
+        return _Response(data)
+
+    def _select(self, query: _Query, rows: dict[str, dict[str, Any]], key_column: str) -> list[dict[str, Any]]:
+        if query._eq:
+            matched = [row for row in rows.values() if all(str(row.get(c, "")) == v for c, v in query._eq)]
+        elif query._order == key_column:
+            keys = self._sorted_keys.get(query._table)
+            if keys is None:
+                keys = self._sorted_keys[query._table] = sorted(rows)
+            start, end = query._range or (0, len(keys) - 1)
+            matched = [rows[key] for key in keys[start : end + 1]]
+            query._range = None
+        else:
+            matched = list(rows.values())
+            if query._order:
+                matched.sort(key=lambda row: str(row.get(query._order, "")))
+        if query._range:
+            matched = matched[query._range[0] : query._range[1] + 1]
+        if query._limit is not None:
+            matched = matched[: query._limit]
+        if query._columns.strip() == "*":
+            return [dict(row) for row in matched]
+        columns = [column.strip() for column in query._columns.split(",")]
+        return [{column: row.get(column) for column in columns} for row in matched]
@@ -0,0 +1,144 @@
+"""Per-message SeaTalk send latency: a new httpx.AsyncClient per call vs the pooled SeaTalkClient.
+
+Both modes send the same group text messages to the local SeaTalk stub from
+``benchmarks.fake_servers`` (token fetched once up front, as in production):
+
+- ``per_call``: the previous behaviour, ``async with httpx.AsyncClient()`` around every post,
+  so each message pays a new TCP (and, with ``--certfile``, TLS) handshake
+- ``pooled``: ``SeaTalkClient.send_group_text_message`` over its persistent pool
+
+Reports mean/p50/p95/p99 latency in ms and the number of TCP connections the stub saw.
+``--latency-ms`` adds server-side delay per request. Handshake cost is small on loopback
+without TLS; pass a self-signed ``--certfile``/``--keyfile`` for a closer match to
+openapi.seatalk.io, e.g.:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=127.0.0.1 \
+        -addext subjectAltName=IP:127.0.0.1 -keyout key.pem -out cert.pem
+
+Both clients trust that certificate through ``SSL_CERT_FILE``. The stub runs on uvicorn, which
+only speaks HTTP/1.1, so SEATALK_HTTP2 cannot be measured here.
+
+Usage:
+    python -m benchmarks.seatalk_latency [--messages 200] [--concurrency 1] [--certfile cert.pem --keyfile key.pem]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from app.config import Settings
+from app.seatalk.client import SeaTalkClient
+from benchmarks.fake_servers import FaultConfig, FaultInjector, create_seatalk_app, serve_in_thread
+
+_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def _per_call_send(client: SeaTalkClient, base_url: str, group_id: str, content: str) -> None:
+    token = await client.get_token()
+    payload = {"group_id": group_id, "message": {"tag": "text", "text": {"format": 1, "content": content}}}
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    async with httpx.AsyncClient(timeout=15.0) as http:
+        response = await http.post(f"{base_url}/messaging/v2/group_chat", headers=headers, json=payload)
+        response.raise_for_status()
+
+
+async def _run_mode(mode: str, settings: Settings, app, base_url: str, args: argparse.Namespace) -> dict:
+    client = SeaTalkClient(settings)
+    await client.start()
+    await client.get_token()
+    app.state.connections.clear()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def send(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            if mode == "per_call":
+                await _per_call_send(client, base_url, "bench-group", f"message {index}")
+            else:
+                await client.send_group_text_message("bench-group", f"message {index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(index) for index in range(args.messages)))
+    wall = time.perf_counter() - started
+    await client.aclose()
+    return {
+        "mode": mode,
+        "messages": args.messages,
+        "wall_seconds": round(wall, 4),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "connections": len(app.state.connections),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    logging.disable(logging.INFO)
+    app = create_seatalk_app(FaultInjector(FaultConfig(latency_ms=args.latency_ms)))
+    ssl = {}
+    if args.certfile:
+        ssl = {"ssl_certfile": args.certfile, "ssl_keyfile": args.keyfile}
+        os.environ["SSL_CERT_FILE"] = str(Path(args.certfile).resolve())
+    server, base_url = serve_in_thread(app, **ssl)
+    settings = Settings(
+        SEATALK_APP_ID="bench",
+        SEATALK_APP_SECRET="bench",
+        SEATALK_API_BASE_URL=base_url,
+    )
+    try:
+        results = [asyncio.run(_run_mode(mode, settings, app, base_url, args)) for mode in ("per_call", "pooled")]
+    finally:
+        server.should_exit = True
+    return {
+        "benchmark": "seatalk_latency",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tls": bool(args.certfile),
+        "concurrency": args.concurrency,
+        "server_latency_ms": args.latency_ms,
+        "results": results,
+    }
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seatalk_latency")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="server-side delay per request")
+    parser.add_argument("--certfile", default=None, help="serve the stub over TLS with this certificate")
+    parser.add_argument("--keyfile", default=None)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = args.output or _RESULTS_DIR / f"seatalk_latency-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"{'mode':<9} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'conns':>6}")
+    for item in report["results"]:
+        print(
+            f"{item['mode']:<9} {item['mean_ms']:>8.2f} {item['p50_ms']:>8.2f} "
+            f"{item['p95_ms']:>8.2f} {item['p99_ms']:>8.2f} {item['connections']:>6}"
+        )
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,205 @@
+"""Shipment lookups served from the in-process ShipmentIndex.
+
+- ``index``: ``get`` by shipment_id and filtered ``query`` pages per second on one core, against
+  a linear scan of the synced StuckupTable (what a lookup without indexes has to do), plus the
+  cost of applying a sync diff incrementally versus rebuilding the index.
+- ``http``: GET /stuckup/shipments/{id} and filtered GET /stuckup/shipments through a real
+  uvicorn server with one keep-alive client, both in this process (so they share one core).
+  The client is ``http.client`` to keep its own overhead small.
+
+Usage:
+    python -m benchmarks.shipment_lookup [--rows 100000] [--lookups 20000] [--churn 0.01] [--output PATH]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+from app.workflows.stuckup.diff import diff_tables
+from app.workflows.stuckup.index import ShipmentIndex, _normalize
+from app.workflows.stuckup.table import StuckupTable
+from benchmarks.stuckup_table_memory import _HEADERS, _STATUSES, synthetic_rows
+
+_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_KEY = "shipment_id"
+
+
+def _rate(count: int, elapsed: float) -> float:
+    return round(count / elapsed, 1) if elapsed else 0.0
+
+
+def _scan_get(table: StuckupTable, shipment_id: str) -> dict[str, str] | None:
+    for idx, value in enumerate(table.column(_KEY)):
+        if value.strip() == shipment_id:
+            return dict(zip(table.column_names, (table.column(name)[idx] for name in table.column_names)))
+    return None
+
+
+def _scan_query(table: StuckupTable, filters: dict[str, str], limit: int) -> list[str]:
+    columns = [(table.column(name), _normalize(value)) for name, value in filters.items()]
+    keys = [key for idx, key in enumerate(table.column(_KEY)) if all(_normalize(column[idx]) == value for column, value in columns)]
+    return sorted(keys)[:limit]
+
+
+def _filters(rng: random.Random, count: int) -> list[dict[str, str]]:
+    return [
+        {"hub_dest_station_name": f"hub {rng.randrange(400)}", "status_desc": rng.choice(_STATUSES)} for _ in range(count)
+    ]
+
+
+def run_index(rows: int, lookups: int, churn: float) -> dict[str, Any]:
+    rng = random.Random(11)
+    table = StuckupTable.from_rows(_HEADERS, synthetic_rows(rows))
+    index = ShipmentIndex(_KEY)
+
+    started = time.perf_counter()
+    index.apply(table, diff_tables(None, table, _KEY))
+    rebuild_ms = (time.perf_counter() - started) * 1000
+
+    ids = [f"SPXPH{rng.randrange(rows):012d}" for _ in range(lookups)]
+    started = time.perf_counter()
+    for shipment_id in ids:
+        index.get(shipment_id)
+    get_rate = _rate(lookups, time.perf_counter() - started)
+
+    filters = _filters(rng, lookups)
+    started = time.perf_counter()
+    for item in filters:
+        index.query(item, limit=50)
+    query_rate = _rate(lookups, time.perf_counter() - started)
+
+    scans = max(1, min(lookups, 200_000 // max(1, rows) * 10))
+    started = time.perf_counter()
+    for shipment_id in ids[:scans]:
+        _scan_get(table, shipment_id)
+    scan_get_rate = _rate(scans, time.perf_counter() - started)
+    started = time.perf_counter()
+    for item in filters[:scans]:
+        _scan_query(table, item, 50)
+    scan_query_rate = _rate(scans, time.perf_counter() - started)
+
+    # A sync where `churn` of the rows changed status, 1/3 as many were delivered and as many are new.
+    changed = max(1, int(rows * churn))
+    next_rows = synthetic_rows(rows)
+    for row in rng.sample(next_rows, changed):
+        row[4] = rng.choice([status for status in _STATUSES if status != row[4]])
+    del next_rows[: changed // 3]
+    template = next_rows[0]
+    for idx in range(changed // 3):
+        row = list(template)
+        row[2] = f"SPXPH{rows + idx:012d}"
+        next_rows.append(row)
+    next_table = StuckupTable.from_rows(_HEADERS, next_rows)
+    diff = diff_tables(table, next_table, _KEY)
+    started = time.perf_counter()
+    index.apply(next_table, diff)
+    incremental_ms = (time.perf_counter() - started) * 1000
+    assert index.get_status()["rows"] == len(next_table)
+
+    return {
+        "rows": rows,
+        "lookups": lookups,
+        "get_per_second": get_rate,
+        "query_per_second": query_rate,
+        "scan_get_per_second": scan_get_rate,
+        "scan_query_per_second": scan_query_rate,
+        "rebuild_ms": round(rebuild_ms, 2),
+        "diff_rows": len(diff.upsert_keys) + len(diff.removed),
+        "incremental_apply_ms": round(incremental_ms, 2),
+    }
+
+
+def run_http(rows: int, lookups: int) -> dict[str, Any]:
+    os.environ.update(
+        {
+            "SEATALK_APP_ID": "bench",
+            "SEATALK_APP_SECRET": "bench",
+            "STUCKUP_AUTO_SYNC_ENABLED": "false",
+            "SEATALK_GROUP_REGISTRY": "memory",
+        }
+    )
+    from app.config import get_settings
+    from benchmarks.fake_servers import serve_in_thread
+
+    get_settings.cache_clear()
+    import app.main as main
+
+    table = StuckupTable.from_rows(_HEADERS, synthetic_rows(rows))
+    main.stuckup_monitor.shipments.apply(table, diff_tables(None, table, _KEY))
+    server, url = serve_in_thread(main.app)
+    rng = random.Random(13)
+    results: dict[str, Any] = {"rows": rows, "lookups": lookups}
+    address = urlsplit(url)
+    client = http.client.HTTPConnection(address.hostname, address.port)
+    requests = {
+        "get": [f"/stuckup/shipments/SPXPH{rng.randrange(rows):012d}" for _ in range(lookups)],
+        "query": [f"/stuckup/shipments?{urlencode({**item, 'limit': 50})}" for item in _filters(rng, lookups)],
+    }
+    try:
+        for name, paths in requests.items():
+            latencies: list[float] = []
+            started = time.perf_counter()
+            for path in paths:
+                sent = time.perf_counter()
+                client.request("GET", path)
+                response = client.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"GET {path} returned {response.status}")
+                latencies.append(time.perf_counter() - sent)
+            elapsed = time.perf_counter() - started
+            latencies.sort()
+            results[f"{name}_per_second"] = _rate(len(paths), elapsed)
+            results[f"{name}_p50_ms"] = round(statistics.median(latencies) * 1000, 3)
+            results[f"{name}_p99_ms"] = round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3)
+    finally:
+        client.close()
+        server.should_exit = True
+    return results
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.shipment_lookup")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--http-lookups", type=int, default=5_000)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    report = {
+        "benchmark": "shipment_lookup",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "index": run_index(args.rows, args.lookups, args.churn),
+        "http": run_http(args.rows, args.http_lookups),
+    }
+    output = args.output or _RESULTS_DIR / f"shipment_lookup-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    index, http = report["index"], report["http"]
+    print(f"rows={index['rows']}")
+    print(f"index get/s      {index['get_per_second']:>12.0f}   scan {index['scan_get_per_second']:>10.1f}")
+    print(f"index query/s    {index['query_per_second']:>12.0f}   scan {index['scan_query_per_second']:>10.1f}")
+    print(f"rebuild          {index['rebuild_ms']:>10.1f}ms   incremental ({index['diff_rows']} rows) {index['incremental_apply_ms']:.1f}ms")
+    print(f"http get/s       {http['get_per_second']:>12.0f}   p50 {http['get_p50_ms']:.2f}ms p99 {http['get_p99_ms']:.2f}ms")
+    print(f"http query/s     {http['query_per_second']:>12.0f}   p50 {http['query_p50_ms']:.2f}ms p99 {http['query_p99_ms']:.2f}ms")
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
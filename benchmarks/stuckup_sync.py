@@ -0,0 +1,221 @@
+"""End-to-end StuckupService.sync_source_sheet_to_supabase benchmark on synthetic data.
+
+Each size runs in a fresh process (so peak RSS is per size) against the in-memory fakes in
+``benchmarks.fakes``, through three scenarios:
+
+- ``initial``: empty Supabase and target sheet, full upsert + export
+- ``unchanged``: same source again (hash fast path)
+- ``changed``: 1% of rows edited in exported columns, 0.5% removed, 0.5% appended
+
+Per scenario it reports wall time, peak RSS so far, and per-stage API calls, approximate
+JSON bytes and time (``lead_seconds`` is the local compute before each call). Results are
+written as JSON; ``--compare`` prints wall-time ratios against an earlier result file.
+
+Usage:
+    python -m benchmarks.stuckup_sync [rows ...] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+from app.config import Settings
+from app.workflows.stuckup.service import StuckupService
+from benchmarks.fakes import CallRecorder, FakeSheets, FakeSupabaseClient
+from benchmarks.stuckup_table_memory import _HEADERS, synthetic_rows
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_DEFAULT_SIZES = [1_000, 10_000, 100_000, 500_000]
+_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_SOURCE_ID = "bench-source"
+_TARGET_ID = "bench-target"
+
+
+def _settings() -> Settings:
+    return Settings(
+        SEATALK_APP_ID="bench",
+        SEATALK_APP_SECRET="bench",
+        STUCKUP_SOURCE_SPREADSHEET_ID=_SOURCE_ID,
+        STUCKUP_TARGET_SPREADSHEET_ID=_TARGET_ID,
+        STUCKUP_BACKUP_ENABLED=False,
+        SUPABASE_URL="",
+        SUPABASE_SERVICE_ROLE_KEY="",
+    )
+
+
+def build_service(source_rows: list[list[str]]) -> tuple[StuckupService, FakeSheets, FakeSupabaseClient, CallRecorder]:
+    settings = _settings()
+    recorder = CallRecorder()
+    sheets = FakeSheets(recorder)
+    sheets.add_worksheet(_SOURCE_ID, settings.stuckup_source_worksheet_name, [list(_HEADERS), *source_rows])
+    sheets.add_worksheet(_TARGET_ID, settings.stuckup_target_worksheet_name)
+    sheets.add_worksheet(_TARGET_ID, settings.stuckup_log_worksheet_name)
+    sheets.add_worksheet(_TARGET_ID, "dashboard_summary")
+
+    supabase = FakeSupabaseClient(
+        recorder,
+        key_columns={
+            settings.supabase_stuckup_table: settings.supabase_stuckup_conflict_column,
+            settings.supabase_stuckup_state_table: "key",
+        },
+    )
+    service = StuckupService(settings, sheets=sheets)  # type: ignore[arg-type]
+    # Point the real sink (batching, paging, state keys) at the in-memory client.
+    service._supabase._client = supabase  # type: ignore[assignment]
+    service._supabase._enabled = True
+    return service, sheets, supabase, recorder
+
+
+def _change_source(grid: list[list[str]], seed: int = 11) -> None:
+    rng = random.Random(seed)
+    data_rows = len(grid) - 1
+    hub_col = _HEADERS.index("hub_dest_station_name")
+    ts_col = _HEADERS.index("status_timestamp")
+    for idx in rng.sample(range(1, len(grid)), max(1, data_rows // 100)):
+        grid[idx] = list(grid[idx])
+        grid[idx][hub_col] = f"Moved Hub {idx % 17}"
+        grid[idx][ts_col] = "2026-03-01 08:00:00"
+    removed = set(rng.sample(range(1, len(grid)), max(1, data_rows // 200)))
+    grid[:] = [row for idx, row in enumerate(grid) if idx not in removed]
+    appended = synthetic_rows(max(1, data_rows // 200), seed=seed)
+    for offset, row in enumerate(appended):
+        row[_HEADERS.index("shipment_id")] = f"SPXNEW{offset:010d}"
+        # Appended rows must pass the status filter to show up downstream.
+        row[_HEADERS.index("status_desc")] = "SOC_Staging"
+    grid.extend(appended)
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1_048_576 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_scenario(name: str, service: StuckupService, recorder: CallRecorder) -> dict:
+    recorder.reset()
+    started = time.perf_counter()
+    result = service.sync_source_sheet_to_supabase()
+    wall = time.perf_counter() - started - recorder.overhead_seconds
+    stages = recorder.snapshot()
+    for entry in stages.values():
+        entry["seconds"] = round(entry["seconds"], 6)
+        entry["lead_seconds"] = round(entry["lead_seconds"], 6)
+    return {
+        "scenario": name,
+        "status": result.status,
+        "message": result.message,
+        "source_rows": result.source_rows,
+        "upserted_rows": result.upserted_rows,
+        "exported_rows": result.exported_rows,
+        "wall_seconds": round(wall, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "api_calls": sum(int(entry["calls"]) for entry in stages.values()),
+        "request_bytes": sum(int(entry["request_bytes"]) for entry in stages.values()),
+        "response_bytes": sum(int(entry["response_bytes"]) for entry in stages.values()),
+        "stages": stages,
+    }
+
+
+def run_size(rows: int) -> dict:
+    logging.disable(logging.INFO)
+    baseline_rss = _peak_rss_mb()
+    service, sheets, _, recorder = build_service(synthetic_rows(rows))
+    source_grid = sheets.grid(_SOURCE_ID, service._settings.stuckup_source_worksheet_name)
+    scenarios = [_run_scenario("initial", service, recorder), _run_scenario("unchanged", service, recorder)]
+    _change_source(source_grid)
+    scenarios.append(_run_scenario("changed", service, recorder))
+    service.close()
+    return {"rows": rows, "baseline_rss_mb": baseline_rss, "scenarios": scenarios}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list[int], *, isolate: bool = True) -> dict:
+    results = []
+    for rows in sizes:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results.append(pool.submit(run_size, rows).result())
+        else:
+            results.append(run_size(rows))
+    return {
+        "benchmark": "stuckup_sync",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: dict, previous: dict) -> list[str]:
+    before = {(item["rows"], s["scenario"]): s for item in previous.get("results", []) for s in item["scenarios"]}
+    lines = []
+    for item in current["results"]:
+        for scenario in item["scenarios"]:
+            old = before.get((item["rows"], scenario["scenario"]))
+            if not old or not old["wall_seconds"]:
+                continue
+            ratio = scenario["wall_seconds"] / old["wall_seconds"]
+            lines.append(
+                f"{item['rows']:>8} {scenario['scenario']:<10} {old['wall_seconds']:>9.3f}s -> "
+                f"{scenario['wall_seconds']:>9.3f}s ({ratio:.2f}x), calls {old['api_calls']} -> {scenario['api_calls']}"
+            )
+    return lines
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stuckup_sync")
+    parser.add_argument("rows", nargs="*", type=int, default=_DEFAULT_SIZES)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--in-process", action="store_true", help="skip the per-size subprocess (RSS is then cumulative)")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, isolate=not args.in_process)
+    output = args.output or _RESULTS_DIR / f"stuckup_sync-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"{'rows':>8} {'scenario':<10} {'wall s':>9} {'RSS MB':>8} {'calls':>6} {'sent MB':>8} {'recv MB':>8}")
+    for item in report["results"]:
+        for scenario in item["scenarios"]:
+            print(
+                f"{item['rows']:>8} {scenario['scenario']:<10} {scenario['wall_seconds']:>9.3f} "
+                f"{scenario['peak_rss_mb'] or 0:>8.1f} {scenario['api_calls']:>6} "
+                f"{scenario['request_bytes'] / 1_048_576:>8.2f} {scenario['response_bytes'] / 1_048_576:>8.2f}"
+            )
+    print(f"results written to {output}")
+    if args.compare:
+        for line in compare(report, json.loads(args.compare.read_text(encoding="utf-8"))):
+            print(line)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
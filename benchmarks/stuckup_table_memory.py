@@ -0,0 +1,95 @@
+"""Compare retained memory of dict-per-row records against StuckupTable.
+
+Usage:
+    python -m benchmarks.stuckup_table_memory [rows ...]
+"""
+
+import gc
+import random
+import sys
+import tracemalloc
+
+from app.workflows.stuckup.table import StuckupTable
+
+_HEADERS = [
+    "journey_type", "spx_station_site", "shipment_id", "status_group", "status_desc", "business_id",
+    "business_name", "soc8_transfer_staging", "status_timestamp", "ageing_bucket", "lh_arrival_ts", "queue_ts",
+    "next_destination_name", "sla_tag", "sla_text", "asm_reject_reason", "hub_dest_station_name",
+    "return_station_name", "mm_type", "hub_region", "cluster_name", "last_to_number",
+    "content_dest_station_name", "last_unsuccessful_log_operator", "ctime", "fms_last_update_time",
+    "last_run_time", "destination_region", "cogs", "handover_task_id", "workstation_id", "workstation_name",
+    "lh_trip", "last_operator", "day", "ageing_bucket_2", "operator", "hv",
+]
+_STATUSES = ["SOC_Packed", "SOC_Packing", "SOC_Staging", "SOC_LHTransported", "SOC_LHTransporting"]
+_REGIONS = ["NCR", "SOL", "NOL", "VIS", "MIN"]
+
+
+def synthetic_rows(count: int, seed: int = 7) -> list[list[str]]:
+    rng = random.Random(seed)
+    hubs = [f"Hub {idx}" for idx in range(400)]
+    clusters = [f"Cluster {idx}" for idx in range(60)]
+    operators = [f"ops{idx}@example.com" for idx in range(200)]
+    rows: list[list[str]] = []
+    for idx in range(count):
+        row = [f"v{col % 7}" for col in range(len(_HEADERS))]
+        row[2] = f"SPXPH{idx:012d}"
+        row[4] = rng.choice(_STATUSES)
+        row[8] = f"2026-02-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+        row[9] = rng.choice(["0-1 day", "1-2 days", "2-3 days", ">3 days"])
+        row[16] = rng.choice(hubs)
+        row[19] = rng.choice(_REGIONS)
+        row[20] = rng.choice(clusters)
+        row[33] = rng.choice(operators)
+        rows.append(row)
+    return rows
+
+
+def _measure(template: list[list[str]], build) -> int:
+    # Cells returned by the Sheets API are distinct string objects, so copy them per run and
+    # count whatever the representation keeps alive once the raw rows are dropped.
+    gc.collect()
+    tracemalloc.start()
+    rows = [[cell.encode("utf-8").decode("utf-8") for cell in row] for row in template]
+    result = build(rows)
+    del rows
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def _as_records(rows: list[list[str]]) -> list[dict[str, str]]:
+    # Mirrors the previous StuckupService record construction.
+    records: list[dict[str, str]] = []
+    for row in rows:
+        records.append({name: row[idx] if idx < len(row) else "" for idx, name in enumerate(_HEADERS)})
+    return records
+
+
+def run(count: int) -> dict[str, float]:
+    template = synthetic_rows(count)
+    records_bytes = _measure(template, _as_records)
+    table_bytes = _measure(template, lambda rows: StuckupTable.from_rows(_HEADERS, rows))
+    return {
+        "rows": count,
+        "records_mb": records_bytes / 1_048_576,
+        "table_mb": table_bytes / 1_048_576,
+        "records_bytes_per_row": records_bytes / count,
+        "table_bytes_per_row": table_bytes / count,
+    }
+
+
+def main(argv: list[str]) -> None:
+    counts = [int(arg) for arg in argv] or [100_000, 500_000]
+    print(f"{'rows':>8} {'records MB':>11} {'table MB':>9} {'B/row before':>13} {'B/row after':>12}")
+    for count in counts:
+        stats = run(count)
+        print(
+            f"{stats['rows']:>8} {stats['records_mb']:>11.1f} {stats['table_mb']:>9.1f} "
+            f"{stats['records_bytes_per_row']:>13.0f} {stats['table_bytes_per_row']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -48,3 +48,20 @@ create table if not exists stuckup_sync_state (
   value text not null,
   updated_at timestamptz not null default now()
 );
+
+-- SeaTalk callback event_ids already claimed by a worker (shared dedup of redeliveries)
+create table if not exists seatalk_callback_events (
+  event_id text primary key,
+  expires_at double precision not null,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists seatalk_callback_events_expires_at_idx
+  on seatalk_callback_events (expires_at);
+
+-- SeaTalk groups the bot was added to (targets for broadcasts)
+create table if not exists seatalk_groups (
+  group_id text primary key,
+  group_name text,
+  added_at double precision not null
+);
@@ -9,13 +9,20 @@ const CFG = {
   maxImageBytes: 5 * 1024 * 1024,
   textTemplate: "Outbound Stuck at SOC_Staging Stuckup Validation Report {date}",
   dateFormat: "yyyy-MM-dd",
-  stateKey: "dashboard_alert_last_trigger_value"
+  stateKey: "dashboard_alert_last_trigger_value",
+  // Optional push to the Python server (POST /stuckup/trigger). Leave the URL empty to disable.
+  // The signing secret is read from the script property STUCKUP_TRIGGER_SECRET.
+  stuckupTriggerUrl: "",
+  stuckupTriggerSource: "dashboard_export",
+  stuckupTriggerPipeline: "",
+  stuckupWatchSheets: []
 };
 
 function onEdit(e) {
   // Installable onEdit trigger is required (simple trigger won't have full auth).
   if (!e || !e.range) return;
   const sheet = e.range.getSheet();
+  notifyStuckupTrigger_(sheet.getName(), e.range.getA1Notation());
   if (sheet.getName() !== CFG.triggerSheet) return;
   if (e.range.getA1Notation() !== CFG.triggerCell) return;
   processDashboardTrigger_();
@@ -54,6 +61,49 @@ function processDashboardTrigger_() {
   props.setProperty(CFG.stateKey, current);
 }
 
+function notifyStuckupTrigger_(sheetName, a1Range) {
+  // Tells the server that watched data changed; it debounces bursts of edits into one sync.
+  if (!CFG.stuckupTriggerUrl) return;
+  if (CFG.stuckupWatchSheets.length && CFG.stuckupWatchSheets.indexOf(sheetName) === -1) return;
+  const secret = PropertiesService.getScriptProperties().getProperty("STUCKUP_TRIGGER_SECRET");
+  if (!secret) {
+    console.warn("STUCKUP_TRIGGER_SECRET script property is missing; stuckup trigger not sent");
+    return;
+  }
+
+  const body = JSON.stringify({
+    source: CFG.stuckupTriggerSource,
+    pipeline: CFG.stuckupTriggerPipeline || null,
+    sheet: sheetName,
+    range: a1Range
+  });
+  const timestamp = String(Math.floor(Date.now() / 1000));
+  const signature = toHex_(Utilities.computeHmacSha256Signature(timestamp + "." + body, secret));
+
+  try {
+    const resp = UrlFetchApp.fetch(CFG.stuckupTriggerUrl, {
+      method: "post",
+      contentType: "application/json",
+      payload: body,
+      headers: { "X-Stuckup-Timestamp": timestamp, "X-Stuckup-Signature": signature },
+      muteHttpExceptions: true
+    });
+    console.log("stuckup trigger http=%s body=%s", resp.getResponseCode(), resp.getContentText());
+  } catch (err) {
+    // Never block the dashboard flow; the server's scheduled probe is the fallback.
+    console.warn("stuckup trigger failed: %s", err);
+  }
+}
+
+function toHex_(bytes) {
+  return bytes
+    .map(function (b) {
+      const v = (b < 0 ? b + 256 : b).toString(16);
+      return v.length === 1 ? "0" + v : v;
+    })
+    .join("");
+}
+
 function testSendTextAndImageNow_() {
   // Manual test helper: sends text + image immediately.
   const ss = SpreadsheetApp.getActiveSpreadsheet();
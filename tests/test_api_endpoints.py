@@ -1,9 +1,12 @@
 import hashlib
 import importlib
 import json
+import time
 
 from fastapi.testclient import TestClient
 
+from app.workflows.stuckup.trigger import compute_trigger_signature
+
 
 def _signature(body: bytes) -> str:
     return hashlib.sha256(body + b"test_signing_secret").hexdigest()
@@ -16,6 +19,7 @@ def _load_main(monkeypatch):
     monkeypatch.setenv("SEATALK_SIGNING_SECRET", "test_signing_secret")
     monkeypatch.setenv("SEATALK_VERIFY_SIGNATURE", "true")
     monkeypatch.setenv("STUCKUP_AUTO_SYNC_ENABLED", "false")
+    monkeypatch.setenv("SEATALK_GROUP_REGISTRY", "memory")
 
     import app.config as config
 
@@ -40,6 +44,7 @@ def _load_main_with_secrets(
     monkeypatch.setenv("SEATALK_SYSTEM_SIGNING_SECRETS", system_secrets_csv)
     monkeypatch.setenv("SEATALK_VERIFY_SIGNATURE", "true")
     monkeypatch.setenv("STUCKUP_AUTO_SYNC_ENABLED", "false")
+    monkeypatch.setenv("SEATALK_GROUP_REGISTRY", "memory")
 
     import app.config as config
 
@@ -74,6 +79,91 @@ def test_health_and_uptime(monkeypatch) -> None:
     assert body["reference_row"] == 2
 
 
+def test_stuckup_diff_before_first_sync(monkeypatch) -> None:
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+
+    r = client.get("/stuckup/diff", params={"limit": 10})
+    assert r.status_code == 200
+    assert r.json() == {"diff": None, "history": []}
+
+
+def test_stuckup_pipelines_endpoints(monkeypatch) -> None:
+    monkeypatch.setenv("STUCKUP_PIPELINES", '[{"name": "soc5"}, {"name": "soc8"}]')
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+
+    r1 = client.get("/stuckup/pipelines")
+    assert r1.status_code == 200
+    assert [item["pipeline"] for item in r1.json()["pipelines"]] == ["soc5", "soc8"]
+
+    r2 = client.get("/stuckup/status", params={"pipeline": "soc8"})
+    assert r2.status_code == 200
+    assert r2.json()["pipeline"] == "soc8"
+
+    r3 = client.get("/stuckup/diff", params={"pipeline": "missing"})
+    assert r3.status_code == 404
+
+
+def test_stuckup_shipment_endpoints(monkeypatch) -> None:
+    from app.workflows.stuckup.diff import diff_tables
+    from app.workflows.stuckup.table import StuckupTable
+
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+
+    r1 = client.get("/stuckup/shipments/SPX1")
+    assert r1.status_code == 503
+
+    table = StuckupTable.from_rows(
+        ["shipment_id", "status_desc", "hub_region"],
+        [["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "VIS"], ["SPX3", "SOC_Packed", "NCR"]],
+    )
+    main.stuckup_monitor.shipments.apply(table, diff_tables(None, table, "shipment_id"))
+
+    r2 = client.get("/stuckup/shipments/SPX2")
+    assert r2.status_code == 200
+    assert r2.json()["shipment"]["hub_region"] == "VIS"
+    assert client.get("/stuckup/shipments/SPX9").status_code == 404
+
+    r3 = client.get("/stuckup/shipments", params={"status_desc": "soc_packed", "limit": 1, "offset": 1})
+    assert r3.status_code == 200
+    assert r3.json()["total"] == 2
+    assert [item["shipment_id"] for item in r3.json()["items"]] == ["SPX3"]
+    assert client.get("/stuckup/shipments", params={"limit": 0}).status_code == 422
+
+
+def test_stuckup_trigger_endpoint(monkeypatch) -> None:
+    monkeypatch.setenv("STUCKUP_TRIGGER_SECRET", "trigger_secret")
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+
+    body = b'{"source":"apps_script","sheet":"raw"}'
+    timestamp = str(int(time.time()))
+    headers = {
+        "content-type": "application/json",
+        "x-stuckup-timestamp": timestamp,
+        "x-stuckup-signature": compute_trigger_signature("trigger_secret", timestamp, body),
+    }
+
+    r1 = client.post("/stuckup/trigger", content=body, headers={**headers, "x-stuckup-signature": "bad"})
+    assert r1.status_code == 401
+
+    # Auto-sync is disabled in tests, so the monitor is not running.
+    r2 = client.post("/stuckup/trigger", content=body, headers=headers)
+    assert r2.status_code == 409
+    assert r2.json()["status"] == "not_running"
+
+
+def test_stuckup_trigger_disabled_without_secret(monkeypatch) -> None:
+    monkeypatch.setenv("STUCKUP_TRIGGER_SECRET", "")
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+
+    r = client.post("/stuckup/trigger", json={"source": "apps_script"})
+    assert r.status_code == 404
+
+
 def test_event_verification_signature(monkeypatch) -> None:
     main = _load_main(monkeypatch)
     client = TestClient(main.app)
@@ -204,11 +294,13 @@ def test_group_mention_from_system_account_gets_group_reply(monkeypatch) -> None
     }
     body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
 
-    r = client.post(
-        "/callbacks/seatalk",
-        content=body,
-        headers={"content-type": "application/json", "signature": _signature(body)},
-    )
+    # The reply is sent from a background task; leaving the client drains it.
+    with client:
+        r = client.post(
+            "/callbacks/seatalk",
+            content=body,
+            headers={"content-type": "application/json", "signature": _signature(body)},
+        )
 
     assert r.status_code == 200
     assert r.json() == {"code": 0}
@@ -260,3 +352,179 @@ def test_bot_added_to_group_chat_sends_group_welcome(monkeypatch) -> None:
     assert sent["thread_id"] is None
     assert isinstance(sent.get("content"), str)
     assert "/stuckup" in (sent["content"] or "")
+
+
+def test_callback_acks_before_the_queued_reply_is_delivered(monkeypatch) -> None:
+    main = _load_main(monkeypatch)
+    sent: list[str] = []
+
+    async def _slow_send_group_text_message(group_id: str, content: str, *, thread_id: str | None = None):
+        import asyncio
+
+        await asyncio.sleep(0.5)
+        sent.append(group_id)
+        return {"code": 0}
+
+    monkeypatch.setattr(main.seatalk_client, "send_group_text_message", _slow_send_group_text_message)
+    payload = {
+        "event_id": "evt-5",
+        "event_type": "bot_added_to_group_chat",
+        "timestamp": 1,
+        "app_id": "app",
+        "event": {"group": {"group_id": "g_slow"}},
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    with TestClient(main.app) as client:
+        started = time.monotonic()
+        r = client.post(
+            "/callbacks/seatalk",
+            content=body,
+            headers={"content-type": "application/json", "signature": _signature(body)},
+        )
+        acked_after = time.monotonic() - started
+        queued = client.get("/seatalk/outbox").json()
+
+    assert r.json() == {"code": 0}
+    assert acked_after < 0.4
+    assert queued["running"] is True and queued["enqueued"] == 1
+    # Shutdown drains the outbox before the client pool closes.
+    assert sent == ["g_slow"]
+    assert main.seatalk_outbox.get_status()["sent"] == 1
+
+
+class _SlowReport:
+    async def handle(self, context):
+        import asyncio
+
+        from app.workflows.base import WorkflowResult
+
+        await asyncio.sleep(0.5)
+        return WorkflowResult(handled=True, response_text="report ready")
+
+
+def test_callback_acks_before_a_slow_workflow_finishes(monkeypatch) -> None:
+    from app.workflows.router import WorkflowRouter, WorkflowSpec
+
+    main = _load_main(monkeypatch)
+    router = WorkflowRouter(main.settings, commands=(WorkflowSpec(f"{__name__}:_SlowReport", ("/report",)),))
+    monkeypatch.setattr(main, "workflow_router", router)
+    sent: list[str] = []
+
+    async def _fake_send_text_message(employee_code: str, content: str, *, thread_id: str | None = None):
+        sent.append(content)
+        return {"code": 0}
+
+    monkeypatch.setattr(main.seatalk_client, "send_text_message", _fake_send_text_message)
+    payload = {
+        "event_id": "evt-8",
+        "event_type": "message_from_bot_subscriber",
+        "timestamp": 1,
+        "event": {"employee_code": "e_1", "message": {"message_id": "m_1", "tag": "text", "text": {"content": "/report"}}},
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    with TestClient(main.app) as client:
+        started = time.monotonic()
+        r = client.post(
+            "/callbacks/seatalk",
+            content=body,
+            headers={"content-type": "application/json", "signature": _signature(body)},
+        )
+        acked_after = time.monotonic() - started
+        in_flight = client.get("/workflows/status").json()["in_flight"]
+
+    assert r.json() == {"code": 0}
+    assert acked_after < 0.4
+    assert in_flight == 1
+    # Shutdown waits for the run, then drains its reply.
+    assert sent == ["report ready"]
+
+
+def test_redelivered_callback_is_acked_without_reprocessing(monkeypatch) -> None:
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+    sent: list[str] = []
+
+    async def _fake_send_group_text_message(group_id: str, content: str, *, thread_id: str | None = None):
+        sent.append(group_id)
+        return {"code": 0}
+
+    monkeypatch.setattr(main.seatalk_client, "send_group_text_message", _fake_send_group_text_message)
+    payload = {
+        "event_id": "evt-6",
+        "event_type": "bot_added_to_group_chat",
+        "timestamp": 1,
+        "app_id": "app",
+        "event": {"group": {"group_id": "g_1"}},
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    headers = {"content-type": "application/json", "signature": _signature(body)}
+
+    first = client.post("/callbacks/seatalk", content=body, headers=headers)
+    second = client.post("/callbacks/seatalk", content=body, headers=headers)
+
+    assert first.json() == {"code": 0}
+    assert second.json() == {"code": 0, "message": "duplicate event"}
+    assert sent == ["g_1"]
+    stats = client.get("/seatalk/dedup").json()
+    assert stats["local_hits"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_unknown_event_type_is_acked_before_dedup(monkeypatch) -> None:
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+    # The event body would not validate as a CallbackEvent; unhandled types are never parsed that far.
+    payload = {"event_id": "evt-7", "event_type": "user_left_group_chat", "timestamp": 1, "event": {"group_id": "g_1", "message": "left"}}
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    headers = {"content-type": "application/json", "signature": _signature(body)}
+
+    response = client.post("/callbacks/seatalk", content=body, headers=headers)
+
+    assert response.json() == {"code": 0, "message": "ignored event_type=user_left_group_chat"}
+    assert client.get("/seatalk/dedup").json()["checked"] == 0
+    stats = client.get("/seatalk/callbacks").json()
+    assert stats["ignored"] == {"user_left_group_chat": 1} and "bot_added_to_group_chat" in stats["event_types"]
+
+    known = json.dumps({**payload, "event_type": "bot_added_to_group_chat"}, separators=(",", ":")).encode("utf-8")
+    invalid = client.post("/callbacks/seatalk", content=known, headers={**headers, "signature": _signature(known)})
+    assert invalid.status_code == 400
+
+
+def test_broadcast_reaches_groups_the_bot_was_added_to(monkeypatch) -> None:
+    monkeypatch.setenv("SEATALK_BROADCAST_SECRET", "broadcast_secret")
+    main = _load_main(monkeypatch)
+    client = TestClient(main.app)
+    sent: list[tuple[str, str]] = []
+
+    async def _fake_send_group_text_message(group_id: str, content: str, *, thread_id: str | None = None):
+        sent.append((group_id, content))
+        return {"code": 0}
+
+    async def _fake_send_text_message(employee_code: str, content: str, *, thread_id: str | None = None):
+        raise RuntimeError("SeaTalk API error: code=3001, message=user not found")
+
+    monkeypatch.setattr(main.seatalk_client, "send_group_text_message", _fake_send_group_text_message)
+    monkeypatch.setattr(main.seatalk_client, "send_text_message", _fake_send_text_message)
+    for index, event_type in enumerate(["bot_added_to_group_chat", "bot_added_to_group_chat", "bot_removed_from_group_chat"]):
+        group_id = "g_2" if index == 2 else f"g_{index + 1}"
+        payload = {"event_id": f"evt-g{index}", "event_type": event_type, "event": {"group": {"group_id": group_id, "group_name": "Ops"}}}
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        client.post("/callbacks/seatalk", content=body, headers={"content-type": "application/json", "signature": _signature(body)})
+    assert [group["group_id"] for group in client.get("/seatalk/groups").json()["groups"]] == ["g_1"]
+    sent.clear()
+
+    body = json.dumps({"content": "stuckup alert", "all_groups": True, "employee_codes": ["E404"]}).encode("utf-8")
+    timestamp = str(int(time.time()))
+    headers = {
+        "content-type": "application/json",
+        "x-broadcast-timestamp": timestamp,
+        "x-broadcast-signature": compute_trigger_signature("broadcast_secret", timestamp, body),
+    }
+    assert client.post("/seatalk/broadcast", content=body, headers={**headers, "x-broadcast-signature": "bad"}).status_code == 401
+
+    report = client.post("/seatalk/broadcast", content=body, headers=headers).json()
+
+    assert sent == [("g_1", "stuckup alert")]
+    assert report["sent"] == 1 and report["failed"] == 1
+    assert {(result["recipient"], result["status"]) for result in report["results"]} == {("g_1", "sent"), ("E404", "failed")}
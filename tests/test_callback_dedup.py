@@ -0,0 +1,91 @@
+import asyncio
+
+from app.config import Settings
+from app.integrations.supabase_sink import SupabaseSink
+from app.seatalk import dedup as dedup_module
+from app.seatalk.dedup import CallbackDedup, SqliteDedupBackend, SupabaseDedupBackend
+from benchmarks.fakes import FakeSupabaseClient
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def _claims(dedup: CallbackDedup, *event_ids: str | None) -> list[bool]:
+    async def run() -> list[bool]:
+        return [await dedup.claim(event_id) for event_id in event_ids]
+
+    return asyncio.run(run())
+
+
+def test_memory_cache_expires_and_evicts(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(dedup_module.time, "time", clock.time)
+    dedup = CallbackDedup(None, ttl_seconds=60, max_entries=2)
+
+    assert _claims(dedup, "e1", "e1", "e2", None) == [True, False, True, True]
+    clock.now += 61
+    assert _claims(dedup, "e1") == [True]
+    _claims(dedup, "e3", "e4")  # evicts e1 (least recently used)
+    assert _claims(dedup, "e1") == [True]
+
+    status = dedup.get_status()
+    assert status["local_hits"] == 1 and status["misses"] == 6 and status["without_event_id"] == 1
+    assert status["entries"] == 2 and status["evicted"] == 3
+    assert status["hit_rate"] == round(1 / 7, 4)
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path, monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(dedup_module.time, "time", clock.time)
+    path = tmp_path / "events.sqlite3"
+    worker_a = CallbackDedup(SqliteDedupBackend(path), ttl_seconds=60, max_entries=100)
+    worker_b = CallbackDedup(SqliteDedupBackend(path), ttl_seconds=60, max_entries=100)
+
+    assert _claims(worker_a, "e1") == [True]
+    assert _claims(worker_b, "e1") == [False]
+    asyncio.run(worker_a.release("e1"))
+    assert _claims(worker_b, "e1") == [True]
+    clock.now += 61
+    assert _claims(worker_a, "e1") == [True]  # expired claim is taken over
+
+    assert worker_b.get_status()["shared_hits"] == 1
+    assert worker_a.get_status()["backend"] == "SqliteDedupBackend"
+
+
+def test_supabase_backend_claims_reclaims_and_purges() -> None:
+    settings = Settings(SEATALK_APP_ID="x", SEATALK_APP_SECRET="y", SUPABASE_URL="", SUPABASE_SERVICE_ROLE_KEY="")
+    sink = SupabaseSink(settings)
+    client = FakeSupabaseClient(key_columns={"seatalk_callback_events": "event_id"})
+    sink._client = client  # type: ignore[assignment]
+    sink._enabled = True
+    backend = SupabaseDedupBackend(sink)
+
+    assert backend.claim("e1", 60, now=1_000) is True
+    assert backend.claim("e1", 60, now=1_030) is False
+    assert backend.claim("e1", 60, now=1_061) is True
+    assert backend.claim("e2", 60, now=1_100) is True
+    backend.purge(now=1_150)
+
+    assert set(client.tables["seatalk_callback_events"]) == {"e2"}
+
+
+def test_backend_errors_fail_open() -> None:
+    class _BrokenBackend:
+        def claim(self, event_id: str, ttl_seconds: float, now: float) -> bool:
+            raise RuntimeError("database is locked")
+
+        def release(self, event_id: str) -> None:
+            pass
+
+        def purge(self, now: float) -> None:
+            pass
+
+    dedup = CallbackDedup(_BrokenBackend(), ttl_seconds=60, max_entries=10)
+
+    assert _claims(dedup, "e1", "e1") == [True, False]
+    assert dedup.get_status()["backend_errors"] == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.models.events import CallbackEnvelope, CallbackEvent
+from app.seatalk.callbacks import CallbackRegistry
+
+
+def _envelope(event_type: str, event: dict | None = None) -> CallbackEnvelope:
+    return CallbackEnvelope.model_validate({"event_id": "e1", "event_type": event_type, "event": event})
+
+
+def test_dispatch_passes_the_parsed_event_to_sync_and_async_handlers() -> None:
+    registry = CallbackRegistry()
+    seen: list[tuple[str, str | None]] = []
+
+    @registry.register("message_from_bot_subscriber")
+    async def on_message(envelope: CallbackEnvelope, event: CallbackEvent) -> None:
+        seen.append((envelope.event_type, event.message.text.plain_text))
+
+    @registry.register("interactive_message_click")
+    def on_click(envelope: CallbackEnvelope, event: CallbackEvent) -> None:
+        seen.append((envelope.event_type, event.value))
+
+    message = _envelope("message_from_bot_subscriber", {"message": {"text": {"plain_text": "hi"}}})
+    click = _envelope("interactive_message_click", {"value": "ok"})
+    assert isinstance(message.event, dict)
+
+    async def run() -> list[bool]:
+        return [await registry.dispatch(message), await registry.dispatch(click), await registry.dispatch(_envelope("user_left"))]
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert seen == [("message_from_bot_subscriber", "hi"), ("interactive_message_click", "ok")]
+    status = registry.get_status()
+    assert status["handled"] == {"message_from_bot_subscriber": 1, "interactive_message_click": 1}
+    assert status["ignored"] == {"user_left": 1}
+
+
+def test_handler_without_event_gets_an_empty_event() -> None:
+    registry = CallbackRegistry()
+    seen: list[CallbackEvent] = []
+    registry.register("user_enter_chatroom_with_bot")(lambda envelope, event: seen.append(event))
+
+    asyncio.run(registry.dispatch(_envelope("user_enter_chatroom_with_bot")))
+
+    assert seen == [CallbackEvent()]
+
+
+def test_duplicate_registration_is_rejected() -> None:
+    registry = CallbackRegistry()
+    registry.register("bot_added_to_group_chat")(lambda envelope, event: None)
+
+    with pytest.raises(ValueError, match="bot_added_to_group_chat"):
+        registry.register("bot_added_to_group_chat")(lambda envelope, event: None)
+    assert registry.handles("bot_added_to_group_chat") and not registry.handles("user_left")
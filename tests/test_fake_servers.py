@@ -0,0 +1,89 @@
+import httpx
+import pytest
+from googleapiclient.errors import HttpError
+
+from app.config import Settings
+from app.integrations.google_sheets import GoogleSheetsClient
+from app.integrations.supabase_sink import SupabaseSink
+from app.workflows.stuckup.service import StuckupService
+from benchmarks.fake_servers import (
+    add_target_spreadsheet,
+    create_postgrest_app,
+    create_sheets_app,
+    seed_source_sheet,
+    serve_in_thread,
+)
+from benchmarks.fakes import FakeSheets
+
+
+@pytest.fixture
+def fake_backends():
+    store = FakeSheets()
+    seed_source_sheet(store, "fake-source", "Source", 1100)
+    add_target_spreadsheet(store, "fake-target", ["Stuckup", "config", "dashboard_summary"])
+    sheets_app = create_sheets_app(store)
+    postgrest_app = create_postgrest_app()
+    sheets_server, sheets_url = serve_in_thread(sheets_app)
+    postgrest_server, postgrest_url = serve_in_thread(postgrest_app)
+    settings = Settings(
+        SEATALK_APP_ID="x",
+        SEATALK_APP_SECRET="y",
+        GOOGLE_SHEETS_API_ENDPOINT=f"{sheets_url}/",
+        SUPABASE_URL=postgrest_url,
+        SUPABASE_SERVICE_ROLE_KEY="fake.service.key",
+        STUCKUP_SOURCE_SPREADSHEET_ID="fake-source",
+        STUCKUP_TARGET_SPREADSHEET_ID="fake-target",
+        STUCKUP_BACKUP_ENABLED=False,
+    )
+    yield settings, sheets_app, postgrest_app, sheets_url
+    sheets_server.should_exit = True
+    postgrest_server.should_exit = True
+
+
+def test_sync_runs_end_to_end_against_the_fake_servers(fake_backends) -> None:
+    settings, sheets_app, postgrest_app, _ = fake_backends
+    service = StuckupService(settings)
+
+    first = service.sync_source_sheet_to_supabase()
+    second = service.sync_source_sheet_to_supabase()
+
+    assert first.status == "ok" and first.upserted_rows == 1100
+    assert second.status == "ok" and second.upserted_rows == 0
+    assert len(postgrest_app.state.store.rows["stuckup_shipments"]) == 1100
+    target = sheets_app.state.store.grid("fake-target", "Stuckup")
+    assert len(target) == 1101 and target[0][2] == "shipment_id"
+    # 1101 rows do not fit the default 1000-row grid, so a resize went through batchUpdate.
+    assert sheets_app.state.store.grid_sizes[("fake-target", "Stuckup")][0] == 1101
+
+
+def test_state_compare_and_set_follows_postgrest_conflicts(fake_backends) -> None:
+    settings = fake_backends[0]
+    sink = SupabaseSink(settings)
+
+    assert sink.insert_state_if_absent("lease", "a").status == "ok"
+    assert sink.insert_state_if_absent("lease", "b").status == "conflict"
+    assert sink.replace_state_if_equal("lease", "stale", "c").status == "conflict"
+    assert sink.replace_state_if_equal("lease", "a", "c").status == "ok"
+    assert sink.get_state("lease")[1] == "c"
+    assert sink.upsert_rows([{"shipment_id": "SPX1", "no_such_column": "x"}], "shipment_id").status == "error"
+    assert sink.claim_callback_event("evt-1", 160.0, 100.0).status == "ok"
+    assert sink.claim_callback_event("evt-1", 170.0, 110.0).status == "conflict"
+    assert sink.claim_callback_event("evt-1", 230.0, 170.0).status == "ok"
+    assert sink.purge_callback_events(300.0).status == "ok"
+    assert sink.claim_callback_event("evt-1", 400.0, 310.0).message == "event claimed"
+
+
+def test_injected_throttling_reaches_both_clients(fake_backends) -> None:
+    settings, sheets_app, postgrest_app, sheets_url = fake_backends
+    sheets_app.state.faults.update({"throttle_rate": 1.0, "retry_after_seconds": 7})
+    postgrest_app.state.faults.update({"throttle_rate": 1.0})
+
+    with pytest.raises(HttpError) as excinfo:
+        GoogleSheetsClient(settings).read_values("fake-source", "Source", "A1:C2")
+    assert excinfo.value.resp.status == 429
+    assert SupabaseSink(settings).get_state("anything")[0].status == "error"
+
+    response = httpx.get(f"{sheets_url}/v4/spreadsheets/fake-source/values/A1:B2")
+    assert response.status_code == 429 and response.headers["retry-after"] == "7"
+    stats = httpx.get(f"{sheets_url}/_fake/stats").json()
+    assert stats["faults"]["throttled"] == 2
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+
+from app.leader_election import LeaderElector, LeaseFence, LeaseLostError, MemoryLeaseBackend, SqliteLeaseBackend
+from app.scheduler import JobScheduler, ScheduledJob
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryLeaseBackend()
+    return SqliteLeaseBackend(tmp_path / "leases.sqlite3")
+
+
+def test_lease_is_exclusive_until_it_expires(backend) -> None:
+    first = backend.try_acquire("lease", "a", 30, now=1000.0)
+    assert first is not None and first.token == 1
+
+    assert backend.try_acquire("lease", "b", 30, now=1010.0) is None
+
+    renewed = backend.try_acquire("lease", "a", 30, now=1020.0)
+    assert renewed is not None and renewed.token == 1 and renewed.expires_at == 1050.0
+
+    # "a" stopped renewing: "b" takes over with a higher fencing token.
+    taken = backend.try_acquire("lease", "b", 30, now=1051.0)
+    assert taken is not None and taken.holder == "b" and taken.token == 2
+    assert backend.try_acquire("lease", "a", 30, now=1052.0) is None
+
+
+def test_released_lease_can_be_taken_immediately(backend) -> None:
+    backend.try_acquire("lease", "a", 30, now=1000.0)
+    backend.release("lease", "b")
+    assert backend.try_acquire("lease", "b", 30, now=1001.0) is None
+
+    backend.release("lease", "a")
+    taken = backend.try_acquire("lease", "b", 30, now=1001.0)
+    assert taken is not None and taken.token == 2
+
+
+def test_fence_fails_once_the_lease_moves_on(backend) -> None:
+    backend.try_acquire("lease", "a", 30, now=time.time())
+    fence = LeaseFence(backend, "lease", "a", token=1)
+    fence.check()
+
+    backend.try_acquire("lease", "b", 30, now=time.time() + 31)
+    with pytest.raises(LeaseLostError):
+        fence.check()
+    with pytest.raises(LeaseLostError):
+        LeaseFence(backend, "lease", "b", token=1).check()  # same holder, older token
+    LeaseFence(backend, "lease", "b", token=2).check()
+
+
+def test_only_one_elector_leads_and_leadership_moves_on_stop() -> None:
+    backend = MemoryLeaseBackend()
+    events: list[str] = []
+
+    def _elector(holder: str) -> LeaderElector:
+        return LeaderElector(backend, name="lease", ttl_seconds=1.0, renew_interval_seconds=0.05, holder=holder)
+
+    def _callbacks(holder: str):
+        async def _demoted() -> None:
+            events.append(f"{holder}:demoted")
+
+        return {"on_elected": lambda: events.append(f"{holder}:elected"), "on_demoted": _demoted}
+
+    async def _main() -> None:
+        a, b = _elector("a"), _elector("b")
+        a.start(**_callbacks("a"))
+        await asyncio.sleep(0.1)
+        b.start(**_callbacks("b"))
+        await asyncio.sleep(0.15)
+        assert a.is_leader() and not b.is_leader()
+        assert a.get_status()["fencing_token"] == 1
+        fence = a.fence()
+        assert fence is not None and fence.token == 1 and b.fence() is None
+
+        await a.stop()
+        await asyncio.sleep(0.15)
+        assert b.is_leader() and b.token == 2
+        await b.stop()
+
+    asyncio.run(_main())
+
+    assert events == ["a:elected", "a:demoted", "b:elected", "b:demoted"]
+
+
+def test_leader_is_demoted_when_lease_is_taken() -> None:
+    backend = MemoryLeaseBackend()
+    demoted = asyncio.Event()
+
+    async def _main() -> None:
+        elector = LeaderElector(backend, name="lease", ttl_seconds=1.0, renew_interval_seconds=0.05, holder="a")
+
+        async def _on_demoted() -> None:
+            demoted.set()
+
+        elector.start(on_elected=lambda: None, on_demoted=_on_demoted)
+        await asyncio.sleep(0.1)
+        # Simulate a replica that saw the lease expire (e.g. after a long pause of this one).
+        backend.try_acquire("lease", "b", 30, now=time.time() + 5)
+        await asyncio.wait_for(demoted.wait(), timeout=1)
+        assert not elector.is_leader()
+        await elector.stop()
+
+    asyncio.run(_main())
+
+
+def test_scheduler_run_guard_skips_jobs() -> None:
+    runs = {"count": 0}
+
+    async def _job() -> None:
+        runs["count"] += 1
+
+    class _Schedule:
+        def next_after(self, ts: float) -> float:
+            return ts + 0.02
+
+    scheduler = JobScheduler("Asia/Manila", run_guard=lambda: False)
+    scheduler.add_job(ScheduledJob(name="job", schedule=_Schedule(), func=_job))  # type: ignore[arg-type]
+
+    async def _main() -> None:
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(_main())
+
+    assert runs["count"] == 0
+    assert scheduler.get_status()["job"]["skipped_guard"] >= 1
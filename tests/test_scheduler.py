@@ -0,0 +1,169 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.scheduler import CronSchedule, IntervalSchedule, JobScheduler, ScheduledJob, parse_schedule
+
+_TZ = "Asia/Manila"
+
+
+def _ts(*args: int) -> float:
+    return datetime(*args, tzinfo=ZoneInfo(_TZ)).timestamp()
+
+
+def _local(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, ZoneInfo(_TZ)).replace(tzinfo=None)
+
+
+def test_interval_schedule_aligns_to_wall_clock() -> None:
+    schedule = parse_schedule("every 30m", _TZ)
+
+    assert isinstance(schedule, IntervalSchedule)
+    assert _local(schedule.next_after(_ts(2026, 2, 18, 10, 5, 17))) == datetime(2026, 2, 18, 10, 30)
+    assert _local(schedule.next_after(_ts(2026, 2, 18, 10, 30))) == datetime(2026, 2, 18, 11, 0)
+    assert _local(parse_schedule("45", _TZ).next_after(_ts(2026, 2, 18, 10, 0, 50))) == datetime(2026, 2, 18, 10, 1, 30)
+
+
+def test_interval_schedule_restarts_at_local_midnight() -> None:
+    schedule = parse_schedule("every 7h", _TZ)
+
+    assert _local(schedule.next_after(_ts(2026, 2, 18, 22, 0))) == datetime(2026, 2, 19, 0, 0)
+
+
+def test_cron_schedule_steps_ranges_and_weekdays() -> None:
+    schedule = parse_schedule("*/15 9-17 * * 1-5", _TZ)
+
+    assert isinstance(schedule, CronSchedule)
+    # Friday 17:50 -> Monday 09:00
+    assert _local(schedule.next_after(_ts(2026, 2, 20, 17, 50))) == datetime(2026, 2, 23, 9, 0)
+    assert _local(schedule.next_after(_ts(2026, 2, 23, 9, 0))) == datetime(2026, 2, 23, 9, 15)
+
+
+def test_cron_day_of_month_or_day_of_week() -> None:
+    schedule = parse_schedule("0 8 1 * 0", _TZ)
+
+    # 2026-02-18 is a Wednesday: next Sunday (22nd) comes before the 1st of March.
+    assert _local(schedule.next_after(_ts(2026, 2, 18, 9, 0))) == datetime(2026, 2, 22, 8, 0)
+    assert _local(schedule.next_after(_ts(2026, 2, 28, 9, 0))) == datetime(2026, 3, 1, 8, 0)
+
+    # A "*/N" day-of-month is not a restriction: both fields must match (odd days that are Mondays).
+    stepped = parse_schedule("0 8 */2 * 1", _TZ)
+    assert _local(stepped.next_after(_ts(2026, 2, 18, 9, 0))) == datetime(2026, 2, 23, 8, 0)
+
+
+@pytest.mark.parametrize("expression", ["", "* * * *", "61 * * * *", "*/0 * * * *", "every 0s"])
+def test_invalid_schedules_are_rejected(expression: str) -> None:
+    with pytest.raises(ValueError):
+        parse_schedule(expression, _TZ)
+
+
+class _FastSchedule:
+    def __init__(self, period: float) -> None:
+        self.period = period
+
+    def next_after(self, ts: float) -> float:
+        return (math.floor(ts / self.period) + 1) * self.period
+
+    def __repr__(self) -> str:
+        return f"every {self.period}s"
+
+
+def _run_scheduler(scheduler: JobScheduler, seconds: float) -> None:
+    async def _main() -> None:
+        scheduler.start()
+        await asyncio.sleep(seconds)
+        await scheduler.stop()
+
+    asyncio.run(_main())
+
+
+def test_overlapping_runs_are_skipped_and_deadlines_reported() -> None:
+    active = {"now": 0, "peak": 0}
+
+    async def _slow_job() -> None:
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.25)
+        active["now"] -= 1
+
+    scheduler = JobScheduler(_TZ)
+    scheduler.add_job(
+        ScheduledJob(
+            name="slow",
+            schedule=_FastSchedule(0.05),  # type: ignore[arg-type]
+            func=_slow_job,
+            deadline_seconds=0.05,
+            missed_run_policy="skip",
+            last_run_at=time.time(),
+        )
+    )
+    _run_scheduler(scheduler, 0.6)
+
+    status = scheduler.get_status()["slow"]
+    assert active["peak"] == 1
+    assert status["deadline_exceeded"] >= 1
+    assert status["skipped_overlap"] >= 1
+    assert status["running"] is False
+
+
+def test_missed_runs_are_caught_up_per_policy() -> None:
+    counts = {"all": 0, "once": 0, "skip": 0}
+
+    def _job(name: str):
+        async def _run() -> None:
+            counts[name] += 1
+
+        return _run
+
+    scheduler = JobScheduler(_TZ)
+    # Three one-hour periods passed since the last run; the next regular fire is an hour away.
+    for policy in counts:
+        scheduler.add_job(
+            ScheduledJob(
+                name=policy,
+                schedule=_FastSchedule(3600),  # type: ignore[arg-type]
+                func=_job(policy),
+                missed_run_policy=policy,
+                last_run_at=time.time() - 3 * 3600,
+            )
+        )
+    _run_scheduler(scheduler, 0.1)
+
+    assert counts == {"all": 3, "once": 1, "skip": 0}
+
+
+def test_job_without_history_waits_for_its_first_fire() -> None:
+    runs: list[float] = []
+
+    async def _run() -> None:
+        runs.append(time.time())
+
+    scheduler = JobScheduler(_TZ)
+    scheduler.add_job(ScheduledJob(name="sync", schedule=_FastSchedule(3600), func=_run, missed_run_policy="all"))  # type: ignore[arg-type]
+    _run_scheduler(scheduler, 0.1)
+
+    assert runs == []
+    assert scheduler.get_status()["sync"]["missed_runs"] == 0
+
+
+def test_failed_job_records_error_and_keeps_running() -> None:
+    async def _boom() -> None:
+        raise RuntimeError("boom")
+
+    scheduler = JobScheduler(_TZ)
+    scheduler.add_job(ScheduledJob(name="boom", schedule=_FastSchedule(0.05), func=_boom))  # type: ignore[arg-type]
+    _run_scheduler(scheduler, 0.2)
+
+    status = scheduler.get_status()["boom"]
+    assert status["runs"] >= 2
+    assert status["last_error"] == "boom"
+
+
+def test_unknown_policy_rejected() -> None:
+    scheduler = JobScheduler(_TZ)
+    with pytest.raises(ValueError):
+        scheduler.add_job(ScheduledJob(name="x", schedule=_FastSchedule(1), func=lambda: None, missed_run_policy="later"))  # type: ignore[arg-type]
@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+
+from app.config import Settings
+from app.integrations.supabase_sink import SupabaseSink
+from app.seatalk.groups import GroupRegistry, SqliteGroupStore, SupabaseGroupStore
+from app.seatalk.outbox import BroadcastTarget, SeaTalkOutbox
+from benchmarks.fakes import FakeSupabaseClient
+
+
+class _FakeClient:
+    def __init__(self, failures: dict[str, list[Exception]] | None = None, delay: float = 0.01) -> None:
+        self.sent: list[str] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._failures = failures or {}
+        self._delay = delay
+
+    async def send_text_message(self, employee_code: str, content: str, *, thread_id: str | None = None) -> dict:
+        return await self._record(employee_code)
+
+    async def send_group_text_message(self, group_id: str, content: str, *, thread_id: str | None = None) -> dict:
+        return await self._record(group_id)
+
+    async def _record(self, recipient: str) -> dict:
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(self._delay)
+            pending = self._failures.get(recipient)
+            if pending:
+                raise pending.pop(0)
+            self.sent.append(recipient)
+            return {"code": 0}
+        finally:
+            self._in_flight -= 1
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://openapi.seatalk.io/messaging/v2/group_chat")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+
+def _outbox(client: _FakeClient, **overrides) -> SeaTalkOutbox:
+    options = {
+        "workers": 1,
+        "rate_per_minute": 0,
+        "burst": 10,
+        "max_attempts": 3,
+        "retry_base_seconds": 0.01,
+        "retry_max_seconds": 0.05,
+        "max_pending": 100,
+        "dead_letter_limit": 10,
+        "broadcast_concurrency": 3,
+        **overrides,
+    }
+    return SeaTalkOutbox(client, **options)  # type: ignore[arg-type]
+
+
+def test_broadcast_caps_concurrency_and_isolates_failures() -> None:
+    client = _FakeClient(
+        failures={
+            "g_2": [_status_error(503)],  # retried, then delivered
+            "g_3": [RuntimeError("SeaTalk API error: code=4001, message=bot not in group")],
+        }
+    )
+    outbox = _outbox(client)
+    targets = [BroadcastTarget("group", f"g_{i}") for i in range(1, 9)] + [BroadcastTarget("single", "E1")]
+
+    report = asyncio.run(outbox.broadcast(targets + [BroadcastTarget("group", "g_1")], "alert"))
+
+    assert client.max_in_flight == 3
+    assert sorted(client.sent) == sorted(["g_1", "g_2", "g_4", "g_5", "g_6", "g_7", "g_8", "E1"])
+    assert (report.sent, report.failed) == (8, 1)
+    by_recipient = {result.recipient: result for result in report.results}
+    assert len(report.results) == 9
+    assert by_recipient["g_2"].status == "sent" and by_recipient["g_2"].attempts == 2
+    assert by_recipient["g_3"].status == "failed" and "4001" in (by_recipient["g_3"].error or "")
+    assert report.to_dict()["failed"] == 1
+    status = outbox.get_status()
+    assert status["broadcasts"] == 1 and status["broadcast_failed"] == 1 and status["dead_lettered"] == 0
+
+
+def test_group_registry_persists_in_sqlite(tmp_path) -> None:
+    path = tmp_path / "groups.sqlite3"
+
+    async def run() -> tuple[list[str], str | None]:
+        worker_a = GroupRegistry(SqliteGroupStore(path))
+        await worker_a.add("g_1", "Hub Ops")
+        await worker_a.add("g_2")
+        await worker_a.add("g_1")  # re-added without a name keeps the known one
+        await worker_a.remove("g_2")
+        restarted = GroupRegistry(SqliteGroupStore(path))
+        groups = await restarted.list_groups()
+        return [group.group_id for group in groups], groups[0].group_name
+
+    assert asyncio.run(run()) == (["g_1"], "Hub Ops")
+
+
+def test_group_registry_supabase_store_and_fallback() -> None:
+    settings = Settings(SEATALK_APP_ID="x", SEATALK_APP_SECRET="y", SUPABASE_URL="", SUPABASE_SERVICE_ROLE_KEY="")
+    sink = SupabaseSink(settings)
+    client = FakeSupabaseClient(key_columns={"seatalk_groups": "group_id"})
+    sink._client = client  # type: ignore[assignment]
+    sink._enabled = True
+    registry = GroupRegistry(SupabaseGroupStore(sink))
+
+    asyncio.run(registry.add("g_2", "Linehaul"))
+    asyncio.run(registry.add("g_1", "Hub Ops"))
+    other_replica = GroupRegistry(SupabaseGroupStore(sink))
+    assert [group.group_id for group in asyncio.run(other_replica.list_groups())] == ["g_1", "g_2"]
+
+    class _Unreachable:
+        def table(self, name: str):
+            raise httpx.ConnectError("connection refused")
+
+    sink._client = _Unreachable()  # type: ignore[assignment]
+    assert [group.group_id for group in asyncio.run(other_replica.list_groups())] == ["g_1", "g_2"]
+    asyncio.run(other_replica.add("g_3"))
+    status = asyncio.run(other_replica.get_status())
+    assert status["store_errors"] == 3 and len(status["groups"]) == 3
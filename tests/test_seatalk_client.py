@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.seatalk.client import SeaTalkClient
+from app.seatalk.token import AccessToken
+from benchmarks.fake_servers import create_seatalk_app, serve_in_thread
+
+
+@pytest.fixture
+def seatalk_stub():
+    app = create_seatalk_app()
+    server, url = serve_in_thread(app)
+    settings = Settings(SEATALK_APP_ID="x", SEATALK_APP_SECRET="y", SEATALK_API_BASE_URL=url)
+    yield settings, app
+    server.should_exit = True
+
+
+def test_messages_share_one_pooled_connection_and_token(seatalk_stub) -> None:
+    settings, app = seatalk_stub
+
+    async def scenario() -> None:
+        client = SeaTalkClient(settings)
+        await client.start()
+        await client.send_text_message("E1", "hello")
+        for index in range(5):
+            await client.send_group_text_message("G1", f"message {index}")
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    assert len(app.state.messages) == 6
+    assert app.state.token_requests == 1
+    assert len(app.state.connections) == 1
+
+
+def test_client_reopens_after_close_and_surfaces_api_errors(seatalk_stub) -> None:
+    settings, app = seatalk_stub
+
+    async def scenario() -> None:
+        client = SeaTalkClient(settings)
+        await client.send_group_text_message("G1", "before close")  # opened lazily outside a lifespan
+        await client.aclose()
+        await client.send_group_text_message("G1", "after close")
+        client._tokens._token = AccessToken("revoked", time.time() + 3600)
+        with pytest.raises(RuntimeError, match="code=2"):
+            await client.send_group_text_message("G1", "bad token")
+        app.state.faults.update({"error_rate": 1.0})
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.send_group_text_message("G1", "server error")
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    assert [message["message"]["text"]["content"] for message in app.state.messages] == ["before close", "after close"]
+    assert len(app.state.connections) == 2
+
+
+def test_http2_falls_back_when_h2_is_missing(monkeypatch, caplog) -> None:
+    import builtins
+
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == "h2":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    client = SeaTalkClient(Settings(SEATALK_APP_ID="x", SEATALK_APP_SECRET="y", SEATALK_HTTP2=True))
+
+    # httpx itself raises ImportError for http2=True without h2.
+    http = client._build_http_client()
+
+    assert isinstance(http, httpx.AsyncClient)
+    assert "using HTTP/1.1" in caplog.text
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import httpx
+
+from app.seatalk.outbox import SeaTalkOutbox
+
+
+class _FakeClient:
+    def __init__(self, failures: dict[str, list[Exception]] | None = None, delay: float = 0.0) -> None:
+        self.sent: list[tuple[str, str]] = []
+        self._failures = failures or {}
+        self._delay = delay
+
+    async def send_text_message(self, employee_code: str, content: str, *, thread_id: str | None = None) -> dict:
+        return await self._record(employee_code, content)
+
+    async def send_group_text_message(self, group_id: str, content: str, *, thread_id: str | None = None) -> dict:
+        return await self._record(group_id, content)
+
+    async def _record(self, recipient: str, content: str) -> dict:
+        await asyncio.sleep(self._delay)
+        pending = self._failures.get(content)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((recipient, content))
+        return {"code": 0}
+
+
+def _status_error(status: int, retry_after: str | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://openapi.seatalk.io/messaging/v2/group_chat")
+    headers = {"Retry-After": retry_after} if retry_after else {}
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, headers=headers, request=request))
+
+
+def _outbox(client: _FakeClient, **overrides) -> SeaTalkOutbox:
+    options = {
+        "workers": 4,
+        "rate_per_minute": 0,
+        "burst": 10,
+        "max_attempts": 3,
+        "retry_base_seconds": 0.05,
+        "retry_max_seconds": 0.2,
+        "max_pending": 100,
+        "dead_letter_limit": 10,
+    }
+    return SeaTalkOutbox(client, **{**options, **overrides})  # type: ignore[arg-type]
+
+
+def test_retries_keep_per_recipient_order_without_blocking_others() -> None:
+    client = _FakeClient({"a1": [_status_error(503), httpx.ConnectError("reset")]})
+    outbox = _outbox(client)
+
+    async def scenario() -> dict:
+        outbox.start()
+        for content in ("a1", "a2", "a3"):
+            await outbox.send_group_text("group-a", content)
+        await outbox.send_text("E1", "b1")
+        await outbox.stop(drain_timeout=5)
+        return outbox.get_status()
+
+    status = asyncio.run(scenario())
+
+    assert [content for recipient, content in client.sent if recipient == "group-a"] == ["a1", "a2", "a3"]
+    assert client.sent[0] == ("E1", "b1")
+    assert status["sent"] == 4 and status["retried"] == 2 and status["dead_letters"] == []
+
+
+def test_permanent_and_exhausted_failures_are_dead_lettered() -> None:
+    client = _FakeClient(
+        {
+            "rejected": [RuntimeError("failed to send group message, code=3")],
+            "flaky": [_status_error(429, "0"), _status_error(500), _status_error(502)],
+        }
+    )
+    outbox = _outbox(client, max_pending=3)
+
+    async def scenario() -> dict:
+        outbox.start()
+        await outbox.send_group_text("g1", "rejected")
+        await outbox.send_group_text("g2", "flaky")
+        await outbox.send_group_text("g2", "after flaky")
+        await outbox.send_group_text("g3", "overflow")
+        await outbox.stop(drain_timeout=5)
+        return outbox.get_status()
+
+    status = asyncio.run(scenario())
+
+    letters = {letter["content"]: letter for letter in status["dead_letters"]}
+    assert letters["rejected"]["attempts"] == 1 and "code=3" in letters["rejected"]["error"]
+    assert letters["flaky"]["attempts"] == 3 and "502" in letters["flaky"]["error"]
+    assert letters["overflow"]["attempts"] == 0 and "outbox full" in letters["overflow"]["error"]
+    assert client.sent == [("g2", "after flaky")]
+    assert status["dead_lettered"] == 3
+
+
+def test_token_bucket_spaces_out_sends() -> None:
+    client = _FakeClient()
+    outbox = _outbox(client, rate_per_minute=600, burst=2)
+
+    async def scenario() -> float:
+        outbox.start()
+        started = time.monotonic()
+        for index in range(5):
+            await outbox.send_text(f"E{index}", "hello")
+        await outbox.stop(drain_timeout=5)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+
+    # Two sends from the burst, then one every 0.1 s.
+    assert elapsed >= 0.25
+    assert len(client.sent) == 5 and outbox.get_status()["rate_limited_waits"] >= 1
+
+
+def test_sends_inline_when_not_started() -> None:
+    client = _FakeClient()
+    outbox = _outbox(client)
+
+    asyncio.run(outbox.send_text("E1", "hello"))
+
+    assert client.sent == [("E1", "hello")]
+    assert outbox.get_status()["enqueued"] == 0
+
+
+def test_thread_replies_within_the_window_are_coalesced() -> None:
+    client = _FakeClient()
+    outbox = _outbox(client, coalesce_window_seconds=0.05, coalesce_max_chars=20)
+
+    async def scenario() -> dict:
+        outbox.start()
+        for content in ("one", "two", "three"):
+            await outbox.send_group_text("g1", content, thread_id="t1", coalesce=True)
+        await outbox.send_group_text("g1", "other", thread_id="t2", coalesce=True)
+        await outbox.send_group_text("g1", "top level")  # no thread: never held back
+        await outbox.send_group_text("g1", "too long to merge!", thread_id="t1", coalesce=True)  # flushes the full batch
+        await asyncio.sleep(0.1)
+        await outbox.send_group_text("g1", "late", thread_id="t1", coalesce=True)
+        await outbox.send_group_text("g1", "notice", thread_id="t1")  # not coalescible: sent after "late", unmerged
+        await outbox.stop(drain_timeout=5)
+        return outbox.get_status()
+
+    status = asyncio.run(scenario())
+
+    assert client.sent[0] == ("g1", "top level")
+    assert sorted(content for _, content in client.sent[1:]) == sorted(
+        ["one\n\ntwo\n\nthree", "other", "too long to merge!", "late", "notice"]
+    )
+    assert [content for _, content in client.sent][-2:] == ["late", "notice"]
+    assert status["enqueued"] == 8 and status["coalesced"] == 2 and status["sent"] == 6
+    assert status["coalescing"] == 0 and status["pending"] == 0
@@ -0,0 +1,103 @@
+import asyncio
+import stat
+import time
+
+import pytest
+
+from app.seatalk import token as token_module
+from app.seatalk.token import AccessToken, FileTokenCache, SqliteTokenCache, TokenManager
+
+
+class _Fetcher:
+    def __init__(self, lifetimes: list[float], failures: int = 0) -> None:
+        self.calls = 0
+        self._lifetimes = lifetimes
+        self._failures = failures
+
+    async def __call__(self) -> AccessToken:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.calls > 1 and self._failures:
+            self._failures -= 1
+            raise RuntimeError("failed to obtain app access token, code=100")
+        lifetime = self._lifetimes[min(len(self._lifetimes), self.calls) - 1]
+        return AccessToken(f"token-{self.calls}", time.time() + lifetime)
+
+
+def _manager(fetch: _Fetcher, cache=None) -> TokenManager:
+    return TokenManager(
+        fetch,
+        app_id="app",
+        refresh_ahead_seconds=61,
+        retry_base_seconds=0.05,
+        retry_max_seconds=0.2,
+        cache=cache,
+    )
+
+
+def test_concurrent_callers_share_one_fetch() -> None:
+    fetch = _Fetcher([7200])
+    manager = _manager(fetch)
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(*(manager.get_token() for _ in range(20)))
+
+    tokens = asyncio.run(scenario())
+    asyncio.run(manager.get_token())
+
+    assert set(tokens) == {"token-1"} and fetch.calls == 1
+    assert manager.get_status()["fetched"] == 1
+
+
+def test_background_refresh_retries_while_the_old_token_is_served(monkeypatch) -> None:
+    monkeypatch.setattr(token_module.random, "uniform", lambda low, high: 0.0)
+    # The first token enters the refresh window after ~1 s and stays usable for ~2 s.
+    fetch = _Fetcher([62, 7200], failures=2)
+    manager = _manager(fetch)
+
+    async def scenario() -> tuple[list[str], str]:
+        first = await manager.get_token()
+        manager.start()
+        seen = [first]
+        deadline = time.monotonic() + 3
+        while manager.get_status()["background_refreshes"] == 0 and time.monotonic() < deadline:
+            seen.append(await manager.get_token())
+            await asyncio.sleep(0.02)
+        latest = await manager.get_token()
+        await manager.stop()
+        return seen, latest
+
+    seen, latest = asyncio.run(scenario())
+
+    assert set(seen) <= {"token-1", "token-4"} and latest == "token-4"
+    status = manager.get_status()
+    assert status["failures"] == 2 and status["inline_refreshes"] == 1 and status["consecutive_failures"] == 0
+
+
+def test_inline_fetch_failure_surfaces_without_a_token() -> None:
+    async def failing() -> AccessToken:
+        raise RuntimeError("failed to obtain app access token, code=100")
+
+    manager = _manager(failing)  # type: ignore[arg-type]
+
+    with pytest.raises(RuntimeError, match="code=100"):
+        asyncio.run(manager.get_token())
+    assert manager.get_status()["last_error"].endswith("code=100")
+
+
+@pytest.mark.parametrize("cache_type", [FileTokenCache, SqliteTokenCache])
+def test_workers_share_the_token_through_a_cache(tmp_path, cache_type) -> None:
+    path = tmp_path / "token"
+    worker_a, worker_b = _Fetcher([7200]), _Fetcher([7200])
+
+    token_a = asyncio.run(_manager(worker_a, cache_type(path)).get_token())
+    token_b = asyncio.run(_manager(worker_b, cache_type(path)).get_token())
+
+    assert token_a == token_b == "token-1"
+    assert worker_a.calls == 1 and worker_b.calls == 0
+    # An older token never replaces a fresher one in the cache.
+    cache_type(path).store("app", AccessToken("stale", time.time() + 10))
+    if cache_type is SqliteTokenCache:
+        assert cache_type(path).load("app").value == "token-1"
+    else:
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
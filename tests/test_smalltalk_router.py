@@ -1,6 +1,11 @@
+import asyncio
+import time
+
+import pytest
+
 from app.config import Settings
-from app.workflows.base import WorkflowContext
-from app.workflows.router import WorkflowRouter
+from app.workflows.base import WorkflowContext, WorkflowResult
+from app.workflows.router import COMMAND_WORKFLOWS, TIMED_OUT_TEXT, WORKING_ON_IT_TEXT, WorkflowRouter, WorkflowSpec
 
 
 def _settings() -> Settings:
@@ -10,9 +15,18 @@ def _settings() -> Settings:
     )
 
 
+def _route(router: WorkflowRouter, context: WorkflowContext) -> WorkflowResult:
+    return asyncio.run(router.route(context))
+
+
+def _context(text: str) -> WorkflowContext:
+    return WorkflowContext(employee_code="e_1", seatalk_id="s_1", thread_id=None, text=text)
+
+
 def test_plain_hello_returns_conversational_reply() -> None:
     router = WorkflowRouter(_settings())
-    result = router.route(
+    result = _route(
+        router,
         WorkflowContext(
             employee_code="e_1",
             seatalk_id="s_1",
@@ -27,7 +41,8 @@ def test_plain_hello_returns_conversational_reply() -> None:
 
 def test_unknown_slash_command_keeps_command_fallback() -> None:
     router = WorkflowRouter(_settings())
-    result = router.route(
+    result = _route(
+        router,
         WorkflowContext(
             employee_code="e_1",
             seatalk_id="s_1",
@@ -42,7 +57,8 @@ def test_unknown_slash_command_keeps_command_fallback() -> None:
 
 def test_stuckup_command_still_routes_normally() -> None:
     router = WorkflowRouter(_settings())
-    result = router.route(
+    result = _route(
+        router,
         WorkflowContext(
             employee_code="e_1",
             seatalk_id="s_1",
@@ -53,3 +69,102 @@ def test_stuckup_command_still_routes_normally() -> None:
     assert result.handled
     assert result.response_text is not None
     assert "Manual `/stuckup sync` is currently turned off." in result.response_text
+
+
+def test_commands_are_matched_by_token_and_load_only_their_workflow() -> None:
+    router = WorkflowRouter(_settings())
+    assert router.loaded() == []
+
+    assert _route(router, _context("LH request for tomorrow")).handled
+    assert router.loaded() == ["app.workflows.lh_request.handler:LHRequestWorkflow"]
+
+    assert _route(router, _context("Stuckup? help")).handled
+    assert not _route(router, _context("/lhx")).handled  # no prefix matching inside a token
+    assert "app.workflows.smalltalk.handler:SmallTalkWorkflow" not in router.loaded()
+
+    assert "Hi!" in (_route(router, _context("hey team, backlogs later")).response_text or "")
+    assert router.loaded()[-1] == "app.workflows.smalltalk.handler:SmallTalkWorkflow"
+
+
+def test_duplicate_command_is_rejected() -> None:
+    clash = WorkflowSpec("app.workflows.backlogs.handler:BacklogsWorkflow", ("/stuckup",))
+    with pytest.raises(ValueError, match="/stuckup"):
+        WorkflowRouter(_settings(), commands=COMMAND_WORKFLOWS + (clash,))
+
+
+class _SlowWorkflow:
+    cancelled = False
+
+    async def handle(self, context: WorkflowContext) -> WorkflowResult:
+        try:
+            await asyncio.sleep(float(context.text.split()[1]))
+        except asyncio.CancelledError:
+            _SlowWorkflow.cancelled = True
+            raise
+        return WorkflowResult(handled=True, response_text="report ready")
+
+
+class _BlockingWorkflow:
+    def handle(self, context: WorkflowContext) -> WorkflowResult:
+        time.sleep(0.2)  # e.g. a synchronous Sheets read
+        return WorkflowResult(handled=True, response_text="rows loaded")
+
+
+def _timed_router(**spec_options) -> WorkflowRouter:
+    settings = _settings().model_copy(update={"workflow_working_notice_seconds": 0.05, "workflow_timeout_seconds": 1.0})
+    return WorkflowRouter(
+        settings,
+        commands=(
+            WorkflowSpec(f"{__name__}:_SlowWorkflow", ("/slow",), **spec_options),
+            WorkflowSpec(f"{__name__}:_BlockingWorkflow", ("/blocking",)),
+        ),
+    )
+
+
+def test_slow_workflow_gets_a_working_notice_then_its_reply() -> None:
+    router = _timed_router()
+    notices: list[str] = []
+
+    async def notify(text: str) -> None:
+        notices.append(text)
+
+    fast = asyncio.run(router.route(_context("/slow 0"), notify=notify))
+    slow = asyncio.run(router.route(_context("/slow 0.2"), notify=notify))
+
+    assert fast.response_text == slow.response_text == "report ready"
+    assert notices == [WORKING_ON_IT_TEXT]
+    assert router.get_status()["working_notices"] == 1
+
+
+def test_workflow_past_its_timeout_is_cancelled() -> None:
+    _SlowWorkflow.cancelled = False
+    router = _timed_router(timeout_seconds=0.1)
+
+    result = asyncio.run(router.route(_context("/slow 5")))
+
+    assert result.handled and result.response_text == TIMED_OUT_TEXT
+    assert _SlowWorkflow.cancelled
+    assert router.get_status()["timeouts"] == 1
+
+
+def test_sync_workflow_runs_off_the_event_loop() -> None:
+    router = _timed_router()
+
+    async def scenario() -> tuple[WorkflowResult, int]:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await router.route(_context("/blocking"))
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+
+    assert result.response_text == "rows loaded"
+    assert ticks >= 5
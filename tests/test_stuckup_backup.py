@@ -0,0 +1,90 @@
+import gzip
+
+from app.config import Settings
+from app.workflows.stuckup.backup import StuckupBackupWriter, list_snapshots, restore_rows
+from app.workflows.stuckup.table import StuckupTable
+
+_HEADERS = ["shipment_id", "status_desc", "hub_region"]
+
+
+def _settings(tmp_path, **overrides) -> Settings:
+    values = {
+        "SEATALK_APP_ID": "x",
+        "SEATALK_APP_SECRET": "y",
+        "STUCKUP_BACKUP_DIR": str(tmp_path / "backups"),
+        "STUCKUP_BACKUP_SNAPSHOT_INTERVAL_SECONDS": 3600,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def _table(rows: list[list[str]]) -> StuckupTable:
+    return StuckupTable.from_rows(_HEADERS, rows)
+
+
+def test_snapshot_then_deltas_restore_latest_state(tmp_path) -> None:
+    writer = StuckupBackupWriter(_settings(tmp_path))
+    writer.write_now(_table([["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "VIS"]]))
+    writer.write_now(_table([["SPX1", "SOC_LHTransported", "MIN"], ["SPX3", "SOC_Packed", "NCR"]]))
+    writer.write_now(_table([["SPX1", "SOC_LHTransported", "MIN"], ["SPX3", "SOC_Packed", "NCR"]]))
+
+    snapshots = list_snapshots(tmp_path / "backups")
+    assert len(snapshots) == 1
+    delta_path = snapshots[0][2].with_name(snapshots[0][2].name.replace(".jsonl.gz", ".delta.jsonl.gz"))
+    with gzip.open(delta_path, "rt", encoding="utf-8") as f:
+        delta_lines = [line for line in f if line.strip()]
+    # One run header plus upsert SPX1, upsert SPX3, delete SPX2; the unchanged third run adds nothing.
+    assert len(delta_lines) == 4
+
+    rows = restore_rows(tmp_path / "backups", "shipment_id")
+    assert sorted(rows, key=lambda row: row["shipment_id"]) == [
+        {"shipment_id": "SPX1", "status_desc": "SOC_LHTransported", "hub_region": "MIN"},
+        {"shipment_id": "SPX3", "status_desc": "SOC_Packed", "hub_region": "NCR"},
+    ]
+
+
+def test_snapshot_retention_by_count(tmp_path) -> None:
+    writer = StuckupBackupWriter(
+        _settings(tmp_path, STUCKUP_BACKUP_SNAPSHOT_INTERVAL_SECONDS=0, STUCKUP_BACKUP_RETENTION_COUNT=2)
+    )
+    for idx in range(4):
+        writer.write_now(_table([[f"SPX{idx}", "SOC_Staging", "MIN"]]))
+
+    snapshots = list_snapshots(tmp_path / "backups")
+    assert [seq for seq, _, _ in snapshots] == [3, 4]
+    assert restore_rows(tmp_path / "backups", "shipment_id") == [
+        {"shipment_id": "SPX3", "status_desc": "SOC_Staging", "hub_region": "MIN"}
+    ]
+
+
+def test_submit_writes_in_background(tmp_path) -> None:
+    writer = StuckupBackupWriter(_settings(tmp_path))
+    writer.submit(_table([["SPX1", "SOC_Staging", "MIN"]]))
+
+    assert writer.flush(timeout=5.0)
+    writer.close()
+    assert len(list_snapshots(tmp_path / "backups")) == 1
+
+
+def test_disabled_writer_does_nothing(tmp_path) -> None:
+    writer = StuckupBackupWriter(_settings(tmp_path, STUCKUP_BACKUP_ENABLED=False))
+    writer.submit(_table([["SPX1", "SOC_Staging", "MIN"]]))
+    writer.close()
+
+    assert not (tmp_path / "backups").exists()
+
+
+def test_restore_stops_at_a_truncated_delta_and_keeps_duplicate_keys(tmp_path) -> None:
+    writer = StuckupBackupWriter(_settings(tmp_path))
+    writer.write_now(_table([["SPX1", "SOC_Staging", "MIN"], ["SPX1", "SOC_Packed", "VIS"]]))
+    writer.write_now(_table([["SPX1", "SOC_Staging", "MIN"], ["SPX1", "SOC_Packed", "NCR"], ["SPX2", "SOC_Packed", "SOL"]]))
+    snapshot = list_snapshots(tmp_path / "backups")[0][2]
+    delta_path = snapshot.with_name(snapshot.name.replace(".jsonl.gz", ".delta.jsonl.gz"))
+    complete = delta_path.read_bytes()
+    writer.write_now(_table([["SPX3", "SOC_Staging", "MIN"]]))
+    # A crash in the middle of the third run's append.
+    delta_path.write_bytes(delta_path.read_bytes()[: len(complete) + 20])
+
+    rows = restore_rows(tmp_path / "backups", "shipment_id")
+
+    assert sorted(row["hub_region"] for row in rows) == ["MIN", "NCR", "SOL"]
@@ -1,12 +1,33 @@
+from datetime import date
+
 from app.config import Settings
 from app.workflows.stuckup.service import StuckupService
+from app.workflows.stuckup.summary import parse_day, summarize_table
+from app.workflows.stuckup.table import StuckupTable
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "SEATALK_APP_ID": "x",
+        "SEATALK_APP_SECRET": "y",
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+_SUMMARY_HEADERS = ["shipment_id", "status_desc", "day", "status_timestamp", "hub_region", "cluster_name", "hub_dest_station_name"]
 
 
-def _settings() -> Settings:
-    return Settings(
-        SEATALK_APP_ID="x",
-        SEATALK_APP_SECRET="y",
-    )
+def _summary_table() -> StuckupTable:
+    rows = [
+        ["SPX1", "SOC_Staging", "2026-02-18", "", "MIN", "SOC BCP", "GenSan Hub"],
+        ["SPX2", "SOC_Staging", "2026-02-17", "", "MIN", "SOC BCP", "GenSan Hub"],
+        ["SPX3", "SOC_Staging", "2026-02-17", "", "RC", "No Cluster", "SOC 5"],
+        ["SPX4", "SOC_Staging", "", "2026-02-15 08:30:00", "SOL-IIS", "SOC BCP", "Tambler Hub"],
+        ["SPX5", "SOC_Packed", "2026-02-18", "", "MIN", "SOC BCP", "GenSan Hub"],  # other status
+        ["SPX6", "SOC_Staging", "2026-02-10", "", "MIN", "SOC BCP", "GenSan Hub"],  # outside L7D
+    ]
+    return StuckupTable.from_rows(_SUMMARY_HEADERS, rows)
 
 
 def test_build_dashboard_summary_from_block_returns_sentences_with_action_taken() -> None:
@@ -55,6 +76,8 @@ def test_build_dashboard_summary_from_block_handles_shifted_dashboard_columns()
 
 class _FakeSheets:
     def __init__(self) -> None:
+        self.block: list[list[str]] = []
+        self.read_calls = 0
         self.ensure_calls: list[dict[str, object]] = []
         self.clear_calls: list[dict[str, object]] = []
         self.update_calls: list[dict[str, object]] = []
@@ -75,6 +98,10 @@ class _FakeSheets:
             }
         )
 
+    def read_values(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
+        self.read_calls += 1
+        return [list(row) for row in self.block]
+
     def clear_range(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> None:
         self.clear_calls.append(
             {
@@ -106,7 +133,7 @@ def test_refresh_dashboard_summary_writes_to_merged_summary_block_top_left() ->
     service = StuckupService(_settings())
     fake_sheets = _FakeSheets()
     service._google_sheets = fake_sheets  # type: ignore[assignment]
-    service._read_dashboard_block_stable = lambda: []  # type: ignore[assignment]
+    service._read_dashboard_block_stable = lambda first_read=None: []  # type: ignore[assignment]
 
     service.refresh_dashboard_summary_only()
 
@@ -114,3 +141,84 @@ def test_refresh_dashboard_summary_writes_to_merged_summary_block_top_left() ->
     assert fake_sheets.update_calls
     assert fake_sheets.clear_calls[-1]["cell_range"] == "C4:AA9"
     assert fake_sheets.update_calls[-1]["start_cell"] == "C4"
+
+
+def test_refresh_dashboard_summary_skips_when_inputs_are_unchanged() -> None:
+    service = StuckupService(_settings())
+    fake_sheets = _FakeSheets()
+    fake_sheets.block = [["", "Region", "Ave L7D", "Total L7D"], ["", "Total", "1", "7"]]
+    service._google_sheets = fake_sheets  # type: ignore[assignment]
+    service._read_dashboard_block_stable = lambda first_read=None: first_read  # type: ignore[assignment]
+
+    assert service.refresh_dashboard_summary_only() is True
+    assert service.refresh_dashboard_summary_only() is False
+    assert len(fake_sheets.update_calls) == 1
+
+    # The formula block recalculated: refresh again.
+    fake_sheets.block[1][3] = "8"
+    assert service.refresh_dashboard_summary_only() is True
+
+    # New data exported by a sync: refresh even though the block looks the same.
+    service._exported_data_hash = "new-export"
+    assert service.refresh_dashboard_summary_only() is True
+
+    assert service.summary_refresh_counts() == {"executed": 3, "skipped": 1, "validation_mismatches": 0}
+    assert fake_sheets.read_calls == 4
+
+
+def test_parse_day_accepts_sheet_formats() -> None:
+    today = date(2026, 1, 2)
+
+    assert parse_day("2026-01-01", today) == date(2026, 1, 1)
+    assert parse_day("1/2/2026 10:00:00", today) == date(2026, 1, 2)
+    assert parse_day("31-Dec", today) == date(2025, 12, 31)
+    assert parse_day("n/a", today) is None
+
+
+def test_summarize_table_computes_daily_l7d_and_shares() -> None:
+    summary = summarize_table(_summary_table(), today=date(2026, 2, 18), status_values={"SOC_Staging"})
+
+    assert (summary.latest_label, summary.latest_count) == ("18-Feb", 1)
+    assert (summary.prev_label, summary.prev_count) == ("17-Feb", 2)
+    assert summary.total_l7d == 4
+    assert summary.ave_l7d == 1  # 4 rows over 3 days with data
+    assert summary.region_totals == [("MIN", 2), ("RC", 1), ("SOL-IIS", 1)]
+    assert summary.clusters == [("SOC BCP", 75.0), ("No Cluster", 25.0)]
+    assert summary.hubs[0] == ("GenSan Hub", 50.0)
+
+
+def test_local_summary_refresh_does_not_read_the_sheet() -> None:
+    service = StuckupService(_settings())
+    fake_sheets = _FakeSheets()
+    service._google_sheets = fake_sheets  # type: ignore[assignment]
+    service._summary_table = _summary_table()
+    service._exported_data_hash = "export-1"
+
+    assert service.refresh_dashboard_summary_only() is True
+    assert service.refresh_dashboard_summary_only() is False
+
+    assert fake_sheets.read_calls == 0
+    text = fake_sheets.update_calls[-1]["values"][0][0]
+    assert "Top Contributing Regions by Total L7D are" in text
+    assert "Action Taken:" in text
+
+
+def test_validate_mode_writes_sheet_summary_and_reports_mismatches() -> None:
+    service = StuckupService(_settings(STUCKUP_SUMMARY_SOURCE="validate"))
+    fake_sheets = _FakeSheets()
+    fake_sheets.block = [
+        ["", "Region", "Ave L7D", "Total L7D", "18-Feb", "17-Feb"],
+        ["", "MIN", "1", "2", "1", "1"],
+        ["", "Total", "1", "5", "1", "2"],
+    ]
+    service._google_sheets = fake_sheets  # type: ignore[assignment]
+    service._read_dashboard_block_stable = lambda first_read=None: first_read  # type: ignore[assignment]
+    service._summary_table = _summary_table()
+
+    assert service.refresh_dashboard_summary_only() is True
+
+    assert "7-day total of 5" in fake_sheets.update_calls[-1]["values"][0][0]
+    validation = service.summary_validation
+    assert validation is not None
+    assert any(item.startswith("total_l7d:") for item in validation["mismatches"])
+    assert service.summary_refresh_counts()["validation_mismatches"] == 1
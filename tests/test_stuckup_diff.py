@@ -0,0 +1,71 @@
+from app.workflows.stuckup.diff import diff_tables
+from app.workflows.stuckup.table import StuckupTable
+
+_HEADERS = ["shipment_id", "status_desc", "hub_region"]
+
+
+def test_diff_without_base_marks_all_rows_added() -> None:
+    current = StuckupTable.from_rows(_HEADERS, [["SPX2", "SOC_Packed", "VIS"], ["SPX1", "SOC_Staging", "MIN"]])
+
+    diff = diff_tables(None, current, "shipment_id")
+
+    assert not diff.has_base
+    assert diff.added == ["SPX1", "SPX2"]
+    assert diff.touches_columns(["hub_region"])
+
+
+def test_diff_reports_added_removed_and_changed_columns() -> None:
+    previous = StuckupTable.from_rows(
+        _HEADERS,
+        [["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "VIS"], ["SPX3", "SOC_Packed", "NCR"]],
+    )
+    current = StuckupTable.from_rows(
+        _HEADERS,
+        [["SPX1", "SOC_LHTransported", "MIN"], ["SPX3", "SOC_Packed", "NCR"], ["SPX4", "SOC_Staging", "SOL"]],
+    )
+
+    diff = diff_tables(previous, current, "shipment_id", computed_at="now")
+
+    assert diff.added == ["SPX4"]
+    assert diff.removed == ["SPX2"]
+    assert diff.changed == {"SPX1": ("status_desc",)}
+    assert diff.upsert_keys == {"SPX1", "SPX4"}
+    summary = diff.summary()
+    assert summary["changed_columns"] == {"status_desc": 1}
+    assert diff.to_dict(limit=0)["added_keys"] == []
+
+
+def test_diff_only_in_unexported_columns_does_not_touch_export() -> None:
+    previous = StuckupTable.from_rows(_HEADERS, [["SPX1", "SOC_Staging", "MIN"]])
+    current = StuckupTable.from_rows(_HEADERS, [["SPX1", "SOC_Staging", "VIS"]])
+
+    diff = diff_tables(previous, current, "shipment_id")
+
+    assert not diff.touches_columns(["shipment_id", "status_desc"])
+    assert diff.touches_columns(["hub_region"])
+
+
+def test_diff_flags_schema_change() -> None:
+    previous = StuckupTable.from_rows(["shipment_id", "status_desc"], [["SPX1", "SOC_Staging"]])
+    current = StuckupTable.from_rows(_HEADERS, [["SPX1", "SOC_Staging", "MIN"]])
+
+    diff = diff_tables(previous, current, "shipment_id")
+
+    assert diff.schema_changed
+    assert not diff.is_empty
+
+
+def test_duplicate_keys_are_not_reported_as_added_and_disable_incremental_sync() -> None:
+    previous = StuckupTable.from_rows(_HEADERS, [["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "VIS"]])
+    current = StuckupTable.from_rows(
+        _HEADERS,
+        [["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "VIS"], ["SPX2", "SOC_Packed", "NCR"]],
+    )
+
+    diff = diff_tables(previous, current, "shipment_id")
+
+    assert diff.added == [] and diff.removed == [] and diff.changed == {}
+    assert diff.duplicate_keys == ["SPX2"]
+    assert not diff.is_incremental
+    assert diff.touches_columns(["shipment_id"])
+    assert diff.summary()["duplicates"] == 1
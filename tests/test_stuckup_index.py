@@ -0,0 +1,70 @@
+import pytest
+
+from app.workflows.stuckup.diff import diff_tables
+from app.workflows.stuckup.index import ShipmentIndex
+from app.workflows.stuckup.table import StuckupTable
+
+_HEADERS = ["shipment_id", "status_desc", "hub_region", "cluster_name"]
+
+
+def _table(rows: list[list[str]], headers: list[str] = _HEADERS) -> StuckupTable:
+    return StuckupTable.from_rows(headers, rows)
+
+
+def test_index_applies_sync_diffs_incrementally() -> None:
+    index = ShipmentIndex("shipment_id")
+    first = _table(
+        [
+            ["SPX3", "SOC_Packed", "NCR", "North"],
+            ["SPX1", "SOC_Staging", "MIN", "South"],
+            ["SPX2", "soc_packed ", "VIS", "North"],
+        ]
+    )
+    index.apply(first, diff_tables(None, first, "shipment_id"))
+
+    assert index.get(" SPX1 ") == {"shipment_id": "SPX1", "status_desc": "SOC_Staging", "hub_region": "MIN", "cluster_name": "South"}
+    assert [item["shipment_id"] for item in index.query({"status_desc": "SOC_PACKED"}, limit=10)["items"]] == ["SPX2", "SPX3"]
+
+    second = _table(
+        [
+            ["SPX3", "SOC_LHTransported", "NCR", "North"],
+            ["SPX1", "SOC_Staging", "MIN", "South"],
+            ["SPX4", "SOC_Packed", "NCR", "North"],
+        ]
+    )
+    index.apply(second, diff_tables(first, second, "shipment_id"))
+
+    assert index.get("SPX2") is None
+    assert index.get("SPX3")["status_desc"] == "SOC_LHTransported"
+    assert [item["shipment_id"] for item in index.query({"status_desc": "soc_packed"}, limit=10)["items"]] == ["SPX4"]
+    assert index.query({"status_desc": "SOC_LHTransported"}, limit=10)["total"] == 1
+    status = index.get_status()
+    assert (status["rebuilds"], status["incremental_updates"], status["rows_applied"]) == (1, 1, 3)
+    assert status["rows"] == 3 and status["indexed_columns"]["status_desc"] == 3
+
+
+def test_index_intersects_filters_and_paginates() -> None:
+    index = ShipmentIndex("shipment_id")
+    rows = [[f"SPX{idx:02d}", "SOC_Packed" if idx % 2 else "SOC_Staging", "NCR" if idx < 6 else "VIS", "North"] for idx in range(10)]
+    table = _table(rows)
+    index.apply(table, diff_tables(None, table, "shipment_id"))
+
+    page = index.query({"status_desc": "SOC_Packed", "hub_region": "ncr", "cluster_name": ""}, limit=2, offset=1)
+    assert (page["total"], page["offset"], page["limit"]) == (3, 1, 2)
+    assert [item["shipment_id"] for item in page["items"]] == ["SPX03", "SPX05"]
+    assert index.query({}, limit=3, offset=8)["total"] == 10
+    assert index.query({"ageing_bucket": "0-1 day"}, limit=10)["total"] == 0  # column not in this table
+    with pytest.raises(ValueError):
+        index.query({"shipment_id": "SPX01"}, limit=10)
+
+
+def test_index_rebuilds_on_schema_change() -> None:
+    index = ShipmentIndex("shipment_id")
+    first = _table([["SPX1", "SOC_Packed", "NCR", "North"]])
+    index.apply(first, diff_tables(None, first, "shipment_id"))
+    headers = [*_HEADERS, "ageing_bucket"]
+    second = _table([["SPX1", "SOC_Packed", "NCR", "North", ">3 days"]], headers)
+    index.apply(second, diff_tables(first, second, "shipment_id"))
+
+    assert index.get_status()["rebuilds"] == 2
+    assert index.query({"ageing_bucket": ">3 DAYS"}, limit=10)["total"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from app.config import Settings
+from app.workflows.stuckup.monitor import StuckupMonitor
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "SEATALK_APP_ID": "x",
+        "SEATALK_APP_SECRET": "y",
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.mark.parametrize(
+    ("mode", "jobs"),
+    [
+        ("scheduled", ["sync", "summary_refresh"]),
+        ("row_change", ["source_probe", "summary_refresh"]),
+        ("both", ["source_probe", "sync", "summary_refresh"]),
+    ],
+)
+def test_scheduler_jobs_follow_sync_mode(mode: str, jobs: list[str]) -> None:
+    monitor = StuckupMonitor(_settings(STUCKUP_SYNC_MODE=mode))
+
+    scheduler = monitor._build_scheduler()
+
+    assert list(scheduler.get_status()) == jobs
+
+
+def test_job_cadences_default_to_interval_settings_and_accept_overrides() -> None:
+    monitor = StuckupMonitor(
+        _settings(
+            STUCKUP_SYNC_MODE="both",
+            STUCKUP_POLL_INTERVAL_SECONDS=1,
+            STUCKUP_SCHEDULED_SYNC_INTERVAL_SECONDS=1800,
+            STUCKUP_SUMMARY_SCHEDULE="*/10 6-22 * * *",
+        )
+    )
+
+    status = monitor._build_scheduler().get_status()
+
+    assert status["source_probe"]["schedule"] == "every 5s"
+    assert status["sync"]["schedule"] == "every 1800s"
+    assert status["summary_refresh"]["schedule"] == "*/10 6-22 * * *"
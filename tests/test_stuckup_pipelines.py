@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.config import Settings
+from app.workflows.stuckup.models import StuckupSyncResult
+from app.workflows.stuckup.pipelines import StuckupPipelineManager
+
+_PIPELINES = [
+    {"name": "soc5", "source_spreadsheet_id": "src5", "target_spreadsheet_id": "dst5", "supabase_table": "soc5_rows"},
+    {"name": "soc8", "source_spreadsheet_id": "src8", "target_spreadsheet_id": "dst8", "sync_mode": "both"},
+    {"name": "default"},
+]
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "SEATALK_APP_ID": "x",
+        "SEATALK_APP_SECRET": "y",
+        "STUCKUP_SOURCE_SPREADSHEET_ID": "src",
+        "STUCKUP_TARGET_SPREADSHEET_ID": "dst",
+        "STUCKUP_PIPELINES": json.dumps(_PIPELINES),
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_without_pipelines_global_settings_are_the_default_pipeline() -> None:
+    settings = _settings(STUCKUP_PIPELINES="")
+
+    pipelines = settings.stuckup_pipeline_settings()
+
+    assert pipelines == [settings]
+    assert pipelines[0].stuckup_pipeline_name == "default"
+
+
+def test_pipeline_settings_inherit_globals_and_namespace_state() -> None:
+    soc5, soc8, default = _settings().stuckup_pipeline_settings()
+
+    assert soc5.stuckup_source_spreadsheet_id == "src5"
+    assert soc5.supabase_stuckup_table == "soc5_rows"
+    assert soc5.stuckup_source_range == "A1:AL"
+    assert soc5.supabase_stuckup_data_hash_key == "stuckup_data_hash:soc5"
+    assert soc5.supabase_stuckup_scheduled_sync_key == "stuckup_last_scheduled_sync_ts:soc5"
+    assert soc5.stuckup_backup_dir == Path("data/stuckup/backups/soc5")
+    assert soc8.stuckup_sync_mode == "both"
+    assert soc8.supabase_stuckup_table == "stuckup_shipments"
+    # The "default" entry keeps the un-suffixed state keys used by single-pipeline deployments.
+    assert default.stuckup_source_spreadsheet_id == "src"
+    assert default.supabase_stuckup_data_hash_key == "stuckup_data_hash"
+
+
+def test_pipelines_can_be_loaded_from_file(tmp_path) -> None:
+    path = tmp_path / "pipelines.json"
+    path.write_text(json.dumps(_PIPELINES[:1]), encoding="utf-8")
+
+    pipelines = _settings(STUCKUP_PIPELINES=str(path)).stuckup_pipeline_settings()
+
+    assert [p.stuckup_pipeline_name for p in pipelines] == ["soc5"]
+
+
+def test_duplicate_or_unknown_pipeline_fields_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        _settings(STUCKUP_PIPELINES=json.dumps([{"name": "a"}, {"name": "a"}])).stuckup_pipeline_configs()
+    with pytest.raises(ValueError):
+        _settings(STUCKUP_PIPELINES=json.dumps([{"name": "a", "unknown": 1}])).stuckup_pipeline_configs()
+
+
+class _SlowService:
+    source_row_count = None
+    summary_validation = None
+
+    def __init__(self, tracker: dict[str, int], lock: threading.Lock) -> None:
+        self._tracker = tracker
+        self._lock = lock
+
+    def summary_refresh_counts(self) -> dict[str, int]:
+        return {"executed": 0, "skipped": 0}
+
+    def report_image_counts(self) -> dict[str, int]:
+        return {"renders": 0, "cache_hits": 0}
+
+    def sync_source_sheet_to_supabase(self) -> StuckupSyncResult:
+        with self._lock:
+            self._tracker["running"] += 1
+            self._tracker["peak"] = max(self._tracker["peak"], self._tracker["running"])
+        time.sleep(0.05)
+        with self._lock:
+            self._tracker["running"] -= 1
+        return StuckupSyncResult("ok", "synced", 0, 0, 0, 0)
+
+
+def test_manager_shares_clients_and_limits_concurrent_syncs() -> None:
+    manager = StuckupPipelineManager(_settings(STUCKUP_MAX_CONCURRENT_SYNCS=2))
+    monitors = [manager.get(name) for name in manager.names]
+    assert manager.names == ["soc5", "soc8", "default"]
+    assert manager.get() is monitors[0]
+    assert manager.get("missing") is None
+    assert len({id(monitor._sheets) for monitor in monitors}) == 1
+    assert len({id(monitor._supabase) for monitor in monitors}) == 3
+
+    tracker = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+    for monitor in monitors:
+        monitor._service = _SlowService(tracker, lock)  # type: ignore[assignment]
+
+    async def _run_all() -> None:
+        await asyncio.gather(*(monitor._run_sync() for monitor in monitors for _ in range(2)))
+
+    asyncio.run(_run_all())
+
+    assert tracker["peak"] == 2
+    status = manager.get_status()
+    assert [item["pipeline"] for item in status["pipelines"]] == ["soc5", "soc8", "default"]
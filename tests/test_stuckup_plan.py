@@ -0,0 +1,55 @@
+from app.workflows.stuckup import plan as plan_module
+from benchmarks.stuckup_sync import _SOURCE_ID, _change_source, build_service
+from benchmarks.stuckup_table_memory import synthetic_rows
+
+
+def _writes(plan) -> list[tuple[str, str, str]]:
+    return [(op.service, op.action, op.resource) for op in plan.operations if op.action != "read"]
+
+
+def test_plan_reads_but_leaves_sheets_supabase_and_service_state_untouched() -> None:
+    service, sheets, supabase, _ = build_service(synthetic_rows(1500))
+
+    plan = service.plan_sync()
+
+    assert plan.result is not None and plan.result.status == "ok"
+    assert ("supabase", "upsert", "stuckup_shipments") in _writes(plan)
+    assert ("sheets", "resize", "Stuckup") in _writes(plan)
+    totals = plan.totals()
+    assert totals["rows_upserted"] == 1500
+    assert totals["cells_written"] >= 1500 * 17
+    assert totals["supabase_write_requests"] == 3  # two upsert batches + data hash
+    assert supabase.tables["stuckup_shipments"] == {}
+    assert sheets.grid("bench-target", "Stuckup") == []
+    assert service.last_diff is None and service.exported_data_hash is None
+
+
+def test_plan_matches_the_calls_of_the_following_sync() -> None:
+    service, sheets, _, recorder = build_service(synthetic_rows(3000))
+    service.sync_source_sheet_to_supabase()
+    _change_source(sheets.grid(_SOURCE_ID, "Source"))
+
+    plan = service.plan_sync()
+    recorder.reset()
+    result = service.sync_source_sheet_to_supabase()
+    calls = recorder.snapshot()
+
+    assert plan.result.message == result.message and plan.result.upserted_rows == result.upserted_rows
+    totals = plan.totals()
+    assert totals["rows_deleted"] == 15
+    assert totals["supabase_read_requests"] == sum(
+        entry["calls"] for name, entry in calls.items() if name.startswith("supabase.select")
+    )
+    writes = sum(entry["calls"] for name, entry in calls.items() if "update" in name.lower() or "clear" in name)
+    assert totals["sheets_write_requests"] == writes
+
+
+def test_plan_warns_about_oversized_writes_and_grids(monkeypatch) -> None:
+    monkeypatch.setattr(plan_module, "_SHEETS_RECOMMENDED_PAYLOAD_BYTES", 10_000)
+    monkeypatch.setattr(plan_module, "_SHEETS_MAX_CELLS", 20_000)
+    service, _, _, _ = build_service(synthetic_rows(1200))
+
+    warnings = service.plan_sync().warnings
+
+    assert any("Stuckup!A1 write is" in warning for warning in warnings)
+    assert any("Stuckup would grow to" in warning for warning in warnings)
@@ -0,0 +1,98 @@
+import re
+
+from app.config import Settings
+from app.workflows.stuckup.probe import SourceChangeProbe
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "SEATALK_APP_ID": "x",
+        "SEATALK_APP_SECRET": "y",
+        "STUCKUP_SOURCE_SPREADSHEET_ID": "source",
+        "STUCKUP_SOURCE_RANGE": "A:C",
+        "STUCKUP_PROBE_HEAD_ROWS": 2,
+        "STUCKUP_PROBE_TAIL_ROWS": 2,
+        "STUCKUP_PROBE_SAMPLE_ROWS": 0,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+class _GridSheets:
+    def __init__(self, data_rows: int) -> None:
+        self.rows = [["shipment_id", "status_desc", "hub"]] + [[f"SPX{idx}", "SOC_Packed", "Hub"] for idx in range(data_rows)]
+        self.grid_rows = 1000
+        self.calls: list[list[str]] = []
+
+    def read_row_blocks(self, spreadsheet_id: str, worksheet_name: str, cell_ranges: list[str]):
+        self.calls.append(cell_ranges)
+        blocks = []
+        for cell_range in cell_ranges:
+            first, last = (int(value) for value in re.findall(r"\d+", cell_range))
+            blocks.append([list(row) for row in self.rows[first - 1 : last]])
+        return self.grid_rows, blocks
+
+
+def test_probe_is_one_read_and_detects_head_tail_and_appends() -> None:
+    sheets = _GridSheets(10)
+    probe = SourceChangeProbe(_settings(), sheets)  # type: ignore[arg-type]
+    probe.set_data_rows(10)
+
+    assert probe.probe().baseline
+    assert sheets.calls[-1] == ["A2:C3", "A10:C13"]
+    unchanged = probe.probe()
+    assert not unchanged.baseline and not unchanged.changes and not unchanged.fingerprint_changed
+
+    sheets.rows[1][1] = "SOC_Staging"
+    assert probe.probe().changes == ["head/tail rows or row count"]
+
+    sheets.rows.append(["SPX10", "SOC_Packed", "Hub"])
+    assert probe.probe().changes == ["head/tail rows or row count"]
+    assert len(sheets.calls) == 4
+
+
+def test_new_data_row_count_rebaselines_the_tail() -> None:
+    sheets = _GridSheets(10)
+    probe = SourceChangeProbe(_settings(), sheets)  # type: ignore[arg-type]
+    probe.set_data_rows(10)
+    probe.probe()
+
+    sheets.rows.append(["SPX10", "SOC_Packed", "Hub"])
+    probe.set_data_rows(11)  # a sync already read the new row
+    result = probe.probe()
+
+    assert result.baseline and result.fingerprint_changed and not result.changes
+    assert sheets.calls[-1][1] == "A11:C14"
+
+
+def test_sample_rows_are_compared_between_probes() -> None:
+    sheets = _GridSheets(20)
+    probe = SourceChangeProbe(_settings(STUCKUP_PROBE_SAMPLE_ROWS=30), sheets)  # type: ignore[arg-type]
+    probe.set_data_rows(20)
+    probe.probe()
+
+    sheets.rows[10][2] = "Other hub"
+    result = probe.probe()
+
+    assert result.changes == ["sample row 11"]
+    assert not result.fingerprint_changed
+
+
+def test_fingerprint_survives_restart_via_dump_and_restore() -> None:
+    sheets = _GridSheets(10)
+    first = SourceChangeProbe(_settings(), sheets)  # type: ignore[arg-type]
+    first.set_data_rows(10)
+    first.probe()
+
+    restarted = SourceChangeProbe(_settings(), sheets)  # type: ignore[arg-type]
+    restarted.restore(first.dump())
+    result = restarted.probe()
+
+    assert not result.baseline and not result.changes and not result.fingerprint_changed
+
+
+def test_legacy_reference_row_state_is_treated_as_no_baseline() -> None:
+    probe = SourceChangeProbe(_settings(), _GridSheets(5))  # type: ignore[arg-type]
+    probe.restore("ab" * 32)
+
+    assert probe.probe().baseline
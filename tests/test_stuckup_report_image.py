@@ -0,0 +1,176 @@
+import asyncio
+import base64
+
+import httpx
+
+from app.config import Settings
+from app.seatalk.outbox import SeaTalkOutbox
+from app.workflows.stuckup.models import StuckupSyncResult
+from app.workflows.stuckup.monitor import StuckupMonitor
+from app.workflows.stuckup.report_image import DashboardImageRenderer
+from app.workflows.stuckup.summary import DashboardSummary
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _summary() -> DashboardSummary:
+    return DashboardSummary(
+        latest_label="18-Feb",
+        latest_count=1,
+        prev_label="17-Feb",
+        prev_count=2,
+        total_l7d=4,
+        ave_l7d=1,
+        region_totals=[("MIN", 2), ("RC", 1), ("SOL-IIS", 1)],
+        clusters=[("SOC BCP", 75.0), ("No Cluster", 25.0)],
+        hubs=[("GenSan Hub", 50.0), ("SOC 5", 25.0), ("Tambler Hub", 25.0)],
+        daily_counts=[("12-Feb", 0), ("13-Feb", 0), ("14-Feb", 0), ("15-Feb", 1), ("16-Feb", 0), ("17-Feb", 2), ("18-Feb", 1)],
+    )
+
+
+def test_renderer_returns_png_and_reuses_cached_image(tmp_path) -> None:
+    renderer = DashboardImageRenderer(tmp_path)
+
+    png, content_hash = renderer.render(_summary(), title="Stuckup", as_of="2026-02-18 10:00:00")
+    again, same_hash = renderer.render(_summary(), title="Stuckup", as_of="2026-02-18 10:00:00")
+
+    assert png.startswith(_PNG_SIGNATURE)
+    assert again == png and same_hash == content_hash
+    assert (renderer.renders, renderer.cache_hits) == (1, 1)
+    assert (tmp_path / f"{content_hash}.png").exists()
+
+
+def test_renderer_changes_hash_when_data_changes_and_prunes_old_files(tmp_path) -> None:
+    renderer = DashboardImageRenderer(tmp_path, keep_files=2)
+    hashes = set()
+    for count in range(4):
+        summary = _summary()
+        summary.latest_count = count
+        hashes.add(renderer.render(summary, title="Stuckup", as_of="now")[1])
+
+    assert len(hashes) == 4
+    assert len(list(tmp_path.glob("*.png"))) == 2
+
+
+def test_renderer_shrinks_images_above_the_size_limit(tmp_path) -> None:
+    limit = 20_000
+    renderer = DashboardImageRenderer(tmp_path, max_bytes=limit)
+
+    png, _ = renderer.render(_summary(), title="Stuckup", as_of="now")
+
+    assert png.startswith(_PNG_SIGNATURE)
+    assert len(png) <= limit
+
+
+class _FakeSeaTalk:
+    def __init__(self, image_failures: int = 0) -> None:
+        self.sent: list[tuple[str, str, str]] = []
+        self._image_failures = image_failures
+
+    async def send_group_text_message(self, group_id: str, content: str, *, thread_id: str | None = None) -> dict:
+        self.sent.append(("text", group_id, content))
+        return {"code": 0}
+
+    async def send_group_image_message(self, group_id: str, image_base64: str, *, thread_id: str | None = None) -> dict:
+        if self._image_failures:
+            self._image_failures -= 1
+            request = httpx.Request("POST", "https://openapi.seatalk.io/messaging/v2/group_chat")
+            raise httpx.HTTPStatusError("HTTP 503", request=request, response=httpx.Response(503, request=request))
+        self.sent.append(("image", group_id, image_base64))
+        return {"code": 0}
+
+
+def _outbox(seatalk: _FakeSeaTalk) -> SeaTalkOutbox:
+    return SeaTalkOutbox(
+        seatalk,  # type: ignore[arg-type]
+        workers=2,
+        rate_per_minute=0,
+        burst=10,
+        max_attempts=3,
+        retry_base_seconds=0.01,
+        retry_max_seconds=0.05,
+        max_pending=10,
+        dead_letter_limit=10,
+    )
+
+
+class _ExportingService:
+    source_row_count = None
+
+    def __init__(self, exported_rows: int | None = 1) -> None:
+        self.exported_data_hash: str | None = None
+        self.exported_rows = exported_rows
+
+    def sync_source_sheet_to_supabase(self) -> StuckupSyncResult:
+        return StuckupSyncResult("ok", "synced", 1, 1, self.exported_rows, 1)
+
+    def render_report_image(self) -> tuple[bytes, str] | None:
+        return _PNG_SIGNATURE + b"body", "abc123"
+
+
+def _monitor(tmp_path, outbox: SeaTalkOutbox, service: _ExportingService) -> StuckupMonitor:
+    monitor = StuckupMonitor(
+        Settings(
+            SEATALK_APP_ID="x",
+            SEATALK_APP_SECRET="y",
+            STUCKUP_REPORT_GROUP_ID="group-1",
+            STUCKUP_STATE_PATH=str(tmp_path / "reference_row_state.txt"),
+        ),
+        outbox=outbox,
+    )
+    monitor._service = service  # type: ignore[assignment]
+    return monitor
+
+
+def test_monitor_pushes_the_report_once_per_exported_table(tmp_path) -> None:
+    seatalk = _FakeSeaTalk()
+    service = _ExportingService()
+    monitor = _monitor(tmp_path, _outbox(seatalk), service)
+
+    asyncio.run(monitor._run_sync())  # nothing exported yet
+    service.exported_data_hash = "hash-1"
+    asyncio.run(monitor._run_sync())
+    asyncio.run(monitor._run_sync())  # same export, no second report
+
+    assert [kind for kind, _, _ in seatalk.sent] == ["text", "image"]
+    assert seatalk.sent[0][2].startswith("Outbound Stuck at SOC_Staging Stuckup Validation Report ")
+    assert base64.b64decode(seatalk.sent[1][2]).startswith(_PNG_SIGNATURE)
+    assert monitor._last_status["last_report_status"] == "ok"
+
+    # A restarted process (or a new leader) re-exporting the same table does not report it again.
+    restarted = _monitor(tmp_path, _outbox(seatalk), service)
+    asyncio.run(restarted._run_sync())
+    assert len(seatalk.sent) == 2
+
+
+def test_monitor_does_not_report_an_export_it_only_adopted(tmp_path) -> None:
+    seatalk = _FakeSeaTalk()
+    # First sync of a fresh process takes the unchanged-source fast path and adopts the export.
+    service = _ExportingService(exported_rows=None)
+    service.exported_data_hash = "hash-1"
+    monitor = _monitor(tmp_path, _outbox(seatalk), service)
+
+    asyncio.run(monitor._run_sync())
+
+    assert seatalk.sent == []
+    assert monitor._last_status["last_report_status"] is None
+
+
+def test_report_goes_through_the_outbox_and_a_failed_image_is_retried(tmp_path) -> None:
+    seatalk = _FakeSeaTalk(image_failures=1)
+    outbox = _outbox(seatalk)
+    service = _ExportingService()
+    service.exported_data_hash = "hash-1"
+    monitor = _monitor(tmp_path, outbox, service)
+
+    async def scenario() -> dict:
+        outbox.start()
+        await monitor._run_sync()
+        await outbox.stop(drain_timeout=5)
+        return outbox.get_status()
+
+    status = asyncio.run(scenario())
+
+    assert [kind for kind, _, _ in seatalk.sent] == ["text", "image"]
+    assert status["sent"] == 2 and status["retried"] == 1 and status["dead_letters"] == []
+    assert monitor._last_status["last_report_status"] == "ok"
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import re
+import time
+
+from app.config import Settings
+from app.integrations.types import SinkResult
+from app.leader_election import LeaseFence, MemoryLeaseBackend
+from app.workflows.stuckup.service import StuckupService
+
+_SOURCE_VALUES = [
+    ["shipment_id", "status_desc", "hub_region"],
+    ["SPX1", "SOC_Staging", "MIN"],
+    ["SPX2", "SOC_Packed", "VIS"],
+    ["SPX3", "Delivered", "VIS"],
+]
+
+
+def _settings(tmp_path) -> Settings:
+    return Settings(
+        SEATALK_APP_ID="x",
+        SEATALK_APP_SECRET="y",
+        STUCKUP_SOURCE_SPREADSHEET_ID="source",
+        STUCKUP_TARGET_SPREADSHEET_ID="target",
+        STUCKUP_EXPORT_COLUMNS="shipment_id,status_desc,hub_region",
+        STUCKUP_BACKUP_DIR=str(tmp_path / "backups"),
+        STUCKUP_REPORT_IMAGE_DIR=str(tmp_path / "report_images"),
+    )
+
+
+class _CountingSheets:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, str]] = []
+        self.source_values = [list(row) for row in _SOURCE_VALUES]
+        # Target worksheet contents, row 1 first.
+        self.target: list[list[str]] = []
+
+    def read_values(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
+        self.calls.append(("read_values", spreadsheet_id, worksheet_name))
+        if spreadsheet_id == "source":
+            return [list(row) for row in self.source_values]
+        return [["1/1/2026 00:00:00", "Updated"]]
+
+    def clear_range(self, spreadsheet_id: str, worksheet_name: str, cell_range: str) -> None:
+        self.calls.append(("clear_range", spreadsheet_id, worksheet_name))
+        if worksheet_name == "Stuckup":
+            rows = re.findall(r"\d+", cell_range)
+            first, last = (int(rows[0]), int(rows[1])) if rows else (1, len(self.target))
+            for idx in range(first - 1, min(last, len(self.target))):
+                self.target[idx] = []
+
+    def update_values(
+        self,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        start_cell: str,
+        values: list[list[str]],
+    ) -> dict[str, int]:
+        self.calls.append(("update_values", spreadsheet_id, worksheet_name))
+        if worksheet_name == "Stuckup":
+            self._write(start_cell, values)
+        return {"updatedRows": len(values)}
+
+    def batch_update_values(self, spreadsheet_id: str, worksheet_name: str, blocks) -> dict[str, int]:
+        self.calls.append(("batch_update_values", spreadsheet_id, worksheet_name))
+        for start_cell, values in blocks:
+            self._write(start_cell, values)
+        return {"totalUpdatedRows": sum(len(values) for _, values in blocks)}
+
+    def _write(self, start_cell: str, values: list[list[str]]) -> None:
+        first = int(start_cell[1:]) - 1
+        while len(self.target) < first + len(values):
+            self.target.append([])
+        self.target[first : first + len(values)] = [list(row) for row in values]
+
+    def ensure_grid_size(self, spreadsheet_id: str, worksheet_name: str, min_rows: int, min_columns: int) -> None:
+        self.calls.append(("ensure_grid_size", spreadsheet_id, worksheet_name))
+
+
+class _CountingSupabase:
+    def __init__(self, data_hash: str | None) -> None:
+        self.data_hash = data_hash
+        self.calls: list[str] = []
+        self.upserted: list[dict[str, str]] = []
+
+    def get_data_hash(self) -> tuple[SinkResult, str | None]:
+        self.calls.append("get_data_hash")
+        return SinkResult("supabase_state", "ok", "state loaded"), self.data_hash
+
+    def set_data_hash(self, data_hash: str) -> SinkResult:
+        self.calls.append("set_data_hash")
+        self.data_hash = data_hash
+        return SinkResult("supabase_state", "ok", "state saved")
+
+    def upsert_rows(self, rows, conflict_column: str) -> SinkResult:
+        self.calls.append("upsert_rows")
+        self.upserted = list(rows)
+        return SinkResult("supabase", "ok", "upserted")
+
+    def fetch_all_rows(self, order_by: str | None = None, columns: list[str] | None = None):
+        self.calls.append("fetch_all_rows")
+        rows = [
+            {"shipment_id": "SPX1", "status_desc": "SOC_Staging", "hub_region": "MIN"},
+            {"shipment_id": "SPX2", "status_desc": "SOC_Packed", "hub_region": "VIS"},
+        ]
+        return SinkResult("supabase", "ok", "fetched"), rows
+
+    def delete_rows_by_values(self, column: str, values: list[str]) -> SinkResult:
+        self.calls.append("delete_rows_by_values")
+        return SinkResult("supabase", "ok", "deleted")
+
+
+def _source_hash() -> str:
+    headers = _SOURCE_VALUES[0]
+    records = [dict(zip(headers, row)) for row in _SOURCE_VALUES[1:] if row[1] != "Delivered"]
+    return hashlib.sha256(json.dumps(records, ensure_ascii=True, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _service(tmp_path, data_hash: str | None) -> tuple[StuckupService, _CountingSheets, _CountingSupabase]:
+    service = StuckupService(_settings(tmp_path))
+    sheets = _CountingSheets()
+    supabase = _CountingSupabase(data_hash)
+    service._google_sheets = sheets  # type: ignore[assignment]
+    service._supabase = supabase  # type: ignore[assignment]
+    service.refresh_dashboard_summary_only = lambda: sheets.calls.append(("refresh_summary", "target", ""))  # type: ignore[assignment]
+    return service, sheets, supabase
+
+
+def test_unchanged_data_only_appends_log_entry(tmp_path) -> None:
+    service, sheets, supabase = _service(tmp_path, _source_hash())
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok"
+    assert "no update" in result.message
+    assert result.source_rows == 2
+    assert result.upserted_rows == 0
+    assert result.exported_rows is None  # the target was not read back
+    assert supabase.calls == ["get_data_hash"]
+    # A fresh process adopts the unchanged export, so the summary and report image are available.
+    assert service.exported_data_hash == _source_hash()
+    assert service.render_report_image() is not None
+    assert service.last_diff is not None and not service.last_diff.has_base
+    target_calls = [call for call in sheets.calls if call[1] == "target"]
+    assert target_calls == [
+        ("read_values", "target", "config"),
+        ("update_values", "target", "config"),
+    ]
+
+
+def test_changed_data_runs_full_export(tmp_path) -> None:
+    service, sheets, supabase = _service(tmp_path, "stale-hash")
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok"
+    assert "Updated" in result.message
+    assert result.exported_rows == 2
+    assert supabase.calls == ["get_data_hash", "upsert_rows", "fetch_all_rows", "set_data_hash"]
+    assert ("update_values", "target", "Stuckup") in sheets.calls
+    assert ("refresh_summary", "target", "") in sheets.calls
+
+
+def test_second_sync_upserts_only_changed_rows(tmp_path) -> None:
+    service, sheets, supabase = _service(tmp_path, "stale-hash")
+    service.sync_source_sheet_to_supabase()
+    sheets.source_values[2][2] = "MIN"
+    sheets.calls.clear()
+    supabase.calls.clear()
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok"
+    assert result.upserted_rows == 1
+    assert supabase.upserted == [{"shipment_id": "SPX2", "status_desc": "SOC_Packed", "hub_region": "MIN"}]
+    assert service.last_diff is not None
+    assert service.last_diff.changed == {"SPX2": ("hub_region",)}
+    assert service.shipments is not None and service.shipments.get("SPX2")["hub_region"] == "MIN"
+    assert service.shipments.get("SPX3") is None  # filtered out before the sync
+    assert service.shipments.get_status()["incremental_updates"] == 1
+    # Only the changed row is rewritten in place; Supabase is not read back.
+    assert "fetch_all_rows" not in supabase.calls
+    assert ("update_values", "target", "Stuckup") not in sheets.calls
+    assert ("batch_update_values", "target", "Stuckup") in sheets.calls
+    assert "1 target row(s) patched" in result.message and result.exported_rows == 2
+    assert sheets.target[1:] == [["SPX1", "SOC_Staging", "MIN"], ["SPX2", "SOC_Packed", "MIN"]]
+
+
+def test_removed_rows_are_deleted_by_key_and_the_target_is_compacted_in_place(tmp_path) -> None:
+    service, sheets, supabase = _service(tmp_path, "stale-hash")
+    service.sync_source_sheet_to_supabase()
+    header = sheets.source_values[0]
+    sheets.source_values = [
+        header,
+        ["SPX2", "SOC_Staging", "VIS"],
+        ["SPX4", "SOC_Packed", "NCR"],
+        ["SPX5", "SOC_Packed", "MIN"],
+    ]
+    supabase.calls.clear()
+    deleted: list[list[str]] = []
+    supabase.delete_rows_by_values = lambda column, values: (deleted.append(values), SinkResult("supabase", "ok", "deleted"))[1]  # type: ignore[method-assign]
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok" and result.exported_rows == 3
+    assert deleted == [["SPX1"]]
+    assert "fetch_all_rows" not in supabase.calls
+    # SPX4 takes SPX1's row, SPX2 is rewritten where it is, SPX5 is appended.
+    assert sheets.target == [
+        header,
+        ["SPX4", "SOC_Packed", "NCR"],
+        ["SPX2", "SOC_Staging", "VIS"],
+        ["SPX5", "SOC_Packed", "MIN"],
+    ]
+
+    sheets.source_values = [header, ["SPX5", "SOC_Packed", "MIN"]]
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok" and result.exported_rows == 1
+    assert deleted[-1] == ["SPX2", "SPX4"]
+    # The last row moves up into the first free slot and the rows left over are cleared.
+    assert sheets.target == [header, ["SPX5", "SOC_Packed", "MIN"], [], []]
+
+
+def test_sync_skips_export_when_only_unexported_columns_change(tmp_path) -> None:
+    service, sheets, supabase = _service(tmp_path, "stale-hash")
+    service._settings.stuckup_export_columns = "shipment_id,status_desc"
+    service.sync_source_sheet_to_supabase()
+    sheets.source_values[1][2] = "NCR"
+    sheets.calls.clear()
+    supabase.calls.clear()
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "ok"
+    assert result.upserted_rows == 1
+    assert supabase.calls == ["get_data_hash", "upsert_rows", "set_data_hash"]
+    assert ("update_values", "target", "Stuckup") not in sheets.calls
+    # The summary follows the new rows even though the target sheet was left alone.
+    assert ("refresh_summary", "target", "") in sheets.calls
+    assert service.exported_data_hash == supabase.data_hash
+    assert service._summary_table is not None and service._summary_table.column("hub_region")[0] == "NCR"
+
+
+def test_demoted_leader_sync_does_not_commit(tmp_path) -> None:
+    backend = MemoryLeaseBackend()
+    backend.try_acquire("lease", "a", 30, now=time.time())
+    service, sheets, supabase = _service(tmp_path, "stale-hash")
+    service._fence_provider = lambda: LeaseFence(backend, "lease", "a", token=1)
+    read_source = sheets.read_values
+
+    def _read_then_lose_lease(spreadsheet_id: str, worksheet_name: str, cell_range: str) -> list[list[str]]:
+        # Another replica takes the lease while this sync is reading the source.
+        backend.try_acquire("lease", "b", 30, now=time.time() + 31)
+        return read_source(spreadsheet_id, worksheet_name, cell_range)
+
+    sheets.read_values = _read_then_lose_lease  # type: ignore[method-assign]
+
+    result = service.sync_source_sheet_to_supabase()
+
+    assert result.status == "error"
+    assert "leadership lost" in result.message
+    assert supabase.calls == ["get_data_hash"]
+    assert supabase.data_hash == "stale-hash"
+    assert [call for call in sheets.calls if call[0] != "read_values"] == []
+    assert service.exported_data_hash is None and service.last_diff is None
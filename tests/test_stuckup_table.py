@@ -0,0 +1,61 @@
+import hashlib
+import json
+
+from app.workflows.stuckup.table import StuckupTable
+
+
+def _table() -> StuckupTable:
+    return StuckupTable.from_rows(
+        ["shipment_id", "status_desc", "hub_region"],
+        [
+            ["SPX1", "SOC_Staging", "MIN"],
+            ["SPX2", "Delivered"],
+            ["SPX3", "SOC_Packed", "VIS", "extra"],
+        ],
+    )
+
+
+def test_from_rows_pads_short_rows_and_drops_extra_cells() -> None:
+    table = _table()
+
+    assert len(table) == 3
+    assert table.column_names == ["shipment_id", "status_desc", "hub_region"]
+    assert table.column("hub_region") == ["MIN", "", "VIS"]
+    assert table.column("missing") == ["", "", ""]
+
+
+def test_filter_in_and_project() -> None:
+    table = _table().filter_in("status_desc", {"SOC_Staging", "SOC_Packed"})
+
+    assert len(table) == 2
+    assert table.project(["hub_region", "shipment_id", "missing"]) == [
+        ["MIN", "SPX1", ""],
+        ["VIS", "SPX3", ""],
+    ]
+
+
+def test_repeated_values_share_one_string_object() -> None:
+    table = StuckupTable.from_rows(["status_desc"], [["".join(["SOC_", "Staging"])] for _ in range(3)])
+
+    first, second, third = table.column("status_desc")
+    assert first is second is third
+
+
+def test_key_set_operations() -> None:
+    source = _table()
+    target = StuckupTable.from_records(
+        [{"shipment_id": "SPX1"}, {"shipment_id": " SPX9 "}, {"shipment_id": None}],
+        ["shipment_id"],
+    )
+
+    assert source.key_set("shipment_id") == {"SPX1", "SPX2", "SPX3"}
+    assert target.keys_not_in("shipment_id", source.key_set("shipment_id")) == ["SPX9"]
+
+
+def test_content_hash_matches_hash_of_record_list() -> None:
+    table = _table()
+    records = list(table.iter_records())
+    expected = hashlib.sha256(json.dumps(records, ensure_ascii=True, sort_keys=True).encode("utf-8")).hexdigest()
+
+    assert records[1] == {"shipment_id": "SPX2", "status_desc": "Delivered", "hub_region": ""}
+    assert table.content_hash() == expected
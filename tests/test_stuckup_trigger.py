@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.workflows.stuckup.trigger import (
+    StuckupTriggerQueue,
+    compute_trigger_signature,
+    is_valid_trigger_signature,
+)
+
+
+def test_trigger_signature_checks_secret_and_timestamp() -> None:
+    body = b'{"source":"apps_script"}'
+    now = time.time()
+    timestamp = str(int(now))
+    signature = compute_trigger_signature("s3cret", timestamp, body)
+
+    assert is_valid_trigger_signature("s3cret", timestamp, body, signature, max_skew_seconds=300, now=now)
+    assert not is_valid_trigger_signature("other", timestamp, body, signature, max_skew_seconds=300, now=now)
+    assert not is_valid_trigger_signature("s3cret", timestamp, body + b" ", signature, max_skew_seconds=300, now=now)
+    # Replayed long after it was signed.
+    assert not is_valid_trigger_signature("s3cret", timestamp, body, signature, max_skew_seconds=300, now=now + 301)
+    assert not is_valid_trigger_signature("", timestamp, body, signature, max_skew_seconds=300, now=now)
+
+
+def _queue(runs: list[float], *, run_seconds: float = 0.0, rate_per_minute: float = 0.0) -> StuckupTriggerQueue:
+    async def _run() -> None:
+        runs.append(time.monotonic())
+        await asyncio.sleep(run_seconds)
+
+    return StuckupTriggerQueue(_run, debounce_seconds=0.05, max_delay_seconds=0.2, rate_per_minute=rate_per_minute)
+
+
+def test_burst_of_requests_is_coalesced_into_one_run() -> None:
+    runs: list[float] = []
+
+    async def _main() -> list[str]:
+        queue = _queue(runs)
+        statuses = []
+        for _ in range(5):
+            statuses.append(queue.request("sheet").status)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.15)
+        return statuses
+
+    statuses = asyncio.run(_main())
+
+    assert statuses == ["queued", "coalesced", "coalesced", "coalesced", "coalesced"]
+    assert len(runs) == 1
+
+
+def test_requests_during_a_run_schedule_one_follow_up() -> None:
+    runs: list[float] = []
+
+    async def _main() -> dict:
+        queue = _queue(runs, run_seconds=0.1)
+        queue.request("sheet")
+        await asyncio.sleep(0.08)  # first run is in progress
+        queue.request("sheet")
+        queue.request("sheet")
+        await asyncio.sleep(0.3)
+        return queue.get_status()
+
+    status = asyncio.run(_main())
+
+    assert len(runs) == 2
+    assert status["runs"] == 2 and status["pending"] == 0
+
+
+def test_continuous_requests_still_run_within_max_delay() -> None:
+    runs: list[float] = []
+
+    async def _main() -> float:
+        queue = _queue(runs)
+        started = time.monotonic()
+        while time.monotonic() - started < 0.3:
+            queue.request("sheet")
+            await asyncio.sleep(0.02)
+        await queue.close()
+        return started
+
+    started = asyncio.run(_main())
+
+    assert runs and runs[0] - started < 0.28
+
+
+def test_rate_limit_is_per_source() -> None:
+    runs: list[float] = []
+
+    async def _main() -> list:
+        queue = _queue(runs, rate_per_minute=2)
+        decisions = [queue.request("a"), queue.request("a"), queue.request("a"), queue.request("b")]
+        await queue.close()
+        return decisions
+
+    decisions = asyncio.run(_main())
+
+    assert [d.status for d in decisions] == ["queued", "coalesced", "rate_limited", "coalesced"]
+    assert 0 < decisions[2].retry_after_seconds <= 30